@@ -1,134 +1,472 @@
 #!/usr/bin/env python3
 """
 Import SQL chunks to Cloudflare D1 database
+
+Chunks are imported with bounded parallelism. Progress is recorded in a
+manifest (import_manifest.json in the chunks directory) holding the SHA-256
+of every chunk and its import status, so a rerun skips chunks that were
+already imported and only retries the ones that failed. A chunk whose
+content changed since it was imported is treated as new.
+
+Instead of fixed sleeps between imports, a shared backoff delay grows when
+imports fail (timeouts, rate limits) and decays again as imports succeed.
+
+Retrying a chunk must not fail on the rows an earlier attempt already wrote,
+so plain INSERT statements are sent as INSERT OR REPLACE (the chunks carry
+explicit primary keys, so a replayed row replaces itself).
+
+Two transports are supported:
+    wrangler - `wrangler d1 execute --file` per chunk (default)
+    api      - statements sent one at a time through the D1 HTTP API via
+               D1Connection, used automatically when CLOUDFLARE_ACCOUNT_ID,
+               D1_DATABASE_ID and CLOUDFLARE_API_TOKEN are set. A chunk stops
+               at its first failing statement; the number of statements
+               applied is kept in the manifest and a retry resumes there.
+
+Usage:
+    python import_chunks.py                   # Import pending and failed chunks
+    python import_chunks.py --only-failed     # Retry only chunks that failed
+    python import_chunks.py --workers 1       # Import sequentially
+    python import_chunks.py --transport api   # Bypass wrangler
 """
+import argparse
+import hashlib
+import json
 import os
+import random
+import re
 import subprocess
+import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
 
-def import_chunk(chunk_file):
-    """Import a single chunk file to D1"""
-    cmd = [
-        'wrangler', 'd1', 'execute', 'gkl-fantasy',
-        '--file', chunk_file,
-        '--remote'
-    ]
-    
+sys.path.append(str(Path(__file__).parent.parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+from split_sql_files import iter_sql_statements
+
+DATABASE_NAME = 'gkl-fantasy'
+MANIFEST_NAME = 'import_manifest.json'
+CHUNK_PATTERNS = ['daily_lineups_chunk_*.sql', 'player_stats_chunk_*.sql']
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 3
+# Base timeout plus an allowance per MB of SQL, replacing the flat 60s limit
+BASE_TIMEOUT_SECONDS = 60
+TIMEOUT_SECONDS_PER_MB = 60
+
+# Statements applied between manifest checkpoints (api transport)
+PROGRESS_INTERVAL = 100
+
+_PLAIN_INSERT = re.compile(r'^INSERT\s+INTO\b', re.IGNORECASE)
+
+STATUS_PENDING = 'pending'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+
+def file_sha256(path):
+    """Hash a file in blocks so large chunks are never fully loaded."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ImportManifest:
+    """Thread-safe JSON manifest of chunk hashes and import status."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.chunks = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.chunks = json.load(f).get('chunks', {})
+
+    def sync(self, chunk_path, sha256):
+        """Register a chunk, resetting its status if its content changed."""
+        with self._lock:
+            entry = self.chunks.get(chunk_path.name)
+            if entry is None or entry.get('sha256') != sha256:
+                self.chunks[chunk_path.name] = {
+                    'sha256': sha256,
+                    'size_bytes': chunk_path.stat().st_size,
+                    'status': STATUS_PENDING,
+                    'attempts': 0,
+                    'statements_applied': 0
+                }
+            return self.chunks[chunk_path.name]['status']
+
+    def update(self, chunk_name, **fields):
+        """Update a chunk entry and persist the manifest atomically."""
+        with self._lock:
+            self.chunks[chunk_name].update(fields)
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': datetime.now().isoformat(), 'chunks': self.chunks},
+                      f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+
+class AdaptiveBackoff:
+    """
+    Shared delay between imports that adapts to failures.
+
+    Each failure doubles the delay (starting at min_delay, capped at
+    max_delay); each success halves it, dropping to zero below min_delay.
+    """
+
+    def __init__(self, min_delay=1.0, max_delay=60.0):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self.delay
+        if delay:
+            # Jitter keeps parallel workers from retrying in lockstep
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def record_success(self):
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay / 2 >= self.min_delay else 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.min_delay, self.delay * 2))
+
+
+def chunk_timeout(chunk_path):
+    """Scale the wrangler timeout with the chunk size."""
+    size_mb = chunk_path.stat().st_size / (1024 * 1024)
+    return int(BASE_TIMEOUT_SECONDS + TIMEOUT_SECONDS_PER_MB * size_mb)
+
+
+def idempotent_statement(statement):
+    """Rewrite a plain INSERT as INSERT OR REPLACE so replaying it is harmless."""
+    return _PLAIN_INSERT.sub('INSERT OR REPLACE INTO', statement, count=1)
+
+
+def write_idempotent_copy(chunk_file, target):
+    """Stream a chunk into target with every plain INSERT made idempotent."""
+    with open(chunk_file, 'r', encoding='utf-8') as f:
+        for statement in iter_sql_statements(f):
+            target.write(idempotent_statement(statement))
+            target.write('\n')
+
+
+def import_chunk(chunk_file, timeout=BASE_TIMEOUT_SECONDS):
+    """
+    Import a single chunk file to D1 with wrangler.
+
+    wrangler runs an idempotent temporary copy of the chunk, so a retry
+    after a partial import does not hit UNIQUE constraint errors.
+
+    Returns:
+        (success, error_message)
+    """
+    tmp_path = None
     try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.sql',
+                                         prefix=f"{Path(chunk_file).stem}_", delete=False) as tmp:
+            tmp_path = tmp.name
+            write_idempotent_copy(chunk_file, tmp)
+
+        cmd = [
+            'wrangler', 'd1', 'execute', DATABASE_NAME,
+            '--file', tmp_path,
+            '--remote'
+        ]
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=60
+            timeout=timeout
         )
-        return result.returncode == 0
+        if result.returncode == 0:
+            return True, None
+        return False, (result.stderr or result.stdout).strip()[-500:]
     except subprocess.TimeoutExpired:
-        print(f"    [TIMEOUT] Import timed out after 60 seconds")
-        return False
+        return False, f"Import timed out after {timeout} seconds"
     except Exception as e:
-        print(f"    [ERROR] {str(e)}")
-        return False
-
-def main():
-    # Change to chunks directory
-    chunks_dir = Path(__file__).parent.parent / 'sql' / 'chunks'
-    os.chdir(chunks_dir)
-    
-    print("=" * 60)
-    print("Cloudflare D1 Data Import - Large Datasets")
-    print("=" * 60)
-    print()
-    
-    # Get all chunk files
-    lineup_chunks = sorted(Path('.').glob('daily_lineups_chunk_*.sql'))
-    stats_chunks = sorted(Path('.').glob('player_stats_chunk_*.sql'))
-    
-    total_chunks = len(lineup_chunks) + len(stats_chunks)
-    print(f"Found {len(lineup_chunks)} lineup chunks")
-    print(f"Found {len(stats_chunks)} player stats chunks")
-    print(f"Total: {total_chunks} chunks to import")
-    print()
-    
-    input("Press Enter to start import (this will take 10-15 minutes)...")
-    print()
-    
-    successful = 0
-    failed = 0
-    
-    # Import daily lineups
-    print("=" * 60)
-    print("IMPORTING DAILY LINEUPS")
-    print("=" * 60)
-    
-    for i, chunk in enumerate(lineup_chunks, 1):
-        print(f"[{i}/{len(lineup_chunks)}] Importing {chunk.name}...", end=' ')
-        start_time = time.time()
-        
-        if import_chunk(str(chunk)):
-            elapsed = time.time() - start_time
-            print(f"[OK] ({elapsed:.1f}s)")
-            successful += 1
+        return False, str(e)
+    finally:
+        if tmp_path:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+def import_chunk_api(chunk_file, d1, start=0, on_progress=None):
+    """
+    Import a single chunk file through the D1 HTTP API.
+
+    Statements are streamed from the file and executed one at a time, so
+    the import stops at the first failing statement instead of carrying on
+    past it.
+
+    Args:
+        chunk_file: Chunk file path
+        d1: D1Connection
+        start: Number of leading statements already applied by an earlier attempt
+        on_progress: Called with the number of statements applied so far,
+                     every PROGRESS_INTERVAL statements
+
+    Returns:
+        (success, error_message, statements_applied)
+    """
+    applied = start
+    try:
+        with open(chunk_file, 'r', encoding='utf-8') as f:
+            for index, statement in enumerate(iter_sql_statements(f)):
+                if index < start:
+                    continue
+                try:
+                    d1.execute(idempotent_statement(statement))
+                except Exception as e:
+                    return False, f"Statement {index + 1} failed: {e}", applied
+                applied += 1
+                if on_progress and applied % PROGRESS_INTERVAL == 0:
+                    on_progress(applied)
+        return True, None, applied
+    except Exception as e:
+        return False, str(e), applied
+
+
+def discover_chunks(chunks_dir, patterns=CHUNK_PATTERNS):
+    """Return chunk files in import order (lineups first, then stats)."""
+    chunks = []
+    for pattern in patterns:
+        chunks.extend(sorted(Path(chunks_dir).glob(pattern)))
+    return chunks
+
+
+def run_import(chunks, manifest, transport='wrangler', workers=DEFAULT_WORKERS,
+               max_attempts=DEFAULT_MAX_ATTEMPTS, only_failed=False, d1=None):
+    """
+    Import chunks in parallel, skipping completed ones.
+
+    Args:
+        chunks: Chunk file paths
+        manifest: ImportManifest tracking status
+        transport: 'wrangler' or 'api'
+        workers: Maximum concurrent imports
+        max_attempts: Attempts per chunk within this run
+        only_failed: Only import chunks previously marked failed
+        d1: D1Connection, required for the api transport
+
+    Returns:
+        Dict with completed, failed and skipped counts
+    """
+    todo = []
+    skipped = 0
+    for chunk in chunks:
+        status = manifest.sync(chunk, file_sha256(chunk))
+        if status == STATUS_COMPLETED or (only_failed and status != STATUS_FAILED):
+            skipped += 1
         else:
-            print(f"[FAILED]")
-            failed += 1
-        
-        # Small delay between imports
-        time.sleep(1)
-    
+            todo.append(chunk)
+    manifest.save()
+
+    print(f"Chunks to import: {len(todo)} ({skipped} skipped)")
+    print(f"Transport: {transport}, workers: {workers}")
     print()
-    
-    # Import player stats
-    print("=" * 60)
-    print("IMPORTING PLAYER STATS")
-    print("=" * 60)
-    
-    for i, chunk in enumerate(stats_chunks, 1):
-        print(f"[{i}/{len(stats_chunks)}] Importing {chunk.name}...", end=' ')
-        start_time = time.time()
-        
-        if import_chunk(str(chunk)):
+
+    max_attempts = max(1, max_attempts)
+    backoff = AdaptiveBackoff()
+    counts = {'completed': 0, 'failed': 0, 'skipped': skipped}
+    progress = {'done': 0}
+    print_lock = threading.Lock()
+
+    def import_one(chunk):
+        error = None
+        for attempt in range(1, max_attempts + 1):
+            backoff.wait()
+            start_time = time.time()
+            entry = manifest.chunks[chunk.name]
+            if transport == 'api':
+                ok, error, applied = import_chunk_api(
+                    chunk, d1, start=entry.get('statements_applied', 0),
+                    on_progress=lambda n: manifest.update(chunk.name, statements_applied=n)
+                )
+                manifest.update(chunk.name, statements_applied=applied)
+            else:
+                ok, error = import_chunk(chunk, timeout=chunk_timeout(chunk))
             elapsed = time.time() - start_time
-            print(f"[OK] ({elapsed:.1f}s)")
-            successful += 1
-        else:
-            print(f"[FAILED]")
-            failed += 1
-        
-        # Small delay between imports
-        time.sleep(1)
-    
-    print()
-    print("=" * 60)
-    print("IMPORT SUMMARY")
-    print("=" * 60)
-    print(f"Successful imports: {successful}/{total_chunks}")
-    print(f"Failed imports: {failed}/{total_chunks}")
-    print()
-    
-    # Verify counts
+
+            if ok:
+                backoff.record_success()
+                manifest.update(chunk.name, status=STATUS_COMPLETED,
+                                attempts=entry.get('attempts', 0) + 1,
+                                imported_at=datetime.now().isoformat(),
+                                elapsed_seconds=round(elapsed, 1),
+                                transport=transport, last_error=None)
+                return True, elapsed, attempt, None
+
+            backoff.record_failure()
+            manifest.update(chunk.name, status=STATUS_FAILED,
+                            attempts=entry.get('attempts', 0) + 1,
+                            last_error=error, transport=transport)
+        return False, elapsed, max_attempts, error
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(import_one, chunk): chunk for chunk in todo}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            ok, elapsed, attempts, error = future.result()
+            with print_lock:
+                progress['done'] += 1
+                prefix = f"[{progress['done']}/{len(todo)}] {chunk.name}"
+                retry_note = f", {attempts} attempts" if attempts > 1 else ""
+                if ok:
+                    counts['completed'] += 1
+                    print(f"{prefix} [OK] ({elapsed:.1f}s{retry_note})")
+                else:
+                    counts['failed'] += 1
+                    print(f"{prefix} [FAILED] {error}")
+
+    return counts
+
+
+VERIFY_QUERY = (
+    "SELECT 'transactions' as table_name, COUNT(*) as count FROM transactions " +
+    "UNION ALL SELECT 'daily_lineups', COUNT(*) FROM daily_lineups " +
+    "UNION ALL SELECT 'daily_gkl_player_stats', COUNT(*) FROM daily_gkl_player_stats " +
+    "UNION ALL SELECT 'player_id_mapping', COUNT(*) FROM player_id_mapping"
+)
+
+
+def verify_counts(d1=None):
+    """Print row counts for the imported tables."""
     print("Verifying database counts...")
+
+    if d1 is not None:
+        try:
+            for row in d1.execute(VERIFY_QUERY).get('results', []):
+                print(f"  {row['table_name']}: {row['count']:,}")
+        except Exception as e:
+            print(f"Could not verify counts: {e}")
+        return
+
     verify_cmd = [
-        'wrangler', 'd1', 'execute', 'gkl-fantasy',
-        '--command', 
-        "SELECT 'transactions' as table_name, COUNT(*) as count FROM transactions " +
-        "UNION ALL SELECT 'daily_lineups', COUNT(*) FROM daily_lineups " +
-        "UNION ALL SELECT 'daily_gkl_player_stats', COUNT(*) FROM daily_gkl_player_stats " +
-        "UNION ALL SELECT 'player_id_mapping', COUNT(*) FROM player_id_mapping",
+        'wrangler', 'd1', 'execute', DATABASE_NAME,
+        '--command', VERIFY_QUERY,
         '--remote',
         '--json'
     ]
-    
+
     try:
-        result = subprocess.run(verify_cmd, capture_output=True, text=True)
+        result = subprocess.run(verify_cmd, capture_output=True, text=True, timeout=60)
         print(result.stdout)
     except Exception as e:
         print(f"Could not verify counts: {e}")
-    
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Import SQL chunks to Cloudflare D1')
+    parser.add_argument('--chunks-dir', default=str(Path(__file__).parent.parent / 'sql' / 'chunks'),
+                        help='Directory containing chunk files')
+    parser.add_argument('--pattern', action='append',
+                        help='Glob pattern for chunk files (repeatable)')
+    parser.add_argument('--transport', choices=['auto', 'wrangler', 'api'], default='auto',
+                        help='Import via wrangler or the D1 HTTP API (auto: API when credentials are set)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Maximum concurrent imports')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help='Attempts per chunk before it is marked failed')
+    parser.add_argument('--only-failed', action='store_true',
+                        help='Only retry chunks marked failed in the manifest')
+    parser.add_argument('--reset', action='store_true',
+                        help='Discard the manifest and import every chunk')
+    parser.add_argument('--yes', action='store_true', help='Do not prompt before importing')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the row count check')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    chunks_dir = Path(args.chunks_dir)
+    manifest_path = chunks_dir / MANIFEST_NAME
+    if args.reset and manifest_path.exists():
+        manifest_path.unlink()
+
+    print("=" * 60)
+    print("Cloudflare D1 Data Import - Large Datasets")
+    print("=" * 60)
+    print()
+
+    chunks = discover_chunks(chunks_dir, args.pattern or CHUNK_PATTERNS)
+    print(f"Found {len(chunks)} chunk files in {chunks_dir}")
+
+    d1 = None
+    transport = args.transport
+    if transport in ('auto', 'api'):
+        from data_pipeline.common.d1_connection import D1Connection, is_d1_available
+        if is_d1_available():
+            d1 = D1Connection()
+            transport = 'api'
+            if args.transport == 'auto':
+                print("Transport auto: using the D1 HTTP API (D1 credentials found)")
+        elif transport == 'api':
+            print("[ERROR] D1 credentials not configured")
+            print("Required: CLOUDFLARE_ACCOUNT_ID, D1_DATABASE_ID, CLOUDFLARE_API_TOKEN")
+            sys.exit(1)
+        else:
+            transport = 'wrangler'
+            print("Transport auto: using wrangler (D1 credentials not set)")
+
+    if not args.yes:
+        input("Press Enter to start import...")
+    print()
+
+    manifest = ImportManifest(manifest_path)
+    counts = run_import(
+        chunks, manifest,
+        transport=transport,
+        workers=args.workers,
+        max_attempts=args.max_attempts,
+        only_failed=args.only_failed,
+        d1=d1
+    )
+
+    print()
+    print("=" * 60)
+    print("IMPORT SUMMARY")
+    print("=" * 60)
+    print(f"Imported: {counts['completed']}")
+    print(f"Failed: {counts['failed']}")
+    print(f"Skipped (already imported): {counts['skipped']}")
+    print(f"Manifest: {manifest_path}")
+
+    if counts['failed']:
+        print(f"[WARNING] {counts['failed']} chunks failed to import")
+        print("Re-run with --only-failed to retry just those chunks")
+
+    print()
+    if not args.no_verify:
+        verify_counts(d1)
+
     print()
     print("=" * 60)
     print("Import process complete!")
     print("=" * 60)
 
+    return counts['failed'] == 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main() else 1)
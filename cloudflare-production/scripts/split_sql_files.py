@@ -1,82 +1,424 @@
 #!/usr/bin/env python3
 """
 Split large SQL files into chunks for Cloudflare D1 import
+
+The dump is read as a stream and tokenized into complete SQL statements
+(quoted strings, quoted identifiers and comments are respected, so a ';'
+inside a literal never ends a statement). Statements are then packed into
+chunk files bounded by both byte size and statement count, so a chunk never
+ends in the middle of a multi-line INSERT and always fits D1 import limits.
+
+Optionally, runs of consecutive single-row INSERTs into the same table are
+rewritten into multi-row INSERTs, which cuts the statement count D1 has to
+execute by one to two orders of magnitude.
+
+Memory use is bounded by the largest single statement, not the dump size.
+
+Usage:
+    python split_sql_files.py
+    python split_sql_files.py data_daily_lineups.sql --prefix daily_lineups --merge-inserts
 """
+import argparse
 import os
+import re
 import sys
 
-def split_sql_file(input_file, output_prefix, chunk_size=5000):
-    """Split a SQL file into smaller chunks"""
-    
-    # Read the input file
-    with open(input_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    total_lines = len(lines)
-    num_chunks = (total_lines + chunk_size - 1) // chunk_size
-    
+# D1 rejects statements over 100KB; keep headroom for the trailing ';'
+DEFAULT_MAX_STATEMENT_BYTES = 90 * 1024
+DEFAULT_MAX_CHUNK_BYTES = 2 * 1024 * 1024
+DEFAULT_MAX_CHUNK_STATEMENTS = 5000
+DEFAULT_ROWS_PER_INSERT = 100
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Characters that can change tokenizer state outside of a literal
+_SPECIAL_CHARS = re.compile(r"['\";\-/`\[]")
+
+_SINGLE_ROW_INSERT = re.compile(
+    r"^((?:INSERT(?:\s+OR\s+\w+)?|REPLACE)\s+INTO\s+[^\s(]+\s*(?:\([^)]*\))?\s*VALUES)\s*\(",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def iter_sql_statements(stream, block_size=READ_BLOCK_SIZE):
+    """
+    Yield complete SQL statements from a text stream.
+
+    Statements are returned stripped and terminated with ';'. Comments that
+    appear between statements are dropped; comments inside a statement are
+    kept verbatim. Doubled quotes ('it''s') are handled naturally because the
+    literal closes and immediately reopens.
+
+    Args:
+        stream: Text file object opened for reading
+        block_size: Number of characters read per block
+
+    Yields:
+        str: One SQL statement at a time
+    """
+    closers = {"'": "'", '"': '"', '`': '`', '[': ']'}
+    state = None          # None, a quote opener, '--' or '/*'
+    statement = []        # Pieces of the statement being assembled
+    buf = ''
+
+    while True:
+        block = stream.read(block_size)
+        at_eof = not block
+        buf += block
+        pos = 0
+        n = len(buf)
+
+        while pos < n:
+            if state is None:
+                match = _SPECIAL_CHARS.search(buf, pos)
+                if not match:
+                    statement.append(buf[pos:])
+                    pos = n
+                    break
+                i = match.start()
+                ch = buf[i]
+                if ch in '-/' and i + 1 >= n and not at_eof:
+                    # Need the next character to know if a comment starts
+                    statement.append(buf[pos:i])
+                    pos = i
+                    break
+                if ch == ';':
+                    statement.append(buf[pos:i + 1])
+                    text = ''.join(statement).strip()
+                    statement = []
+                    if text != ';':
+                        yield text
+                    pos = i + 1
+                elif ch == '-' and buf.startswith('--', i):
+                    statement.append(buf[pos:i])
+                    state = '--'
+                    pos = i
+                elif ch == '/' and buf.startswith('/*', i):
+                    statement.append(buf[pos:i])
+                    state = '/*'
+                    pos = i
+                elif ch in closers:
+                    statement.append(buf[pos:i + 1])
+                    state = ch
+                    pos = i + 1
+                else:
+                    statement.append(buf[pos:i + 1])
+                    pos = i + 1
+            elif state == '--':
+                end = buf.find('\n', pos)
+                if end == -1:
+                    comment, pos = buf[pos:], n
+                else:
+                    comment, pos = buf[pos:end + 1], end + 1
+                    state = None
+                # Only keep comments embedded in a statement
+                if ''.join(statement).strip():
+                    statement.append(comment)
+            elif state == '/*':
+                end = buf.find('*/', pos)
+                if end == -1:
+                    # Keep a trailing '*' in case '*/' straddles blocks
+                    keep = n - 1 if buf.endswith('*') and not at_eof else n
+                    comment, pos = buf[pos:keep], keep
+                    if ''.join(statement).strip():
+                        statement.append(comment)
+                    break
+                comment, pos = buf[pos:end + 2], end + 2
+                state = None
+                if ''.join(statement).strip():
+                    statement.append(comment)
+            else:
+                end = buf.find(closers[state], pos)
+                if end == -1:
+                    statement.append(buf[pos:])
+                    pos = n
+                else:
+                    statement.append(buf[pos:end + 1])
+                    pos = end + 1
+                    state = None
+
+        buf = buf[pos:]
+
+        if at_eof:
+            break
+
+    tail = ''.join(statement).strip()
+    if tail:
+        # Final statement without a terminating semicolon
+        yield tail if tail.endswith(';') else tail + ';'
+
+
+def split_single_row_insert(statement):
+    """
+    Split a single-row INSERT into its prefix and values tuple.
+
+    Args:
+        statement: Complete SQL statement ending with ';'
+
+    Returns:
+        (prefix, values) where prefix ends with 'VALUES' and values is the
+        parenthesized row, or None if the statement is not a plain
+        single-row INSERT (multi-row, ON CONFLICT, SELECT, ...).
+    """
+    match = _SINGLE_ROW_INSERT.match(statement)
+    if not match:
+        return None
+
+    start = match.end() - 1
+    depth = 0
+    in_quote = None
+    i = start
+    n = len(statement)
+    while i < n:
+        ch = statement[i]
+        if in_quote:
+            if ch == in_quote:
+                in_quote = None
+        elif ch in ("'", '"'):
+            in_quote = ch
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                break
+        i += 1
+    else:
+        return None
+
+    if statement[i + 1:].strip() != ';':
+        return None
+
+    prefix = re.sub(r'\s+', ' ', match.group(1).strip())
+    return prefix, statement[start:i + 1]
+
+
+def merge_single_row_inserts(statements, rows_per_insert=DEFAULT_ROWS_PER_INSERT,
+                             max_statement_bytes=DEFAULT_MAX_STATEMENT_BYTES):
+    """
+    Rewrite runs of single-row INSERTs with the same prefix into multi-row INSERTs.
+
+    Any other statement flushes the current run so statement order is preserved.
+
+    Args:
+        statements: Iterable of SQL statements
+        rows_per_insert: Maximum rows per merged INSERT
+        max_statement_bytes: Maximum encoded size of a merged INSERT
+
+    Yields:
+        str: SQL statements
+    """
+    prefix = None
+    rows = []
+    size = 0
+
+    def flush():
+        if len(rows) == 1:
+            return f"{prefix} {rows[0]};"
+        return f"{prefix}\n" + ",\n".join(rows) + ";"
+
+    for statement in statements:
+        parts = split_single_row_insert(statement)
+        if parts is None:
+            if rows:
+                yield flush()
+                rows = []
+            yield statement
+            continue
+
+        stmt_prefix, values = parts
+        row_bytes = len(values.encode('utf-8')) + 2
+        if rows and (stmt_prefix != prefix or len(rows) >= rows_per_insert
+                     or size + row_bytes > max_statement_bytes):
+            yield flush()
+            rows = []
+
+        if not rows:
+            prefix = stmt_prefix
+            size = len(prefix.encode('utf-8')) + 2
+        rows.append(values)
+        size += row_bytes
+
+    if rows:
+        yield flush()
+
+
+class ChunkWriter:
+    """Pack statements into chunk files bounded by bytes and statement count."""
+
+    def __init__(self, output_dir, output_prefix, max_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                 max_statements=DEFAULT_MAX_CHUNK_STATEMENTS):
+        self.output_dir = output_dir
+        self.output_prefix = output_prefix
+        self.max_bytes = max_bytes
+        self.max_statements = max_statements
+
+        self.chunk_files = []
+        self.total_statements = 0
+        self.total_bytes = 0
+        self.oversized_statements = 0
+
+        self._file = None
+        self._bytes = 0
+        self._statements = 0
+
+    def _open_next(self):
+        self.close()
+        chunk_file = os.path.join(
+            self.output_dir, f"{self.output_prefix}_chunk_{len(self.chunk_files) + 1:02d}.sql"
+        )
+        # newline='\n' keeps byte accounting identical across platforms
+        self._file = open(chunk_file, 'w', encoding='utf-8', newline='\n')
+        self._bytes = 0
+        self._statements = 0
+        self.chunk_files.append(chunk_file)
+
+    def write(self, statement):
+        """Append one statement, starting a new chunk when a limit would be exceeded."""
+        data = statement + '\n'
+        size = len(data.encode('utf-8'))
+
+        if size > self.max_bytes:
+            self.oversized_statements += 1
+
+        if (self._file is None
+                or self._statements >= self.max_statements
+                or (self._statements and self._bytes + size > self.max_bytes)):
+            self._open_next()
+
+        self._file.write(data)
+        self._bytes += size
+        self._statements += 1
+        self.total_bytes += size
+        self.total_statements += 1
+
+    def close(self):
+        """Close the currently open chunk, printing its size."""
+        if self._file is not None:
+            self._file.close()
+            print(f"  Created {self.chunk_files[-1]} "
+                  f"({self._statements} statements, {self._bytes / 1024:.0f} KB)")
+            self._file = None
+
+
+def split_sql_file(input_file, output_prefix, output_dir='chunks',
+                   max_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                   max_statements=DEFAULT_MAX_CHUNK_STATEMENTS,
+                   merge_inserts=False, rows_per_insert=DEFAULT_ROWS_PER_INSERT):
+    """
+    Split a SQL file into statement-aligned chunks.
+
+    Args:
+        input_file: Path to the SQL dump
+        output_prefix: Prefix for chunk file names
+        output_dir: Directory the chunks are written to
+        max_bytes: Maximum size of a chunk in bytes
+        max_statements: Maximum number of statements per chunk
+        merge_inserts: Rewrite consecutive single-row INSERTs into multi-row INSERTs
+        rows_per_insert: Maximum rows per merged INSERT
+
+    Returns:
+        List of chunk file paths
+    """
     print(f"Splitting {input_file}:")
-    print(f"  Total lines: {total_lines}")
-    print(f"  Chunk size: {chunk_size}")
-    print(f"  Number of chunks: {num_chunks}")
-    
-    # Create chunks
-    for i in range(num_chunks):
-        start_idx = i * chunk_size
-        end_idx = min((i + 1) * chunk_size, total_lines)
-        
-        chunk_file = f"chunks/{output_prefix}_chunk_{i+1:02d}.sql"
-        
-        with open(chunk_file, 'w', encoding='utf-8') as f:
-            f.writelines(lines[start_idx:end_idx])
-        
-        print(f"  Created {chunk_file} ({end_idx - start_idx} lines)")
-    
-    return num_chunks
+    print(f"  Max chunk size: {max_bytes / 1024:.0f} KB")
+    print(f"  Max statements per chunk: {max_statements}")
+    print(f"  Merge inserts: {'yes' if merge_inserts else 'no'}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    writer = ChunkWriter(output_dir, output_prefix, max_bytes, max_statements)
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        statements = iter_sql_statements(f)
+        if merge_inserts:
+            statements = merge_single_row_inserts(
+                statements,
+                rows_per_insert=rows_per_insert,
+                max_statement_bytes=min(DEFAULT_MAX_STATEMENT_BYTES, max_bytes)
+            )
+        try:
+            for statement in statements:
+                writer.write(statement)
+        finally:
+            writer.close()
+
+    print(f"  Total statements: {writer.total_statements}")
+    print(f"  Total size: {writer.total_bytes / (1024 * 1024):.1f} MB")
+    print(f"  Number of chunks: {len(writer.chunk_files)}")
+    if writer.oversized_statements:
+        print(f"  [WARNING] {writer.oversized_statements} statements exceed the chunk "
+              f"size limit and were written to their own chunk")
+
+    return writer.chunk_files
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Split SQL dumps into D1-sized chunks')
+    parser.add_argument('input_file', nargs='?',
+                        help='SQL file to split (default: the daily_lineups and player_stats dumps)')
+    parser.add_argument('--prefix', help='Chunk file prefix (default: input file name)')
+    parser.add_argument('--output-dir', default='chunks', help='Output directory for chunks')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_CHUNK_BYTES,
+                        help='Maximum chunk size in bytes')
+    parser.add_argument('--max-statements', type=int, default=DEFAULT_MAX_CHUNK_STATEMENTS,
+                        help='Maximum statements per chunk')
+    parser.add_argument('--merge-inserts', action='store_true',
+                        help='Rewrite consecutive single-row INSERTs as multi-row INSERTs')
+    parser.add_argument('--rows-per-insert', type=int, default=DEFAULT_ROWS_PER_INSERT,
+                        help='Maximum rows per merged INSERT')
+    return parser.parse_args(argv)
+
 
 def main():
-    # Change to sql directory
-    os.chdir('../sql')
-    
-    # Ensure chunks directory exists
-    if not os.path.exists('chunks'):
-        os.makedirs('chunks')
-    
+    args = parse_args()
+
+    options = dict(
+        output_dir=args.output_dir,
+        max_bytes=args.max_bytes,
+        max_statements=args.max_statements,
+        merge_inserts=args.merge_inserts,
+        rows_per_insert=args.rows_per_insert
+    )
+
     print("=" * 50)
     print("SQL File Splitter for Cloudflare D1")
     print("=" * 50)
     print()
-    
+
+    if args.input_file:
+        if not os.path.exists(args.input_file):
+            print(f"[ERROR] {args.input_file} not found")
+            sys.exit(1)
+        prefix = args.prefix or os.path.splitext(os.path.basename(args.input_file))[0]
+        chunks = split_sql_file(args.input_file, prefix, **options)
+        print(f"\n[OK] Split {args.input_file} into {len(chunks)} chunks")
+        return
+
+    # Default: split the full table dumps in the sql directory
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sql'))
+
     # Split daily_lineups
     if os.path.exists('data_daily_lineups.sql'):
-        lineups_chunks = split_sql_file(
-            'data_daily_lineups.sql', 
-            'daily_lineups',
-            chunk_size=5000
-        )
-        print(f"\n[OK] Split daily_lineups into {lineups_chunks} chunks")
+        lineups_chunks = split_sql_file('data_daily_lineups.sql', 'daily_lineups', **options)
+        print(f"\n[OK] Split daily_lineups into {len(lineups_chunks)} chunks")
     else:
         print("[WARNING] data_daily_lineups.sql not found")
-    
+
     print()
-    
+
     # Split daily_gkl_player_stats
     if os.path.exists('data_daily_gkl_player_stats.sql'):
-        stats_chunks = split_sql_file(
-            'data_daily_gkl_player_stats.sql',
-            'player_stats',
-            chunk_size=5000
-        )
-        print(f"\n[OK] Split player_stats into {stats_chunks} chunks")
+        stats_chunks = split_sql_file('data_daily_gkl_player_stats.sql', 'player_stats', **options)
+        print(f"\n[OK] Split player_stats into {len(stats_chunks)} chunks")
     else:
         print("[WARNING] data_daily_gkl_player_stats.sql not found")
-    
+
     print()
     print("=" * 50)
     print("Splitting complete!")
     print("Chunks are in the sql/chunks/ directory")
-    print("Use import-chunks.bat to import them to D1")
+    print("Use import_chunks.py to import them to D1")
     print("=" * 50)
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
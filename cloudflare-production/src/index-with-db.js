@@ -2,6 +2,87 @@
  * GKL Fantasy Baseball API - CloudFlare Workers with D1 Database
  */
 
+// Lineup slots that are not starts (same sets as data_pipeline/common/scoring_categories.py)
+const BENCH_SLOTS = ['BN'];
+const INJURED_SLOTS = ['IL', 'IL10', 'IL15', 'IL60', 'IL+'];
+const MINOR_LEAGUE_SLOTS = ['NA'];
+const INACTIVE_SLOTS = [...BENCH_SLOTS, ...INJURED_SLOTS, ...MINOR_LEAGUE_SLOTS];
+
+const sqlList = (values) => values.map(value => `'${value}'`).join(', ');
+
+/**
+ * Load the precomputed spotlight summary for a player-season
+ * (player_spotlight_summary, built by data_pipeline/player_spotlight/summaries.py)
+ * in the shape of the daily_lineups aggregates the spotlight endpoint uses.
+ * Returns null when there is no summary row, so the caller falls back to SQL.
+ */
+async function loadSpotlightSummary(env, playerId, season) {
+  let summary;
+  try {
+    summary = await env.DB.prepare(`
+      SELECT teams_json, positions_json, monthly_json
+      FROM player_spotlight_summary
+      WHERE yahoo_player_id = ? AND season = ?
+    `).bind(String(playerId), season).first();
+  } catch (error) {
+    // Table not created on this database yet
+    console.warn('Spotlight summary unavailable:', error.message);
+    return null;
+  }
+  if (!summary) {
+    return null;
+  }
+
+  const teams = JSON.parse(summary.teams_json || '[]');
+  const positions = JSON.parse(summary.positions_json || '[]');
+  const monthly = JSON.parse(summary.monthly_json || '[]');
+
+  const usageByTeam = {};
+  for (const row of positions) {
+    if (!usageByTeam[row.team_name]) {
+      usageByTeam[row.team_name] = {
+        team_name: row.team_name,
+        total_days: 0,
+        started_days: 0,
+        benched_days: 0,
+        minor_league_days: 0,
+        injured_days: 0
+      };
+    }
+    const team = usageByTeam[row.team_name];
+    team.total_days += row.days;
+    if (BENCH_SLOTS.includes(row.selected_position)) {
+      team.benched_days += row.days;
+    } else if (INJURED_SLOTS.includes(row.selected_position)) {
+      team.injured_days += row.days;
+    } else if (MINOR_LEAGUE_SLOTS.includes(row.selected_position)) {
+      team.minor_league_days += row.days;
+    } else {
+      team.started_days += row.days;
+    }
+  }
+
+  return {
+    teamHistory: teams
+      .map(team => ({
+        team_name: team.team_name,
+        days: team.days,
+        from_date: team.from_date,
+        to_date: team.to_date
+      }))
+      .sort((a, b) => (b.to_date || '').localeCompare(a.to_date || '')),
+    usageByTeam: Object.values(usageByTeam),
+    monthlyData: monthly.map(row => ({
+      month_year: row.month,
+      team_name: row.team_name,
+      selected_position: row.selected_position,
+      days: row.days,
+      period_start: row.first_date,
+      period_end: row.last_date
+    }))
+  };
+}
+
 export default {
   async fetch(request, env, ctx) {
     const url = new URL(request.url);
@@ -522,8 +603,12 @@ export default {
             });
           }
           
+          // Team history, usage and monthly rows come from the precomputed
+          // summary when there is one; otherwise aggregate daily_lineups
+          const summary = await loadSpotlightSummary(env, playerId, season);
+          
           // Get team history
-          const teamHistory = await env.DB.prepare(`
+          const teamHistory = summary ? { results: summary.teamHistory } : await env.DB.prepare(`
             SELECT 
               team_name,
               COUNT(*) as days,
@@ -535,11 +620,15 @@ export default {
             ORDER BY MAX(date) DESC
           `).bind(playerId).all();
           
-          // Get the latest date in the database to determine "current" status
-          const maxDateResult = await env.DB.prepare(`
-            SELECT MAX(date) as max_date FROM daily_lineups
+          // Database date range; separate subqueries so each uses the date index
+          const dateRangeResult = await env.DB.prepare(`
+            SELECT 
+              (SELECT MIN(date) FROM daily_lineups) as min_date,
+              (SELECT MAX(date) FROM daily_lineups) as max_date
           `).first();
-          const databaseMaxDate = maxDateResult?.max_date || new Date().toISOString().split('T')[0];
+          
+          // Get the latest date in the database to determine "current" status
+          const databaseMaxDate = dateRangeResult?.max_date || new Date().toISOString().split('T')[0];
           
           // Check if the player is currently on a team using 7-day recency check (same as Player Explorer)
           const mostRecentTeam = teamHistory.results?.[0];
@@ -573,14 +662,14 @@ export default {
           })) || [];
           
           // Get usage breakdown per team
-          const usageByTeam = await env.DB.prepare(`
+          const usageByTeam = summary ? { results: summary.usageByTeam } : await env.DB.prepare(`
             SELECT 
               team_name,
               COUNT(*) as total_days,
-              SUM(CASE WHEN selected_position NOT IN ('BN', 'IL', 'IL10', 'IL60', 'NA') THEN 1 ELSE 0 END) as started_days,
-              SUM(CASE WHEN selected_position = 'BN' THEN 1 ELSE 0 END) as benched_days,
-              SUM(CASE WHEN selected_position = 'NA' THEN 1 ELSE 0 END) as minor_league_days,
-              SUM(CASE WHEN selected_position IN ('IL', 'IL10', 'IL60') THEN 1 ELSE 0 END) as injured_days
+              SUM(CASE WHEN selected_position NOT IN (${sqlList(INACTIVE_SLOTS)}) THEN 1 ELSE 0 END) as started_days,
+              SUM(CASE WHEN selected_position IN (${sqlList(BENCH_SLOTS)}) THEN 1 ELSE 0 END) as benched_days,
+              SUM(CASE WHEN selected_position IN (${sqlList(MINOR_LEAGUE_SLOTS)}) THEN 1 ELSE 0 END) as minor_league_days,
+              SUM(CASE WHEN selected_position IN (${sqlList(INJURED_SLOTS)}) THEN 1 ELSE 0 END) as injured_days
             FROM daily_lineups
             WHERE player_id = ?
             GROUP BY team_name
@@ -616,14 +705,7 @@ export default {
             }
           }
           
-          // Get actual date range from database to determine season coverage
-          const dateRangeResult = await env.DB.prepare(`
-            SELECT 
-              MIN(date) as min_date,
-              MAX(date) as max_date
-            FROM daily_lineups
-          `).first();
-          
+          // Use the database date range to determine season coverage
           const minDate = dateRangeResult?.min_date || '2025-07-01';
           const maxDate = dateRangeResult?.max_date || '2025-08-03';
           
@@ -684,7 +766,7 @@ export default {
           };
           
           // Get monthly breakdown with team and position details
-          const monthlyData = await env.DB.prepare(`
+          const monthlyData = summary ? { results: summary.monthlyData } : await env.DB.prepare(`
             SELECT 
               strftime('%Y-%m', date) as month_year,
               team_name,
@@ -756,13 +838,13 @@ export default {
             
             // Don't modify not_rostered here - we'll calculate it after all data is processed
             
-            if (!['BN', 'IL', 'IL10', 'IL60', 'NA'].includes(row.selected_position)) {
+            if (!INACTIVE_SLOTS.includes(row.selected_position)) {
               month.started += row.days;
-            } else if (row.selected_position === 'BN') {
+            } else if (BENCH_SLOTS.includes(row.selected_position)) {
               month.benched += row.days;
-            } else if (row.selected_position === 'NA') {
+            } else if (MINOR_LEAGUE_SLOTS.includes(row.selected_position)) {
               month.minor_leagues += row.days;
-            } else if (['IL', 'IL10', 'IL60'].includes(row.selected_position)) {
+            } else if (INJURED_SLOTS.includes(row.selected_position)) {
               month.injured_list += row.days;
             }
             
@@ -53,6 +53,7 @@ export default {
     
     router.get('/player-spotlight/:playerId', (req) => handlePlayerSpotlight(req, env, 'spotlight'));
     router.get('/player-spotlight/:playerId/timeline', (req) => handlePlayerSpotlight(req, env, 'timeline'));
+    router.get('/player-spotlight/:playerId/summary', (req) => handlePlayerSpotlight(req, env, 'summary'));
     
     router.get('/players', (req) => handlePlayers(req, env, 'list'));
     router.get('/players/:playerId', (req) => handlePlayers(req, env, 'get'));
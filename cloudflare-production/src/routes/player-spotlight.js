@@ -17,6 +17,8 @@ export async function handlePlayerSpotlight(request, env, action) {
         return await getPlayerSpotlight(db, playerId, season);
       case 'timeline':
         return await getPlayerTimeline(db, playerId, season);
+      case 'summary':
+        return await getPlayerSummary(db, playerId, season);
       default:
         throw new Error('Invalid action');
     }
@@ -122,4 +124,29 @@ async function getPlayerTimeline(db, playerId, season) {
   }), {
     headers: { 'Content-Type': 'application/json' }
   });
-}
\ No newline at end of file
+}
+
+async function getPlayerSummary(db, playerId, season) {
+  // Precomputed by data_pipeline/player_spotlight/summaries.py
+  const summary = await db.first(`
+    SELECT *
+    FROM player_spotlight_summary
+    WHERE yahoo_player_id = ? AND season = ?
+  `, [playerId, parseInt(season)]);
+  
+  if (!summary) {
+    throw new Error('Player summary not found');
+  }
+  
+  const { teams_json, positions_json, monthly_json, usage_json, ...info } = summary;
+  
+  return new Response(JSON.stringify({
+    ...info,
+    teams: JSON.parse(teams_json || '[]'),
+    positions: JSON.parse(positions_json || '[]'),
+    monthly: JSON.parse(monthly_json || '[]'),
+    usage: JSON.parse(usage_json || '{}')
+  }), {
+    headers: { 'Content-Type': 'application/json' }
+  });
+}
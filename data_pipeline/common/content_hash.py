@@ -0,0 +1,185 @@
+"""
+Fast content hashing over column tuples.
+
+BatchHasher encodes rows with a fixed field order in a compact, canonical,
+self-delimiting binary form and digests them with BLAKE2b. Digests carry a
+version prefix ('b2:') so they can be told apart from the legacy SHA-256
+hashes of scripts/change_tracking.ChangeTracker; hash_matches() still
+accepts a legacy stored hash, so switching formats is not seen as a change.
+"""
+
+import hashlib
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# Prefix of BatchHasher digests; unprefixed values are legacy SHA-256 hashes
+HASH_VERSION = 'b2'
+HASH_PREFIX = HASH_VERSION + ':'
+
+_pack_int = struct.Struct('>q').pack
+_pack_float = struct.Struct('>d').pack
+_pack_len = struct.Struct('>I').pack
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _encode_str(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return b's' + _pack_len(len(data)) + data
+
+
+def _encode_int(value: int) -> bytes:
+    if _INT_MIN <= value <= _INT_MAX:
+        return b'i' + _pack_int(value)
+    return _encode_str(str(value))
+
+
+def _encode_float(value: float) -> bytes:
+    # NaN is how pandas spells a missing value
+    if value != value:
+        return b'N'
+    # 2.0 and 2 hash alike, so int and float columns of the same data agree
+    if value.is_integer():
+        return _encode_int(int(value))
+    return b'f' + _pack_float(round(value, 6))
+
+
+_ENCODERS: Dict[type, Callable[[Any], bytes]] = {
+    str: _encode_str,
+    int: _encode_int,
+    float: _encode_float,
+    bool: lambda value: b'T' if value else b'F',
+    type(None): lambda value: b'N',
+}
+
+
+def encode_value(value: Any) -> bytes:
+    """Canonical, self-delimiting binary encoding of a scalar."""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    # pd.NA and NaT are missing values too, like None and NaN
+    if PANDAS_AVAILABLE and pd.api.types.is_scalar(value) and pd.isna(value):
+        return b'N'
+    # numpy scalars
+    if hasattr(value, 'item'):
+        return encode_value(value.item())
+    for base, encoder in _ENCODERS.items():
+        if isinstance(value, base):
+            return encoder(value)
+    # dates, Decimals, ... by their string form
+    return _encode_str(str(value))
+
+
+class BatchHasher:
+    """
+    Content hashing over column tuples with a fixed field order.
+    
+    Each row is encoded as the concatenation of its encoded fields and
+    digested with BLAKE2b, skipping the dict normalization and JSON
+    serialization of ChangeTracker.generate_hash.
+    """
+    
+    DIGEST_SIZE = 16
+    
+    def __init__(self, fields: Sequence[str], defaults: Optional[Mapping[str, Any]] = None):
+        """
+        Args:
+            fields: Field names in hashing order
+            defaults: Values used for fields missing from a record or frame
+        """
+        self.fields = tuple(fields)
+        self.defaults = dict(defaults or {})
+    
+    @staticmethod
+    def encode_row(row: Sequence[Any]) -> bytes:
+        """Binary encoding of one row of field values."""
+        return b''.join(map(encode_value, row))
+    
+    @classmethod
+    def _digest(cls, data: bytes) -> str:
+        return HASH_PREFIX + hashlib.blake2b(data, digest_size=cls.DIGEST_SIZE).hexdigest()
+    
+    def _record_rows(self, records: Iterable[Mapping[str, Any]]) -> Iterable[Tuple]:
+        pairs = [(field, self.defaults.get(field)) for field in self.fields]
+        return (tuple(record.get(field, default) for field, default in pairs) for record in records)
+    
+    def _frame_rows(self, frame) -> Iterable[Tuple]:
+        # tolist() turns numpy scalars into Python values in one pass per column
+        columns = [frame[field].tolist() if field in frame.columns
+                   else [self.defaults.get(field)] * len(frame)
+                   for field in self.fields]
+        return zip(*columns)
+    
+    def hash_row(self, row: Sequence[Any]) -> str:
+        """Hash of one row given in field order."""
+        return self._digest(self.encode_row(row))
+    
+    def hash_rows(self, rows: Iterable[Sequence[Any]]) -> List[str]:
+        """Hashes of rows given in field order."""
+        encode, digest = self.encode_row, self._digest
+        return [digest(encode(row)) for row in rows]
+    
+    def hash_records(self, records: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Hashes of dict records."""
+        return self.hash_rows(self._record_rows(records))
+    
+    def hash_frame(self, frame) -> List[str]:
+        """Hashes of every row of a pandas DataFrame, in row order."""
+        return self.hash_rows(self._frame_rows(frame))
+    
+    def digest_rows(self, rows: Iterable[Sequence[Any]]) -> str:
+        """Single order-independent hash of a collection of rows (e.g. a roster)."""
+        return self._digest(b''.join(sorted(map(self.encode_row, rows))))
+    
+    def digest_records(self, records: Iterable[Mapping[str, Any]]) -> str:
+        """Single order-independent hash of a collection of dict records."""
+        return self.digest_rows(self._record_rows(records))
+    
+    def hash_frame_groups(self, frame, by: Sequence[str]) -> Dict[Tuple, str]:
+        """
+        Order-independent hash per group of DataFrame rows.
+        
+        Args:
+            frame: pandas DataFrame
+            by: Columns identifying a group (e.g. ('date', 'team_key'))
+        
+        Returns:
+            {group key tuple: hash}
+        """
+        groups: Dict[Tuple, List[bytes]] = {}
+        keys = zip(*(frame[column].tolist() for column in by))
+        for key, row in zip(keys, self._frame_rows(frame)):
+            groups.setdefault(key, []).append(self.encode_row(row))
+        return {key: self._digest(b''.join(sorted(encoded))) for key, encoded in groups.items()}
+
+
+def is_legacy_hash(value: Optional[str]) -> bool:
+    """True for a SHA-256 hash written before BatchHasher."""
+    return bool(value) and not value.startswith(HASH_PREFIX)
+
+
+def hash_matches(stored_hash: Optional[str], new_hash: str,
+                 legacy: Optional[Callable[[], str]] = None) -> bool:
+    """
+    Compare a stored hash with a freshly computed one across hash formats.
+
+    Args:
+        stored_hash: Hash read from the database (None if no existing data)
+        new_hash: BatchHasher hash of the new data
+        legacy: Computes the legacy hash of the new data; only called when
+                stored_hash is a legacy hash
+
+    Returns:
+        True if the data is unchanged
+    """
+    if stored_hash is None:
+        return False
+    if is_legacy_hash(stored_hash):
+        return legacy is not None and legacy() == stored_hash
+    return stored_hash == new_hash
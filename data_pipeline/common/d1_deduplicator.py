@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+Server-side Deduplication for D1 Tables
+
+Finds and removes rows that share a natural key, entirely inside the
+database. Duplicate groups are located with GROUP BY ... HAVING COUNT(*) > 1
+and surplus rows are deleted with a ROW_NUMBER() window in bounded batches,
+so cleanup never pulls a table client-side.
+
+For each natural key the most recently written row (highest rowid) is kept.
+Rows with a NULL in any key column are never considered duplicates.
+
+Works against a D1Connection or a local sqlite3 connection.
+
+Usage:
+    from data_pipeline.common.d1_deduplicator import D1Deduplicator
+
+    dedup = D1Deduplicator(D1Connection())
+    report = dedup.report()                      # Dry run
+    dedup.deduplicate('daily_lineups', since='2025-08-01')
+"""
+
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Natural keys per table, plus the date column used to scope cleanup
+DEDUP_TARGETS: Dict[str, Dict[str, Any]] = {
+    'transactions': {
+        'key': ('transaction_id', 'yahoo_player_id', 'movement_type'),
+        'date_column': 'date',
+    },
+    'daily_lineups': {
+        'key': ('date', 'team_key', 'yahoo_player_id'),
+        'date_column': 'date',
+    },
+    'daily_gkl_player_stats': {
+        'key': ('date', 'mlb_player_id'),
+        'date_column': 'date',
+    },
+}
+
+DEFAULT_DELETE_BATCH_SIZE = 5000
+DEFAULT_SAMPLE_SIZE = 10
+
+
+class D1Deduplicator:
+    """Find and delete natural-key duplicates with set-based SQL."""
+
+    def __init__(self, connection, targets: Optional[Dict[str, Dict[str, Any]]] = None,
+                 batch_size: int = DEFAULT_DELETE_BATCH_SIZE):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection
+            targets: Table -> {'key': (...), 'date_column': ...}; defaults to DEDUP_TARGETS
+            batch_size: Maximum rows removed per DELETE statement
+        """
+        self.connection = connection
+        self.targets = targets or DEDUP_TARGETS
+        self.batch_size = batch_size
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            self.connection.commit()
+            return cursor.rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    # ------------------------------------------------------------------
+    # SQL builders
+    # ------------------------------------------------------------------
+
+    def _scope(self, table: str, since: Optional[str], until: Optional[str]):
+        """Build the WHERE clause limiting the scan to non-NULL keys and a date range."""
+        target = self.targets[table]
+        clauses = [f"{col} IS NOT NULL" for col in target['key']]
+        params: List[Any] = []
+        date_column = target.get('date_column')
+        if since and date_column:
+            clauses.append(f"{date_column} >= ?")
+            params.append(since)
+        if until and date_column:
+            clauses.append(f"{date_column} <= ?")
+            params.append(until)
+        return ' AND '.join(clauses), params
+
+    def _surplus_rowids_sql(self, table: str, where: str) -> str:
+        key = ', '.join(self.targets[table]['key'])
+        return f"""
+            SELECT rowid FROM (
+                SELECT rowid,
+                       ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY rowid DESC) AS copy_rank
+                FROM {table}
+                WHERE {where}
+            )
+            WHERE copy_rank > 1
+            LIMIT ?
+        """
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def find_duplicates(self, table: str, since: Optional[str] = None, until: Optional[str] = None,
+                        sample_size: int = DEFAULT_SAMPLE_SIZE) -> Dict[str, Any]:
+        """
+        Summarize duplicate groups for one table without modifying it.
+
+        Returns:
+            Dictionary with duplicate_groups, surplus_rows, max_copies and a
+            sample of the largest groups
+        """
+        key_columns = self.targets[table]['key']
+        key = ', '.join(key_columns)
+        where, params = self._scope(table, since, until)
+
+        grouped = f"""
+            SELECT {key}, COUNT(*) AS copies
+            FROM {table}
+            WHERE {where}
+            GROUP BY {key}
+            HAVING COUNT(*) > 1
+        """
+
+        summary = self._query(f"""
+            SELECT COUNT(*) AS duplicate_groups,
+                   COALESCE(SUM(copies - 1), 0) AS surplus_rows,
+                   COALESCE(MAX(copies), 0) AS max_copies
+            FROM ({grouped})
+        """, params)
+        row = summary[0] if summary else {}
+
+        sample = []
+        if row.get('duplicate_groups') and sample_size:
+            sample = self._query(f"{grouped} ORDER BY copies DESC LIMIT ?", params + [sample_size])
+
+        return {
+            'table': table,
+            'key': list(key_columns),
+            'duplicate_groups': row.get('duplicate_groups', 0) or 0,
+            'surplus_rows': row.get('surplus_rows', 0) or 0,
+            'max_copies': row.get('max_copies', 0) or 0,
+            'sample': sample,
+        }
+
+    def report(self, tables: Optional[Sequence[str]] = None, since: Optional[str] = None,
+               until: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Dry run: duplicate summary for every configured table."""
+        return {
+            table: self.find_duplicates(table, since=since, until=until)
+            for table in (tables or self.targets)
+        }
+
+    def deduplicate(self, table: str, since: Optional[str] = None, until: Optional[str] = None,
+                    max_batches: Optional[int] = None) -> int:
+        """
+        Delete surplus copies for one table in bounded batches.
+
+        Each batch is a single DELETE ... WHERE rowid IN (window query LIMIT n)
+        executed on the server. Batches repeat until nothing is removed.
+
+        Args:
+            table: Table to clean
+            since: Optional lower date bound
+            until: Optional upper date bound
+            max_batches: Stop after this many batches (None for no limit)
+
+        Returns:
+            Number of rows deleted
+        """
+        where, params = self._scope(table, since, until)
+        delete_sql = f"DELETE FROM {table} WHERE rowid IN ({self._surplus_rowids_sql(table, where)})"
+
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            changes = self._execute(delete_sql, params + [self.batch_size])
+            batches += 1
+            deleted += changes
+            logger.info(f"{table}: batch {batches} removed {changes} duplicate rows")
+            if changes < self.batch_size:
+                break
+
+        logger.info(f"{table}: removed {deleted} duplicate rows in {batches} batches")
+        return deleted
+
+    def deduplicate_all(self, tables: Optional[Sequence[str]] = None, since: Optional[str] = None,
+                        until: Optional[str] = None) -> Dict[str, int]:
+        """Deduplicate every configured table; returns rows deleted per table."""
+        return {
+            table: self.deduplicate(table, since=since, until=until)
+            for table in (tables or self.targets)
+        }
+
+    def ensure_unique_index(self, table: str) -> None:
+        """
+        Create a unique index on the natural key so duplicates cannot return.
+
+        Must run after deduplicate(), otherwise index creation fails.
+        """
+        key = self.targets[table]['key']
+        index_name = f"idx_{table}_natural_key"
+        self._execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(key)})")
+        logger.info(f"Ensured unique index {index_name} on {table}({', '.join(key)})")
+
+
+def print_report(report: Dict[str, Dict[str, Any]]) -> None:
+    """Print a dry-run report."""
+    print("=" * 60)
+    print("DUPLICATE REPORT")
+    print("=" * 60)
+    for table, info in report.items():
+        print(f"\n{table} (key: {', '.join(info['key'])})")
+        print(f"  Duplicate groups: {info['duplicate_groups']:,}")
+        print(f"  Surplus rows:     {info['surplus_rows']:,}")
+        if info['max_copies']:
+            print(f"  Max copies:       {info['max_copies']}")
+        for group in info['sample']:
+            key_text = ', '.join(f"{col}={group.get(col)}" for col in info['key'])
+            print(f"    {key_text}  x{group.get('copies')}")
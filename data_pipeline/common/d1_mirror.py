@@ -0,0 +1,487 @@
+#!/usr/bin/env python
+"""
+Local Incremental Mirror of D1
+
+Maintains a local SQLite replica of selected D1 tables so read-heavy
+analysis (monitoring, quality checks, mapping builds) stops consuming D1
+read quota and HTTPS latency.
+
+Each table is pulled with keyset-paginated reads using one of three
+strategies:
+    rowid       - rows with rowid above the stored watermark. INSERT OR REPLACE
+                  in D1 assigns a fresh rowid, so replaced rows are picked up
+                  too; the stale local copy is evicted by the table's UNIQUE
+                  constraints, which are recreated from D1's own DDL.
+    updated_at  - rows whose timestamp column is at or after the watermark,
+                  for tables that are updated in place.
+    full        - the whole table is re-pulled (small tables such as job_log).
+
+Neither watermark sees rows deleted in D1 (export_to_cloudflare deletes and
+re-inserts the most recent days of lineups; the deduplicator drops surplus
+rows anywhere). After each incremental pull two reconcile steps run:
+    window      - tables with a `reconcile_column` have their trailing
+                  RECONCILE_DAYS re-pulled: local rows in the window are
+                  deleted and replaced with D1's current rows. This also
+                  covers re-inserted rows whose rowids were reused below the
+                  watermark.
+    row count   - if the local row count then differs from D1's, the full
+                  list of D1 rowids is pulled; local rows missing from it are
+                  deleted and D1 rows missing locally are fetched. COUNT(*)
+                  reads every row of the D1 table, so it only runs when the
+                  window refresh or D1's MAX(rowid) shows drift, or once per
+                  COUNT_CHECK_INTERVAL.
+
+Watermarks and the last row count check live in the `_mirror_state` table of
+the replica.
+
+Usage:
+    from data_pipeline.common.d1_mirror import D1Mirror, MirrorConnection
+
+    mirror = D1Mirror(D1Connection())
+    mirror.sync()                                   # Incremental pull
+    conn = MirrorConnection(mirror.mirror_path)     # D1Connection-compatible reads
+    conn.execute("SELECT COUNT(*) AS n FROM daily_lineups")['results']
+
+    # Existing repository classes can read the replica directly
+    PlayerStatsRepository(db_path=mirror.mirror_path)
+
+CLI:
+    python -m data_pipeline.common.d1_mirror               # Sync all tables
+    python -m data_pipeline.common.d1_mirror --full daily_lineups
+"""
+
+import logging
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIRROR_TABLES: Dict[str, Dict[str, Any]] = {
+    'transactions': {'strategy': 'rowid', 'page_size': 2000, 'reconcile_column': 'date'},
+    'daily_lineups': {'strategy': 'rowid', 'page_size': 2000, 'reconcile_column': 'date'},
+    'daily_gkl_player_stats': {'strategy': 'updated_at', 'column': 'updated_at', 'page_size': 500,
+                               'reconcile_column': 'date'},
+    'player_mapping': {'strategy': 'updated_at', 'column': 'updated_at', 'page_size': 1000},
+    'draft_results': {'strategy': 'rowid', 'page_size': 1000},
+    'job_log': {'strategy': 'full', 'page_size': 1000},
+}
+
+STATE_TABLE = '_mirror_state'
+
+# Trailing days re-pulled on every sync to pick up deletes and re-inserts
+RECONCILE_DAYS = 7
+
+# Row counts are compared with D1 at least this often, even without signs of drift
+COUNT_CHECK_INTERVAL = timedelta(days=1)
+
+# Rowids per page when listing D1 rowids, and per IN (...) when fetching rows
+ROWID_PAGE_SIZE = 5000
+ROWID_FETCH_BATCH = 90
+
+
+class MirrorConnection:
+    """
+    Read-only, D1Connection-compatible view of the local mirror.
+
+    execute() returns the same dictionary shape as D1Connection.execute, so
+    scripts written against D1 can run unchanged against the replica.
+    """
+
+    def __init__(self, mirror_path):
+        self.mirror_path = Path(mirror_path)
+        self.conn = sqlite3.connect(f"file:{self.mirror_path}?mode=ro", uri=True,
+                                    check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def execute(self, query: str, params: Optional[Sequence[Any]] = None) -> Dict:
+        cursor = self.conn.execute(query, list(params or []))
+        rows = [dict(row) for row in cursor.fetchall()] if cursor.description else []
+        return {
+            'results': rows,
+            'success': True,
+            'changes': 0,
+            'last_row_id': None,
+            'rows_read': len(rows),
+            'rows_written': 0
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+class D1Mirror:
+    """Maintains a local SQLite replica of D1 tables."""
+
+    def __init__(self, d1, mirror_path=None, tables: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            d1: D1Connection used for reads
+            mirror_path: Replica database path (defaults to get_mirror_database_path())
+            tables: Table configuration; defaults to MIRROR_TABLES
+        """
+        if mirror_path is None:
+            from data_pipeline.config.database_config import get_mirror_database_path
+            mirror_path = get_mirror_database_path()
+
+        self.d1 = d1
+        self.mirror_path = Path(mirror_path)
+        self.tables = tables or MIRROR_TABLES
+
+        self.mirror_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.mirror_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                table_name TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                watermark_rowid INTEGER DEFAULT 0,
+                watermark_value TEXT,
+                rows_pulled INTEGER DEFAULT 0,
+                last_synced_at TIMESTAMP,
+                last_count_check TIMESTAMP
+            )
+        """)
+        state_columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({STATE_TABLE})")}
+        if 'last_count_check' not in state_columns:
+            self.conn.execute(f"ALTER TABLE {STATE_TABLE} ADD COLUMN last_count_check TIMESTAMP")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def _d1_rows(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        return self.d1.execute(query, list(params)).get('results', [])
+
+    def _ensure_table(self, table: str) -> List[str]:
+        """Create the local table from D1's DDL and return its column names."""
+        columns = [row['name'] for row in self._d1_rows(f"PRAGMA table_info({table})")]
+        if not columns:
+            raise ValueError(f"Table {table} not found in D1")
+
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if not exists:
+            ddl = self._d1_rows(
+                "SELECT type, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL "
+                "ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END", [table]
+            )
+            for row in ddl:
+                if row['type'] in ('table', 'index'):
+                    self.conn.execute(row['sql'])
+            self.conn.commit()
+            logger.info(f"Created mirror table {table} ({len(columns)} columns)")
+        else:
+            # Pick up columns added in D1 since the replica was created
+            local = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column in columns:
+                if column not in local:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+                    logger.info(f"Added column {table}.{column} to mirror")
+            self.conn.commit()
+
+        return columns
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _get_state(self, table: str) -> Dict[str, Any]:
+        row = self.conn.execute(
+            f"SELECT strategy, watermark_rowid, watermark_value, rows_pulled, last_synced_at, "
+            f"last_count_check FROM {STATE_TABLE} WHERE table_name = ?", (table,)
+        ).fetchone()
+        if not row:
+            return {'strategy': None, 'watermark_rowid': 0, 'watermark_value': None,
+                    'rows_pulled': 0, 'last_synced_at': None, 'last_count_check': None}
+        return dict(zip(('strategy', 'watermark_rowid', 'watermark_value',
+                         'rows_pulled', 'last_synced_at', 'last_count_check'), row))
+
+    def _set_state(self, table: str, strategy: str, watermark_rowid: int,
+                   watermark_value: Optional[str], rows_pulled: int):
+        self.conn.execute(f"""
+            INSERT INTO {STATE_TABLE}
+                (table_name, strategy, watermark_rowid, watermark_value, rows_pulled, last_synced_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(table_name) DO UPDATE SET
+                strategy = excluded.strategy,
+                watermark_rowid = excluded.watermark_rowid,
+                watermark_value = excluded.watermark_value,
+                rows_pulled = {STATE_TABLE}.rows_pulled + excluded.rows_pulled,
+                last_synced_at = excluded.last_synced_at
+        """, (table, strategy, watermark_rowid, watermark_value, rows_pulled,
+              datetime.now().isoformat()))
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def _store(self, table: str, columns: List[str], rows: List[Dict[str, Any]]):
+        column_list = ', '.join(['rowid'] + columns)
+        placeholders = ', '.join(['?'] * (len(columns) + 1))
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({column_list}) VALUES ({placeholders})",
+            [[row['_mirror_rowid']] + [row.get(col) for col in columns] for row in rows]
+        )
+
+    def sync_table(self, table: str, full: bool = False) -> int:
+        """
+        Pull new and changed rows for one table.
+
+        Args:
+            table: Table name (must be in the table configuration)
+            full: Discard the local copy and re-pull everything
+
+        Returns:
+            Number of rows pulled
+        """
+        config = self.tables[table]
+        page_size = config.get('page_size', 1000)
+        strategy = config['strategy']
+
+        if full:
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"DELETE FROM {STATE_TABLE} WHERE table_name = ?", (table,))
+            self.conn.commit()
+
+        columns = self._ensure_table(table)
+        column_list = ', '.join(columns)
+
+        watermark_column = config.get('column')
+        if strategy == 'updated_at' and watermark_column not in columns:
+            logger.warning(f"{table}.{watermark_column} not found in D1, falling back to rowid watermark")
+            strategy = 'rowid'
+
+        state = self._get_state(table)
+        if state['strategy'] != strategy:
+            state.update(watermark_rowid=0, watermark_value=None)
+
+        if strategy == 'full':
+            self.conn.execute(f"DELETE FROM {table}")
+            state.update(watermark_rowid=0, watermark_value=None)
+
+        last_rowid = state['watermark_rowid'] or 0
+        last_value = state['watermark_value']
+        pulled = 0
+
+        while True:
+            if strategy == 'updated_at':
+                if last_value is None:
+                    where, params = "1 = 1", []
+                else:
+                    where = (f"({watermark_column} > ? OR "
+                             f"({watermark_column} = ? AND rowid > ?))")
+                    params = [last_value, last_value, last_rowid]
+                order = f"{watermark_column}, rowid"
+            else:
+                where, params = "rowid > ?", [last_rowid]
+                order = "rowid"
+
+            rows = self._d1_rows(
+                f"SELECT rowid AS _mirror_rowid, {column_list} FROM {table} "
+                f"WHERE {where} ORDER BY {order} LIMIT ?",
+                params + [page_size]
+            )
+            if not rows:
+                break
+
+            self._store(table, columns, rows)
+            pulled += len(rows)
+            last_rowid = rows[-1]['_mirror_rowid']
+            if strategy == 'updated_at':
+                last_value = rows[-1].get(watermark_column)
+                if last_value is None:
+                    # NULL timestamps sort first; continue by rowid among them
+                    last_value = ''
+
+            # Commit page by page so an interrupted sync resumes where it stopped
+            self._set_state(table, strategy, last_rowid, last_value, len(rows))
+            self.conn.commit()
+
+            if len(rows) < page_size:
+                break
+
+        if pulled == 0:
+            self._set_state(table, strategy, last_rowid, last_value, 0)
+            self.conn.commit()
+
+        logger.info(f"Mirrored {pulled} rows for {table} ({strategy})")
+
+        if strategy != 'full' and not full:
+            pulled += self._reconcile(table, columns, config, strategy, last_rowid, last_value)
+        return pulled
+
+    # ------------------------------------------------------------------
+    # Reconcile
+    # ------------------------------------------------------------------
+
+    def _reconcile(self, table: str, columns: List[str], config: Dict[str, Any],
+                   strategy: str, last_rowid: int, last_value: Optional[str]) -> int:
+        """Apply D1 deletes to the replica; returns the number of rows re-pulled."""
+        pulled, drift = 0, False
+        reconcile_column = config.get('reconcile_column')
+        if reconcile_column in columns:
+            window_rows, drift = self._refresh_window(table, columns, reconcile_column,
+                                                      config.get('page_size', 1000))
+            pulled += window_rows
+
+        if strategy == 'rowid':
+            # Rowids freed by deletes at the end of the table are reused by D1;
+            # move the watermark back so new rows on them are not skipped
+            max_rowid = self._d1_rows(f"SELECT MAX(rowid) AS max_rowid FROM {table}")[0]['max_rowid'] or 0
+            if last_rowid > max_rowid:
+                last_rowid, drift = max_rowid, True
+
+        counted = False
+        if drift or self._count_check_due(table):
+            remote = self._d1_rows(f"SELECT COUNT(*) AS row_count FROM {table}")[0]['row_count']
+            local = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if local != remote:
+                logger.warning(f"Mirror {table} has {local:,} rows, D1 has {remote:,}; reconciling rowids")
+                pulled += self._reconcile_rowids(table, columns)
+            counted = True
+
+        self._set_state(table, strategy, last_rowid, last_value, pulled)
+        if counted:
+            self.conn.execute(f"UPDATE {STATE_TABLE} SET last_count_check = ? WHERE table_name = ?",
+                              (datetime.now().isoformat(), table))
+        self.conn.commit()
+        return pulled
+
+    def _count_check_due(self, table: str) -> bool:
+        last_check = self._get_state(table)['last_count_check']
+        return last_check is None or datetime.now() - datetime.fromisoformat(last_check) >= COUNT_CHECK_INTERVAL
+
+    def _refresh_window(self, table: str, columns: List[str], column: str,
+                        page_size: int) -> Tuple[int, bool]:
+        """
+        Replace the local rows of the trailing RECONCILE_DAYS with D1's.
+
+        Returns:
+            Rows pulled, and whether the local window held a different number
+            of rows (a sign of deletes the watermarks did not see)
+        """
+        cutoff = (date.today() - timedelta(days=RECONCILE_DAYS)).isoformat()
+        column_list = ', '.join(columns)
+
+        rows, last_rowid = [], 0
+        while True:
+            page = self._d1_rows(
+                f"SELECT rowid AS _mirror_rowid, {column_list} FROM {table} "
+                f"WHERE {column} >= ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                [cutoff, last_rowid, page_size]
+            )
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            last_rowid = page[-1]['_mirror_rowid']
+
+        # Swap the window in one transaction so readers never see it half-empty
+        deleted = self.conn.execute(f"DELETE FROM {table} WHERE {column} >= ?", (cutoff,)).rowcount
+        self._store(table, columns, rows)
+        self.conn.commit()
+
+        if deleted != len(rows):
+            logger.info(f"Window refresh of {table} since {cutoff}: "
+                        f"{deleted} local rows replaced by {len(rows)} from D1")
+        return len(rows), deleted != len(rows)
+
+    def _reconcile_rowids(self, table: str, columns: List[str]) -> int:
+        """Make the replica's rowids match D1's; returns the number of rows fetched."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS _mirror_rowids (rowid_value INTEGER PRIMARY KEY)")
+        self.conn.execute("DELETE FROM _mirror_rowids")
+
+        last_rowid = 0
+        while True:
+            page = self._d1_rows(
+                f"SELECT rowid AS _mirror_rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                [last_rowid, ROWID_PAGE_SIZE]
+            )
+            self.conn.executemany("INSERT INTO _mirror_rowids (rowid_value) VALUES (?)",
+                                  [(row['_mirror_rowid'],) for row in page])
+            if len(page) < ROWID_PAGE_SIZE:
+                break
+            last_rowid = page[-1]['_mirror_rowid']
+
+        deleted = self.conn.execute(
+            f"DELETE FROM {table} WHERE rowid NOT IN (SELECT rowid_value FROM _mirror_rowids)"
+        ).rowcount
+        missing = [row[0] for row in self.conn.execute(
+            f"SELECT rowid_value FROM _mirror_rowids WHERE rowid_value NOT IN (SELECT rowid FROM {table})"
+        )]
+
+        column_list = ', '.join(columns)
+        for start in range(0, len(missing), ROWID_FETCH_BATCH):
+            batch = missing[start:start + ROWID_FETCH_BATCH]
+            placeholders = ', '.join(['?'] * len(batch))
+            self._store(table, columns, self._d1_rows(
+                f"SELECT rowid AS _mirror_rowid, {column_list} FROM {table} "
+                f"WHERE rowid IN ({placeholders})", batch
+            ))
+
+        self.conn.execute("DELETE FROM _mirror_rowids")
+        self.conn.commit()
+        logger.info(f"Rowid reconcile of {table}: deleted {deleted} rows, fetched {len(missing)}")
+        return len(missing)
+
+    def sync(self, tables: Optional[Sequence[str]] = None, full: bool = False) -> Dict[str, int]:
+        """Sync the given tables (default: all configured tables)."""
+        results = {}
+        for table in tables or self.tables:
+            try:
+                results[table] = self.sync_table(table, full=full)
+            except Exception as e:
+                logger.error(f"Failed to mirror {table}: {e}")
+                results[table] = -1
+        return results
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Local row counts and watermarks for every mirrored table."""
+        report = []
+        for table in self.tables:
+            state = self._get_state(table)
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            count = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if exists else 0
+            report.append({'table': table, 'local_rows': count, **state})
+        return report
+
+
+def main():
+    import argparse
+    import sys
+
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+    from data_pipeline.common.d1_connection import D1Connection
+
+    parser = argparse.ArgumentParser(description='Maintain a local SQLite mirror of D1 tables')
+    parser.add_argument('tables', nargs='*', help='Tables to sync (default: all)')
+    parser.add_argument('--full', action='store_true', help='Re-pull the tables from scratch')
+    parser.add_argument('--mirror-path', help='Replica database path')
+    parser.add_argument('--status', action='store_true', help='Show mirror status without syncing')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    mirror = D1Mirror(D1Connection(), mirror_path=args.mirror_path)
+    try:
+        if not args.status:
+            mirror.sync(args.tables or None, full=args.full)
+        print(f"Mirror: {mirror.mirror_path}")
+        for entry in mirror.status():
+            print(f"  {entry['table']}: {entry['local_rows']:,} rows "
+                  f"(last sync: {entry['last_synced_at'] or 'never'})")
+    finally:
+        mirror.close()
+
+
+if __name__ == '__main__':
+    main()
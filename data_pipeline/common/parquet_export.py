@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+"""
+Partitioned Parquet Export
+
+Writes the analytics tables to Parquet under database/parquet/<environment>/,
+Hive-partitioned so notebooks can scan full history without going through
+SQLite row by row:
+
+    daily_gkl_player_stats/season=2025/month=7/part-0.parquet
+    daily_lineups/season=2025/month=7/part-0.parquet
+    transactions/season=2025/month=7/part-0.parquet
+    draft_results/season=2025/part-0.parquet
+    player_mapping/part-0.parquet
+
+Every partition of a table is written with one explicit Arrow schema built
+from the table's declared SQLite column types (PRAGMA table_info), never from
+the pandas dtypes of a single partition, so a column that is entirely NULL in
+one month still has the same type as everywhere else. The schema is stored in
+<table>/_common_metadata and passed back to the reader. String columns are
+dictionary-encoded (team names, positions, player names repeat heavily) and
+date columns are stored as date32.
+
+Exports are incremental: _export_state.json keeps a per-table watermark of
+the last exported updated_at (or created_at) plus per-partition row counts,
+and only partitions with rows changed since then (or whose row count moved,
+which catches deletes) are rewritten from the source. A schema change (e.g. a
+new column) rewrites the whole table. --full rewrites everything.
+
+load_table() reads projected columns with partition pruning and predicate
+pushdown through pyarrow.
+
+Usage:
+    python -m data_pipeline.common.parquet_export
+    python -m data_pipeline.common.parquet_export --tables daily_lineups --full
+    python -m data_pipeline.common.parquet_export --mirror
+
+    from data_pipeline.common.parquet_export import load_table
+    df = load_table('daily_lineups', columns=['date', 'team_name', 'selected_position'],
+                    filters=[('season', '=', 2025), ('selected_position', '=', 'BN')])
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import (
+    get_database_path,
+    get_mirror_database_path,
+    get_parquet_export_dir,
+    get_table_name,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = '_export_state.json'
+
+# Table -> export layout.
+#   date_column:   drives the month partition (None = no month partition)
+#   season_column: existing season column, else the year of date_column
+#   suffixed:      table name takes the environment suffix
+EXPORT_TABLES: Dict[str, Dict[str, Any]] = {
+    'daily_gkl_player_stats': {'date_column': 'date', 'season_column': None, 'suffixed': False},
+    'daily_lineups': {'date_column': 'date', 'season_column': 'season', 'suffixed': True},
+    'transactions': {'date_column': 'date', 'season_column': None, 'suffixed': True},
+    'draft_results': {'date_column': None, 'season_column': 'season', 'suffixed': True},
+    'player_mapping': {'date_column': None, 'season_column': None, 'suffixed': True},
+}
+
+# Columns a partition rewrite is keyed on, in order of preference
+WATERMARK_COLUMNS = ('updated_at', 'created_at')
+
+SCHEMA_FILE = '_common_metadata'
+
+STRING_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Hive partition values are read back as int32
+PARTITION_TYPE = pa.int32()
+
+
+def arrow_type(declared_type: Optional[str]) -> pa.DataType:
+    """Arrow type for a declared SQLite column type, following SQLite's affinity rules."""
+    declared = (declared_type or '').upper()
+    if 'INT' in declared:
+        return pa.int64()
+    if declared.startswith('BOOL'):
+        return pa.bool_()
+    if any(name in declared for name in ('REAL', 'FLOA', 'DOUB', 'NUMERIC', 'DECIMAL')):
+        return pa.float64()
+    if 'BLOB' in declared:
+        return pa.binary()
+    # TEXT, VARCHAR, untyped, and DATE/TIMESTAMP columns other than the partition date
+    return STRING_TYPE
+
+
+def partition_fields(table: str) -> List[pa.Field]:
+    """Hive partition columns of an exported table."""
+    spec = EXPORT_TABLES.get(table)
+    if spec is None:
+        return []
+    names = []
+    if spec['season_column'] or spec['date_column']:
+        names.append('season')
+    if spec['date_column']:
+        names.append('month')
+    return [pa.field(name, PARTITION_TYPE) for name in names]
+
+
+def stored_schema(root: Path) -> Optional[pa.Schema]:
+    """File schema written with a table export, or None for exports without one."""
+    path = root / SCHEMA_FILE
+    return pq.read_schema(path) if path.exists() else None
+
+
+class ParquetExporter:
+    """Incrementally exports SQLite tables to partitioned Parquet."""
+
+    def __init__(self, environment: str = 'production', db_path: Optional[Union[str, Path]] = None,
+                 export_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            environment: 'production' or 'test'
+            db_path: Source database override (e.g. the local D1 mirror)
+            export_dir: Export root override
+        """
+        self.environment = environment
+        self.db_path = Path(db_path) if db_path else get_database_path(environment)
+        self.export_dir = Path(export_dir) if export_dir else get_parquet_export_dir(environment)
+        self.state_path = self.export_dir / STATE_FILE
+        self.conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text())
+        return {}
+
+    def _save_state(self, state: Dict[str, Any]):
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, self.state_path)
+
+    # ------------------------------------------------------------------
+    # Source introspection
+    # ------------------------------------------------------------------
+
+    def source_table(self, table: str) -> str:
+        if EXPORT_TABLES[table]['suffixed'] and self.db_path != get_mirror_database_path():
+            return get_table_name(table, self.environment)
+        return table
+
+    def _columns(self, source: str) -> List[str]:
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({source})")]
+
+    def table_schema(self, table: str, source: str) -> pa.Schema:
+        """
+        Arrow schema of the partition files, from the declared column types.
+
+        The season column is left out when it is a partition key (its value
+        lives in the directory name).
+        """
+        spec = EXPORT_TABLES[table]
+        fields = []
+        for _, name, declared_type, *_ in self.conn.execute(f"PRAGMA table_info({source})"):
+            if name == spec['season_column']:
+                continue
+            fields.append(pa.field(name, pa.date32() if name == spec['date_column']
+                                   else arrow_type(declared_type)))
+        return pa.schema(fields)
+
+    def _season_sql(self, spec: Dict[str, Any]) -> Optional[str]:
+        if spec['season_column']:
+            return spec['season_column']
+        if spec['date_column']:
+            return f"CAST(strftime('%Y', {spec['date_column']}) AS INTEGER)"
+        return None
+
+    def _month_sql(self, spec: Dict[str, Any]) -> Optional[str]:
+        if spec['date_column']:
+            return f"CAST(strftime('%m', {spec['date_column']}) AS INTEGER)"
+        return None
+
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> Tuple[str, str]:
+        """Half-open date range [first of month, first of next month)."""
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+    def _partition_where(self, spec: Dict[str, Any], key: Tuple) -> Tuple[str, List[Any]]:
+        """
+        Predicate selecting one partition's rows.
+
+        Month partitions are date ranges rather than strftime() comparisons,
+        so the date index is used instead of scanning the table.
+        """
+        clauses, params = [], []
+        if spec['season_column'] and key:
+            clauses.append(f"{spec['season_column']} = ?")
+            params.append(key[0])
+        if spec['date_column'] and len(key) == 2:
+            date_column = spec['date_column']
+            clauses.append(f"{date_column} >= ? AND {date_column} < ?")
+            params.extend(self._month_bounds(*key))
+        return ' AND '.join(clauses) or '1 = 1', params
+
+    def _partition_keys(self, table: str, source: str, where: str = '1 = 1',
+                        params: Sequence[Any] = ()) -> List[Tuple]:
+        spec = EXPORT_TABLES[table]
+        keys = [sql for sql in (self._season_sql(spec), self._month_sql(spec)) if sql]
+        if not keys:
+            return [()]
+        rows = self.conn.execute(
+            f"SELECT DISTINCT {', '.join(keys)} FROM {source} WHERE {where}", list(params)
+        ).fetchall()
+        return sorted(tuple(int(v) for v in row) for row in rows if None not in row)
+
+    def _partition_counts(self, table: str, source: str) -> Dict[Tuple, int]:
+        spec = EXPORT_TABLES[table]
+        if spec['date_column']:
+            return self._month_counts(spec, source)
+        keys = [sql for sql in (self._season_sql(spec), self._month_sql(spec)) if sql]
+        if not keys:
+            return {(): self.conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]}
+        rows = self.conn.execute(
+            f"SELECT {', '.join(keys)}, COUNT(*) FROM {source} GROUP BY {', '.join(keys)}"
+        ).fetchall()
+        return {tuple(int(v) for v in row[:-1]): row[-1] for row in rows if None not in row[:-1]}
+
+    def _month_counts(self, spec: Dict[str, Any], source: str) -> Dict[Tuple, int]:
+        """Row counts per (season, month), one date range count per month."""
+        date_column = spec['date_column']
+        first, last = self.conn.execute(
+            f"SELECT MIN({date_column}), MAX({date_column}) FROM {source}").fetchone()
+        if not first:
+            return {}
+        year, month = int(first[:4]), int(first[5:7])
+        counts = {}
+        while (year, month) <= (int(last[:4]), int(last[5:7])):
+            start, end = self._month_bounds(year, month)
+            if spec['season_column']:
+                rows = self.conn.execute(f"""
+                    SELECT {spec['season_column']}, COUNT(*) FROM {source}
+                    WHERE {date_column} >= ? AND {date_column} < ? GROUP BY {spec['season_column']}
+                """, [start, end]).fetchall()
+            else:
+                rows = [(year, self.conn.execute(
+                    f"SELECT COUNT(*) FROM {source} WHERE {date_column} >= ? AND {date_column} < ?",
+                    [start, end]).fetchone()[0])]
+            counts.update({(int(season), month): n for season, n in rows if season is not None and n})
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return counts
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _partition_dir(self, table: str, key: Tuple) -> Path:
+        path = self.export_dir / table
+        for name, value in zip(('season', 'month'), key):
+            path = path / f"{name}={value}"
+        return path
+
+    @staticmethod
+    def _to_arrow(frame: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+        """Convert a partition to the table schema, whatever dtypes pandas inferred."""
+        arrays = []
+        for field in schema:
+            values = frame[field.name]
+            if pa.types.is_date32(field.type):
+                array = pa.array(pd.to_datetime(values, errors='coerce'), from_pandas=True)
+                array = array.cast(pa.date32(), safe=False)
+            elif pa.types.is_boolean(field.type):
+                array = pa.array([None if pd.isna(v) else bool(v)
+                                  for v in pd.to_numeric(values, errors='coerce')], type=pa.bool_())
+            elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                array = pa.array(pd.to_numeric(values, errors='coerce'), type=field.type, from_pandas=True)
+            elif pa.types.is_binary(field.type):
+                array = pa.array([None if v is None else bytes(v) for v in values.astype(object)],
+                                 type=pa.binary())
+            else:
+                array = pa.array([None if pd.isna(v) else str(v) for v in values.astype(object)],
+                                 type=pa.string()).dictionary_encode()
+            arrays.append(array)
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _write_partition(self, table: str, source: str, key: Tuple, schema: pa.Schema) -> int:
+        spec = EXPORT_TABLES[table]
+        where, params = self._partition_where(spec, key)
+        frame = pd.read_sql_query(f"SELECT * FROM {source} WHERE {where}", self.conn, params=params)
+
+        # Partition values live in the directory names
+        if spec['season_column'] and key:
+            frame = frame.drop(columns=[spec['season_column']])
+
+        target = self._partition_dir(table, key)
+        if frame.empty:
+            if target.exists():
+                shutil.rmtree(target)
+            return 0
+
+        staging = target.with_name(target.name + '.tmp')
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+        pq.write_table(self._to_arrow(frame, schema), staging / 'part-0.parquet',
+                       compression='zstd', use_dictionary=True)
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+        return len(frame)
+
+    def export_table(self, table: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Export one table, rewriting only partitions changed since the last run.
+
+        Args:
+            table: Key of EXPORT_TABLES
+            full: Rewrite every partition and drop stale ones
+
+        Returns:
+            Dictionary with partitions and rows written
+        """
+        source = self.source_table(table)
+        columns = self._columns(source)
+        if not columns:
+            logger.warning(f"Skipping {table}: {source} not found in {self.db_path}")
+            return {'table': table, 'partitions': 0, 'rows': 0, 'skipped': True}
+
+        root = self.export_dir / table
+        schema = self.table_schema(table, source)
+        previous_schema = stored_schema(root)
+        schema_changed = previous_schema is None or not previous_schema.equals(schema)
+        if schema_changed and root.exists():
+            logger.info(f"{table}: schema changed, rewriting every partition")
+
+        state = self._load_state()
+        table_state = state.get(table, {})
+        watermark_column = next((c for c in WATERMARK_COLUMNS if c in columns), None)
+        watermark = table_state.get('watermark')
+        incremental = not full and not schema_changed and watermark_column and watermark and \
+            table_state.get('watermark_column') == watermark_column
+
+        counts = self._partition_counts(table, source)
+        if incremental:
+            keys = set(self._partition_keys(table, source, f"{watermark_column} > ?", [watermark]))
+            # Deletes leave no watermark behind; catch them by partition row count
+            exported = {tuple(json.loads(k)): n for k, n in table_state.get('partition_rows', {}).items()}
+            keys |= {key for key in set(counts) | set(exported) if counts.get(key, 0) != exported.get(key, 0)}
+            keys = sorted(keys)
+        else:
+            keys = sorted(counts)
+            if root.exists():
+                shutil.rmtree(root)
+
+        new_watermark = None
+        if watermark_column:
+            new_watermark = self.conn.execute(f"SELECT MAX({watermark_column}) FROM {source}").fetchone()[0]
+
+        rows = sum(self._write_partition(table, source, key, schema) for key in keys)
+        root.mkdir(parents=True, exist_ok=True)
+        pq.write_metadata(schema, root / SCHEMA_FILE)
+
+        state[table] = {
+            'watermark_column': watermark_column,
+            'watermark': new_watermark,
+            'exported_at': datetime.now().isoformat(),
+            'source': str(self.db_path),
+            'partition_rows': {json.dumps(list(key)): n for key, n in counts.items()},
+        }
+        self._save_state(state)
+
+        logger.info(f"Exported {table}: {len(keys)} partitions, {rows} rows"
+                    f"{' (incremental)' if incremental else ''}")
+        return {'table': table, 'partitions': len(keys), 'rows': rows, 'incremental': bool(incremental)}
+
+    def export(self, tables: Optional[Sequence[str]] = None, full: bool = False) -> List[Dict[str, Any]]:
+        """Export several tables (default: all of EXPORT_TABLES)."""
+        return [self.export_table(table, full) for table in (tables or EXPORT_TABLES)]
+
+
+def load_table(table: str, columns: Optional[Sequence[str]] = None,
+               filters: Optional[List[Tuple[str, str, Any]]] = None,
+               environment: Optional[str] = None,
+               export_dir: Optional[Union[str, Path]] = None) -> pd.DataFrame:
+    """
+    Read an exported table with column projection and predicate pushdown.
+
+    Partition filters (season, month) prune directories; other filters are
+    pushed into the Parquet row-group statistics. The schema stored with the
+    export is applied to every file, so column types never depend on which
+    partition happens to be read first.
+
+    Args:
+        table: Exported table name
+        columns: Columns to read (default: all)
+        filters: pyarrow DNF filters, e.g. [('season', '=', 2025), ('month', '>=', 6)]
+        environment: 'production' or 'test'
+        export_dir: Export root override
+
+    Returns:
+        DataFrame with dictionary-encoded strings as pandas categoricals
+    """
+    root = (Path(export_dir) if export_dir else get_parquet_export_dir(environment)) / table
+    if not root.exists():
+        raise FileNotFoundError(f"No Parquet export for {table} at {root}; run parquet_export first")
+    schema = stored_schema(root)
+    if schema is None:
+        raise FileNotFoundError(f"Parquet export for {table} at {root} has no {SCHEMA_FILE}; "
+                                f"re-run parquet_export to rewrite it")
+    schema = pa.schema(list(schema) + partition_fields(table))
+    return pq.read_table(root, columns=list(columns) if columns else None, filters=filters,
+                         partitioning='hive', schema=schema).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export analytics tables to partitioned Parquet')
+    parser.add_argument('--tables', nargs='+', choices=list(EXPORT_TABLES), help='Tables to export (default: all)')
+    parser.add_argument('--full', action='store_true', help='Rewrite every partition')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--mirror', action='store_true', help='Export from the local D1 mirror')
+    parser.add_argument('--output', help='Export root override')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    exporter = ParquetExporter(args.environment,
+                               db_path=get_mirror_database_path() if args.mirror else None,
+                               export_dir=args.output)
+    try:
+        for result in exporter.export(args.tables, args.full):
+            if result.get('skipped'):
+                print(f"  {result['table']:<24} skipped (table not found)")
+            else:
+                print(f"  {result['table']:<24} {result['partitions']:>4} partitions {result['rows']:>9,} rows")
+    finally:
+        exporter.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Shared API rate limiting.
+
+One RateLimiter per named budget is kept for the whole process, so collectors
+that call the same API from several threads or components draw from a single
+requests-per-second allowance instead of each sleeping on its own clock.
+"""
+
+import threading
+import time
+from typing import Dict
+
+# Yahoo Fantasy API guideline: 1 request per second
+YAHOO_REQUESTS_PER_SECOND = 1.0
+
+
+class RateLimiter:
+    """Thread-safe rate limiter for API requests."""
+
+    def __init__(self, requests_per_second=1.0):
+        self.requests_per_second = requests_per_second
+        self.min_interval = 1.0 / requests_per_second
+        self.last_request_time = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Wait if necessary to maintain rate limit."""
+        with self.lock:
+            now = time.time()
+            time_since_last = now - self.last_request_time
+
+            if time_since_last < self.min_interval:
+                sleep_time = self.min_interval - time_since_last
+                time.sleep(sleep_time)
+
+            self.last_request_time = time.time()
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter(name: str = 'yahoo',
+                       requests_per_second: float = YAHOO_REQUESTS_PER_SECOND) -> RateLimiter:
+    """
+    Process-wide limiter for a named API budget.
+
+    Args:
+        name: Budget name (e.g. 'yahoo')
+        requests_per_second: Rate used when the budget is first created
+
+    Returns:
+        The RateLimiter shared by every caller using this name
+    """
+    with _shared_lock:
+        limiter = _shared_limiters.get(name)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_second=requests_per_second)
+            _shared_limiters[name] = limiter
+        return limiter
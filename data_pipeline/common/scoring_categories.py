@@ -0,0 +1,138 @@
+"""
+League Scoring Categories
+
+Single definition of the GKL roto categories and the raw stat components they
+are built from. The ledger, standings and valuation modules all derive their
+SQL and array math from these tables, so a category change is made here once.
+
+Categories (matching the web UI):
+    Batting:  R, H, 3B, HR, RBI, SB, AVG, OBP, SLG
+    Pitching: APP, W, SV, K, HLD, ERA, WHIP, K/BB, QS
+
+Counting categories map to a single component. Rate categories are stored as
+numerator/denominator components and only divided after aggregation, so any
+date range can be summed first and converted to a rate at the end.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Reserve lineup slots, by kind. Yahoo has used IL, IL10, IL15, IL60 and IL+
+# for injured list spots across seasons.
+BENCH_SLOTS = ('BN',)
+INJURED_SLOTS = ('IL', 'IL10', 'IL15', 'IL60', 'IL+')
+MINOR_LEAGUE_SLOTS = ('NA',)
+
+# Lineup slots that do not accumulate stats
+INACTIVE_SLOTS = BENCH_SLOTS + INJURED_SLOTS + MINOR_LEAGUE_SLOTS
+
+# Lineup slots that accumulate pitching stats; every other active slot accumulates batting
+PITCHING_SLOTS = ('SP', 'RP', 'P')
+
+# Ledger component -> (side, [(daily_gkl_player_stats column, weight), ...])
+COMPONENTS: Dict[str, Tuple[str, List[Tuple[str, int]]]] = {
+    'batting_at_bats': ('batting', [('batting_at_bats', 1)]),
+    'batting_runs': ('batting', [('batting_runs', 1)]),
+    'batting_hits': ('batting', [('batting_hits', 1)]),
+    'batting_triples': ('batting', [('batting_triples', 1)]),
+    'batting_home_runs': ('batting', [('batting_home_runs', 1)]),
+    'batting_rbis': ('batting', [('batting_rbis', 1)]),
+    'batting_stolen_bases': ('batting', [('batting_stolen_bases', 1)]),
+    'batting_walks': ('batting', [('batting_walks', 1)]),
+    'batting_hit_by_pitch': ('batting', [('batting_hit_by_pitch', 1)]),
+    'batting_sacrifice_flies': ('batting', [('batting_sacrifice_flies', 1)]),
+    # TB = 1B + 2*2B + 3*3B + 4*HR = H + 2B + 2*3B + 3*HR
+    'batting_total_bases': ('batting', [('batting_hits', 1), ('batting_doubles', 1),
+                                        ('batting_triples', 2), ('batting_home_runs', 3)]),
+    'pitching_appearances': ('pitching', [('games_played', 1)]),
+    'pitching_wins': ('pitching', [('pitching_wins', 1)]),
+    'pitching_saves': ('pitching', [('pitching_saves', 1)]),
+    'pitching_strikeouts': ('pitching', [('pitching_strikeouts', 1)]),
+    'pitching_holds': ('pitching', [('pitching_holds', 1)]),
+    'pitching_quality_starts': ('pitching', [('pitching_quality_starts', 1)]),
+    'pitching_innings_pitched': ('pitching', [('pitching_innings_pitched', 1)]),
+    'pitching_earned_runs': ('pitching', [('pitching_earned_runs', 1)]),
+    'pitching_hits_allowed': ('pitching', [('pitching_hits_allowed', 1)]),
+    'pitching_walks_allowed': ('pitching', [('pitching_walks_allowed', 1)]),
+}
+
+# Category -> definition. Rate categories are sum(numerator) * scale / sum(denominator),
+# compared at their displayed precision. A zero denominator has no value (ranked
+# last) unless 'zero_denominator_best' is set, in which case a positive numerator
+# over zero ranks above every finite value (K/BB with no walks).
+CATEGORIES: Dict[str, Dict] = {
+    'R': {'side': 'batting', 'numerator': ['batting_runs']},
+    'H': {'side': 'batting', 'numerator': ['batting_hits']},
+    '3B': {'side': 'batting', 'numerator': ['batting_triples']},
+    'HR': {'side': 'batting', 'numerator': ['batting_home_runs']},
+    'RBI': {'side': 'batting', 'numerator': ['batting_rbis']},
+    'SB': {'side': 'batting', 'numerator': ['batting_stolen_bases']},
+    'AVG': {'side': 'batting', 'numerator': ['batting_hits'],
+            'denominator': ['batting_at_bats'], 'precision': 3},
+    'OBP': {'side': 'batting',
+            'numerator': ['batting_hits', 'batting_walks', 'batting_hit_by_pitch'],
+            'denominator': ['batting_at_bats', 'batting_walks', 'batting_hit_by_pitch',
+                            'batting_sacrifice_flies'], 'precision': 3},
+    'SLG': {'side': 'batting', 'numerator': ['batting_total_bases'],
+            'denominator': ['batting_at_bats'], 'precision': 3},
+    'APP': {'side': 'pitching', 'numerator': ['pitching_appearances']},
+    'W': {'side': 'pitching', 'numerator': ['pitching_wins']},
+    'SV': {'side': 'pitching', 'numerator': ['pitching_saves']},
+    'K': {'side': 'pitching', 'numerator': ['pitching_strikeouts']},
+    'HLD': {'side': 'pitching', 'numerator': ['pitching_holds']},
+    'ERA': {'side': 'pitching', 'numerator': ['pitching_earned_runs'],
+            'denominator': ['pitching_innings_pitched'], 'scale': 9, 'precision': 2,
+            'higher_is_better': False},
+    'WHIP': {'side': 'pitching', 'numerator': ['pitching_walks_allowed', 'pitching_hits_allowed'],
+             'denominator': ['pitching_innings_pitched'], 'precision': 2, 'higher_is_better': False},
+    'K/BB': {'side': 'pitching', 'numerator': ['pitching_strikeouts'],
+             'denominator': ['pitching_walks_allowed'], 'precision': 2, 'zero_denominator_best': True},
+    'QS': {'side': 'pitching', 'numerator': ['pitching_quality_starts']},
+}
+
+CATEGORY_ORDER: List[str] = list(CATEGORIES)
+
+
+def is_rate(category: str) -> bool:
+    """True if the category is a ratio of summed components."""
+    return bool(CATEGORIES[category].get('denominator'))
+
+
+def higher_is_better(category: str) -> bool:
+    """True unless lower values win the category (ERA, WHIP)."""
+    return CATEGORIES[category].get('higher_is_better', True)
+
+
+def component_sql(component: str, alias: str = 's') -> str:
+    """SQL expression for a component over one daily_gkl_player_stats row."""
+    _, terms = COMPONENTS[component]
+    return ' + '.join(
+        f"COALESCE({alias}.{column}, 0)" if weight == 1 else f"{weight} * COALESCE({alias}.{column}, 0)"
+        for column, weight in terms
+    )
+
+
+def stats_columns() -> List[str]:
+    """Every daily_gkl_player_stats column referenced by a component."""
+    columns = []
+    for _, terms in COMPONENTS.values():
+        for column, _ in terms:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def category_value(category: str, totals: Dict[str, float]) -> Optional[float]:
+    """
+    Value of a category from summed components.
+
+    Rate categories are rounded to their displayed precision and are None when
+    the denominator is zero.
+    """
+    spec = CATEGORIES[category]
+    numerator = sum(totals.get(component, 0) or 0 for component in spec['numerator'])
+    if not is_rate(category):
+        return numerator
+    denominator = sum(totals.get(component, 0) or 0 for component in spec['denominator'])
+    if not denominator:
+        return None
+    return round(numerator * spec.get('scale', 1) / denominator, spec.get('precision', 3))
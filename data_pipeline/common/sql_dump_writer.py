@@ -0,0 +1,397 @@
+"""
+Streaming SQL Dump Writer
+
+Shared writer for the SQL files we hand to `wrangler d1 execute` (and the
+chunk importer). Rows are streamed from a SQLite cursor with fetchmany(),
+encoded with a type-dispatched literal encoder, and packed into multi-row
+INSERT / REPLACE / UPSERT statements sized to stay under D1's statement
+limit. Output is written as it is produced, optionally gzip-compressed, so
+exporting a full season of daily_lineups or daily_gkl_player_stats never
+holds the table in memory.
+
+Every dump gets a JSON manifest next to it (`<file>.manifest.json`) with
+per-table row and statement counts plus the SHA-256 of the uncompressed SQL.
+
+Usage:
+    from data_pipeline.common.sql_dump_writer import SqlDumpWriter
+
+    with SqlDumpWriter(export_dir / 'lineups.sql') as writer:
+        writer.write_comment("Recent lineups export")
+        writer.write_query(conn, 'daily_lineups',
+                           "SELECT * FROM daily_lineups WHERE date >= ?",
+                           (cutoff_date,), mode='replace')
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# D1 rejects statements over 100KB; keep headroom for the trailing ';'
+MAX_STATEMENT_BYTES = 90 * 1024
+MAX_ROWS_PER_STATEMENT = 100
+FETCH_SIZE = 2000
+
+STATEMENT_PREFIXES = {
+    'insert': 'INSERT INTO',
+    'insert_or_ignore': 'INSERT OR IGNORE INTO',
+    'replace': 'REPLACE INTO',
+    'insert_or_replace': 'INSERT OR REPLACE INTO',
+    'upsert': 'INSERT INTO',
+}
+
+
+def _encode_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _encode_float(value: float) -> str:
+    # NaN/inf have no SQL literal; SQLite stores them as NULL anyway
+    if math.isnan(value) or math.isinf(value):
+        return 'NULL'
+    return repr(value)
+
+
+def _encode_bytes(value: bytes) -> str:
+    return "X'" + value.hex() + "'"
+
+
+_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    type(None): lambda value: 'NULL',
+    bool: lambda value: '1' if value else '0',
+    int: int.__repr__,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    memoryview: lambda value: _encode_bytes(bytes(value)),
+    Decimal: lambda value: _encode_float(float(value)),
+    date: lambda value: _encode_str(value.isoformat()),
+    datetime: lambda value: _encode_str(value.isoformat(sep=' ')),
+}
+
+
+def sql_literal(value: Any) -> str:
+    """
+    Encode a Python value as a SQLite literal.
+
+    Args:
+        value: None, bool, int, float, str, bytes, Decimal, date or datetime
+               (numpy scalars are handled through their Python equivalents)
+
+    Returns:
+        SQL literal text
+    """
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+
+    # Subclasses and numpy scalars
+    if hasattr(value, 'item'):
+        return sql_literal(value.item())
+    for base, encoder in _ENCODERS.items():
+        if isinstance(value, base):
+            return encoder(value)
+    return _encode_str(str(value))
+
+
+def encode_row(row: Sequence[Any]) -> str:
+    """Encode a row as a parenthesized VALUES tuple."""
+    encoders = _ENCODERS
+    try:
+        return '(' + ', '.join([encoders[type(v)](v) for v in row]) + ')'
+    except KeyError:
+        return '(' + ', '.join([sql_literal(v) for v in row]) + ')'
+
+
+class SqlDumpWriter:
+    """
+    Streaming writer for D1-compatible SQL dumps.
+
+    Statements are written immediately; only the rows of the statement
+    currently being built are kept in memory.
+    """
+
+    def __init__(self, path, compress: Optional[bool] = None,
+                 max_statement_bytes: int = MAX_STATEMENT_BYTES,
+                 max_rows_per_statement: int = MAX_ROWS_PER_STATEMENT,
+                 write_manifest: bool = True):
+        """
+        Open a dump file for writing.
+
+        Args:
+            path: Output path; a '.gz' suffix enables compression by default
+            compress: Force gzip compression on or off
+            max_statement_bytes: Upper bound for a single statement
+            max_rows_per_statement: Upper bound for rows per INSERT
+            write_manifest: Write `<path>.manifest.json` on close
+        """
+        self.path = Path(path)
+        self.compress = self.path.suffix == '.gz' if compress is None else compress
+        self.max_statement_bytes = max_statement_bytes
+        self.max_rows_per_statement = max_rows_per_statement
+        self.write_manifest = write_manifest
+
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.statements = 0
+        self.bytes_written = 0
+        self._sha256 = hashlib.sha256()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.compress:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8', newline='\n')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8', newline='\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self, text: str):
+        data = text.encode('utf-8')
+        self._sha256.update(data)
+        self.bytes_written += len(data)
+        self._file.write(text)
+
+    def write_comment(self, text: str):
+        """Write one or more '-- ' comment lines."""
+        for line in text.splitlines() or ['']:
+            self._write(f"-- {line}\n")
+
+    def write_blank(self):
+        self._write("\n")
+
+    def write_statement(self, sql: str, table: Optional[str] = None):
+        """Write a raw statement, adding the trailing ';' if missing."""
+        sql = sql.strip()
+        if not sql.endswith(';'):
+            sql += ';'
+        self._write(sql + "\n")
+        self.statements += 1
+        if table:
+            self._table_entry(table)['statements'] += 1
+
+    def _table_entry(self, table: str) -> Dict[str, Any]:
+        if table not in self.tables:
+            self.tables[table] = {'rows': 0, 'statements': 0, 'columns': None, 'mode': None}
+        return self.tables[table]
+
+    def write_rows(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                   mode: str = 'insert', conflict_columns: Optional[Sequence[str]] = None,
+                   update_columns: Optional[Sequence[str]] = None) -> int:
+        """
+        Write rows as multi-row statements.
+
+        Args:
+            table: Target table name
+            columns: Column names, in row order
+            rows: Iterable of row tuples
+            mode: 'insert', 'insert_or_ignore', 'replace', 'insert_or_replace' or 'upsert'
+            conflict_columns: Conflict target for 'upsert'
+            update_columns: Columns updated on conflict (default: all non-conflict columns)
+
+        Returns:
+            Number of rows written
+        """
+        if mode not in STATEMENT_PREFIXES:
+            raise ValueError(f"Unknown dump mode: {mode}")
+
+        suffix = ''
+        if mode == 'upsert':
+            if not conflict_columns:
+                raise ValueError("upsert mode requires conflict_columns")
+            if update_columns is None:
+                update_columns = [c for c in columns if c not in conflict_columns]
+            if update_columns:
+                assignments = ', '.join(f"{c} = excluded.{c}" for c in update_columns)
+                suffix = f"\nON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {assignments}"
+            else:
+                suffix = f"\nON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+
+        prefix = f"{STATEMENT_PREFIXES[mode]} {table} ({', '.join(columns)}) VALUES\n"
+        base_bytes = len(prefix.encode('utf-8')) + len(suffix.encode('utf-8')) + 2
+
+        entry = self._table_entry(table)
+        entry['columns'] = list(columns)
+        entry['mode'] = mode
+
+        pending: List[str] = []
+        pending_bytes = base_bytes
+        count = 0
+
+        def flush():
+            self._write(prefix + ',\n'.join(pending) + suffix + ';\n')
+            self.statements += 1
+            entry['statements'] += 1
+
+        for row in rows:
+            values = encode_row(row)
+            # Character count is a cheap upper-bound proxy for ASCII-heavy data
+            row_bytes = len(values) + 2
+            if not values.isascii():
+                row_bytes = len(values.encode('utf-8')) + 2
+            if pending and (len(pending) >= self.max_rows_per_statement
+                            or pending_bytes + row_bytes > self.max_statement_bytes):
+                flush()
+                pending = []
+                pending_bytes = base_bytes
+            pending.append(values)
+            pending_bytes += row_bytes
+            count += 1
+
+        if pending:
+            flush()
+
+        entry['rows'] += count
+        return count
+
+    def write_query(self, conn, table: str, query: str, params: Sequence[Any] = (),
+                    mode: str = 'insert', exclude_columns: Sequence[str] = (),
+                    conflict_columns: Optional[Sequence[str]] = None,
+                    update_columns: Optional[Sequence[str]] = None,
+                    fetch_size: int = FETCH_SIZE) -> int:
+        """
+        Stream the result of a query into multi-row statements for `table`.
+
+        Column names come from the cursor description, so the SELECT list
+        (with aliases) defines the target columns.
+
+        Args:
+            conn: sqlite3 connection
+            table: Target table name
+            query: SELECT statement
+            params: Query parameters
+            mode: Statement mode, see write_rows
+            exclude_columns: Result columns to drop (e.g. auto-increment ids)
+            conflict_columns: Conflict target for 'upsert'
+            update_columns: Columns updated on conflict
+            fetch_size: Rows fetched per round-trip
+
+        Returns:
+            Number of rows written
+        """
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        columns = [d[0] for d in cursor.description]
+
+        keep = [i for i, c in enumerate(columns) if c not in exclude_columns]
+        if len(keep) != len(columns):
+            columns = [columns[i] for i in keep]
+
+        def stream():
+            while True:
+                batch = cursor.fetchmany(fetch_size)
+                if not batch:
+                    break
+                if len(keep) == len(cursor.description):
+                    yield from batch
+                else:
+                    for row in batch:
+                        yield [row[i] for i in keep]
+
+        try:
+            return self.write_rows(table, columns, stream(), mode=mode,
+                                   conflict_columns=conflict_columns,
+                                   update_columns=update_columns)
+        finally:
+            cursor.close()
+
+    def manifest(self) -> Dict[str, Any]:
+        """Return the manifest describing what has been written so far."""
+        return {
+            'file': self.path.name,
+            'generated': datetime.now().isoformat(),
+            'compressed': self.compress,
+            'statements': self.statements,
+            'uncompressed_bytes': self.bytes_written,
+            'sha256': self._sha256.hexdigest(),
+            'tables': self.tables,
+        }
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.manifest.json')
+
+    def close(self):
+        """Close the dump and write its manifest."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+
+        if self.write_manifest:
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest(), f, indent=2)
+
+        logger.debug(f"Wrote {self.statements} statements ({self.bytes_written} bytes) to {self.path}")
+
+
+def export_table(conn, table: str, path, where: str = '', params: Sequence[Any] = (),
+                 mode: str = 'insert_or_replace', order_by: Optional[str] = None,
+                 exclude_columns: Sequence[str] = (), compress: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Stream a whole table (or a filtered slice) to a SQL dump.
+
+    Args:
+        conn: sqlite3 connection
+        table: Table to export
+        path: Output file ('.gz' suffix compresses)
+        where: Optional WHERE clause, without the keyword
+        params: Parameters for the WHERE clause
+        mode: Statement mode, see SqlDumpWriter.write_rows
+        order_by: Optional ORDER BY clause, without the keywords
+        exclude_columns: Columns to leave out of the dump
+        compress: Force gzip compression on or off
+
+    Returns:
+        The dump manifest
+    """
+    query = f"SELECT * FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+
+    with SqlDumpWriter(path, compress=compress) as writer:
+        writer.write_comment(f"Data for table: {table}")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_blank()
+        writer.write_query(conn, table, query, params, mode=mode,
+                           exclude_columns=exclude_columns)
+    return writer.manifest()
+
+
+if __name__ == '__main__':
+    import argparse
+    import sqlite3
+
+    from data_pipeline.config.database_config import get_database_path
+
+    parser = argparse.ArgumentParser(description='Stream a table to a D1-compatible SQL dump')
+    parser.add_argument('table', help='Table to export (e.g. daily_lineups)')
+    parser.add_argument('output', help="Output file; use a '.gz' suffix for gzip")
+    parser.add_argument('--where', default='', help="Filter, e.g. \"date BETWEEN '2025-03-27' AND '2025-09-28'\"")
+    parser.add_argument('--mode', default='insert_or_replace', choices=sorted(STATEMENT_PREFIXES),
+                        help='Statement type')
+    parser.add_argument('--exclude', action='append', default=[], help='Column to leave out (repeatable)')
+    parser.add_argument('--environment', default=None, help="Database environment ('production' or 'test')")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(str(get_database_path(args.environment)))
+    try:
+        result = export_table(conn, args.table, args.output, where=args.where,
+                              mode=args.mode, exclude_columns=args.exclude)
+    finally:
+        conn.close()
+
+    for table, info in result['tables'].items():
+        print(f"{table}: {info['rows']:,} rows in {info['statements']:,} statements")
+    print(f"Wrote {args.output} ({result['uncompressed_bytes'] / (1024 * 1024):.1f} MB uncompressed)")
@@ -0,0 +1,278 @@
+"""
+Single-writer queue for the local SQLite database.
+
+SQLite allows one writer at a time. When lineup, transaction and stats jobs
+each open their own connection per insert, they collide on the write lock and
+fall back to retry_on_lock sleeps. SQLiteWriter gives each database file one
+writer thread that owns the only write connection (WAL, tuned pragmas).
+Callers queue write requests and get a Future back. The thread drains
+everything queued, runs it in a single transaction (one fsync per group
+instead of per insert) and resolves the futures after COMMIT.
+
+Each request runs inside its own SAVEPOINT, so a failing statement rolls back
+only that request and the rest of the group still commits.
+
+Readers are unaffected: WAL lets any number of read connections run
+alongside the writer. Writers in other processes still go through SQLite's
+own locking (busy_timeout) and are not coordinated by this queue.
+
+Usage:
+    writer = get_writer(db_path)
+    writer.execute("UPDATE job_log SET status = ? WHERE job_id = ?", ('completed', job_id))
+    inserted = writer.executemany(insert_sql, rows).result()
+    writer.run(lambda conn: LineupStints(conn).refresh_dates(dates)).result()
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on requests committed together
+MAX_GROUP_SIZE = 500
+
+# How long the writer waits for more requests before committing a group
+GROUP_WINDOW = 0.005
+
+WRITER_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA busy_timeout = 30000',
+    'PRAGMA cache_size = -64000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA wal_autocheckpoint = 1000',
+)
+
+_STOP = object()
+
+
+class _WriteRequest:
+    """One unit of work: a statement, an executemany batch or a callable."""
+
+    __slots__ = ('sql', 'params', 'many', 'func', 'future')
+
+    def __init__(self, sql: Optional[str] = None, params: Any = (), many: bool = False,
+                 func: Optional[Callable[[sqlite3.Connection], Any]] = None):
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.func = func
+        self.future: Future = Future()
+
+    def apply(self, conn: sqlite3.Connection) -> Any:
+        if self.func is not None:
+            return self.func(conn)
+        if self.many:
+            return conn.executemany(self.sql, self.params).rowcount
+        return conn.execute(self.sql, self.params).rowcount
+
+
+class SQLiteWriter:
+    """Owns the write connection to one SQLite file and group-commits queued writes."""
+
+    def __init__(self, db_path: Union[str, Path], max_group_size: int = MAX_GROUP_SIZE,
+                 group_window: float = GROUP_WINDOW):
+        """
+        Args:
+            db_path: SQLite database file
+            max_group_size: Most requests committed in one transaction
+            group_window: Seconds to wait for further requests before committing
+        """
+        self.db_path = str(db_path)
+        self.max_group_size = max_group_size
+        self.group_window = group_window
+        self.stats = {'requests': 0, 'groups': 0, 'failed_requests': 0, 'largest_group': 0}
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Submitting work
+    # ------------------------------------------------------------------
+
+    def submit(self, request: _WriteRequest) -> Future:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"SQLiteWriter for {self.db_path} is closed")
+            if self._thread is None:
+                # Connect here so a bad path fails the caller instead of the thread
+                self._thread = threading.Thread(target=self._run, args=(self._connect(),),
+                                                name='sqlite-writer', daemon=True)
+                self._thread.start()
+            self._queue.put(request)
+        return request.future
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> Future:
+        """Queue one statement; the future resolves to its rowcount."""
+        return self.submit(_WriteRequest(sql, tuple(params)))
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> Future:
+        """Queue a batch of rows for one statement; the future resolves to the total rowcount."""
+        return self.submit(_WriteRequest(sql, [tuple(row) for row in rows], many=True))
+
+    def run(self, func: Callable[[sqlite3.Connection], Any]) -> Future:
+        """
+        Queue a callable that writes through the connection it is given.
+
+        The callable runs on the writer thread inside the group transaction and
+        must not keep the connection. If it calls commit() itself, the group is
+        committed at that point and later requests start a new transaction, so
+        helpers that commit should skip it on autocommit connections
+        (isolation_level None) such as this one.
+        """
+        return self.submit(_WriteRequest(func=func))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until everything queued so far is committed."""
+        self.run(lambda conn: None).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit queued work and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: the writer issues BEGIN/SAVEPOINT/COMMIT itself
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _next_group(self) -> list:
+        """Block for one request, then take whatever else arrives within the group window."""
+        group = [self._queue.get()]
+        deadline = time.monotonic() + self.group_window
+        while len(group) < self.max_group_size and group[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                group.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return group
+
+    def _run(self, conn: sqlite3.Connection):
+        try:
+            while True:
+                group = self._next_group()
+                stop = group[-1] is _STOP
+                requests = [r for r in group if r is not _STOP]
+                if requests:
+                    self._commit_group(conn, requests)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _commit_group(self, conn: sqlite3.Connection, requests: list):
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for request in requests:
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                conn.execute('SAVEPOINT write_request')
+                try:
+                    result = request.apply(conn)
+                except Exception as e:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK TO write_request')
+                        conn.execute('RELEASE write_request')
+                    self.stats['failed_requests'] += 1
+                    request.future.set_exception(e)
+                    continue
+                if conn.in_transaction:
+                    conn.execute('RELEASE write_request')
+                results.append((request, result))
+            if conn.in_transaction:
+                conn.execute('COMMIT')
+        except Exception as e:
+            logger.error(f"SQLite write group of {len(requests)} requests failed: {e}")
+            if conn.in_transaction:
+                conn.rollback()
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, result in results:
+            request.future.set_result(result)
+        self.stats['requests'] += len(requests)
+        self.stats['groups'] += 1
+        self.stats['largest_group'] = max(self.stats['largest_group'], len(requests))
+
+
+def execute_rows(conn: sqlite3.Connection, sql: str,
+                 rows: Iterable[Sequence[Any]]) -> Tuple[int, int]:
+    """
+    Run sql once per row, skipping rows that fail.
+
+    Fallback for a batch whose executemany failed: only the failing
+    statements are lost and the rest of the batch is written.
+
+    Returns:
+        Tuple of (total rowcount, failed rows)
+    """
+    written = failed = 0
+    for row in rows:
+        try:
+            written += conn.execute(sql, row).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Row failed: {e} ({row!r})")
+            failed += 1
+    return written, failed
+
+
+_writers: Dict[str, SQLiteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: Union[str, Path]) -> SQLiteWriter:
+    """
+    Process-wide writer for a database file.
+
+    Args:
+        db_path: SQLite database file
+
+    Returns:
+        The SQLiteWriter shared by every caller writing to this file
+    """
+    key = str(Path(db_path).resolve())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = SQLiteWriter(key)
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def close_writers():
+    """Commit and stop every shared writer (also runs at interpreter exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
@@ -4,18 +4,32 @@ Central configuration module for the GKL League Analytics project.
 
 from .database_config import (
     get_database_path,
+    get_mirror_database_path,
+    get_stats_cube_dir,
+    get_parquet_export_dir,
     get_table_suffix,
     get_table_name,
     get_environment,
     is_test_environment,
     is_production_environment
 )
+from .connection_provider import (
+    get_read_connection,
+    connection_stats,
+    close_read_connections
+)
 
 __all__ = [
     'get_database_path',
+    'get_mirror_database_path',
+    'get_stats_cube_dir',
+    'get_parquet_export_dir',
     'get_table_suffix',
     'get_table_name',
     'get_environment',
     'is_test_environment',
-    'is_production_environment'
+    'is_production_environment',
+    'get_read_connection',
+    'connection_stats',
+    'close_read_connections'
 ]
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Shared read-only SQLite connections.
+
+Repository, validator, job manager and mapper lookups used to open a fresh
+sqlite3 connection per call (and some per player inside a loop). The
+provider keeps one read-only connection per database file per thread and
+hands the same one back on every call:
+
+    - opened with a mode=ro URI and PRAGMA query_only, so a stray write fails
+      instead of taking the write lock
+    - mmap_size, cache_size and temp_store tuned for repeated lookups
+    - open/reuse counts per database, see connection_stats()
+
+Callers must not close a pooled connection. They should close (or fully
+consume) their cursors so that no statement keeps a read snapshot open
+between calls. Writes keep their own connections (see
+data_pipeline/common/sqlite_writer.py).
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .database_config import get_database_path
+
+READ_PRAGMAS = (
+    'PRAGMA query_only = ON',
+    'PRAGMA mmap_size = 268435456',  # 256MB
+    'PRAGMA cache_size = -32000',  # 32MB
+    'PRAGMA temp_store = MEMORY',
+)
+
+
+class ReadConnectionProvider:
+    """Thread-local read-only connections, one per database file per thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, field: str):
+        with self._lock:
+            counts = self._stats.setdefault(key, {'opened': 0, 'reused': 0})
+            counts[field] += 1
+
+    def get(self, db_path: Union[str, Path]) -> sqlite3.Connection:
+        """
+        Read-only connection to db_path for the calling thread.
+
+        Args:
+            db_path: SQLite database file (must exist)
+
+        Returns:
+            sqlite3.Connection reused across calls on this thread
+        """
+        key = str(Path(db_path).resolve())
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(key)
+        if conn is not None:
+            self._count(key, 'reused')
+            return conn
+
+        # check_same_thread=False only so close_all() can close it from another thread
+        conn = sqlite3.connect(f"file:{key}?mode=ro", uri=True, check_same_thread=False)
+        for pragma in READ_PRAGMAS:
+            conn.execute(pragma)
+        connections[key] = conn
+        with self._lock:
+            self._connections.append(conn)
+        self._count(key, 'opened')
+        return conn
+
+    def close_thread(self):
+        """Close the calling thread's connections (e.g. at the end of a worker)."""
+        connections = getattr(self._local, 'connections', None) or {}
+        with self._lock:
+            for conn in connections.values():
+                if conn in self._connections:
+                    self._connections.remove(conn)
+                conn.close()
+        connections.clear()
+
+    def close_all(self):
+        """Close every connection the provider has opened, on any thread."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Other threads' dicts still hold the closed objects; start them afresh
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Open and reuse counts per database file."""
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._stats.items()}
+
+
+_provider = ReadConnectionProvider()
+
+
+def get_read_connection(db_path: Optional[Union[str, Path]] = None,
+                        environment: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Pooled read-only connection for the calling thread.
+
+    Args:
+        db_path: Database file; defaults to get_database_path(environment)
+        environment: Optional environment override ('test' or 'production')
+
+    Returns:
+        sqlite3.Connection that must not be closed by the caller
+    """
+    return _provider.get(db_path or get_database_path(environment))
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """Open and reuse counts of pooled read connections, keyed by database file."""
+    return _provider.stats()
+
+
+def close_read_connections():
+    """Close every pooled read connection (tests, long-running services)."""
+    _provider.close_all()
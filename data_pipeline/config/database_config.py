@@ -16,6 +16,9 @@ from pathlib import Path
 # Database file names
 PRODUCTION_DB = "league_analytics.db"
 TEST_DB = "league_analytics_test.db"
+MIRROR_DB = "league_analytics_d1_mirror.db"
+STATS_CUBE_DIR = "stats_cube"
+PARQUET_EXPORT_DIR = "parquet"
 
 # Default environment
 DEFAULT_ENVIRONMENT = "production"
@@ -67,6 +70,51 @@ def get_database_path(environment=None):
         return DATABASE_DIR / PRODUCTION_DB
 
 
+def get_mirror_database_path():
+    """
+    Get the path of the local D1 mirror database.
+    
+    The mirror is a read-only replica of production D1 tables maintained by
+    data_pipeline/common/d1_mirror.py.
+    
+    Returns:
+        Path: Full path to the mirror database file
+    """
+    return DATABASE_DIR / MIRROR_DB
+
+
+def get_stats_cube_dir(environment=None):
+    """
+    Get the directory holding the memory-mapped player stats cube.
+    
+    The cube is a per-season player x date x stat array maintained by
+    data_pipeline/player_stats/stats_cube.py.
+    
+    Args:
+        environment: Optional environment override ('test' or 'production')
+    
+    Returns:
+        Path: Cube directory for the environment
+    """
+    return DATABASE_DIR / STATS_CUBE_DIR / get_environment(environment)
+
+
+def get_parquet_export_dir(environment=None):
+    """
+    Get the root directory of the partitioned Parquet export.
+    
+    Written by data_pipeline/common/parquet_export.py, one sub-directory per
+    table partitioned by season and month.
+    
+    Args:
+        environment: Optional environment override ('test' or 'production')
+    
+    Returns:
+        Path: Export root for the environment
+    """
+    return DATABASE_DIR / PARQUET_EXPORT_DIR / get_environment(environment)
+
+
 def get_table_suffix(environment=None):
     """
     Get the table suffix for the environment.
@@ -32,7 +32,6 @@ import argparse
 import logging
 import sqlite3
 import sys
-import threading
 import time
 import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -48,11 +47,15 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Import required modules
 from auth.token_manager import YahooTokenManager
+from data_pipeline.common.rate_limiter import get_shared_limiter
 from data_pipeline.common.season_manager import get_league_key, get_season_dates
+from data_pipeline.common.sqlite_writer import execute_rows, get_writer
 from data_pipeline.config.database_config import get_database_path, get_table_name
 from data_pipeline.daily_lineups.data_quality_check import LineupDataQualityChecker
 from data_pipeline.daily_lineups.parser import LineupParser
+from data_pipeline.daily_lineups.stints import LineupStints
 from data_pipeline.metadata.league_keys import LEAGUE_KEYS, SEASON_DATES
+from data_pipeline.metadata.league_metadata import LeagueMetadataCache
 
 # Configure logging
 logging.basicConfig(
@@ -69,28 +72,6 @@ RATE_LIMIT_DELAY = 1.0  # 1 second between requests per Yahoo guidelines
 BATCH_SIZE = 100  # Database batch insert size
 
 
-class RateLimiter:
-    """Thread-safe rate limiter for API requests."""
-    
-    def __init__(self, requests_per_second=1.0):
-        self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0
-        self.lock = threading.Lock()
-    
-    def wait(self):
-        """Wait if necessary to maintain rate limit."""
-        with self.lock:
-            now = time.time()
-            time_since_last = now - self.last_request_time
-            
-            if time_since_last < self.min_interval:
-                sleep_time = self.min_interval - time_since_last
-                time.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-
-
 class LineupBackfiller:
     """Handles bulk lineup data collection from Yahoo Fantasy Sports API."""
     
@@ -105,15 +86,19 @@ class LineupBackfiller:
         self.environment = environment
         self.max_workers = min(max_workers, MAX_WORKERS)
         self.token_manager = YahooTokenManager()
-        self.rate_limiter = RateLimiter(requests_per_second=1.0)
+        self.rate_limiter = get_shared_limiter('yahoo', 1.0 / RATE_LIMIT_DELAY)
         self.quality_checker = LineupDataQualityChecker()
         self.parser = LineupParser()
         
         # Database setup
         self.db_path = get_database_path(environment)
+        self.writer = get_writer(self.db_path)
         self.table_name = get_table_name('daily_lineups', environment)
         self._init_database()
         
+        # Team keys and settings, fetched from Yahoo only when stale
+        self.league_metadata = LeagueMetadataCache(self._fetch_xml, environment)
+        
         # Job tracking
         self.job_id = None
         self.stats = {
@@ -125,7 +110,10 @@ class LineupBackfiller:
     
     def _init_database(self):
         """Initialize database and ensure tables exist."""
-        conn = sqlite3.connect(str(self.db_path))
+        self.writer.run(self._create_tables).result()
+    
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Table and index DDL, run on the writer thread."""
         cursor = conn.cursor()
         
         # Create daily_lineups table if it doesn't exist
@@ -173,9 +161,6 @@ class LineupBackfiller:
                 end_time TIMESTAMP
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def start_job(self, job_type: str, date_range_start: str, date_range_end: str, 
                   league_key: str, metadata: Optional[str] = None) -> str:
@@ -184,16 +169,12 @@ class LineupBackfiller:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         job_id = f"{job_type}_{self.environment}_{timestamp}_{uuid.uuid4().hex[:8]}"
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.writer.execute('''
             INSERT INTO job_log (job_id, job_type, environment, status, 
                                 date_range_start, date_range_end, league_key, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (job_id, job_type, self.environment, 'running', 
-              date_range_start, date_range_end, league_key, metadata))
-        conn.commit()
-        conn.close()
+              date_range_start, date_range_end, league_key, metadata)).result()
         
         self.job_id = job_id
         logger.info(f"Started job: {job_id}")
@@ -205,9 +186,6 @@ class LineupBackfiller:
         if not self.job_id:
             return
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         update_parts = ['status = ?']
         params = [status]
         
@@ -229,9 +207,7 @@ class LineupBackfiller:
         params.append(self.job_id)
         
         query = f"UPDATE job_log SET {', '.join(update_parts)} WHERE job_id = ?"
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        self.writer.execute(query, params).result()
     
     def fetch_lineups_for_date(self, league_key: str, team_key: str, date_str: str) -> List[Dict]:
         """
@@ -333,6 +309,17 @@ class LineupBackfiller:
         
         return lineups
     
+    def _fetch_xml(self, url: str) -> str:
+        """Rate-limited GET returning the XML response text."""
+        self.rate_limiter.wait()
+        headers = {
+            'Authorization': f'Bearer {self.token_manager.get_access_token()}',
+            'Accept': 'application/xml'
+        }
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+        return response.text
+    
     def get_all_team_keys(self, league_key: str) -> List[str]:
         """
         Get all team keys for a league.
@@ -343,29 +330,10 @@ class LineupBackfiller:
         Returns:
             List of team keys
         """
-        url = f"{BASE_FANTASY_URL}/league/{league_key}/teams"
-        headers = {
-            'Authorization': f'Bearer {self.token_manager.get_access_token()}',
-            'Accept': 'application/xml'
-        }
-        
         try:
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.text)
-            ns = {'y': 'http://fantasysports.yahooapis.com/fantasy/v2/base.rng'}
-            
-            team_keys = []
-            teams = root.findall('.//y:team', ns)
-            for team in teams:
-                team_key_elem = team.find('.//y:team_key', ns)
-                if team_key_elem is not None:
-                    team_keys.append(team_key_elem.text)
-            
-            return team_keys
+            return self.league_metadata.get_team_keys(league_key)
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ET.ParseError, ValueError) as e:
             logger.error(f"Error fetching team keys: {e}")
             return []
     
@@ -388,36 +356,30 @@ class LineupBackfiller:
             logger.warning(f"Found {validation_results['invalid']} invalid lineups")
             logger.warning(self.quality_checker.generate_report(validation_results))
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        inserted = 0
-        for lineup in lineups:
-            try:
-                cursor.execute(f'''
-                    INSERT OR IGNORE INTO {self.table_name} (
-                        job_id, season, date, team_key, team_name,
-                        yahoo_player_id, player_name, selected_position, position_type,
-                        player_status, eligible_positions, player_team
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    lineup['job_id'], lineup['season'], lineup['date'],
-                    lineup['team_key'], lineup['team_name'], lineup['yahoo_player_id'],
-                    lineup['player_name'], lineup['selected_position'],
-                    lineup['position_type'], lineup['player_status'],
-                    lineup['eligible_positions'], lineup['player_team']
-                ))
-                
-                if cursor.rowcount > 0:
-                    inserted += 1
-                    
-            except sqlite3.Error as e:
-                logger.error(f"Error inserting lineup: {e}")
-                self.stats['errors'] += 1
-        
-        conn.commit()
-        conn.close()
+        rows = [(
+            lineup['job_id'], lineup['season'], lineup['date'],
+            lineup['team_key'], lineup['team_name'], lineup['yahoo_player_id'],
+            lineup['player_name'], lineup['selected_position'],
+            lineup['position_type'], lineup['player_status'],
+            lineup['eligible_positions'], lineup['player_team']
+        ) for lineup in lineups]
+        
+        insert_sql = f'''
+            INSERT OR IGNORE INTO {self.table_name} (
+                job_id, season, date, team_key, team_name,
+                yahoo_player_id, player_name, selected_position, position_type,
+                player_status, eligible_positions, player_team
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        
+        # One queued batch, committed by the shared writer with any concurrent writes
+        try:
+            return self.writer.executemany(insert_sql, rows).result()
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting lineup batch, retrying row by row: {e}")
         
+        inserted, failed = self.writer.run(lambda conn: execute_rows(conn, insert_sql, rows)).result()
+        self.stats['errors'] += failed
         return inserted
     
     def backfill_date_range(self, start_date: datetime, end_date: datetime, 
@@ -499,6 +461,13 @@ class LineupBackfiller:
             inserted = self.insert_lineups(all_lineups)
             self.stats['total_inserted'] = inserted
             logger.info(f"Inserted {inserted} new lineup records")
+            
+            # Raises inside the writer request, so a failed refresh rolls back whole
+            dates = {lineup['date'] for lineup in all_lineups}
+            try:
+                self.writer.run(lambda conn: LineupStints(conn, self.environment).refresh_dates(dates)).result()
+            except Exception as e:
+                logger.error(f"Failed to refresh lineup stints: {e}")
         
         # Update job status
         self.update_job(
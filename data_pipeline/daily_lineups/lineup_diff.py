@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+"""
+Set-Based Lineup Diffing
+
+Diff stage of the lineup updaters. Instead of comparing lineup dicts one
+team-day at a time (ChangeTracker.compare_lineups), a whole batch of freshly
+fetched team-days is handled at once:
+
+    1. Roster hashes of the batch are compared with daily_lineups_metadata in
+       one query; unchanged team-days whose rows are still in daily_lineups
+       only get last_fetched bumped and skip the write path entirely
+    2. The remaining team-days are loaded into TEMP staging tables (for D1, an
+       in-memory SQLite copy of their stored rows) and diffed with EXCEPT and
+       joins: players added, players removed, position moves, status changes
+    3. Stored rows with no identical fetched row are deleted, fetched rows with
+       no identical stored row are inserted, lineup_changes is written in bulk
+       and the metadata hashes are upserted
+
+Rows are identical when (player, selected_position, player_status) match,
+the same fields that make up the roster content hash.
+"""
+
+import json
+import logging
+import sqlite3
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.content_hash import hash_matches
+from data_pipeline.common.sql_dump_writer import sql_literal
+from data_pipeline.config.database_config import get_table_name
+from data_pipeline.daily_lineups.refresh_planner import (
+    METADATA_TABLE, legacy_lineup_content_hash, lineup_content_hash
+)
+
+logger = logging.getLogger(__name__)
+
+CHANGES_TABLE = 'lineup_changes'
+
+LINEUP_COLUMNS = (
+    'job_id', 'season', 'date', 'team_key', 'team_name', 'yahoo_player_id', 'player_name',
+    'selected_position', 'position_type', 'player_status', 'eligible_positions', 'player_team'
+)
+
+# Rows per D1 statement (inlined literals)
+D1_BATCH = 100
+
+TeamDay = Tuple[str, str]
+
+
+class LineupDiffer:
+    """Applies a batch of fetched team-day rosters through a set-based diff."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 lineups_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection holding daily_lineups
+            environment: 'production' or 'test' (SQLite table suffixes)
+            lineups_table: Override lineups table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        if lineups_table:
+            self.lineups_table = lineups_table
+        else:
+            self.lineups_table = get_table_name('daily_lineups', environment) if self.is_sqlite else 'daily_lineups'
+        self._ensured = False
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _d1_batch(self, statements: List[str], what: str):
+        results = self.connection.execute_batch([(sql, []) for sql in statements])
+        failures = [r for r in results if not r.get('success', True)]
+        if failures:
+            raise RuntimeError(f"{len(failures)} D1 {what} batches failed: {failures[0].get('error')}")
+
+    def ensure_tables(self):
+        """Create lineup_changes and daily_lineups_metadata if the change tracking schema is not applied."""
+        if self._ensured:
+            return
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                team_key TEXT NOT NULL,
+                team_name TEXT,
+                old_hash TEXT,
+                new_hash TEXT,
+                change_type TEXT,
+                players_added TEXT,
+                players_removed TEXT,
+                position_changes TEXT,
+                change_detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                job_id TEXT
+            )
+        """)
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {METADATA_TABLE} (
+                date TEXT NOT NULL,
+                team_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_fetched TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                job_id TEXT,
+                PRIMARY KEY (date, team_key)
+            )
+        """)
+        if self.is_sqlite:
+            self.connection.commit()
+        self._ensured = True
+
+    # ------------------------------------------------------------------
+    # Hash screening
+    # ------------------------------------------------------------------
+
+    def stored_hashes(self, team_days: Set[TeamDay]) -> Dict[TeamDay, str]:
+        """(date, team_key) -> recorded content hash for the batch's dates."""
+        dates = sorted({d for d, _ in team_days})
+        if not dates:
+            return {}
+        rows = self._query(
+            f"SELECT date, team_key, content_hash FROM {METADATA_TABLE} "
+            f"WHERE date IN ({','.join('?' * len(dates))})", dates)
+        return {(row['date'], row['team_key']): row['content_hash']
+                for row in rows if (row['date'], row['team_key']) in team_days}
+
+    def stored_team_days(self, team_days: Set[TeamDay]) -> Set[TeamDay]:
+        """Team-days of the batch that have rows in daily_lineups."""
+        dates = sorted({d for d, _ in team_days})
+        if not dates:
+            return set()
+        rows = self._query(
+            f"SELECT DISTINCT date, team_key FROM {self.lineups_table} "
+            f"WHERE date IN ({','.join('?' * len(dates))})", dates)
+        return {(row['date'], row['team_key']) for row in rows} & team_days
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+
+    def _staging_connection(self, team_days: Set[TeamDay]) -> Tuple[sqlite3.Connection, str]:
+        """
+        Connection holding temp.lineup_stage/lineup_stage_days, and the name of
+        the table with the stored rows to diff against.
+        """
+        if self.is_sqlite:
+            stage, stored_table = self.connection, self.lineups_table
+        else:
+            # D1 cannot hold TEMP tables across requests: copy the stored rows
+            # of the staged team-days into an in-memory database
+            stage, stored_table = sqlite3.connect(':memory:'), 'lineup_stored'
+            stage.execute(f"""
+                CREATE TABLE {stored_table} (
+                    lineup_id INTEGER, date TEXT, team_key TEXT, yahoo_player_id TEXT,
+                    selected_position TEXT, player_status TEXT
+                )
+            """)
+            by_date: Dict[str, List[str]] = defaultdict(list)
+            for date_str, team_key in team_days:
+                by_date[date_str].append(team_key)
+            for date_str, team_keys in sorted(by_date.items()):
+                rows = self._query(f"""
+                    SELECT lineup_id, date, team_key, yahoo_player_id, selected_position, player_status
+                    FROM {self.lineups_table}
+                    WHERE date = ? AND team_key IN ({','.join('?' * len(team_keys))})
+                """, [date_str, *sorted(team_keys)])
+                stage.executemany(f"INSERT INTO {stored_table} VALUES (?, ?, ?, ?, ?, ?)",
+                                  [(r['lineup_id'], r['date'], r['team_key'], r['yahoo_player_id'],
+                                    r['selected_position'], r['player_status']) for r in rows])
+
+        stage.execute(f"CREATE TEMP TABLE IF NOT EXISTS lineup_stage ({', '.join(LINEUP_COLUMNS)})")
+        stage.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS lineup_stage_days (
+                date TEXT NOT NULL, team_key TEXT NOT NULL, PRIMARY KEY (date, team_key)
+            )
+        """)
+        stage.execute("DELETE FROM temp.lineup_stage")
+        stage.execute("DELETE FROM temp.lineup_stage_days")
+        stage.executemany("INSERT INTO temp.lineup_stage_days VALUES (?, ?)", sorted(team_days))
+        return stage, stored_table
+
+    @staticmethod
+    def _diff(stage: sqlite3.Connection, stored_table: str) -> Dict[str, Any]:
+        """Adds, removes, moves, status changes, stale stored rows and new rows of the staged team-days."""
+        stored = f"""
+            SELECT d.* FROM {stored_table} d
+            JOIN temp.lineup_stage_days k ON d.date = k.date AND d.team_key = k.team_key
+        """
+        added = stage.execute(f"""
+            SELECT date, team_key, yahoo_player_id FROM temp.lineup_stage
+            EXCEPT
+            SELECT date, team_key, yahoo_player_id FROM ({stored})
+        """).fetchall()
+        removed = stage.execute(f"""
+            SELECT date, team_key, yahoo_player_id FROM ({stored})
+            EXCEPT
+            SELECT date, team_key, yahoo_player_id FROM temp.lineup_stage
+        """).fetchall()
+        moves = stage.execute(f"""
+            SELECT DISTINCT s.date, s.team_key, s.yahoo_player_id, d.selected_position, s.selected_position
+            FROM temp.lineup_stage s
+            JOIN {stored_table} d
+              ON d.date = s.date AND d.team_key = s.team_key AND d.yahoo_player_id = s.yahoo_player_id
+            WHERE d.selected_position IS NOT s.selected_position
+        """).fetchall()
+        statuses = stage.execute(f"""
+            SELECT DISTINCT s.date, s.team_key, s.yahoo_player_id, d.player_status, s.player_status
+            FROM temp.lineup_stage s
+            JOIN {stored_table} d
+              ON d.date = s.date AND d.team_key = s.team_key AND d.yahoo_player_id = s.yahoo_player_id
+            WHERE d.player_status IS NOT s.player_status
+        """).fetchall()
+        stale = stage.execute(f"""
+            SELECT d.lineup_id, d.date, d.team_key FROM ({stored}) d
+            WHERE NOT EXISTS (
+                SELECT 1 FROM temp.lineup_stage s
+                WHERE s.date = d.date AND s.team_key = d.team_key
+                  AND s.yahoo_player_id = d.yahoo_player_id
+                  AND s.selected_position IS d.selected_position
+                  AND s.player_status IS d.player_status
+            )
+        """).fetchall()
+        fresh = stage.execute(f"""
+            SELECT {', '.join('s.' + c for c in LINEUP_COLUMNS)} FROM temp.lineup_stage s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {stored_table} d
+                WHERE d.date = s.date AND d.team_key = s.team_key
+                  AND d.yahoo_player_id = s.yahoo_player_id
+                  AND d.selected_position IS s.selected_position
+                  AND d.player_status IS s.player_status
+            )
+        """).fetchall()
+        existing = {tuple(r) for r in stage.execute(
+            f"SELECT DISTINCT date, team_key FROM ({stored})").fetchall()}
+        fresh = [dict(zip(LINEUP_COLUMNS, r)) for r in fresh]
+        return {
+            'added': added, 'removed': removed, 'moves': moves, 'statuses': statuses,
+            'stale': [r[0] for r in stale],
+            'fresh': fresh,
+            'existing': existing,
+            # Every team-day with a row to delete or insert
+            'rewritten': {(r[1], r[2]) for r in stale} | {(r['date'], r['team_key']) for r in fresh},
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _write_rows(self, stale_ids: List[int], fresh: List[Dict[str, Any]]):
+        """Delete stale stored rows, then insert the new ones."""
+        if self.is_sqlite:
+            for i in range(0, len(stale_ids), 500):
+                chunk = stale_ids[i:i + 500]
+                self.connection.execute(
+                    f"DELETE FROM {self.lineups_table} WHERE lineup_id IN ({','.join('?' * len(chunk))})", chunk)
+            self.connection.executemany(f"""
+                INSERT OR IGNORE INTO {self.lineups_table} ({', '.join(LINEUP_COLUMNS)})
+                VALUES ({', '.join('?' * len(LINEUP_COLUMNS))})
+            """, [tuple(row[c] for c in LINEUP_COLUMNS) for row in fresh])
+            return
+
+        statements = [
+            f"DELETE FROM {self.lineups_table} WHERE lineup_id IN "
+            f"({', '.join(str(int(i)) for i in stale_ids[n:n + D1_BATCH])})"
+            for n in range(0, len(stale_ids), D1_BATCH)
+        ]
+        statements += [
+            f"INSERT OR REPLACE INTO {self.lineups_table} ({', '.join(LINEUP_COLUMNS)}) VALUES "
+            + ', '.join('(' + ', '.join(sql_literal(row[c]) for c in LINEUP_COLUMNS) + ')'
+                        for row in fresh[n:n + D1_BATCH])
+            for n in range(0, len(fresh), D1_BATCH)
+        ]
+        if statements:
+            self._d1_batch(statements, 'lineup write')
+
+    def _write_changes(self, changes: List[Tuple]):
+        """Bulk-insert lineup_changes rows."""
+        if not changes:
+            return
+        columns = ('date, team_key, team_name, old_hash, new_hash, change_type, '
+                   'players_added, players_removed, position_changes, job_id')
+        if self.is_sqlite:
+            self.connection.executemany(
+                f"INSERT INTO {CHANGES_TABLE} ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", changes)
+            return
+        self._d1_batch([
+            f"INSERT INTO {CHANGES_TABLE} ({columns}) VALUES "
+            + ', '.join('(' + ', '.join(sql_literal(v) for v in change) + ')' for change in changes[n:n + D1_BATCH])
+            for n in range(0, len(changes), D1_BATCH)
+        ], 'lineup change')
+
+    def _write_metadata(self, hashes: Dict[TeamDay, str], modified: Set[TeamDay], job_id: Optional[str]):
+        """Upsert metadata hashes; last_modified moves only for modified team-days."""
+        if not hashes:
+            return
+        upsert = """
+            ON CONFLICT(date, team_key) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                last_fetched = CURRENT_TIMESTAMP,
+                last_modified = COALESCE(excluded.last_modified, last_modified),
+                job_id = excluded.job_id
+        """
+        records = [(d, t, h, (d, t) in modified, job_id) for (d, t), h in sorted(hashes.items())]
+        if self.is_sqlite:
+            self.connection.executemany(f"""
+                INSERT INTO {METADATA_TABLE} (date, team_key, content_hash, last_fetched, last_modified, job_id)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP, CASE WHEN ? THEN CURRENT_TIMESTAMP END, ?)
+                {upsert}
+            """, records)
+            return
+        self._d1_batch([
+            f"INSERT INTO {METADATA_TABLE} (date, team_key, content_hash, last_fetched, last_modified, job_id) VALUES "
+            + ', '.join(f"({sql_literal(d)}, {sql_literal(t)}, {sql_literal(h)}, CURRENT_TIMESTAMP, "
+                        f"{'CURRENT_TIMESTAMP' if m else 'NULL'}, {sql_literal(j)})"
+                        for d, t, h, m, j in records[n:n + D1_BATCH])
+            + upsert
+            for n in range(0, len(records), D1_BATCH)
+        ], 'lineup metadata')
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    def apply(self, lineups: Sequence[Dict[str, Any]], job_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Diff a batch of fetched lineups against the stored ones and write the changes.
+
+        Args:
+            lineups: Parsed lineup rows of complete team-days
+            job_id: Job recorded on written rows, changes and metadata
+
+        Returns:
+            Stats dict: team_days, unchanged, new, modified, rows_inserted,
+            rows_deleted, players_added, players_removed, position_moves,
+            status_changes, plus 'changed' (set of (date, team_key) whose
+            roster changed)
+        """
+        stats = {'team_days': 0, 'unchanged': 0, 'new': 0, 'modified': 0,
+                 'rows_inserted': 0, 'rows_deleted': 0, 'players_added': 0,
+                 'players_removed': 0, 'position_moves': 0, 'status_changes': 0,
+                 'changed': set()}
+        if not lineups:
+            return stats
+        self.ensure_tables()
+
+        by_team_day: Dict[TeamDay, List[Dict[str, Any]]] = defaultdict(list)
+        for lineup in lineups:
+            by_team_day[(lineup['date'], lineup['team_key'])].append(lineup)
+        stats['team_days'] = len(by_team_day)
+
+        # 1. Hash screening: unchanged team-days skip the write path, as long
+        #    as their rows are still in daily_lineups (the metadata can outlive them)
+        hashes = {key: lineup_content_hash(rows) for key, rows in by_team_day.items()}
+        stored = self.stored_hashes(set(by_team_day))
+        matching = {
+            key for key in by_team_day
+            if hash_matches(stored.get(key), hashes[key],
+                            lambda key=key: legacy_lineup_content_hash(by_team_day[key]))
+        }
+        present = self.stored_team_days(matching)
+        if len(present) < len(matching):
+            logger.warning(f"{len(matching) - len(present)} team-days have a matching hash "
+                           f"but no rows in {self.lineups_table}; rewriting them")
+        candidates = set(by_team_day) - present
+        stats['unchanged'] = len(by_team_day) - len(candidates)
+
+        if candidates:
+            # 2. Stage the candidate team-days and diff them as sets
+            stage, stored_table = self._staging_connection(candidates)
+            try:
+                stage.executemany(
+                    f"INSERT INTO temp.lineup_stage VALUES ({', '.join('?' * len(LINEUP_COLUMNS))})",
+                    [tuple(row.get(c) for c in LINEUP_COLUMNS) for key in candidates for row in by_team_day[key]])
+                diff = self._diff(stage, stored_table)
+
+                # 3. Write only what differs
+                self._write_rows(diff['stale'], diff['fresh'])
+                stats['rows_deleted'] = len(diff['stale'])
+                stats['rows_inserted'] = len(diff['fresh'])
+
+                added, removed = defaultdict(list), defaultdict(list)
+                moves, statuses = defaultdict(dict), defaultdict(dict)
+                for date_str, team_key, player_id in diff['added']:
+                    added[(date_str, team_key)].append(player_id)
+                for date_str, team_key, player_id in diff['removed']:
+                    removed[(date_str, team_key)].append(player_id)
+                for date_str, team_key, player_id, old_pos, new_pos in diff['moves']:
+                    moves[(date_str, team_key)][player_id] = {'from': old_pos, 'to': new_pos}
+                for date_str, team_key, player_id, old_status, new_status in diff['statuses']:
+                    statuses[(date_str, team_key)][player_id] = {'from': old_status, 'to': new_status}
+
+                changes = []
+                for key in sorted(candidates):
+                    is_new = key not in diff['existing']
+                    if not (is_new or added[key] or removed[key] or moves[key] or statuses[key]
+                            or key in diff['rewritten']):
+                        continue
+                    stats['changed'].add(key)
+                    stats['new' if is_new else 'modified'] += 1
+                    stats['players_added'] += len(added[key])
+                    stats['players_removed'] += len(removed[key])
+                    stats['position_moves'] += len(moves[key])
+                    stats['status_changes'] += len(statuses[key])
+                    # Status changes are recorded next to the position moves
+                    position_changes = {player_id: dict(move) for player_id, move in moves[key].items()}
+                    for player_id, status in statuses[key].items():
+                        position_changes.setdefault(player_id, {})['status'] = status
+                    changes.append((
+                        key[0], key[1], by_team_day[key][0].get('team_name'), stored.get(key), hashes[key],
+                        'new' if is_new else 'modified',
+                        json.dumps(sorted(added[key])), json.dumps(sorted(removed[key])),
+                        json.dumps(position_changes, sort_keys=True), job_id
+                    ))
+                self._write_changes(changes)
+            finally:
+                if self.is_sqlite:
+                    stage.execute("DELETE FROM temp.lineup_stage")
+                    stage.execute("DELETE FROM temp.lineup_stage_days")
+                else:
+                    stage.close()
+
+        # Hashes for every fetched team-day (only last_fetched moves when unchanged)
+        self._write_metadata(hashes, stats['changed'] | (candidates - set(stored)), job_id)
+        if self.is_sqlite:
+            self.connection.commit()
+
+        logger.info(f"Lineup diff: {stats['team_days']} team-days, {stats['unchanged']} unchanged, "
+                    f"{stats['new']} new, {stats['modified']} modified, {stats['status_changes']} status changes "
+                    f"(+{stats['rows_inserted']}/-{stats['rows_deleted']} rows)")
+        return stats
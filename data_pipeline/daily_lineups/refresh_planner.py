@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+Lineup Refresh Planner
+
+Decides which (team, date) rosters an incremental lineup job actually has to
+fetch, instead of refetching every team for every day in the lookback window.
+A team-day is fetched when:
+
+    today       - the date is today or later (lineups can still change)
+    new         - it has no daily_lineups_metadata row yet
+    unsettled   - it was last fetched before the day was over
+    transaction - the transactions log has an add, drop or trade for the team,
+                  effective on or before the date, recorded after last_fetched
+
+Everything else is settled and skipped. verify_sample adds a random sample of
+skipped team-days so the stored content_hash can be checked against Yahoo.
+
+After fetching, the updater writes the batch through LineupDiffer
+(lineup_diff.py), which stores each roster's content_hash and last_fetched
+(and bumps last_modified when the roster changed); record_fetch() does the
+same for a single team-day.
+
+Usage:
+    python -m data_pipeline.daily_lineups.refresh_planner --days 7
+    python -m data_pipeline.daily_lineups.refresh_planner --start 2025-08-01 --end 2025-08-07 --verify 10
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import get_database_path, get_table_name
+from data_pipeline.common.content_hash import BatchHasher, hash_matches
+
+logger = logging.getLogger(__name__)
+
+METADATA_TABLE = 'daily_lineups_metadata'
+
+# Hours after midnight UTC of the next day before a date's lineups are final
+# (covers late West Coast games in ET/PT)
+SETTLE_HOURS = 10
+
+REASONS = ('today', 'new', 'unsettled', 'transaction', 'verify')
+
+ROSTER_HASHER = BatchHasher(('yahoo_player_id', 'selected_position', 'player_status'))
+
+
+def _roster_rows(lineups: Sequence[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+    return [
+        (str(l.get('yahoo_player_id') or ''), l.get('selected_position') or '', l.get('player_status') or '')
+        for l in lineups
+    ]
+
+
+def lineup_content_hash(lineups: Sequence[Dict[str, Any]]) -> str:
+    """Hash of a team-day roster: unordered (player, slot, status) triples."""
+    return ROSTER_HASHER.digest_rows(_roster_rows(lineups))
+
+
+def legacy_lineup_content_hash(lineups: Sequence[Dict[str, Any]]) -> str:
+    """SHA-256 roster hash stored before the batch hasher (for hash_matches)."""
+    players = sorted(_roster_rows(lineups))
+    return hashlib.sha256('\n'.join('|'.join(p) for p in players).encode()).hexdigest()
+
+
+def _epoch(timestamp: Optional[str]) -> Optional[float]:
+    """Epoch seconds of a SQLite CURRENT_TIMESTAMP (UTC) value."""
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(str(timestamp).replace('T', ' ')[:19])
+    return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+
+class LineupRefreshPlanner:
+    """Plans incremental lineup fetches from fetch metadata and the transactions log."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 transactions_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection
+            environment: 'production' or 'test' (SQLite table suffixes)
+            transactions_table: Override transactions table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        if self.is_sqlite:
+            self.transactions_table = transactions_table or get_table_name('transactions', environment)
+            self.lineup_table = get_table_name('daily_lineups', environment)
+        else:
+            self.transactions_table = transactions_table or 'transactions'
+            self.lineup_table = 'daily_lineups'
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        if self.is_sqlite:
+            self.connection.commit()
+
+    def ensure_table(self):
+        """Create daily_lineups_metadata if the change tracking schema is not applied."""
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {METADATA_TABLE} (
+                date TEXT NOT NULL,
+                team_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_fetched TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                job_id TEXT,
+                PRIMARY KEY (date, team_key)
+            )
+        """)
+        self._commit()
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+
+    def fetch_metadata(self, league_key: str, start: str, end: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """(team_key, date) -> {'content_hash', 'last_fetched'} for the window."""
+        rows = self._query(f"""
+            SELECT team_key, date, content_hash, last_fetched
+            FROM {METADATA_TABLE}
+            WHERE date BETWEEN ? AND ? AND team_key LIKE ?
+        """, [start, end, league_key + '.t.%'])
+        return {(row['team_key'], row['date']): row for row in rows}
+
+    def known_team_keys(self, league_key: str) -> List[str]:
+        """Team keys with stored lineups for a league."""
+        rows = self._query(f"SELECT DISTINCT team_key FROM {self.lineup_table} WHERE team_key LIKE ?",
+                           [league_key + '.t.%'])
+        return sorted(row['team_key'] for row in rows)
+
+    def transactions_since(self, league_key: str, end: str, since_epoch: float) -> Dict[str, List[Tuple[str, float]]]:
+        """team_key -> [(effective date, recorded epoch)] for transactions recorded after since_epoch."""
+        rows = self._query(f"""
+            SELECT team_key, date, recorded FROM (
+                SELECT destination_team_key AS team_key, date,
+                       COALESCE(NULLIF(timestamp, 0), CAST(strftime('%s', created_at) AS INTEGER)) AS recorded
+                FROM {self.transactions_table}
+                WHERE league_key = ? AND date <= ? AND destination_team_key IS NOT NULL
+                UNION ALL
+                SELECT source_team_key AS team_key, date,
+                       COALESCE(NULLIF(timestamp, 0), CAST(strftime('%s', created_at) AS INTEGER)) AS recorded
+                FROM {self.transactions_table}
+                WHERE league_key = ? AND date <= ? AND source_team_key IS NOT NULL
+            )
+            WHERE team_key != '' AND recorded > ?
+        """, [league_key, end, league_key, end, int(since_epoch)])
+        by_team: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        for row in rows:
+            by_team[row['team_key']].append((str(row['date'])[:10], float(row['recorded'] or 0)))
+        return dict(by_team)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def plan(self, league_key: str, team_keys: Sequence[str], start_date: date, end_date: date,
+             today: Optional[date] = None, verify_sample: int = 0,
+             seed: Optional[int] = None) -> List[Tuple[str, str, str]]:
+        """
+        Team-days to fetch for a date window.
+
+        Args:
+            league_key: Yahoo league key
+            team_keys: Teams in the league
+            start_date: First date of the window
+            end_date: Last date of the window
+            today: Override today's date
+            verify_sample: Number of settled team-days to refetch for verification
+            seed: Random seed for the verification sample
+
+        Returns:
+            Sorted (date, team_key, reason) tuples
+        """
+        self.ensure_table()
+        today = today or date.today()
+        start, end = start_date.isoformat(), end_date.isoformat()
+        metadata = self.fetch_metadata(league_key, start, end)
+
+        fetched_epochs = [e for e in (_epoch(m['last_fetched']) for m in metadata.values()) if e is not None]
+        transactions = self.transactions_since(league_key, end, min(fetched_epochs)) if fetched_epochs else {}
+
+        planned: List[Tuple[str, str, str]] = []
+        settled: List[Tuple[str, str]] = []
+        day = start_date
+        while day <= end_date:
+            date_str = day.isoformat()
+            settle_epoch = (datetime.combine(day + timedelta(days=1), datetime.min.time(), timezone.utc)
+                            + timedelta(hours=SETTLE_HOURS)).timestamp()
+            for team_key in team_keys:
+                meta = metadata.get((team_key, date_str))
+                last_fetched = _epoch(meta['last_fetched']) if meta else None
+                if day >= today:
+                    reason = 'today'
+                elif last_fetched is None:
+                    reason = 'new'
+                elif last_fetched < settle_epoch:
+                    reason = 'unsettled'
+                elif any(txn_date <= date_str and recorded > last_fetched
+                         for txn_date, recorded in transactions.get(team_key, ())):
+                    reason = 'transaction'
+                else:
+                    settled.append((date_str, team_key))
+                    reason = None
+                if reason:
+                    planned.append((date_str, team_key, reason))
+            day += timedelta(days=1)
+
+        if verify_sample and settled:
+            rng = random.Random(seed)
+            planned.extend((d, t, 'verify') for d, t in rng.sample(settled, min(verify_sample, len(settled))))
+
+        counts = defaultdict(int)
+        for _, _, reason in planned:
+            counts[reason] += 1
+        total = len(team_keys) * ((end_date - start_date).days + 1)
+        logger.info(f"Lineup refresh plan: {len(planned)} of {total} team-days "
+                    f"({', '.join(f'{r}={counts[r]}' for r in REASONS if counts[r]) or 'nothing to fetch'})")
+        return sorted(planned)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def stored_hash(self, team_key: str, date_str: str) -> Optional[str]:
+        """content_hash recorded for a team-day, if any."""
+        rows = self._query(f"SELECT content_hash FROM {METADATA_TABLE} WHERE team_key = ? AND date = ?",
+                           [team_key, date_str])
+        return rows[0]['content_hash'] if rows else None
+
+    def record_fetch(self, team_key: str, date_str: str, lineups: Sequence[Dict[str, Any]],
+                     job_id: Optional[str] = None) -> bool:
+        """
+        Store the content hash and fetch time for a team-day.
+
+        Returns:
+            True if the roster differs from the previously recorded one
+        """
+        content_hash = lineup_content_hash(lineups)
+        previous = self.stored_hash(team_key, date_str)
+        # A legacy stored hash is compared with the legacy hash and rewritten
+        changed = previous is not None and not hash_matches(
+            previous, content_hash, lambda: legacy_lineup_content_hash(lineups))
+        self._execute(f"""
+            INSERT INTO {METADATA_TABLE} (date, team_key, content_hash, last_fetched, last_modified, job_id)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?)
+            ON CONFLICT(date, team_key) DO UPDATE SET
+                last_modified = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE last_modified END,
+                content_hash = excluded.content_hash,
+                last_fetched = CURRENT_TIMESTAMP,
+                job_id = excluded.job_id
+        """, [date_str, team_key, content_hash, job_id, int(changed)])
+        self._commit()
+        return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show which team-days an incremental lineup job would fetch')
+    parser.add_argument('--days', type=int, default=7, help='Lookback window (default: 7)')
+    parser.add_argument('--start', help='Window start (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Window end (YYYY-MM-DD)')
+    parser.add_argument('--verify', type=int, default=0, help='Settled team-days to sample for verification')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Use Cloudflare D1')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from data_pipeline.common.season_manager import get_league_key
+
+    if args.use_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        connection = D1Connection()
+    else:
+        connection = sqlite3.connect(str(get_database_path(args.environment)))
+
+    if args.start and args.end:
+        start = datetime.strptime(args.start, '%Y-%m-%d').date()
+        end = datetime.strptime(args.end, '%Y-%m-%d').date()
+    else:
+        end = date.today()
+        start = end - timedelta(days=args.days)
+
+    planner = LineupRefreshPlanner(connection, args.environment)
+    league_key = get_league_key(start.year)
+    team_keys = planner.known_team_keys(league_key)
+    for date_str, team_key, reason in planner.plan(league_key, team_keys, start, end, verify_sample=args.verify):
+        print(f"  {date_str} {team_key:<20} {reason}")
+
+
+if __name__ == '__main__':
+    main()
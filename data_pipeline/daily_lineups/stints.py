@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+"""
+Lineup Stints
+
+Run-length encodes daily_lineups into lineup_stints: one row per contiguous
+run of days a player spent on a team in the same lineup slot and status.
+
+    (yahoo_player_id, team_key, selected_position, player_status,
+     start_date, end_date, days)
+
+A season of ~470 rostered players collapses from ~85k daily rows to a few
+thousand stints, and questions such as "who was where on date D" or "days
+at position P in a range" become interval-overlap queries.
+
+Maintenance:
+    refresh_dates() - incremental, called by the lineup updaters after each
+                      insert. Only stints touching the written window are
+                      recomputed, each over its own key's span.
+    rebuild()       - recompute one season (or everything) from scratch.
+
+Usage:
+    python -m data_pipeline.daily_lineups.stints --rebuild --season 2025
+    python -m data_pipeline.daily_lineups.stints --on 2025-07-04 --team 458.l.6966.t.1
+    python -m data_pipeline.daily_lineups.stints --player 12345 --position SS \\
+        --start 2025-04-01 --end 2025-06-30
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import get_database_path, get_table_name
+
+logger = logging.getLogger(__name__)
+
+STINT_TABLE = 'lineup_stints'
+STINT_KEY = ('yahoo_player_id', 'team_key', 'selected_position', 'player_status')
+STINT_COLUMNS = ('season', 'yahoo_player_id', 'player_name', 'team_key', 'team_name',
+                 'selected_position', 'player_status', 'eligible_positions', 'player_team',
+                 'start_date', 'end_date', 'days')
+
+# Player ids per lineup read when refreshing
+PLAYER_BATCH = 200
+# Rows per multi-row INSERT on D1
+D1_INSERT_ROWS = 100
+
+
+def _shift(date_str: str, days: int) -> str:
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def build_stints(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run-length encode lineup rows into stints.
+
+    Args:
+        rows: daily_lineups rows (dicts) with at least the key columns and date
+
+    Returns:
+        Stint dictionaries; descriptive columns come from the last day of each stint
+    """
+    ordered = sorted(
+        rows,
+        key=lambda r: tuple(r.get(k) or '' for k in STINT_KEY) + (r['date'],)
+    )
+    stints = []
+    current = None
+    for row in ordered:
+        key = tuple(row.get(k) or '' for k in STINT_KEY)
+        date = str(row['date'])[:10]
+        if current and current['_key'] == key and _shift(current['end_date'], 1) == date:
+            current['end_date'] = date
+            current['days'] += 1
+            for column in ('player_name', 'team_name', 'eligible_positions', 'player_team'):
+                current[column] = row.get(column, current[column])
+            continue
+        if current and current['_key'] == key and current['end_date'] == date:
+            continue  # duplicate day
+        current = {
+            '_key': key,
+            'season': row.get('season'),
+            'yahoo_player_id': row['yahoo_player_id'],
+            'player_name': row.get('player_name'),
+            'team_key': row['team_key'],
+            'team_name': row.get('team_name'),
+            'selected_position': row.get('selected_position') or '',
+            'player_status': row.get('player_status') or '',
+            'eligible_positions': row.get('eligible_positions'),
+            'player_team': row.get('player_team'),
+            'start_date': date,
+            'end_date': date,
+            'days': 1,
+        }
+        stints.append(current)
+    for stint in stints:
+        del stint['_key']
+    return stints
+
+
+class LineupStints:
+    """Maintains and queries the lineup_stints table."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 lineup_table: Optional[str] = None, stint_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection
+            environment: 'production' or 'test' (SQLite table suffixes)
+            lineup_table: Override lineup table name
+            stint_table: Override stint table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        if self.is_sqlite:
+            self.lineup_table = lineup_table or get_table_name('daily_lineups', environment)
+            self.stint_table = stint_table or get_table_name(STINT_TABLE, environment)
+        else:
+            self.lineup_table = lineup_table or 'daily_lineups'
+            self.stint_table = stint_table or STINT_TABLE
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        # Autocommit connections (the shared SQLite writer) leave the
+        # transaction to the caller so a refresh is applied atomically
+        if self.is_sqlite and self.connection.isolation_level is not None:
+            self.connection.commit()
+
+    def ensure_table(self):
+        """Create the stint table and its lookup indexes."""
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.stint_table} (
+                stint_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                season INTEGER NOT NULL,
+                yahoo_player_id TEXT NOT NULL,
+                player_name TEXT,
+                team_key TEXT NOT NULL,
+                team_name TEXT,
+                selected_position TEXT NOT NULL DEFAULT '',
+                player_status TEXT NOT NULL DEFAULT '',
+                eligible_positions TEXT,
+                player_team TEXT,
+                start_date DATE NOT NULL,
+                end_date DATE NOT NULL,
+                days INTEGER NOT NULL,
+                UNIQUE(yahoo_player_id, team_key, selected_position, player_status, start_date)
+            )
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.stint_table}_dates
+            ON {self.stint_table}(end_date, start_date)
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.stint_table}_player
+            ON {self.stint_table}(yahoo_player_id, start_date)
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.stint_table}_team
+            ON {self.stint_table}(team_key, start_date)
+        """)
+        self._commit()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _write(self, stints: List[Dict[str, Any]]):
+        if not stints:
+            return
+        rows = [tuple(stint[c] for c in STINT_COLUMNS) for stint in stints]
+        insert = f"INSERT OR REPLACE INTO {self.stint_table} ({', '.join(STINT_COLUMNS)}) VALUES "
+        if self.is_sqlite:
+            self.connection.executemany(insert + f"({', '.join(['?'] * len(STINT_COLUMNS))})", rows)
+            return
+        from data_pipeline.common.sql_dump_writer import encode_row
+        statements = [
+            (insert + ',\n'.join(encode_row(row) for row in rows[i:i + D1_INSERT_ROWS]), [])
+            for i in range(0, len(rows), D1_INSERT_ROWS)
+        ]
+        failures = [r for r in self.connection.execute_batch(statements) if not r.get('success', True)]
+        if failures:
+            raise RuntimeError(f"{len(failures)} stint insert batches failed: {failures[0].get('error')}")
+
+    def _lineup_rows(self, player_ids: Sequence[str], start: str, end: str) -> List[Dict[str, Any]]:
+        rows = []
+        for i in range(0, len(player_ids), PLAYER_BATCH):
+            batch = list(player_ids[i:i + PLAYER_BATCH])
+            placeholders = ', '.join(['?'] * len(batch))
+            rows.extend(self._query(f"""
+                SELECT season, date, yahoo_player_id, player_name, team_key, team_name,
+                       selected_position, player_status, eligible_positions, player_team
+                FROM {self.lineup_table}
+                WHERE date BETWEEN ? AND ? AND yahoo_player_id IN ({placeholders})
+            """, [start, end] + batch))
+        return rows
+
+    def refresh_dates(self, dates: Iterable[str]) -> int:
+        """
+        Recompute stints affected by lineup writes on the given dates.
+
+        Stints touching [min(dates) - 1, max(dates) + 1] are replaced. For every
+        affected key the recomputed span is the hull of the window and that
+        key's replaced stints, so untouched stints never overlap it.
+
+        Returns:
+            Number of stints written
+        """
+        dates = sorted({str(d)[:10] for d in dates})
+        if not dates:
+            return 0
+        self.ensure_table()
+
+        lo, hi = dates[0], dates[-1]
+        touch_lo, touch_hi = _shift(lo, -1), _shift(hi, 1)
+
+        victims = self._query(f"""
+            SELECT stint_id, yahoo_player_id, team_key, selected_position, player_status,
+                   start_date, end_date
+            FROM {self.stint_table}
+            WHERE end_date >= ? AND start_date <= ?
+        """, [touch_lo, touch_hi])
+        window_keys = self._query(f"""
+            SELECT DISTINCT yahoo_player_id, team_key,
+                   COALESCE(selected_position, '') AS selected_position,
+                   COALESCE(player_status, '') AS player_status
+            FROM {self.lineup_table}
+            WHERE date BETWEEN ? AND ?
+        """, [lo, hi])
+
+        spans: Dict[tuple, List[str]] = {}
+        for row in window_keys:
+            spans[tuple(row[k] for k in STINT_KEY)] = [lo, hi]
+        for victim in victims:
+            key = tuple(victim[k] or '' for k in STINT_KEY)
+            span = spans.setdefault(key, [lo, hi])
+            span[0] = min(span[0], victim['start_date'])
+            span[1] = max(span[1], victim['end_date'])
+        if not spans:
+            return 0
+
+        player_ids = sorted({key[0] for key in spans})
+        overall_lo = min(span[0] for span in spans.values())
+        overall_hi = max(span[1] for span in spans.values())
+        rows = [
+            row for row in self._lineup_rows(player_ids, overall_lo, overall_hi)
+            if (span := spans.get(tuple(row.get(k) or '' for k in STINT_KEY)))
+            and span[0] <= str(row['date'])[:10] <= span[1]
+        ]
+        stints = build_stints(rows)
+
+        victim_ids = [v['stint_id'] for v in victims]
+        for i in range(0, len(victim_ids), 500):
+            batch = victim_ids[i:i + 500]
+            self._execute(f"DELETE FROM {self.stint_table} WHERE stint_id IN ({', '.join(['?'] * len(batch))})",
+                          batch)
+        self._write(stints)
+        self._commit()
+
+        logger.info(f"Refreshed {len(stints)} lineup stints for {lo} to {hi}")
+        return len(stints)
+
+    def rebuild(self, season: Optional[int] = None) -> int:
+        """Recompute all stints for a season (or every season)."""
+        self.ensure_table()
+        where, params = ('season = ?', [season]) if season else ('1 = 1', [])
+        rows = self._query(f"""
+            SELECT season, date, yahoo_player_id, player_name, team_key, team_name,
+                   selected_position, player_status, eligible_positions, player_team
+            FROM {self.lineup_table}
+            WHERE {where}
+        """, params)
+        self._execute(f"DELETE FROM {self.stint_table} WHERE {where}", params)
+        stints = build_stints(rows)
+        self._write(stints)
+        self._commit()
+        logger.info(f"Rebuilt {len(stints)} lineup stints from {len(rows)} lineup rows")
+        return len(stints)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def roster_on(self, date: str, team_key: Optional[str] = None,
+                  yahoo_player_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Who was where on a date: stints covering it, optionally for one team or player."""
+        clauses, params = ["start_date <= ?", "end_date >= ?"], [date, date]
+        if team_key:
+            clauses.append("team_key = ?")
+            params.append(team_key)
+        if yahoo_player_id:
+            clauses.append("yahoo_player_id = ?")
+            params.append(yahoo_player_id)
+        return self._query(f"""
+            SELECT yahoo_player_id, player_name, team_key, team_name, selected_position,
+                   player_status, start_date, end_date
+            FROM {self.stint_table}
+            WHERE {' AND '.join(clauses)}
+            ORDER BY team_key, selected_position
+        """, params)
+
+    def days_by(self, group_by: str, start: str, end: str, yahoo_player_id: Optional[str] = None,
+                team_key: Optional[str] = None, position: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Days inside [start, end] grouped by a stint column, by interval overlap.
+
+        Args:
+            group_by: Column to group by ('selected_position', 'team_key', 'team_name', ...)
+            start: Range start (YYYY-MM-DD)
+            end: Range end (YYYY-MM-DD)
+            yahoo_player_id: Optional player filter
+            team_key: Optional team filter
+            position: Optional selected_position filter
+        """
+        if group_by not in STINT_COLUMNS:
+            raise ValueError(f"Cannot group stints by {group_by}")
+        clauses, params = ["start_date <= ?", "end_date >= ?"], [end, start]
+        for column, value in (('yahoo_player_id', yahoo_player_id), ('team_key', team_key),
+                              ('selected_position', position)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        overlap = ("CAST(julianday(MIN(end_date, ?)) - julianday(MAX(start_date, ?)) AS INTEGER) + 1")
+        return self._query(f"""
+            SELECT {group_by}, SUM({overlap}) AS days
+            FROM {self.stint_table}
+            WHERE {' AND '.join(clauses)}
+            GROUP BY {group_by}
+            ORDER BY days DESC
+        """, [end, start] + params)
+
+    def days_at_position(self, yahoo_player_id: str, position: str, start: str, end: str) -> int:
+        """Days a player spent in a lineup slot within [start, end]."""
+        rows = self.days_by('selected_position', start, end, yahoo_player_id=yahoo_player_id,
+                            position=position)
+        return int(rows[0]['days']) if rows else 0
+
+
+def refresh_stints_for_dates(connection, dates: Iterable[str], environment: str = 'production') -> int:
+    """Post-write hook for lineup updaters; logs instead of raising."""
+    try:
+        return LineupStints(connection, environment).refresh_dates(dates)
+    except Exception as e:
+        logger.error(f"Failed to refresh lineup stints: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain and query lineup stints')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild stints from daily_lineups')
+    parser.add_argument('--season', type=int, help='Season to rebuild (default: all)')
+    parser.add_argument('--on', help='Show stints covering this date')
+    parser.add_argument('--team', help='Team key filter for --on')
+    parser.add_argument('--player', help='Player id for --position queries')
+    parser.add_argument('--position', help='Lineup slot for --player queries')
+    parser.add_argument('--start', help='Range start for --player queries')
+    parser.add_argument('--end', help='Range end for --player queries')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Use Cloudflare D1')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.use_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        connection = D1Connection()
+    else:
+        connection = sqlite3.connect(str(get_database_path(args.environment)))
+    stints = LineupStints(connection, args.environment)
+
+    if args.rebuild:
+        print(f"Rebuilt {stints.rebuild(args.season)} stints")
+    if args.on:
+        for row in stints.roster_on(args.on, team_key=args.team):
+            print(f"  {row['team_key']:<20} {row['selected_position'] or '-':<5} {row['player_name']}")
+    if args.player and args.position and args.start and args.end:
+        days = stints.days_at_position(args.player, args.position, args.start, args.end)
+        print(f"{args.player} at {args.position}: {days} days")
+
+
+if __name__ == '__main__':
+    main()
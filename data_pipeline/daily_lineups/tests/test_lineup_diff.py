@@ -0,0 +1,104 @@
+"""Tests for set-based lineup diffing."""
+
+import json
+import sqlite3
+import unittest
+
+from data_pipeline.daily_lineups.lineup_diff import CHANGES_TABLE, LINEUP_COLUMNS, LineupDiffer
+
+TABLE = 'daily_lineups'
+TEAM = '458.l.6966.t.1'
+
+
+def lineup_row(player_id, position, status=None, date='2025-06-01'):
+    return {
+        'job_id': 'job', 'season': 2025, 'date': date, 'team_key': TEAM, 'team_name': 'Team One',
+        'yahoo_player_id': player_id, 'player_name': f'Player {player_id}',
+        'selected_position': position, 'position_type': 'B', 'player_status': status,
+        'eligible_positions': position, 'player_team': 'NYY',
+    }
+
+
+class LineupDifferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(f"""
+            CREATE TABLE {TABLE} (
+                lineup_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {', '.join(LINEUP_COLUMNS)},
+                UNIQUE (date, team_key, yahoo_player_id)
+            )
+        """)
+        self.differ = LineupDiffer(self.conn, 'production', TABLE)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def stored(self):
+        return self.conn.execute(f"""
+            SELECT yahoo_player_id, selected_position, player_status FROM {TABLE} ORDER BY yahoo_player_id
+        """).fetchall()
+
+    def changes(self):
+        return self.conn.execute(f"""
+            SELECT change_type, players_added, players_removed, position_changes
+            FROM {CHANGES_TABLE} ORDER BY change_id
+        """).fetchall()
+
+    def test_new_team_day_is_inserted(self):
+        stats = self.differ.apply([lineup_row('1', 'C'), lineup_row('2', '1B')])
+
+        self.assertEqual(stats['new'], 1)
+        self.assertEqual(stats['rows_inserted'], 2)
+        self.assertEqual(self.stored(), [('1', 'C', None), ('2', '1B', None)])
+
+    def test_unchanged_team_day_skips_the_write_path(self):
+        rows = [lineup_row('1', 'C'), lineup_row('2', '1B')]
+        self.differ.apply(rows)
+
+        stats = self.differ.apply(rows)
+        self.assertEqual(stats['unchanged'], 1)
+        self.assertEqual(stats['changed'], set())
+        self.assertEqual(len(self.changes()), 1)
+
+    def test_status_only_change_is_reported(self):
+        self.differ.apply([lineup_row('1', 'C'), lineup_row('2', '1B')])
+
+        stats = self.differ.apply([lineup_row('1', 'C', 'DTD'), lineup_row('2', '1B')])
+
+        self.assertEqual(stats['modified'], 1)
+        self.assertEqual(stats['status_changes'], 1)
+        self.assertEqual(stats['position_moves'], 0)
+        self.assertEqual(stats['changed'], {('2025-06-01', TEAM)})
+        self.assertEqual((stats['rows_deleted'], stats['rows_inserted']), (1, 1))
+        self.assertEqual(self.stored(), [('1', 'C', 'DTD'), ('2', '1B', None)])
+
+        change_type, added, removed, position_changes = self.changes()[-1]
+        self.assertEqual((change_type, json.loads(added), json.loads(removed)), ('modified', [], []))
+        self.assertEqual(json.loads(position_changes), {'1': {'status': {'from': None, 'to': 'DTD'}}})
+
+    def test_moves_adds_and_removes(self):
+        self.differ.apply([lineup_row('1', 'C'), lineup_row('2', '1B')])
+
+        stats = self.differ.apply([lineup_row('1', 'BN'), lineup_row('3', '1B')])
+
+        self.assertEqual((stats['players_added'], stats['players_removed'], stats['position_moves']), (1, 1, 1))
+        self.assertEqual(self.stored(), [('1', 'BN', None), ('3', '1B', None)])
+        _, added, removed, position_changes = self.changes()[-1]
+        self.assertEqual(json.loads(added), ['3'])
+        self.assertEqual(json.loads(removed), ['2'])
+        self.assertEqual(json.loads(position_changes), {'1': {'from': 'C', 'to': 'BN'}})
+
+    def test_matching_hash_without_rows_is_rewritten(self):
+        rows = [lineup_row('1', 'C')]
+        self.differ.apply(rows)
+        self.conn.execute(f"DELETE FROM {TABLE}")
+
+        stats = self.differ.apply(rows)
+        self.assertEqual(stats['unchanged'], 0)
+        self.assertEqual(self.stored(), [('1', 'C', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,11 +18,19 @@ Usage:
     # Update specific date
     python update_lineups.py --date 2025-08-04
     
+    # Refetch everything in the window instead of the incremental plan
+    python update_lineups.py --full
+    
+    # Also spot-check 20 settled team-days against their stored hashes
+    python update_lineups.py --verify 20
+    
     # Test environment
     python update_lineups.py --environment test
 
 Features:
     - Automatic duplicate detection
+    - Set-based diff: only changed team-days are written, changes logged to lineup_changes
+    - Incremental plan: only today, unfetched/unsettled and transaction-touched team-days
     - 7-day default lookback window (configurable)
     - Data quality validation
     - Minimal output for automation
@@ -50,7 +58,13 @@ from auth.token_manager import YahooTokenManager
 from data_pipeline.common.season_manager import get_league_key
 from data_pipeline.config.database_config import get_database_path, get_table_name
 from data_pipeline.daily_lineups.data_quality_check import LineupDataQualityChecker
+from data_pipeline.daily_lineups.lineup_diff import LineupDiffer
 from data_pipeline.daily_lineups.parser import LineupParser
+from data_pipeline.daily_lineups.refresh_planner import LineupRefreshPlanner
+from data_pipeline.daily_lineups.stints import refresh_stints_for_dates
+from data_pipeline.metadata.league_metadata import LeagueMetadataCache
+from data_pipeline.player_spotlight.summaries import refresh_spotlight_for_dates
+from data_pipeline.team_ledger.ledger import refresh_ledger_for_dates
 
 # Import D1 connection module
 try:
@@ -114,6 +128,12 @@ class LineupUpdater:
             self._ensure_database()
             logger.info(f"Using SQLite database: {self.db_path}")
         
+        # Team keys and settings, fetched from Yahoo only when stale; in D1
+        # mode the cache lives in D1 so no local SQLite file is created
+        self.league_metadata = LeagueMetadataCache(
+            lambda url: self._make_request_with_retry(url).text, environment,
+            connection=self.d1_conn)
+        
         # Job tracking
         self.job_id = None
         self.stats = {
@@ -284,24 +304,10 @@ class LineupUpdater:
         Returns:
             List of team keys
         """
-        url = f"{BASE_FANTASY_URL}/league/{league_key}/teams"
-        
         try:
-            response = self._make_request_with_retry(url)
-            
-            root = ET.fromstring(response.text)
-            ns = {'y': 'http://fantasysports.yahooapis.com/fantasy/v2/base.rng'}
-            
-            team_keys = []
-            teams = root.findall('.//y:team', ns)
-            for team in teams:
-                team_key_elem = team.find('.//y:team_key', ns)
-                if team_key_elem is not None:
-                    team_keys.append(team_key_elem.text)
-            
-            return team_keys
+            return self.league_metadata.get_team_keys(league_key)
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ET.ParseError, ValueError) as e:
             logger.error(f"Error fetching team keys: {e}")
             return []
     
@@ -537,14 +543,77 @@ class LineupUpdater:
             
             return new_count, duplicate_count
     
+    def apply_lineups(self, lineups: List[Dict], connection) -> Dict:
+        """
+        Write fetched team-day rosters through the set-based diff.
+        
+        Unchanged team-days only have their fetch time recorded; changed ones
+        get stale rows deleted, new rows inserted and a lineup_changes entry.
+        Derived tables are refreshed for the changed team-days only.
+        
+        Args:
+            lineups: Parsed lineups of complete team-days
+            connection: Connection from _planner_connection()
+            
+        Returns:
+            LineupDiffer.apply stats
+        """
+        validation_results = self.quality_checker.validate_batch(lineups)
+        if validation_results['invalid'] > 0:
+            logger.warning(f"Found {validation_results['invalid']} invalid lineups")
+        
+        diff = LineupDiffer(connection, self.environment).apply(lineups, self.job_id)
+        self.stats['new'] = diff['rows_inserted']
+        self.stats['removed'] = diff['rows_deleted']
+        self.stats['duplicates'] = len(lineups) - diff['rows_inserted']
+        self.stats['unchanged_team_days'] = diff['unchanged']
+        self.stats['changed_team_days'] = len(diff['changed'])
+        
+        changed_lineups = [l for l in lineups if (l['date'], l['team_key']) in diff['changed']]
+        if changed_lineups:
+            self.refresh_derived(changed_lineups)
+        return diff
+    
+    def refresh_derived(self, lineups: List[Dict]) -> int:
+        """
+        Refresh the team stat ledger, lineup stints and the touched players'
+        spotlight summaries for the dates covered by the given lineups.
+        
+        Args:
+            lineups: Lineup dictionaries just written
+            
+        Returns:
+            Number of ledger rows written
+        """
+        dates = {lineup['date'] for lineup in lineups if lineup.get('date')}
+        if not dates:
+            return 0
+        player_ids = {lineup['yahoo_player_id'] for lineup in lineups if lineup.get('yahoo_player_id')}
+        
+        if self.use_d1:
+            refresh_stints_for_dates(self.d1_conn, dates, self.environment)
+            refresh_spotlight_for_dates(self.d1_conn, dates, self.environment, player_ids)
+            return refresh_ledger_for_dates(self.d1_conn, dates, self.environment)
+        
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            refresh_stints_for_dates(conn, dates, self.environment)
+            refresh_spotlight_for_dates(conn, dates, self.environment, player_ids)
+            return refresh_ledger_for_dates(conn, dates, self.environment)
+        finally:
+            conn.close()
+    
     def update_recent(self, days_back: int = DEFAULT_LOOKBACK_DAYS,
-                     league_key: Optional[str] = None) -> Dict:
+                     league_key: Optional[str] = None, incremental: bool = True,
+                     verify_sample: int = 0) -> Dict:
         """
         Update lineups for the last N days.
         
         Args:
             days_back: Number of days to look back
             league_key: Override league key (otherwise uses current year)
+            incremental: Only fetch team-days the refresh planner selects
+            verify_sample: Settled team-days to refetch and check against their stored hash
             
         Returns:
             Statistics dictionary
@@ -553,17 +622,31 @@ class LineupUpdater:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        return self.update_date_range(start_date, end_date, league_key)
+        return self.update_date_range(start_date, end_date, league_key,
+                                      incremental=incremental, verify_sample=verify_sample)
+    
+    def _planner_connection(self):
+        """Connection holding daily_lineups, daily_lineups_metadata and transactions."""
+        if self.use_d1:
+            return self.d1_conn
+        return sqlite3.connect(str(self.db_path))
     
     def update_date_range(self, start_date: datetime, end_date: datetime,
-                         league_key: Optional[str] = None) -> Dict:
+                         league_key: Optional[str] = None, incremental: bool = True,
+                         verify_sample: int = 0) -> Dict:
         """
         Update lineups for a specific date range.
         
+        With incremental=True only the team-days chosen by LineupRefreshPlanner
+        (today, never fetched, unsettled, or touched by a transaction since the
+        last fetch) are requested, so the request count follows league activity.
+        
         Args:
             start_date: Start date
             end_date: End date
             league_key: Override league key
+            incremental: Only fetch team-days the refresh planner selects
+            verify_sample: Settled team-days to refetch and check against their stored hash
             
         Returns:
             Statistics dictionary
@@ -595,21 +678,36 @@ class LineupUpdater:
             metadata=f"Date range: {start_date.date()} to {end_date.date()} ({days_count} days), Teams: {len(team_keys)}"
         )
         
-        # Process each day and team
+        # Decide which team-days to fetch
+        planner_conn = self._planner_connection()
+        planner = LineupRefreshPlanner(planner_conn, self.environment)
+        if incremental:
+            plan = planner.plan(league_key, team_keys, start_date.date(), end_date.date(),
+                                verify_sample=verify_sample)
+        else:
+            planner.ensure_table()
+            plan = []
+            current_date = start_date
+            while current_date <= end_date:
+                date_str = current_date.strftime('%Y-%m-%d')
+                plan.extend((date_str, team_key, 'full') for team_key in team_keys)
+                current_date += timedelta(days=1)
+        
+        self.stats['planned'] = len(plan)
+        self.stats['skipped'] = len(team_keys) * days_count - len(plan)
+        self.stats['verify_mismatches'] = 0
+        
+        # Process each planned team-day
         all_lineups = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            date_str = current_date.strftime('%Y-%m-%d')
-            
-            for team_key in team_keys:
+        try:
+            for date_str, team_key, reason in plan:
                 # Fetch lineups for this team and date
                 try:
                     lineups = self.fetch_and_parse_lineups(league_key, team_key, date_str)
                     
                     if lineups:
                         all_lineups.extend(lineups)
-                        logger.debug(f"Found {len(lineups)} players for {team_key} on {date_str}")
+                        logger.debug(f"Found {len(lineups)} players for {team_key} on {date_str} ({reason})")
                 except requests.exceptions.Timeout as e:
                     logger.error(f"Timeout fetching lineups for {team_key} on {date_str}: {e}")
                     continue
@@ -617,20 +715,24 @@ class LineupUpdater:
                     logger.error(f"Error fetching lineups for {team_key} on {date_str}: {e}")
                     continue
             
-            self.stats['checked'] += 1
-            current_date += timedelta(days=1)
-        
-        # Insert new lineups
-        if all_lineups:
-            new_count, duplicate_count = self.insert_new_lineups(all_lineups)
-            self.stats['new'] = new_count
-            self.stats['duplicates'] = duplicate_count
+            self.stats['checked'] = len({date_str for date_str, _, _ in plan})
             
-            if new_count > 0:
-                logger.info(f"Added {new_count} new lineup records")
-            logger.debug(f"Skipped {duplicate_count} duplicates")
-        else:
-            logger.info("No lineups found in date range")
+            # Diff the fetched team-days against stored rows and write only changes
+            if all_lineups:
+                diff = self.apply_lineups(all_lineups, planner_conn)
+                verified = {(date_str, team_key) for date_str, team_key, reason in plan if reason == 'verify'}
+                for date_str, team_key in sorted(verified & diff['changed']):
+                    self.stats['verify_mismatches'] += 1
+                    logger.warning(f"Verification found a changed roster for {team_key} on {date_str}")
+                
+                if self.stats['new'] > 0:
+                    logger.info(f"Added {self.stats['new']} new lineup records")
+                logger.debug(f"Skipped {self.stats['duplicates']} duplicates")
+            else:
+                logger.info("No lineups found in date range")
+        finally:
+            if not self.use_d1:
+                planner_conn.close()
         
         # Update job
         self.update_job(
@@ -723,15 +825,18 @@ class LineupUpdater:
             if lineups:
                 all_lineups.extend(lineups)
         
-        # Insert new lineups
+        # Diff against stored rows and write only changes
         if all_lineups:
-            new_count, duplicate_count = self.insert_new_lineups(all_lineups)
-            self.stats['new'] = new_count
-            self.stats['duplicates'] = duplicate_count
+            connection = self._planner_connection()
+            try:
+                self.apply_lineups(all_lineups, connection)
+            finally:
+                if not self.use_d1:
+                    connection.close()
             self.stats['checked'] = 1
             
-            if new_count > 0:
-                logger.info(f"Added {new_count} new lineup records for {date_str}")
+            if self.stats['new'] > 0:
+                logger.info(f"Added {self.stats['new']} new lineup records for {date_str}")
             else:
                 logger.info(f"No new lineups for {date_str}")
         else:
@@ -766,6 +871,10 @@ def main():
                        help='Start date for range update (YYYY-MM-DD)')
     parser.add_argument('--end', type=str,
                        help='End date for range update (YYYY-MM-DD)')
+    parser.add_argument('--full', action='store_true',
+                       help='Refetch every team-day in the window instead of the incremental plan')
+    parser.add_argument('--verify', type=int, default=0, metavar='N',
+                       help='Also refetch N settled team-days and check them against their stored hash')
     
     # Configuration options
     parser.add_argument('--environment', choices=['production', 'test'], default='production',
@@ -814,7 +923,8 @@ def main():
             # Update specific date range
             start_date = datetime.strptime(args.start, '%Y-%m-%d')
             end_date = datetime.strptime(args.end, '%Y-%m-%d')
-            stats = updater.update_date_range(start_date, end_date, args.league_key)
+            stats = updater.update_date_range(start_date, end_date, args.league_key,
+                                              incremental=not args.full, verify_sample=args.verify)
             
         elif args.since_last:
             # Update from last lineup date
@@ -827,7 +937,8 @@ def main():
             
         else:
             # Default: update recent days
-            stats = updater.update_recent(args.days, args.league_key)
+            stats = updater.update_recent(args.days, args.league_key,
+                                          incremental=not args.full, verify_sample=args.verify)
         
         # Print summary (unless quiet mode)
         if not args.quiet:
@@ -19,6 +19,8 @@ from typing import Dict, List, Optional, Tuple
 import requests
 
 from auth.token_manager import YahooTokenManager
+from data_pipeline.common.rate_limiter import get_shared_limiter
+from data_pipeline.common.sql_dump_writer import SqlDumpWriter, sql_literal
 from data_pipeline.config.database_config import get_database_path
 from data_pipeline.draft_results.config import (
     API_DELAY_SECONDS,
@@ -30,10 +32,13 @@ from data_pipeline.draft_results.config import (
     DRAFT_TYPE_SNAKE,
     LOG_FORMAT,
     MAX_RETRIES,
+    PLAYER_DETAILS_BATCH,
+    PLAYER_DETAILS_CACHE_TABLE,
     REQUEST_TIMEOUT,
     RETRY_BACKOFF_BASE,
     get_draft_table_name,
 )
+from data_pipeline.metadata.league_metadata import LeagueMetadataCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
@@ -57,6 +62,9 @@ class DraftResultsCollector:
         # Authentication
         self.token_manager = YahooTokenManager()
         
+        # Rate limiting (shared with every other Yahoo caller in the process)
+        self.rate_limiter = get_shared_limiter('yahoo', 1.0 / API_DELAY_SECONDS)
+        
         # Job tracking
         self.job_id = None
         self.stats = {
@@ -70,6 +78,9 @@ class DraftResultsCollector:
         # Initialize database
         self._init_database()
         
+        # Team names and settings, fetched from Yahoo only when stale
+        self.league_metadata = LeagueMetadataCache(self._make_api_request, environment)
+        
         logger.info(f"DraftResultsCollector initialized for {environment} environment")
     
     def _init_database(self):
@@ -189,7 +200,7 @@ class DraftResultsCollector:
                 self.stats['requests_made'] += 1
                 
                 # Rate limiting
-                time.sleep(API_DELAY_SECONDS)
+                self.rate_limiter.wait()
                 
                 response = requests.get(
                     url, 
@@ -230,60 +241,24 @@ class DraftResultsCollector:
         Returns:
             Dict with draft_type and other settings
         """
-        url = f"{BASE_FANTASY_URL}/league/{league_key}/settings"
-        logger.info(f"Fetching league settings for {league_key}")
-        
-        xml_text = self._make_api_request(url)
-        root = ET.fromstring(xml_text)
-        
-        # Parse settings - Yahoo uses different namespace
-        ns = {'yh': 'http://fantasysports.yahooapis.com/fantasy/v2/base.rng'}
-        
-        settings = {}
-        settings_elem = root.find('.//yh:settings', ns)
+        settings = dict(self.league_metadata.get_settings(league_key))
+        settings.setdefault('draft_type', DRAFT_TYPE_SNAKE)
         
-        if settings_elem is not None:
-            # Check is_auction_draft first (more reliable)
-            is_auction_elem = settings_elem.find('.//yh:is_auction_draft', ns)
-            if is_auction_elem is not None and is_auction_elem.text == '1':
-                settings['draft_type'] = DRAFT_TYPE_AUCTION
-            else:
-                # Fall back to draft_type element
-                draft_type_elem = settings_elem.find('.//yh:draft_type', ns)
-                if draft_type_elem is not None:
-                    # Yahoo uses 'live' for snake draft, 'auction' for auction
-                    yahoo_type = draft_type_elem.text
-                    settings['draft_type'] = DRAFT_TYPE_AUCTION if yahoo_type == 'auction' else DRAFT_TYPE_SNAKE
-                else:
-                    settings['draft_type'] = DRAFT_TYPE_SNAKE  # Default
-            
-            # Draft time
-            draft_time_elem = settings_elem.find('.//yh:draft_time', ns)
-            if draft_time_elem is not None:
-                settings['draft_time'] = draft_time_elem.text
-        
-        logger.info(f"League settings: {settings}")
+        logger.info(f"League settings for {league_key}: draft_type={settings['draft_type']}, "
+                    f"draft_time={settings.get('draft_time')}")
         return settings
     
-    def fetch_player_details(self, player_keys: List[str]) -> Dict[str, Dict]:
+    def _fetch_player_batch(self, player_keys: List[str]) -> Dict[str, Dict]:
         """
-        Fetch player details for a list of player keys.
+        Fetch player details for up to 25 player keys in one request.
         
         Args:
-            player_keys: List of Yahoo player keys
+            player_keys: List of Yahoo player keys (at most 25)
             
         Returns:
             Dict mapping player_key to player details
         """
-        if not player_keys:
-            return {}
-        
-        # Yahoo allows fetching multiple players at once
-        # Join player keys with commas
-        player_keys_str = ','.join(player_keys[:25])  # Limit to 25 at a time
-        
-        url = f"{BASE_FANTASY_URL}/players;player_keys={player_keys_str}"
-        logger.info(f"Fetching details for {len(player_keys[:25])} players")
+        url = f"{BASE_FANTASY_URL}/players;player_keys={','.join(player_keys)}"
         
         try:
             xml_text = self._make_api_request(url)
@@ -320,15 +295,92 @@ class DraftResultsCollector:
             return player_details
             
         except Exception as e:
-            logger.warning(f"Failed to fetch player details: {e}")
+            logger.warning(f"Failed to fetch details for {len(player_keys)} players: {e}")
             return {}
     
-    def fetch_draft_data_from_yahoo(self, league_key: str) -> List[Dict]:
+    def _load_cached_player_details(self, player_keys: List[str], season: int) -> Dict[str, Dict]:
+        """Read cached player details for a season."""
+        cached = {}
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            for i in range(0, len(player_keys), 500):
+                batch = player_keys[i:i + 500]
+                rows = conn.execute(f"""
+                    SELECT player_key, player_name, player_position, player_team
+                    FROM {PLAYER_DETAILS_CACHE_TABLE}
+                    WHERE season = ? AND player_key IN ({','.join('?' * len(batch))})
+                """, [season] + batch).fetchall()
+                for player_key, name, position, team in rows:
+                    details = {'name': name, 'position': position, 'team': team}
+                    cached[player_key] = {k: v for k, v in details.items() if v is not None}
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Player details cache unavailable: {e}")
+        finally:
+            conn.close()
+        return cached
+    
+    def _store_cached_player_details(self, player_details: Dict[str, Dict], season: int):
+        """Write fetched player details to the cache."""
+        if not player_details:
+            return
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            conn.executemany(f"""
+                INSERT OR REPLACE INTO {PLAYER_DETAILS_CACHE_TABLE}
+                (player_key, season, player_name, player_position, player_team)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (player_key, season, details.get('name'), details.get('position'), details.get('team'))
+                for player_key, details in player_details.items()
+            ])
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Could not update player details cache: {e}")
+        finally:
+            conn.close()
+    
+    def fetch_player_details(self, player_keys: List[str], season: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Fetch player details for any number of player keys.
+        
+        Keys already in the player details cache for the season are served
+        locally; the rest are fetched in chunks of 25, one request at a time
+        under the shared Yahoo rate limiter, and merged into one map.
+        
+        Args:
+            player_keys: List of Yahoo player keys
+            season: Season year for the cache; no caching when omitted
+            
+        Returns:
+            Dict mapping player_key to player details
+        """
+        player_keys = list(dict.fromkeys(k for k in player_keys if k))
+        if not player_keys:
+            return {}
+        
+        player_details = self._load_cached_player_details(player_keys, season) if season else {}
+        missing = [k for k in player_keys if k not in player_details]
+        batches = [missing[i:i + PLAYER_DETAILS_BATCH] for i in range(0, len(missing), PLAYER_DETAILS_BATCH)]
+        logger.info(f"Fetching details for {len(missing)} players in {len(batches)} requests "
+                    f"({len(player_details)} cached)")
+        
+        fetched = {}
+        for batch in batches:
+            fetched.update(self._fetch_player_batch(batch))
+        
+        if season:
+            self._store_cached_player_details(fetched, season)
+        
+        player_details.update(fetched)
+        return player_details
+    
+    def fetch_draft_data_from_yahoo(self, league_key: str, season: Optional[int] = None) -> List[Dict]:
         """
         Fetch draft results from Yahoo API.
         
         Args:
             league_key: Yahoo league key
+            season: Season year, used to key the player details cache
             
         Returns:
             List of draft pick dictionaries
@@ -389,12 +441,8 @@ class DraftResultsCollector:
             # Extract all player keys
             player_keys = [pick['player_key'] for pick in draft_results if 'player_key' in pick]
             
-            # Fetch player details in batches
-            all_player_details = {}
-            for i in range(0, len(player_keys), 25):
-                batch = player_keys[i:i+25]
-                batch_details = self.fetch_player_details(batch)
-                all_player_details.update(batch_details)
+            # Fetch player details (cached and batched)
+            all_player_details = self.fetch_player_details(player_keys, season)
             
             # Enrich draft results with player details
             for pick in draft_results:
@@ -520,23 +568,8 @@ class DraftResultsCollector:
         Returns:
             Dict mapping team_key to team_name
         """
-        url = f"{BASE_FANTASY_URL}/league/{league_key}/teams"
-        
         try:
-            xml_text = self._make_api_request(url)
-            root = ET.fromstring(xml_text)
-            
-            ns = {'yh': 'http://fantasysports.yahooapis.com/fantasy/v2/base.rng'}
-            team_names = {}
-            
-            for team in root.findall('.//yh:team', ns):
-                team_key_elem = team.find('.//yh:team_key', ns)
-                team_name_elem = team.find('.//yh:name', ns)
-                
-                if team_key_elem is not None and team_name_elem is not None:
-                    team_names[team_key_elem.text] = team_name_elem.text
-            
-            return team_names
+            return self.league_metadata.get_team_names(league_key)
             
         except Exception as e:
             logger.warning(f"Failed to fetch team names: {e}")
@@ -564,7 +597,7 @@ class DraftResultsCollector:
             draft_type = settings.get('draft_type', DRAFT_TYPE_SNAKE)
             
             # Fetch draft results
-            draft_data = self.fetch_draft_data_from_yahoo(league_key)
+            draft_data = self.fetch_draft_data_from_yahoo(league_key, season)
             self.stats['records_processed'] = len(draft_data)
             
             # Validate data
@@ -673,97 +706,67 @@ class DraftResultsCollector:
         cursor = conn.cursor()
         
         try:
-            # Get draft data for this league/season
+            # Count draft data for this league/season
             cursor.execute("""
-                SELECT * FROM draft_results
+                SELECT COUNT(*) FROM draft_results
                 WHERE league_key = ? AND season = ?
-                ORDER BY draft_pick
             """, (league_key, season))
+            draft_count = cursor.fetchone()[0]
             
-            draft_data = cursor.fetchall()
-            
-            if not draft_data:
+            if not draft_count:
                 logger.warning("No draft data found to export")
                 return False
             
-            logger.info(f"Found {len(draft_data)} draft records to export")
-            
-            # Get column names
-            cursor.execute("PRAGMA table_info(draft_results)")
-            columns = [col[1] for col in cursor.fetchall()]
+            logger.info(f"Found {draft_count} draft records to export")
             
             # Collect unique job_ids for foreign key dependencies
-            job_id_index = columns.index('job_id')
-            job_ids = set([row[job_id_index] for row in draft_data if row[job_id_index]])
+            cursor.execute("""
+                SELECT DISTINCT job_id FROM draft_results
+                WHERE league_key = ? AND season = ? AND job_id IS NOT NULL
+            """, (league_key, season))
+            job_ids = [row[0] for row in cursor.fetchall()]
             
             # Export job_log entries first (following sync_to_production pattern)
             if job_ids:
                 job_log_file = export_dir / f'draft_job_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.sql'
-                with open(job_log_file, 'w', encoding='utf-8') as f:
-                    f.write(f"-- Job log export for draft results foreign key dependencies\n")
-                    f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-                    f.write(f"-- League: {league_key}, Season: {season}\n")
-                    f.write(f"-- Count: {len(job_ids)}\n\n")
-                    
-                    # Get job_log data
-                    placeholders = ','.join(['?' for _ in job_ids])
-                    cursor.execute(f"""
+                placeholders = ','.join(['?' for _ in job_ids])
+                with SqlDumpWriter(job_log_file) as writer:
+                    writer.write_comment("Job log export for draft results foreign key dependencies")
+                    writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+                    writer.write_comment(f"League: {league_key}, Season: {season}")
+                    writer.write_comment(f"Count: {len(job_ids)}")
+                    writer.write_blank()
+                    writer.write_query(conn, 'job_log', f"""
                         SELECT * FROM job_log 
                         WHERE job_id IN ({placeholders})
-                    """, list(job_ids))
-                    
-                    job_logs = cursor.fetchall()
-                    
-                    # Get job_log columns
-                    cursor.execute("PRAGMA table_info(job_log)")
-                    job_columns = [col[1] for col in cursor.fetchall()]
-                    
-                    for row in job_logs:
-                        values = []
-                        for val in row:
-                            if val is None:
-                                values.append('NULL')
-                            elif isinstance(val, str):
-                                escaped = val.replace("'", "''")
-                                values.append(f"'{escaped}'")
-                            else:
-                                values.append(str(val))
-                        
-                        f.write(f"INSERT OR IGNORE INTO job_log ({', '.join(job_columns)}) VALUES ({', '.join(values)});\n")
+                    """, job_ids, mode='insert_or_ignore')
                 
                 logger.info(f"[OK] Exported job logs to {job_log_file}")
             
             # Export draft results
             draft_file = export_dir / f'draft_results_{league_key}_{season}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.sql'
-            with open(draft_file, 'w', encoding='utf-8') as f:
-                f.write(f"-- Draft results export\n")
-                f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-                f.write(f"-- League: {league_key}, Season: {season}\n")
-                f.write(f"-- Count: {len(draft_data)}\n\n")
+            with SqlDumpWriter(draft_file) as writer:
+                writer.write_comment("Draft results export")
+                writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+                writer.write_comment(f"League: {league_key}, Season: {season}")
+                writer.write_comment(f"Count: {draft_count}")
+                writer.write_blank()
                 
                 # Clear existing data for this league/season
-                f.write(f"-- Clear existing draft data for this league/season\n")
-                f.write(f"DELETE FROM draft_results WHERE league_key = '{league_key}' AND season = {season};\n\n")
+                writer.write_comment("Clear existing draft data for this league/season")
+                writer.write_statement(
+                    f"DELETE FROM draft_results WHERE league_key = {sql_literal(league_key)} "
+                    f"AND season = {sql_literal(season)}",
+                    table='draft_results'
+                )
+                writer.write_blank()
                 
-                # Insert new data
-                for row in draft_data:
-                    values = []
-                    for i, val in enumerate(row):
-                        if val is None:
-                            values.append('NULL')
-                        elif isinstance(val, str):
-                            escaped = val.replace("'", "''")
-                            values.append(f"'{escaped}'")
-                        elif isinstance(val, bool):
-                            values.append('1' if val else '0')
-                        else:
-                            values.append(str(val))
-                    
-                    # Skip the id column (auto-increment)
-                    column_list = [col for col in columns if col != 'id']
-                    value_list = [values[i] for i, col in enumerate(columns) if col != 'id']
-                    
-                    f.write(f"INSERT INTO draft_results ({', '.join(column_list)}) VALUES ({', '.join(value_list)});\n")
+                # Insert new data, skipping the id column (auto-increment)
+                writer.write_query(conn, 'draft_results', """
+                    SELECT * FROM draft_results
+                    WHERE league_key = ? AND season = ?
+                    ORDER BY draft_pick
+                """, (league_key, season), mode='insert', exclude_columns=('id',))
             
             logger.info(f"[OK] Exported draft results to {draft_file}")
             
@@ -855,7 +858,7 @@ def main():
         logger.info(f"Starting draft collection for {args.league_key} season {args.season}")
         stats = collector.collect_draft_results(args.league_key, args.season)
         
-        logger.info(f"Collection completed successfully!")
+        logger.info("Collection completed successfully!")
         logger.info(f"  Records processed: {stats['records_processed']}")
         logger.info(f"  Records inserted: {stats['records_inserted']}")
         logger.info(f"  Errors: {stats['errors']}")
@@ -21,9 +21,11 @@ API_DELAY_SECONDS = 1.0  # Rate limit: 1 request per second
 MAX_RETRIES = 3
 RETRY_BACKOFF_BASE = 2  # Exponential backoff multiplier
 REQUEST_TIMEOUT = 30  # Seconds
+PLAYER_DETAILS_BATCH = 25  # Yahoo returns at most 25 players per players;player_keys= request
 
 # Database Configuration
 BATCH_SIZE = 100  # Number of records to insert at once
+PLAYER_DETAILS_CACHE_TABLE = 'draft_player_details'  # name/position/team per (player_key, season)
 
 def get_draft_table_name(environment='production'):
     """
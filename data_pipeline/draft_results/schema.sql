@@ -36,4 +36,16 @@ CREATE TRIGGER IF NOT EXISTS update_draft_results_timestamp
 AFTER UPDATE ON draft_results
 BEGIN
     UPDATE draft_results SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-END;
\ No newline at end of file
+END;
+
+-- Player details cache: name, position and team per player key and season,
+-- so re-collecting a season does not refetch players it already resolved
+CREATE TABLE IF NOT EXISTS draft_player_details (
+    player_key TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    player_name TEXT,
+    player_position TEXT,
+    player_team TEXT,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (player_key, season)
+);
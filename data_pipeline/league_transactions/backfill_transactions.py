@@ -34,7 +34,6 @@ import logging
 import os
 import sqlite3
 import sys
-import threading
 import time
 import xml.etree.ElementTree as ET
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -50,9 +49,12 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Import required modules
 from auth.token_manager import YahooTokenManager
+from data_pipeline.common.rate_limiter import get_shared_limiter
 from data_pipeline.common.season_manager import SeasonManager, get_league_key, get_season_dates
+from data_pipeline.common.sqlite_writer import execute_rows, get_writer
 from data_pipeline.config.database_config import get_database_path, get_table_name
 from data_pipeline.league_transactions.data_quality_check import TransactionDataQualityChecker
+from data_pipeline.league_transactions.rollups import TransactionRollups
 from data_pipeline.metadata.league_keys import LEAGUE_KEYS, SEASON_DATES
 
 # Configure logging
@@ -71,28 +73,6 @@ BATCH_SIZE = 100  # Database batch insert size
 CHECKPOINT_FILE = Path(__file__).parent / 'backfill_checkpoint.json'
 
 
-class RateLimiter:
-    """Thread-safe rate limiter for API requests."""
-    
-    def __init__(self, requests_per_second=1.0):
-        self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0
-        self.lock = threading.Lock()
-    
-    def wait(self):
-        """Wait if necessary to maintain rate limit."""
-        with self.lock:
-            now = time.time()
-            time_since_last = now - self.last_request_time
-            
-            if time_since_last < self.min_interval:
-                sleep_time = self.min_interval - time_since_last
-                time.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-
-
 class TransactionBackfiller:
     """Handles bulk transaction data collection from Yahoo Fantasy Sports API."""
     
@@ -107,12 +87,13 @@ class TransactionBackfiller:
         self.environment = environment
         self.max_workers = min(max_workers, MAX_WORKERS)
         self.token_manager = YahooTokenManager()
-        self.rate_limiter = RateLimiter(requests_per_second=1.0)
+        self.rate_limiter = get_shared_limiter('yahoo', 1.0 / RATE_LIMIT_DELAY)
         self.season_manager = SeasonManager()
         self.quality_checker = TransactionDataQualityChecker()
         
         # Database setup
         self.db_path = get_database_path(environment)
+        self.writer = get_writer(self.db_path)
         self.table_name = get_table_name('transactions', environment)
         self._init_database()
         
@@ -127,7 +108,10 @@ class TransactionBackfiller:
     
     def _init_database(self):
         """Initialize database and ensure tables exist."""
-        conn = sqlite3.connect(str(self.db_path))
+        self.writer.run(self._create_tables).result()
+    
+    def _create_tables(self, conn: sqlite3.Connection):
+        """Table and index DDL, run on the writer thread."""
         cursor = conn.cursor()
         
         # Create transactions table if it doesn't exist
@@ -177,9 +161,6 @@ class TransactionBackfiller:
                 end_time TIMESTAMP
             )
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def start_job(self, job_type: str, date_range_start: str, date_range_end: str, 
                   league_key: str, metadata: Optional[str] = None) -> str:
@@ -188,16 +169,12 @@ class TransactionBackfiller:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         job_id = f"{job_type}_{self.environment}_{timestamp}_{uuid.uuid4().hex[:8]}"
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.writer.execute('''
             INSERT INTO job_log (job_id, job_type, environment, status, 
                                 date_range_start, date_range_end, league_key, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (job_id, job_type, self.environment, 'running', 
-              date_range_start, date_range_end, league_key, metadata))
-        conn.commit()
-        conn.close()
+              date_range_start, date_range_end, league_key, metadata)).result()
         
         self.job_id = job_id
         logger.info(f"Started job: {job_id}")
@@ -209,9 +186,6 @@ class TransactionBackfiller:
         if not self.job_id:
             return
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
         update_parts = ['status = ?']
         params = [status]
         
@@ -233,9 +207,7 @@ class TransactionBackfiller:
         params.append(self.job_id)
         
         query = f"UPDATE job_log SET {', '.join(update_parts)} WHERE job_id = ?"
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        self.writer.execute(query, params).result()
     
     def fetch_transactions_for_date(self, league_key: str, date_str: str) -> List[Dict]:
         """
@@ -376,37 +348,51 @@ class TransactionBackfiller:
             logger.warning(f"Found {validation_results['invalid']} invalid transactions")
             logger.warning(self.quality_checker.generate_report(validation_results))
         
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-        
-        inserted = 0
-        for trans in transactions:
-            try:
-                cursor.execute(f'''
-                    INSERT OR IGNORE INTO {self.table_name} (
-                        date, league_key, transaction_id, transaction_type,
-                        yahoo_player_id, player_name, player_position, player_team,
-                        movement_type, destination_team_key, destination_team_name,
-                        source_team_key, source_team_name, timestamp, job_id
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    trans['date'], trans['league_key'], trans['transaction_id'],
-                    trans['transaction_type'], trans['yahoo_player_id'], trans['player_name'],
-                    trans['player_position'], trans['player_team'], trans['movement_type'],
-                    trans['destination_team_key'], trans['destination_team_name'],
-                    trans['source_team_key'], trans['source_team_name'], trans.get('timestamp', 0), trans['job_id']
-                ))
-                
-                if cursor.rowcount > 0:
-                    inserted += 1
-                    
-            except sqlite3.Error as e:
-                logger.error(f"Error inserting transaction: {e}")
-                self.stats['errors'] += 1
+        rows = [(
+            trans['date'], trans['league_key'], trans['transaction_id'],
+            trans['transaction_type'], trans['yahoo_player_id'], trans['player_name'],
+            trans['player_position'], trans['player_team'], trans['movement_type'],
+            trans['destination_team_key'], trans['destination_team_name'],
+            trans['source_team_key'], trans['source_team_name'], trans.get('timestamp', 0), trans['job_id']
+        ) for trans in transactions]
+        
+        insert_sql = f'''
+            INSERT OR IGNORE INTO {self.table_name} (
+                date, league_key, transaction_id, transaction_type,
+                yahoo_player_id, player_name, player_position, player_team,
+                movement_type, destination_team_key, destination_team_name,
+                source_team_key, source_team_name, timestamp, job_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        
+        def insert_batch(conn: sqlite3.Connection) -> int:
+            # The rollup delta must be computed before the insert; both run in the
+            # writer's transaction, so the batch and its rollups commit together
+            rollups = TransactionRollups(conn, self.environment, self.table_name)
+            delta = rollups.prepare(transactions)
+            count = conn.executemany(insert_sql, rows).rowcount
+            rollups.apply(delta)
+            return count
+        
+        def insert_by_row(conn: sqlite3.Connection) -> Tuple[int, int]:
+            rollups = TransactionRollups(conn, self.environment, self.table_name)
+            delta = rollups.prepare(transactions)
+            count, failed = execute_rows(conn, insert_sql, rows)
+            # The delta covers every row of the batch; rebuild when some were skipped
+            if failed:
+                rollups.rebuild()
+            else:
+                rollups.apply(delta)
+            return count, failed
         
-        conn.commit()
-        conn.close()
+        # One queued batch, committed by the shared writer with any concurrent writes
+        try:
+            return self.writer.run(insert_batch).result()
+        except sqlite3.Error as e:
+            logger.error(f"Error inserting transaction batch, retrying row by row: {e}")
         
+        inserted, failed = self.writer.run(insert_by_row).result()
+        self.stats['errors'] += failed
         return inserted
     
     def backfill_date_range(self, start_date: datetime, end_date: datetime, 
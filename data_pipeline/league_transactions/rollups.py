@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+"""
+Transaction Rollups
+
+Incrementally maintained aggregates behind the transaction analytics page
+(transactionService.getStatistics), so the page reads a few hundred rollup
+rows instead of running a GROUP BY scan over the full transactions table for
+each breakdown.
+
+transaction_rollups (dimension, key) -> label, count:
+    transaction_type    rows per transaction_type
+    movement_type       rows per movement_type
+    destination_team    rows per destination_team_name
+    player              rows per player_name
+    player_add          'add' rows per player_name (most added)
+    player_drop         'drop' rows per player_name (most dropped)
+    date                rows per date
+    manager             distinct add/add-drop/trade transactions per team_key
+    active_player       add/add-drop/trade rows per yahoo_player_id
+    active_destination  add/add-drop/trade rows per destination_team_name
+    active_source       add/add-drop/trade rows per source_team_name
+
+transaction_rollup_overview (single row): max transaction id, earliest and
+latest date over add/add-drop/trade rows.
+
+update_transactions.py and backfill_transactions.py call prepare() on each
+fetched batch before inserting (rows already stored are filtered out) and
+apply() after the insert, so each run costs O(new transactions). rebuild()
+recomputes everything from scratch; apply() falls back to it while the
+rollups have not been built yet (no overview row), since a delta on its own
+would only describe the new batch.
+
+On a SQLite connection in autocommit mode (isolation_level=None, such as the
+shared writer's) the caller owns the transaction and nothing is committed
+here, so a batch and its rollup delta commit or roll back together.
+
+Usage:
+    python -m data_pipeline.league_transactions.rollups --rebuild
+    python -m data_pipeline.league_transactions.rollups --show
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import get_database_path, get_table_name
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'transaction_rollups'
+OVERVIEW_TABLE = 'transaction_rollup_overview'
+
+# Transaction types counted as roster activity by the analytics page
+ACTIVE_TYPES = ('add', 'add/drop', 'trade')
+
+ROW_KEY = ('league_key', 'transaction_id', 'yahoo_player_id', 'movement_type')
+TRANSACTION_COLUMNS = ('date', 'league_key', 'transaction_id', 'transaction_type',
+                       'yahoo_player_id', 'player_name', 'movement_type',
+                       'destination_team_key', 'destination_team_name',
+                       'source_team_key', 'source_team_name')
+
+# Transaction ids per existence lookup
+LOOKUP_BATCH = 100
+
+
+class RollupDelta:
+    """Counts contributed by a batch of transactions not yet stored."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.labels: Dict[tuple, str] = {}
+        self.max_transaction_id: Optional[int] = None
+        self.earliest_date: Optional[str] = None
+        self.latest_date: Optional[str] = None
+        self.rows = 0
+
+    def add(self, dimension: str, key: Any, label: Optional[str] = None):
+        if key is None or key == '':
+            return
+        self.counts[(dimension, str(key))] += 1
+        if label:
+            self.labels[(dimension, str(key))] = label
+
+    def add_row(self, row: Dict[str, Any]):
+        """Count one transaction row into every row-level dimension."""
+        self.rows += 1
+        self.add('transaction_type', row.get('transaction_type'))
+        self.add('movement_type', row.get('movement_type'))
+        self.add('destination_team', row.get('destination_team_name'))
+        self.add('player', row.get('player_name'))
+        self.add('date', row.get('date'))
+        if row.get('movement_type') == 'add':
+            self.add('player_add', row.get('player_name'))
+        elif row.get('movement_type') == 'drop':
+            self.add('player_drop', row.get('player_name'))
+
+        if row.get('transaction_type') not in ACTIVE_TYPES:
+            return
+        self.add('active_player', row.get('yahoo_player_id'), row.get('player_name'))
+        self.add('active_destination', row.get('destination_team_name'))
+        self.add('active_source', row.get('source_team_name'))
+        try:
+            transaction_id = int(row['transaction_id'])
+            self.max_transaction_id = max(self.max_transaction_id or transaction_id, transaction_id)
+        except (TypeError, ValueError, KeyError):
+            pass
+        if row.get('date'):
+            self.earliest_date = min(self.earliest_date or row['date'], row['date'])
+            self.latest_date = max(self.latest_date or row['date'], row['date'])
+
+    def __bool__(self):
+        return bool(self.counts)
+
+
+def _manager_pairs(row: Dict[str, Any]) -> List[tuple]:
+    """(team_key, team_name, league_key, transaction_id) for each team a row touches."""
+    if row.get('transaction_type') not in ACTIVE_TYPES:
+        return []
+    pairs = []
+    for side in ('destination', 'source'):
+        team_key, team_name = row.get(f'{side}_team_key'), row.get(f'{side}_team_name')
+        if team_key and team_name:
+            pairs.append((team_key, team_name, row.get('league_key'), str(row.get('transaction_id'))))
+    return pairs
+
+
+class TransactionRollups:
+    """Maintains the transaction analytics rollup tables."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 transactions_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection
+            environment: 'production' or 'test' (SQLite table suffixes)
+            transactions_table: Override transactions table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        if self.is_sqlite:
+            self.transactions_table = transactions_table or get_table_name('transactions', environment)
+            self.rollup_table = get_table_name(ROLLUP_TABLE, environment)
+            self.overview_table = get_table_name(OVERVIEW_TABLE, environment)
+        else:
+            self.transactions_table = transactions_table or 'transactions'
+            self.rollup_table = ROLLUP_TABLE
+            self.overview_table = OVERVIEW_TABLE
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        if self.is_sqlite and self.connection.isolation_level is not None:
+            self.connection.commit()
+
+    def ensure_tables(self):
+        """Create the rollup tables if they do not exist."""
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.rollup_table} (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                label TEXT,
+                count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (dimension, key)
+            )
+        """)
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.overview_table} (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                max_transaction_id INTEGER,
+                earliest_date TEXT,
+                latest_date TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._commit()
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+
+    def _existing_rows(self, transactions: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stored rows sharing a (league_key, transaction_id) with the batch."""
+        by_league: Dict[str, set] = {}
+        for trans in transactions:
+            by_league.setdefault(trans['league_key'], set()).add(str(trans['transaction_id']))
+        existing = []
+        for league_key, ids in by_league.items():
+            ids = sorted(ids)
+            for i in range(0, len(ids), LOOKUP_BATCH):
+                batch = ids[i:i + LOOKUP_BATCH]
+                existing.extend(self._query(f"""
+                    SELECT {', '.join(TRANSACTION_COLUMNS)}
+                    FROM {self.transactions_table}
+                    WHERE league_key = ? AND transaction_id IN ({', '.join(['?'] * len(batch))})
+                """, [league_key] + batch))
+        return existing
+
+    def prepare(self, transactions: Sequence[Dict[str, Any]]) -> RollupDelta:
+        """
+        Compute the rollup delta for a batch about to be inserted.
+
+        Must run before the insert: rows (and manager/transaction pairs)
+        already present in the transactions table are excluded.
+        """
+        delta = RollupDelta()
+        if not transactions:
+            return delta
+
+        existing = self._existing_rows(transactions)
+        seen_rows = {tuple(str(row[k]) for k in ROW_KEY) for row in existing}
+        seen_pairs = {(p[0], p[2], p[3]) for row in existing for p in _manager_pairs(row)}
+
+        for trans in transactions:
+            row_key = tuple(str(trans[k]) for k in ROW_KEY)
+            if row_key in seen_rows:
+                continue
+            seen_rows.add(row_key)
+            delta.add_row(trans)
+            for team_key, team_name, league_key, transaction_id in _manager_pairs(trans):
+                if (team_key, league_key, transaction_id) in seen_pairs:
+                    continue
+                seen_pairs.add((team_key, league_key, transaction_id))
+                delta.add('manager', team_key, team_name)
+        return delta
+
+    def is_built(self) -> bool:
+        """Whether the rollups have been built (the overview row exists)."""
+        self.ensure_tables()
+        return bool(self._query(f"SELECT 1 FROM {self.overview_table} WHERE id = 1"))
+
+    def apply(self, delta: RollupDelta) -> int:
+        """
+        Add a prepared delta to the rollup tables.
+
+        Rebuilds from the full transactions table instead when the rollups
+        have not been built yet; the batch must already be inserted.
+
+        Returns:
+            Number of rollup rows touched
+        """
+        if not delta:
+            return 0
+        if not self.is_built():
+            logger.info("Transaction rollups not built yet, rebuilding instead of applying the delta")
+            return self.rebuild()
+        return self._apply_delta(delta)
+
+    def _apply_delta(self, delta: RollupDelta) -> int:
+        upsert = f"""
+            INSERT INTO {self.rollup_table} (dimension, key, label, count, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(dimension, key) DO UPDATE SET
+                count = count + excluded.count,
+                label = COALESCE(excluded.label, label),
+                updated_at = CURRENT_TIMESTAMP
+        """
+        params = [(dimension, key, delta.labels.get((dimension, key)), count)
+                  for (dimension, key), count in delta.counts.items()]
+        if params and self.is_sqlite:
+            self.connection.executemany(upsert, params)
+        elif params:
+            results = self.connection.execute_batch([(upsert, list(p)) for p in params])
+            failures = [r for r in results if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} rollup upserts failed: {failures[0].get('error')}")
+
+        if delta.latest_date:
+            self._execute(f"""
+                INSERT INTO {self.overview_table} (id, max_transaction_id, earliest_date, latest_date, updated_at)
+                VALUES (1, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(id) DO UPDATE SET
+                    max_transaction_id = MAX(COALESCE(max_transaction_id, 0), COALESCE(excluded.max_transaction_id, 0)),
+                    earliest_date = MIN(COALESCE(earliest_date, excluded.earliest_date), excluded.earliest_date),
+                    latest_date = MAX(COALESCE(latest_date, excluded.latest_date), excluded.latest_date),
+                    updated_at = CURRENT_TIMESTAMP
+            """, [delta.max_transaction_id, delta.earliest_date, delta.latest_date])
+        self._commit()
+
+        logger.info(f"Applied rollup delta for {delta.rows} new transactions ({len(params)} rollup rows)")
+        return len(params)
+
+    def rebuild(self) -> int:
+        """Recompute all rollups from the full transactions table."""
+        self.ensure_tables()
+        rows = self._query(f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM {self.transactions_table}")
+        self._execute(f"DELETE FROM {self.rollup_table}")
+        self._execute(f"DELETE FROM {self.overview_table}")
+        self._commit()
+
+        delta = RollupDelta()
+        seen_pairs = set()
+        for row in rows:
+            delta.add_row(row)
+            for team_key, team_name, league_key, transaction_id in _manager_pairs(row):
+                if (team_key, league_key, transaction_id) not in seen_pairs:
+                    seen_pairs.add((team_key, league_key, transaction_id))
+                    delta.add('manager', team_key, team_name)
+        written = self._apply_delta(delta)
+        # The overview row marks the rollups as built, even with no roster activity
+        self._execute(f"INSERT OR IGNORE INTO {self.overview_table} (id) VALUES (1)")
+        self._commit()
+        logger.info(f"Rebuilt transaction rollups from {len(rows)} transactions")
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def top(self, dimension: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rollup rows of one dimension, largest first."""
+        sql = f"""
+            SELECT key, label, count FROM {self.rollup_table}
+            WHERE dimension = ? ORDER BY count DESC, key
+        """
+        params: List[Any] = [dimension]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def statistics(self) -> Dict[str, Any]:
+        """The transactionService.getStatistics payload, from rollups."""
+        overview_rows = self._query(f"SELECT * FROM {self.overview_table} WHERE id = 1")
+        overview = overview_rows[0] if overview_rows else {}
+        distinct = {row['dimension']: row['n'] for row in self._query(f"""
+            SELECT dimension, COUNT(*) AS n FROM {self.rollup_table}
+            WHERE dimension IN ('active_player', 'active_destination', 'active_source')
+            GROUP BY dimension
+        """)}
+        most_dropped = self.top('player_drop', 1)
+        dates = self.top_dates(30)
+        return {
+            'overview': {
+                'total_transactions': overview.get('max_transaction_id'),
+                'unique_players': distinct.get('active_player', 0),
+                'unique_teams': distinct.get('active_destination', 0) + distinct.get('active_source', 0),
+                'earliest_date': overview.get('earliest_date'),
+                'latest_date': overview.get('latest_date'),
+            },
+            'typeBreakdown': [{'transaction_type': r['key'], 'count': r['count']}
+                              for r in self.top('transaction_type')],
+            'movementBreakdown': [{'movement_type': r['key'], 'count': r['count']}
+                                  for r in self.top('movement_type')],
+            'topTeams': [{'team_name': r['key'], 'acquisitions': r['count']}
+                         for r in self.top('destination_team', 10)],
+            'topPlayers': [{'player_name': r['key'], 'transaction_count': r['count']}
+                           for r in self.top('player', 10)],
+            'mostAddedPlayers': [{'player_name': r['key'], 'add_count': r['count']}
+                                 for r in self.top('player_add', 10)],
+            'mostDroppedPlayer': ({'player_name': most_dropped[0]['key'], 'drop_count': most_dropped[0]['count']}
+                                  if most_dropped else None),
+            'recentActivity': dates,
+            'managerStats': [{'team_name': r['label'], 'transaction_count': r['count']}
+                             for r in self.top('manager')],
+        }
+
+    def top_dates(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """Most recent daily transaction counts."""
+        rows = self._query(f"""
+            SELECT key AS date, count AS transaction_count FROM {self.rollup_table}
+            WHERE dimension = 'date' ORDER BY key DESC LIMIT ?
+        """, [limit])
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain transaction analytics rollups')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute rollups from all transactions')
+    parser.add_argument('--show', action='store_true', help='Print the statistics payload')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Use Cloudflare D1')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.use_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        connection = D1Connection()
+    else:
+        connection = sqlite3.connect(str(get_database_path(args.environment)))
+    rollups = TransactionRollups(connection, args.environment)
+
+    if args.rebuild:
+        print(f"Rebuilt {rollups.rebuild()} rollup rows")
+    if args.show:
+        import json
+        print(json.dumps(rollups.statistics(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+League Transactions Module Test Suite
+
+Run all tests:
+    python -m unittest discover data_pipeline/league_transactions/tests
+"""
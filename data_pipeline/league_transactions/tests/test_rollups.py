@@ -0,0 +1,97 @@
+"""Tests for incrementally maintained transaction rollups."""
+
+import sqlite3
+import unittest
+
+from data_pipeline.league_transactions.rollups import TRANSACTION_COLUMNS, TransactionRollups
+
+TABLE = 'transactions'
+
+
+def make_transaction(transaction_id, date, player_id, movement_type='add',
+                     transaction_type='add/drop', destination='Team A', source=None):
+    return {
+        'date': date,
+        'league_key': '458.l.6966',
+        'transaction_id': str(transaction_id),
+        'transaction_type': transaction_type,
+        'yahoo_player_id': str(player_id),
+        'player_name': f'Player {player_id}',
+        'movement_type': movement_type,
+        'destination_team_key': f'458.l.6966.t.{destination[-1]}' if destination else None,
+        'destination_team_name': destination,
+        'source_team_key': f'458.l.6966.t.{source[-1]}' if source else None,
+        'source_team_name': source,
+    }
+
+
+class TransactionRollupsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(f"""
+            CREATE TABLE {TABLE} (
+                {', '.join(f'{c} TEXT' for c in TRANSACTION_COLUMNS)},
+                UNIQUE (league_key, transaction_id, yahoo_player_id, movement_type)
+            )
+        """)
+        self.rollups = TransactionRollups(self.conn, 'production', TABLE)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def insert(self, transactions):
+        columns = ', '.join(TRANSACTION_COLUMNS)
+        placeholders = ', '.join(['?'] * len(TRANSACTION_COLUMNS))
+        self.conn.executemany(f"INSERT OR IGNORE INTO {TABLE} ({columns}) VALUES ({placeholders})",
+                              [[t[c] for c in TRANSACTION_COLUMNS] for t in transactions])
+        self.conn.commit()
+
+    def load(self, transactions):
+        """Insert a batch the way update_transactions does: prepare, insert, apply."""
+        delta = self.rollups.prepare(transactions)
+        self.insert(transactions)
+        self.rollups.apply(delta)
+
+    def snapshot(self):
+        return (self.conn.execute(f"SELECT dimension, key, label, count FROM {self.rollups.rollup_table} "
+                                  f"ORDER BY dimension, key").fetchall(),
+                self.conn.execute(f"SELECT max_transaction_id, earliest_date, latest_date "
+                                  f"FROM {self.rollups.overview_table}").fetchall())
+
+    def test_incremental_apply_matches_rebuild(self):
+        self.load([make_transaction(1, '2025-04-01', 100),
+                   make_transaction(1, '2025-04-01', 101, 'drop', destination=None, source='Team A')])
+        self.load([make_transaction(2, '2025-04-03', 102, destination='Team B'),
+                   make_transaction(3, '2025-04-03', 100, 'trade', 'trade', 'Team B', 'Team A')])
+        # A re-fetched batch overlapping stored rows only counts the new ones
+        self.load([make_transaction(2, '2025-04-03', 102, destination='Team B'),
+                   make_transaction(4, '2025-04-05', 103)])
+        incremental = self.snapshot()
+
+        self.rollups.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_first_apply_on_existing_transactions_rebuilds(self):
+        self.insert([make_transaction(i, f'2025-04-{i:02d}', 100 + i) for i in range(1, 11)])
+
+        self.load([make_transaction(11, '2025-05-01', 200)])
+
+        overview = self.rollups.statistics()['overview']
+        self.assertEqual(overview['unique_players'], 11)
+        self.assertEqual(overview['earliest_date'], '2025-04-01')
+        self.assertEqual(overview['latest_date'], '2025-05-01')
+        self.assertEqual(self.rollups.top('movement_type'), [{'key': 'add', 'label': None, 'count': 11}])
+
+    def test_rebuild_without_activity_marks_rollups_built(self):
+        self.insert([make_transaction(1, '2025-04-01', 100, 'drop', 'drop', None, 'Team A')])
+        self.rollups.rebuild()
+        self.assertTrue(self.rollups.is_built())
+
+        self.load([make_transaction(2, '2025-04-02', 101)])
+        self.assertEqual(self.rollups.statistics()['overview']['earliest_date'], '2025-04-02')
+        self.assertEqual(len(self.rollups.top('player')), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,6 +50,7 @@ from auth.token_manager import YahooTokenManager
 from data_pipeline.common.season_manager import get_league_key
 from data_pipeline.config.database_config import get_database_path, get_table_name
 from data_pipeline.league_transactions.data_quality_check import TransactionDataQualityChecker
+from data_pipeline.league_transactions.rollups import TransactionRollups
 
 # Import D1 connection module
 try:
@@ -401,8 +402,13 @@ class TransactionUpdater:
             # Log details but continue with valid transactions
         
         if self.use_d1:
+            # Rollup deltas must be computed before REPLACE hides which rows are new
+            rollups = TransactionRollups(self.d1_conn, self.environment)
+            delta = self._prepare_rollups(rollups, transactions)
+            
             # Use D1 batch insert method
             inserted_count, error_count = self.d1_conn.insert_transactions(transactions, self.job_id)
+            self._apply_rollups(rollups, delta, error_count)
             
             # D1 uses REPLACE so we can't distinguish duplicates, return as new
             self.stats['errors'] += error_count
@@ -411,9 +417,12 @@ class TransactionUpdater:
             # Use SQLite
             conn = sqlite3.connect(str(self.db_path))
             cursor = conn.cursor()
+            rollups = TransactionRollups(conn, self.environment, self.table_name)
+            delta = self._prepare_rollups(rollups, transactions)
             
             new_count = 0
             duplicate_count = 0
+            error_count = 0
             
             for trans in transactions:
                 try:
@@ -439,13 +448,41 @@ class TransactionUpdater:
                         
                 except sqlite3.Error as e:
                     logger.error(f"Error inserting transaction: {e}")
-                    self.stats['errors'] += 1
+                    error_count += 1
             
             conn.commit()
+            self.stats['errors'] += error_count
+            self._apply_rollups(rollups, delta, error_count)
             conn.close()
             
             return new_count, duplicate_count
     
+    def _prepare_rollups(self, rollups: TransactionRollups, transactions: List[Dict]):
+        """Compute the analytics rollup delta for a batch; None if it fails."""
+        try:
+            return rollups.prepare(transactions)
+        except Exception as e:
+            logger.error(f"Failed to prepare transaction rollups (run rollups --rebuild): {e}")
+            return None
+    
+    def _apply_rollups(self, rollups: TransactionRollups, delta, error_count: int = 0) -> None:
+        """
+        Apply a prepared rollup delta after the batch has been inserted.
+        
+        The delta counts every new row of the batch, so when some inserts
+        failed it would overcount; the rollups are rebuilt instead.
+        """
+        if delta is None:
+            return
+        try:
+            if error_count:
+                logger.warning(f"{error_count} transaction inserts failed, rebuilding rollups")
+                rollups.rebuild()
+            else:
+                rollups.apply(delta)
+        except Exception as e:
+            logger.error(f"Failed to apply transaction rollups (run rollups --rebuild): {e}")
+    
     def update_recent(self, days_back: int = DEFAULT_LOOKBACK_DAYS,
                      league_key: Optional[str] = None) -> Dict:
         """
@@ -0,0 +1,356 @@
+"""
+League Metadata Cache
+
+Persistent store for per-league metadata that is effectively immutable within a
+season: teams (keys, names, managers), roster positions, stat categories and
+draft settings. Collectors read through LeagueMetadataCache instead of calling
+/league/{key}/teams and /league/{key}/settings at the start of every job.
+
+Freshness is season-aware:
+    - past seasons are fetched once after they end and never again (a copy
+      cached during the season is refetched once)
+    - the current season is refreshed at most once a day
+
+Every refresh also records team names in league_team_names, so renamed teams
+keep their name history (first_seen/last_seen per name).
+
+The tables live in the local SQLite database by default; collectors running
+against D1 pass their D1Connection so the cache is kept there instead.
+
+Usage:
+    python -m data_pipeline.metadata.league_metadata --season 2025
+    python -m data_pipeline.metadata.league_metadata --all --environment test
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import get_database_path
+from data_pipeline.metadata.league_keys import LEAGUE_KEYS, SEASON_DATES
+
+logger = logging.getLogger(__name__)
+
+BASE_FANTASY_URL = 'https://fantasysports.yahooapis.com/fantasy/v2'
+NS = {'y': 'http://fantasysports.yahooapis.com/fantasy/v2/base.rng'}
+
+METADATA_TABLE = 'league_metadata'
+TEAM_NAMES_TABLE = 'league_team_names'
+
+# Current-season metadata is refreshed after this long
+CURRENT_SEASON_TTL = timedelta(days=1)
+
+SEASON_BY_LEAGUE_KEY = {league_key: season for season, league_key in LEAGUE_KEYS.items()}
+
+
+def _text(elem: Optional[ET.Element], path: str) -> Optional[str]:
+    found = elem.find(path, NS) if elem is not None else None
+    return found.text if found is not None else None
+
+
+def parse_teams(root: ET.Element) -> List[Dict[str, Any]]:
+    """Team records from a league teams (or ;out=teams) response."""
+    teams = []
+    for team in root.findall('.//y:teams/y:team', NS):
+        team_key = _text(team, 'y:team_key')
+        if not team_key:
+            continue
+        teams.append({
+            'team_key': team_key,
+            'team_id': _text(team, 'y:team_id'),
+            'team_name': _text(team, 'y:name'),
+            'manager': _text(team, './/y:managers/y:manager/y:nickname'),
+        })
+    return teams
+
+
+def parse_settings(root: ET.Element) -> Dict[str, Any]:
+    """Draft type, draft time, roster positions and stat categories from league settings."""
+    settings_elem = root.find('.//y:settings', NS)
+    if settings_elem is None:
+        return {}
+
+    settings: Dict[str, Any] = {}
+
+    # is_auction_draft is more reliable than draft_type ('live' for snake drafts)
+    if _text(settings_elem, 'y:is_auction_draft') == '1' or _text(settings_elem, 'y:draft_type') == 'auction':
+        settings['draft_type'] = 'auction'
+    else:
+        settings['draft_type'] = 'snake'
+    settings['draft_time'] = _text(settings_elem, 'y:draft_time')
+    settings['scoring_type'] = _text(settings_elem, 'y:scoring_type')
+
+    settings['roster_positions'] = [
+        {
+            'position': _text(position, 'y:position'),
+            'position_type': _text(position, 'y:position_type'),
+            'count': int(_text(position, 'y:count') or 0),
+        }
+        for position in settings_elem.findall('.//y:roster_positions/y:roster_position', NS)
+    ]
+    settings['stat_categories'] = [
+        {
+            'stat_id': int(_text(stat, 'y:stat_id') or 0),
+            'name': _text(stat, 'y:name'),
+            'display_name': _text(stat, 'y:display_name'),
+            'position_type': _text(stat, 'y:position_type'),
+            'is_only_display_stat': _text(stat, 'y:is_only_display_stat') == '1',
+        }
+        for stat in settings_elem.findall('.//y:stat_categories/y:stats/y:stat', NS)
+    ]
+    return settings
+
+
+class LeagueMetadataCache:
+    """Read-through cache of league teams and settings with a season-aware TTL."""
+
+    def __init__(self, fetch: Callable[[str], str], environment: str = 'production',
+                 db_path: Optional[Path] = None, today: Optional[date] = None,
+                 connection=None):
+        """
+        Args:
+            fetch: Function taking a Yahoo API URL and returning the XML response text
+                   (each collector passes its own rate-limited request method)
+            environment: 'production' or 'test'
+            db_path: Override the SQLite database path
+            today: Override today's date (season freshness)
+            connection: D1Connection to keep the cache in D1 instead of the
+                        local SQLite database
+        """
+        self.fetch = fetch
+        self.connection = connection
+        self.db_path = None if connection is not None else (db_path or get_database_path(environment))
+        self.today = today
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._ensure_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path))
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.connection is not None:
+            return self.connection.execute(sql, list(params)).get('results', [])
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def _write(self, statements: List[Tuple[str, Sequence[Any]]]):
+        """Run write statements, in one transaction on SQLite."""
+        if self.connection is not None:
+            results = self.connection.execute_batch([(sql, list(params)) for sql, params in statements])
+            failures = [r for r in results if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} league metadata writes failed: {failures[0].get('error')}")
+            return
+        conn = self._connect()
+        try:
+            for sql, params in statements:
+                conn.execute(sql, list(params))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _ensure_tables(self):
+        self._write([
+            (f"""
+                CREATE TABLE IF NOT EXISTS {METADATA_TABLE} (
+                    league_key TEXT PRIMARY KEY,
+                    season INTEGER,
+                    teams_json TEXT,
+                    settings_json TEXT,
+                    fetched_at TIMESTAMP NOT NULL
+                )
+            """, ()),
+            (f"""
+                CREATE TABLE IF NOT EXISTS {TEAM_NAMES_TABLE} (
+                    team_key TEXT NOT NULL,
+                    season INTEGER,
+                    team_name TEXT NOT NULL,
+                    first_seen TIMESTAMP NOT NULL,
+                    last_seen TIMESTAMP NOT NULL,
+                    PRIMARY KEY (team_key, team_name)
+                )
+            """, ()),
+        ])
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    def season_for(self, league_key: str) -> Optional[int]:
+        """Season of a configured league key."""
+        return SEASON_BY_LEAGUE_KEY.get(league_key)
+
+    def is_fresh(self, season: Optional[int], fetched_at: str) -> bool:
+        """
+        Metadata fetched after its season ended never expires; anything else
+        (the current season, a past season cached mid-season, an unknown
+        season) lasts CURRENT_SEASON_TTL.
+        """
+        today = self.today or date.today()
+        fetched = datetime.fromisoformat(fetched_at)
+        if season is not None:
+            if season in SEASON_DATES:
+                season_end = datetime.strptime(SEASON_DATES[season][1], '%Y-%m-%d').date()
+            else:
+                season_end = date(season, 12, 31)
+            # Fetched after the season ended, so nothing can change any more
+            if fetched.date() > season_end:
+                return True
+        return datetime.combine(today, datetime.now().time()) - fetched < CURRENT_SEASON_TTL
+
+    # ------------------------------------------------------------------
+    # Read-through access
+    # ------------------------------------------------------------------
+
+    def get(self, league_key: str, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Metadata for a league, fetched from Yahoo only when missing or stale.
+
+        Returns:
+            {'league_key', 'season', 'teams': [...], 'settings': {...}, 'fetched_at'}
+        """
+        if not force_refresh and league_key in self._memory:
+            return self._memory[league_key]
+
+        rows = self._query(f"""
+            SELECT season, teams_json, settings_json, fetched_at
+            FROM {METADATA_TABLE} WHERE league_key = ?
+        """, (league_key,))
+        row = rows[0] if rows else None
+
+        if row and not force_refresh and self.is_fresh(row['season'], row['fetched_at']):
+            metadata = {
+                'league_key': league_key,
+                'season': row['season'],
+                'teams': json.loads(row['teams_json'] or '[]'),
+                'settings': json.loads(row['settings_json'] or '{}'),
+                'fetched_at': row['fetched_at'],
+            }
+        else:
+            try:
+                metadata = self.refresh(league_key)
+            except Exception as e:
+                if not row:
+                    raise
+                # Serve stale metadata rather than fail the job
+                logger.warning(f"League metadata refresh failed for {league_key}, using cached copy: {e}")
+                metadata = {
+                    'league_key': league_key,
+                    'season': row['season'],
+                    'teams': json.loads(row['teams_json'] or '[]'),
+                    'settings': json.loads(row['settings_json'] or '{}'),
+                    'fetched_at': row['fetched_at'],
+                }
+
+        self._memory[league_key] = metadata
+        return metadata
+
+    def refresh(self, league_key: str) -> Dict[str, Any]:
+        """Fetch teams and settings in one request and store them."""
+        logger.info(f"Fetching league metadata for {league_key}")
+        root = ET.fromstring(self.fetch(f"{BASE_FANTASY_URL}/league/{league_key};out=settings,teams"))
+
+        season_text = _text(root, './/y:league/y:season')
+        season = self.season_for(league_key) or (int(season_text) if season_text else None)
+        teams = parse_teams(root)
+        settings = parse_settings(root)
+        if not teams:
+            raise ValueError(f"No teams in league metadata response for {league_key}")
+
+        fetched_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+        team_name_sql = f"""
+            INSERT INTO {TEAM_NAMES_TABLE} (team_key, season, team_name, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(team_key, team_name) DO UPDATE SET last_seen = excluded.last_seen
+        """
+        self._write([
+            (f"""
+                INSERT OR REPLACE INTO {METADATA_TABLE}
+                (league_key, season, teams_json, settings_json, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (league_key, season, json.dumps(teams), json.dumps(settings), fetched_at)),
+            *[(team_name_sql, (t['team_key'], season, t['team_name'], fetched_at, fetched_at))
+              for t in teams if t['team_name']],
+        ])
+
+        return {'league_key': league_key, 'season': season, 'teams': teams,
+                'settings': settings, 'fetched_at': fetched_at}
+
+    def get_teams(self, league_key: str) -> List[Dict[str, Any]]:
+        """Team records (team_key, team_id, team_name, manager)."""
+        return self.get(league_key)['teams']
+
+    def get_team_keys(self, league_key: str) -> List[str]:
+        """All team keys for a league."""
+        return [team['team_key'] for team in self.get_teams(league_key)]
+
+    def get_team_names(self, league_key: str) -> Dict[str, str]:
+        """team_key -> current team name."""
+        return {team['team_key']: team['team_name'] for team in self.get_teams(league_key)}
+
+    def get_settings(self, league_key: str) -> Dict[str, Any]:
+        """Draft type/time, roster positions and stat categories."""
+        return self.get(league_key)['settings']
+
+    def get_team_name_history(self, team_key: str) -> List[Dict[str, Any]]:
+        """Every name seen for a team, oldest first."""
+        return self._query(f"""
+            SELECT team_name, season, first_seen, last_seen
+            FROM {TEAM_NAMES_TABLE} WHERE team_key = ?
+            ORDER BY first_seen
+        """, (team_key,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm the league metadata cache')
+    parser.add_argument('--season', type=int, help='Season to fetch')
+    parser.add_argument('--all', action='store_true', help='Fetch every configured season')
+    parser.add_argument('--force', action='store_true', help='Refetch even if cached')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    import requests
+    from auth.token_manager import YahooTokenManager
+    from data_pipeline.common.rate_limiter import get_shared_limiter
+
+    token_manager = YahooTokenManager()
+    limiter = get_shared_limiter('yahoo')
+
+    def fetch(url: str) -> str:
+        limiter.wait()
+        response = requests.get(url, headers={
+            'Authorization': f'Bearer {token_manager.get_access_token()}',
+            'Accept': 'application/xml'
+        }, timeout=30)
+        response.raise_for_status()
+        return response.text
+
+    cache = LeagueMetadataCache(fetch, args.environment)
+    seasons = sorted(LEAGUE_KEYS) if args.all else [args.season]
+    if seasons == [None]:
+        parser.error('--season or --all is required')
+
+    for season in seasons:
+        metadata = cache.get(LEAGUE_KEYS[season], force_refresh=args.force)
+        print(f"{season}: {len(metadata['teams'])} teams, "
+              f"{len(metadata['settings'].get('stat_categories', []))} stat categories "
+              f"(fetched {metadata['fetched_at']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+Player Spotlight Module
+
+Precomputed per player-season spotlight summaries (team and position days,
+monthly breakdowns, usage-split stat totals) served by single-row lookups.
+"""
+
+from .summaries import SpotlightSummarizer, refresh_spotlight_for_dates
+
+__all__ = [
+    "SpotlightSummarizer",
+    "refresh_spotlight_for_dates"
+]
@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+"""
+Player Spotlight Summaries
+
+Precomputes what the spotlight endpoints (web-ui playerSpotlightService.js and
+the worker's routes/player-spotlight.js) otherwise aggregate from daily_lineups
+on every request, one row per player-season in player_spotlight_summary:
+
+    teams_json     - days, first and last date per fantasy team
+    positions_json - days per (team, selected_position)
+    monthly_json   - days per (month, team, selected_position)
+    usage_json     - days and category totals per usage type (started, benched,
+                     injured_list, minor_leagues, other_roster, not_rostered),
+                     relative to the player's current team
+
+Day counts come from lineup_stints by interval arithmetic, stat totals from
+daily_gkl_player_stats. Only players touched by the latest lineup or stats job
+are recomputed; update_lineups.py and update_stats.py call
+refresh_spotlight_for_dates() after writing.
+
+Usage:
+    python -m data_pipeline.player_spotlight.summaries --season 2025
+    python -m data_pipeline.player_spotlight.summaries --season 2025 --players 12345 67890
+    python -m data_pipeline.player_spotlight.summaries --job-id lineup_update_production_...
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.scoring_categories import (
+    BENCH_SLOTS,
+    CATEGORIES,
+    COMPONENTS,
+    CATEGORY_ORDER,
+    INJURED_SLOTS,
+    MINOR_LEAGUE_SLOTS,
+    category_value,
+    stats_columns,
+)
+from data_pipeline.config.database_config import get_database_path, get_table_name
+from data_pipeline.daily_lineups.stints import LineupStints
+from data_pipeline.metadata.league_keys import SEASON_DATES
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLE = 'player_spotlight_summary'
+STATS_TABLE = 'daily_gkl_player_stats'
+
+SUMMARY_COLUMNS = ('season', 'yahoo_player_id', 'player_name', 'current_team_key',
+                   'current_team_name', 'player_type', 'rostered_days', 'season_days',
+                   'first_date', 'last_date', 'teams_json', 'positions_json',
+                   'monthly_json', 'usage_json')
+
+USAGE_TYPES = ('started', 'benched', 'injured_list', 'minor_leagues', 'other_roster', 'not_rostered')
+
+# Player ids per query
+PLAYER_BATCH = 200
+# Rows per multi-row INSERT on D1
+D1_INSERT_ROWS = 25
+
+
+def _parse(value: str) -> date:
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def usage_type(selected_position: Optional[str], team_key: Optional[str],
+               current_team_key: Optional[str]) -> str:
+    """Classify one lineup day the way the spotlight usage breakdown does."""
+    if team_key is None:
+        return 'not_rostered'
+    if team_key != current_team_key:
+        return 'other_roster'
+    if selected_position in BENCH_SLOTS:
+        return 'benched'
+    if selected_position in INJURED_SLOTS:
+        return 'injured_list'
+    if selected_position in MINOR_LEAGUE_SLOTS:
+        return 'minor_leagues'
+    return 'started'
+
+
+def player_type(stat_rows: Sequence[Dict[str, Any]]) -> str:
+    """'batter', 'pitcher' or 'both', with the thresholds used by playerStatsService."""
+    batting_games = sum(1 for r in stat_rows if r.get('has_batting_data'))
+    pitching_games = sum(1 for r in stat_rows if r.get('has_pitching_data'))
+    at_bats = sum(r.get('batting_at_bats') or 0 for r in stat_rows if r.get('has_batting_data'))
+    innings = sum(r.get('pitching_innings_pitched') or 0 for r in stat_rows if r.get('has_pitching_data'))
+
+    if batting_games >= 5 and pitching_games >= 5 and at_bats >= 50 and innings >= 10:
+        return 'both'
+    if pitching_games > batting_games or (pitching_games > 0 and at_bats < 20):
+        return 'pitcher'
+    return 'batter'
+
+
+def season_days(season: int, today: Optional[date] = None) -> int:
+    """Days in the season so far (the whole season once it has ended)."""
+    start, end = SEASON_DATES.get(season, (f"{season}-01-01", f"{season}-12-31"))
+    last = min(_parse(end), today or date.today())
+    return max(0, (last - _parse(start)).days + 1)
+
+
+def summarize_player(season: int, yahoo_player_id: str, stints: Sequence[Dict[str, Any]],
+                     stat_rows: Sequence[Dict[str, Any]], total_days: int) -> Dict[str, Any]:
+    """
+    Build one spotlight summary row.
+
+    Args:
+        season: Season year
+        yahoo_player_id: Player id
+        stints: The player's lineup_stints rows for the season
+        stat_rows: The player's daily_gkl_player_stats rows for the season
+        total_days: Season length used for the not-rostered remainder
+
+    Returns:
+        Dictionary keyed by SUMMARY_COLUMNS
+    """
+    stints = sorted(stints, key=lambda s: (s['start_date'], s['team_key']))
+    current = max(stints, key=lambda s: (s['end_date'], s['start_date'])) if stints else None
+    current_team_key = current['team_key'] if current else None
+
+    teams: Dict[str, Dict[str, Any]] = {}
+    positions: Dict[tuple, int] = defaultdict(int)
+    monthly: Dict[tuple, Dict[str, Any]] = {}
+    usage_days: Dict[str, int] = defaultdict(int)
+    slot_by_date: Dict[str, tuple] = {}
+
+    for stint in stints:
+        start, end = _parse(stint['start_date']), _parse(stint['end_date'])
+        days = (end - start).days + 1
+        team = teams.setdefault(stint['team_key'], {
+            'team_key': stint['team_key'], 'team_name': stint['team_name'], 'days': 0,
+            'from_date': stint['start_date'], 'to_date': stint['end_date'],
+        })
+        team['days'] += days
+        team['from_date'] = min(team['from_date'], stint['start_date'])
+        team['to_date'] = max(team['to_date'], stint['end_date'])
+        team['team_name'] = stint['team_name'] or team['team_name']
+
+        positions[(stint['team_name'], stint['selected_position'])] += days
+        usage_days[usage_type(stint['selected_position'], stint['team_key'], current_team_key)] += days
+
+        # Split the stint at month boundaries
+        piece_start = start
+        while piece_start <= end:
+            next_month = (piece_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            piece_end = min(end, next_month - timedelta(days=1))
+            key = (piece_start.strftime('%Y-%m'), stint['team_name'], stint['selected_position'])
+            entry = monthly.setdefault(key, {
+                'month': key[0], 'team_name': key[1], 'selected_position': key[2], 'days': 0,
+                'first_date': piece_start.isoformat(), 'last_date': piece_end.isoformat(),
+            })
+            entry['days'] += (piece_end - piece_start).days + 1
+            entry['first_date'] = min(entry['first_date'], piece_start.isoformat())
+            entry['last_date'] = max(entry['last_date'], piece_end.isoformat())
+            piece_start = next_month
+
+        day = start
+        while day <= end:
+            slot_by_date[day.isoformat()] = (stint['team_key'], stint['selected_position'])
+            day += timedelta(days=1)
+
+    rostered_days = len(slot_by_date)
+    usage_days['not_rostered'] += max(0, total_days - rostered_days)
+
+    totals: Dict[str, Dict[str, float]] = {u: defaultdict(int) for u in USAGE_TYPES}
+    stat_days: Dict[str, int] = defaultdict(int)
+    for row in stat_rows:
+        team_key, slot = slot_by_date.get(str(row['date'])[:10], (None, None))
+        usage = usage_type(slot, team_key, current_team_key)
+        stat_days[usage] += 1
+        for component, (_, terms) in COMPONENTS.items():
+            totals[usage][component] += sum((row.get(column) or 0) * weight for column, weight in terms)
+
+    kind = player_type(stat_rows)
+    sides = {'batter': ('batting',), 'pitcher': ('pitching',), 'both': ('batting', 'pitching')}[kind]
+    usage = {}
+    for name in USAGE_TYPES:
+        if not usage_days.get(name) and not stat_days.get(name):
+            continue
+        usage[name] = {
+            'days': usage_days.get(name, 0),
+            'stat_days': stat_days.get(name, 0),
+            'stats': {
+                side: ({c: category_value(c, totals[name]) for c in CATEGORY_ORDER
+                        if CATEGORIES[c]['side'] == side} if side in sides else None)
+                for side in ('batting', 'pitching')
+            },
+        }
+
+    player_name = current['player_name'] if current else None
+    if not player_name and stat_rows:
+        player_name = stat_rows[-1].get('player_name')
+
+    return {
+        'season': season,
+        'yahoo_player_id': str(yahoo_player_id),
+        'player_name': player_name,
+        'current_team_key': current_team_key,
+        'current_team_name': current['team_name'] if current else None,
+        'player_type': kind,
+        'rostered_days': rostered_days,
+        'season_days': total_days,
+        'first_date': stints[0]['start_date'] if stints else None,
+        'last_date': current['end_date'] if current else None,
+        'teams_json': json.dumps(sorted(teams.values(), key=lambda t: t['from_date'])),
+        'positions_json': json.dumps([
+            {'team_name': team_name, 'selected_position': position, 'days': days}
+            for (team_name, position), days in sorted(positions.items(), key=lambda kv: -kv[1])
+        ]),
+        'monthly_json': json.dumps([monthly[key] for key in sorted(monthly, key=lambda k: (k[0], k[1] or '', k[2]))]),
+        'usage_json': json.dumps(usage),
+    }
+
+
+class SpotlightSummarizer:
+    """Maintains player_spotlight_summary from lineup_stints and daily stats."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 stats_table: Optional[str] = None, summary_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection
+            environment: 'production' or 'test' (SQLite table suffixes)
+            stats_table: Override stats table name
+            summary_table: Override summary table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        self.stints = LineupStints(connection, environment)
+        self.stats_table = stats_table or STATS_TABLE
+        if self.is_sqlite:
+            self.summary_table = summary_table or get_table_name(SUMMARY_TABLE, environment)
+        else:
+            self.summary_table = summary_table or SUMMARY_TABLE
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        if self.is_sqlite:
+            self.connection.commit()
+
+    def ensure_table(self):
+        """Create the summary table if it does not exist."""
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.summary_table} (
+                season INTEGER NOT NULL,
+                yahoo_player_id TEXT NOT NULL,
+                player_name TEXT,
+                current_team_key TEXT,
+                current_team_name TEXT,
+                player_type TEXT,
+                rostered_days INTEGER DEFAULT 0,
+                season_days INTEGER DEFAULT 0,
+                first_date DATE,
+                last_date DATE,
+                teams_json TEXT,
+                positions_json TEXT,
+                monthly_json TEXT,
+                usage_json TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (yahoo_player_id, season)
+            )
+        """)
+        self._commit()
+
+    # ------------------------------------------------------------------
+    # Touched players
+    # ------------------------------------------------------------------
+
+    def players_for_dates(self, dates: Iterable[str]) -> Dict[int, Set[str]]:
+        """Season -> player ids with lineup or stat rows on the given dates."""
+        dates = sorted({str(d)[:10] for d in dates})
+        if not dates:
+            return {}
+        rows = self._query(f"""
+            SELECT DISTINCT yahoo_player_id, CAST(strftime('%Y', date) AS INTEGER) AS season
+            FROM {self.stints.lineup_table} WHERE date BETWEEN ? AND ?
+            UNION
+            SELECT DISTINCT yahoo_player_id, CAST(strftime('%Y', date) AS INTEGER) AS season
+            FROM {self.stats_table}
+            WHERE date BETWEEN ? AND ? AND yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
+        """, [dates[0], dates[-1], dates[0], dates[-1]])
+        touched: Dict[int, Set[str]] = defaultdict(set)
+        for row in rows:
+            touched[int(row['season'])].add(str(row['yahoo_player_id']))
+        return dict(touched)
+
+    def players_for_job(self, job_id: str) -> Dict[int, Set[str]]:
+        """Season -> player ids written by a lineup or stats job."""
+        rows = self._query(f"""
+            SELECT DISTINCT yahoo_player_id, CAST(strftime('%Y', date) AS INTEGER) AS season
+            FROM {self.stints.lineup_table} WHERE job_id = ?
+            UNION
+            SELECT DISTINCT yahoo_player_id, CAST(strftime('%Y', date) AS INTEGER) AS season
+            FROM {self.stats_table}
+            WHERE job_id = ? AND yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
+        """, [job_id, job_id])
+        touched: Dict[int, Set[str]] = defaultdict(set)
+        for row in rows:
+            touched[int(row['season'])].add(str(row['yahoo_player_id']))
+        return dict(touched)
+
+    def season_players(self, season: int) -> Set[str]:
+        """Every player with a stint in the season."""
+        rows = self._query(f"SELECT DISTINCT yahoo_player_id FROM {self.stints.stint_table} WHERE season = ?",
+                           [season])
+        return {str(row['yahoo_player_id']) for row in rows}
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _write(self, summaries: List[Dict[str, Any]]):
+        if not summaries:
+            return
+        rows = [tuple(summary[c] for c in SUMMARY_COLUMNS) for summary in summaries]
+        insert = (f"INSERT OR REPLACE INTO {self.summary_table} "
+                  f"({', '.join(SUMMARY_COLUMNS)}) VALUES ")
+        if self.is_sqlite:
+            self.connection.executemany(insert + f"({', '.join(['?'] * len(SUMMARY_COLUMNS))})", rows)
+            return
+        from data_pipeline.common.sql_dump_writer import encode_row
+        statements = [
+            (insert + ',\n'.join(encode_row(row) for row in rows[i:i + D1_INSERT_ROWS]), [])
+            for i in range(0, len(rows), D1_INSERT_ROWS)
+        ]
+        failures = [r for r in self.connection.execute_batch(statements) if not r.get('success', True)]
+        if failures:
+            raise RuntimeError(f"{len(failures)} summary insert batches failed: {failures[0].get('error')}")
+
+    def refresh_players(self, season: int, player_ids: Iterable[str]) -> int:
+        """
+        Recompute summaries for some players in one season.
+
+        Returns:
+            Number of summary rows written
+        """
+        player_ids = sorted({str(p) for p in player_ids if p})
+        if not player_ids:
+            return 0
+        self.ensure_table()
+
+        start, end = SEASON_DATES.get(season, (f"{season}-01-01", f"{season}-12-31"))
+        total_days = season_days(season)
+        columns = ', '.join(['date', 'yahoo_player_id', 'player_name', 'has_batting_data',
+                             'has_pitching_data', 'batting_at_bats', 'pitching_innings_pitched']
+                            + [c for c in stats_columns() if c not in ('batting_at_bats', 'pitching_innings_pitched')])
+        written = 0
+        for i in range(0, len(player_ids), PLAYER_BATCH):
+            batch = player_ids[i:i + PLAYER_BATCH]
+            placeholders = ', '.join(['?'] * len(batch))
+            stints = self._query(f"""
+                SELECT yahoo_player_id, player_name, team_key, team_name, selected_position,
+                       start_date, end_date
+                FROM {self.stints.stint_table}
+                WHERE season = ? AND yahoo_player_id IN ({placeholders})
+            """, [season] + batch)
+            stat_rows = self._query(f"""
+                SELECT {columns}
+                FROM {self.stats_table}
+                WHERE date BETWEEN ? AND ? AND yahoo_player_id IN ({placeholders})
+                ORDER BY date
+            """, [start, end] + batch)
+
+            stints_by_player = defaultdict(list)
+            for stint in stints:
+                stints_by_player[str(stint['yahoo_player_id'])].append(stint)
+            stats_by_player = defaultdict(list)
+            for row in stat_rows:
+                stats_by_player[str(row['yahoo_player_id'])].append(row)
+
+            summaries = [
+                summarize_player(season, player_id, stints_by_player[player_id],
+                                 stats_by_player[player_id], total_days)
+                for player_id in batch
+                if stints_by_player[player_id] or stats_by_player[player_id]
+            ]
+            self._write(summaries)
+            self._commit()
+            written += len(summaries)
+
+        logger.info(f"Refreshed {written} spotlight summaries for {season}")
+        return written
+
+    def refresh(self, touched: Dict[int, Set[str]]) -> int:
+        """Recompute summaries for a season -> player ids mapping."""
+        return sum(self.refresh_players(season, players) for season, players in sorted(touched.items()))
+
+    def get(self, yahoo_player_id: str, season: int) -> Optional[Dict[str, Any]]:
+        """Single-row spotlight lookup with the JSON columns decoded."""
+        rows = self._query(f"SELECT * FROM {self.summary_table} WHERE yahoo_player_id = ? AND season = ?",
+                           [str(yahoo_player_id), season])
+        if not rows:
+            return None
+        summary = dict(rows[0])
+        for column in ('teams_json', 'positions_json', 'monthly_json', 'usage_json'):
+            summary[column[:-5]] = json.loads(summary.pop(column) or 'null')
+        return summary
+
+
+def refresh_spotlight_for_dates(connection, dates: Iterable[str], environment: str = 'production',
+                                player_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Post-write hook for the lineup and stats updaters; logs instead of raising.
+
+    Args:
+        connection: D1Connection or sqlite3.Connection
+        dates: Dates the job wrote
+        environment: 'production' or 'test'
+        player_ids: Players the job wrote; derived from the dates when omitted
+    """
+    try:
+        summarizer = SpotlightSummarizer(connection, environment)
+        if player_ids is None:
+            touched = summarizer.players_for_dates(dates)
+        else:
+            touched = defaultdict(set)
+            seasons = {int(str(d)[:4]) for d in dates}
+            for season in seasons:
+                touched[season].update(str(p) for p in player_ids)
+        return summarizer.refresh(touched)
+    except Exception as e:
+        logger.error(f"Failed to refresh spotlight summaries: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build player spotlight summaries')
+    parser.add_argument('--season', type=int, help='Season to summarize (all its players unless --players)')
+    parser.add_argument('--players', nargs='+', help='Player ids to summarize')
+    parser.add_argument('--job-id', help='Summarize the players written by this job')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Use Cloudflare D1')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.use_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        connection = D1Connection()
+    else:
+        connection = sqlite3.connect(str(get_database_path(args.environment)))
+    summarizer = SpotlightSummarizer(connection, args.environment)
+
+    if args.job_id:
+        written = summarizer.refresh(summarizer.players_for_job(args.job_id))
+    elif args.season:
+        players = args.players or summarizer.season_players(args.season)
+        written = summarizer.refresh_players(args.season, players)
+    else:
+        parser.error('--season or --job-id is required')
+    print(f"Wrote {written} spotlight summaries")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,10 @@ Key Components:
 - collector.py: Core data collection from pybaseball APIs
 - job_manager.py: Job tracking and progress management  
 - repository.py: Data access and query interface
+- stats_cube.py: Memory-mapped player x date x stat cube for vectorized analytics
 - player_id_mapper.py: Yahoo Fantasy ↔ MLB player ID mapping
+- mapping_changes.py: player_mapping change log and targeted Yahoo ID backpropagation
+- stat_corrections.py: Stat correction detection from changed MLB games only
 - data_validator.py: Data quality assurance and validation
 - scheduler.py: Daily automation and scheduling
 
@@ -16,6 +16,7 @@ Unlike sync scripts, this NEVER deletes existing data. It only:
 Usage:
     python build_player_mappings_d1.py --use-d1
     python build_player_mappings_d1.py --environment production --use-d1
+    python build_player_mappings_d1.py --use-d1 --mirror   # Read Yahoo players from the local D1 mirror
 """
 
 import argparse
@@ -41,6 +42,8 @@ except ImportError:
 from fuzzywuzzy import fuzz
 import pandas as pd
 from data_pipeline.common.d1_connection import D1Connection
+from data_pipeline.common.d1_mirror import D1Mirror, MirrorConnection
+from data_pipeline.player_stats.mapping_changes import MappingChangeLog
 from data_pipeline.player_stats.yahoo_id_matcher import YahooIDMatcher
 
 # Configure logging
@@ -54,13 +57,15 @@ logger = logging.getLogger(__name__)
 class PlayerMappingBuilder:
     """Builds comprehensive player mappings directly in D1"""
     
-    def __init__(self, environment='production', use_d1=True):
+    def __init__(self, environment='production', use_d1=True, use_mirror=False):
         """
         Initialize the builder.
         
         Args:
             environment: Database environment
             use_d1: If True, write directly to D1
+            use_mirror: If True, sync the local D1 mirror and read league
+                        players from it instead of D1 (writes still go to D1)
         """
         self.environment = environment
         self.use_d1 = use_d1
@@ -71,9 +76,23 @@ class PlayerMappingBuilder:
         else:
             raise ValueError("This script is designed for D1 only. Use --use-d1")
         
+        self.read_conn = self.d1_conn
+        if use_mirror:
+            mirror = D1Mirror(self.d1_conn)
+            try:
+                mirror.sync(['transactions', 'daily_lineups'])
+            finally:
+                mirror.close()
+            self.read_conn = MirrorConnection(mirror.mirror_path)
+            logger.info(f"Reading league players from mirror {mirror.mirror_path}")
+        
         # Initialize Yahoo matcher for getting Yahoo IDs
         self.yahoo_matcher = YahooIDMatcher(environment=environment)
         
+        # mlb_ids whose Yahoo ID was set during this run
+        self.change_log = MappingChangeLog(self.d1_conn, environment)
+        self.changed_mlb_ids = set()
+        
     def ensure_table_exists(self):
         """Ensure player_mapping table exists in D1"""
         schema_sql = """
@@ -223,68 +242,50 @@ class PlayerMappingBuilder:
             return {}
     
     def get_yahoo_players_from_d1(self) -> Dict[str, Dict]:
-        """Get Yahoo players directly from D1 transactions and lineups"""
+        """Get Yahoo players from D1 (or its local mirror) transactions and lineups"""
         yahoo_players = {}
         
         try:
             # First check if transactions table has data
-            check_result = self.d1_conn.execute(
-                "SELECT COUNT(*) FROM transactions"
+            check_result = self.read_conn.execute(
+                "SELECT COUNT(*) AS row_count FROM transactions"
             )
             
             if not check_result or not check_result.get('results'):
                 logger.info("No transactions data available yet")
                 return {}
             
-            count = check_result['results'][0][0] if check_result['results'] else 0
+            count = check_result['results'][0]['row_count'] or 0
             if count == 0:
                 logger.info("Transactions table is empty")
                 return {}
             
-            # Get unique Yahoo players from transactions
-            result = self.d1_conn.execute("""
-                SELECT DISTINCT yahoo_player_id, player_name, player_team
-                FROM transactions
-                WHERE yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
-                LIMIT 5000
-            """)
-            
-            if result and result.get('results'):
-                for row in result['results']:
-                    if row and row[0]:
-                        yahoo_players[row[0]] = {
-                            'yahoo_player_id': row[0],
-                            'player_name': row[1] if row[1] else '',
-                            'team': row[2] if len(row) > 2 else None
-                        }
-            
-            # Also try daily_lineups
-            try:
-                lineup_result = self.d1_conn.execute("""
-                    SELECT DISTINCT yahoo_player_id, player_name, player_team
-                    FROM daily_lineups
-                    WHERE yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
-                    LIMIT 5000
-                """)
+            # Get unique Yahoo players from transactions, then daily_lineups
+            for table in ('transactions', 'daily_lineups'):
+                try:
+                    result = self.read_conn.execute(f"""
+                        SELECT DISTINCT yahoo_player_id, player_name, player_team
+                        FROM {table}
+                        WHERE yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
+                        LIMIT 5000
+                    """)
+                except Exception as table_error:
+                    logger.debug(f"Could not get players from {table}: {table_error}")
+                    continue
                 
-                if lineup_result and lineup_result.get('results'):
-                    for row in lineup_result['results']:
-                        if row and row[0] and row[0] not in yahoo_players:
-                            yahoo_players[row[0]] = {
-                                'yahoo_player_id': row[0],
-                                'player_name': row[1] if row[1] else '',
-                                'team': row[2] if len(row) > 2 else None
-                            }
-            except Exception as lineup_error:
-                logger.debug(f"Could not get lineups: {lineup_error}")
+                for row in result.get('results', []):
+                    yahoo_id = row.get('yahoo_player_id')
+                    if yahoo_id and yahoo_id not in yahoo_players:
+                        yahoo_players[yahoo_id] = {
+                            'yahoo_player_id': yahoo_id,
+                            'player_name': row.get('player_name') or '',
+                            'team': row.get('player_team')
+                        }
             
             logger.info(f"Found {len(yahoo_players)} Yahoo players from D1")
             
         except Exception as e:
-            if str(e) == "0":
-                logger.info("No Yahoo player data available yet in D1")
-            else:
-                logger.warning(f"Could not get Yahoo players from D1: {e}")
+            logger.warning(f"Could not get Yahoo players from D1: {e}")
             
         return yahoo_players
     
@@ -360,6 +361,8 @@ class PlayerMappingBuilder:
                 result = self.d1_conn.execute(sql, values)
                 if result.get('changes', 0) > 0:
                     inserted += 1
+                    if player.get('yahoo_player_id'):
+                        self.changed_mlb_ids.add(mlb_id_value)
                     
             except Exception as e:
                 logger.error(f"Error inserting player {player.get('player_name')}: {e}")
@@ -394,6 +397,7 @@ class PlayerMappingBuilder:
                 
                 if result.get('changes', 0) > 0:
                     updated += 1
+                    self.changed_mlb_ids.add(player['mlb_id'])
                     
             except Exception as e:
                 logger.error(f"Error updating Yahoo ID for {player.get('player_name')}: {e}")
@@ -403,6 +407,16 @@ class PlayerMappingBuilder:
         
         return updated
     
+    def propagate_changes(self) -> int:
+        """Record this run's Yahoo ID changes and backpropagate them to daily stats"""
+        try:
+            self.change_log.record(self.changed_mlb_ids, 'build_player_mappings_d1')
+            self.changed_mlb_ids.clear()
+            return self.change_log.propagate()
+        except Exception as e:
+            logger.error(f"Error propagating Yahoo ID changes: {e}")
+            return 0
+    
     def build_mappings(self):
         """Main method to build comprehensive player mappings"""
         logger.info("Starting comprehensive player mapping build...")
@@ -450,6 +464,9 @@ class PlayerMappingBuilder:
         else:
             logger.info("No Yahoo data available for ID updates yet")
         
+        # Log changed mappings and push them to daily stats
+        self.propagate_changes()
+        
         # Show final stats
         self.show_stats()
     
@@ -497,6 +514,8 @@ def main():
                        help='Database environment (default: production)')
     parser.add_argument('--use-d1', action='store_true', required=True,
                        help='Write directly to Cloudflare D1 (required)')
+    parser.add_argument('--mirror', action='store_true',
+                       help='Sync the local D1 mirror and read league players from it')
     
     args = parser.parse_args()
     
@@ -513,7 +532,8 @@ def main():
     # Initialize builder
     builder = PlayerMappingBuilder(
         environment=args.environment,
-        use_d1=args.use_d1
+        use_d1=args.use_d1,
+        use_mirror=args.mirror
     )
     
     # Build mappings
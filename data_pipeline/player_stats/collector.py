@@ -32,6 +32,7 @@ parent_dir = Path(__file__).parent
 root_dir = parent_dir.parent.parent
 sys.path.insert(0, str(root_dir))
 
+from data_pipeline.config.connection_provider import connection_stats, get_read_connection
 from data_pipeline.player_stats.config import get_config_for_environment
 from data_pipeline.player_stats.pybaseball_integration import PyBaseballIntegration
 from data_pipeline.player_stats.player_id_mapper import PlayerIdMapper
@@ -362,8 +363,9 @@ class PlayerStatsCollector:
         try:
             logger.info("Processing staging data with player ID mapping...")
             
+            cursor = get_read_connection(self.db_path).cursor()
+            # One write connection for every final record of the date
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
             
             try:
                 # Get all unique players from staging tables for this date
@@ -387,6 +389,7 @@ class PlayerStatsCollector:
                 
                 # Combine all players
                 all_players = set(batting_players + pitching_players)
+                cursor.close()
                 logger.info(f"Found {len(all_players)} unique players to process")
                 
                 # Process each player's stats
@@ -421,7 +424,7 @@ class PlayerStatsCollector:
                             
                             # Create final stats record
                             success = self._create_final_stats_record(
-                                target_date, job_id, mapping_dict, player_name, team
+                                conn, target_date, job_id, mapping_dict, player_name, team
                             )
                             if success:
                                 processed_count += 1
@@ -431,6 +434,7 @@ class PlayerStatsCollector:
                         stats.failed_records += 1
                 
                 logger.info(f"Successfully processed {processed_count} players into final stats")
+                logger.debug(f"Pooled read connections: {connection_stats()}")
                 return True
                 
             finally:
@@ -442,8 +446,7 @@ class PlayerStatsCollector:
     
     def _find_player_mapping(self, player_name: str, team: str) -> Optional[Dict[str, Any]]:
         """Find existing player mapping by name and team."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = get_read_connection(self.db_path).cursor()
         
         try:
             # Look for existing mapping by standardized name
@@ -468,12 +471,11 @@ class PlayerStatsCollector:
             return None
             
         finally:
-            conn.close()
+            cursor.close()
     
-    def _create_final_stats_record(self, target_date: date, job_id: str, 
+    def _create_final_stats_record(self, conn: sqlite3.Connection, target_date: date, job_id: str, 
                                  mapping: Dict[str, Any], player_name: str, team: str) -> bool:
-        """Create a final stats record combining batting and pitching data."""
-        conn = sqlite3.connect(self.db_path)
+        """Create a final stats record combining batting and pitching data (conn is owned by the caller)."""
         cursor = conn.cursor()
         
         try:
@@ -571,10 +573,12 @@ class PlayerStatsCollector:
             
         except Exception as e:
             logger.error(f"Failed to create final stats record for {player_name}: {e}")
+            # Don't leave the shared connection holding the write lock
+            conn.rollback()
             return False
             
         finally:
-            conn.close()
+            cursor.close()
     
     def collect_date_range(self, start_date: date, end_date: date, 
                           max_workers: int = 2) -> Dict[str, Any]:
@@ -61,6 +61,9 @@ class ComprehensiveStatsCollector:
         self.player_mapping_table = 'player_mapping'
         self.stats_table = 'daily_gkl_player_stats'
         
+        # Boxscores of the current collection run (game_pk -> boxscore)
+        self.boxscores: Dict[int, Optional[Dict]] = {}
+        
         logger.info(f"Initialized ComprehensiveStatsCollector for {environment}")
     
     def _get_cursor(self):
@@ -172,6 +175,9 @@ class ComprehensiveStatsCollector:
             metadata={'source': 'pybaseball', 'scope': 'all_mlb_players'}
         )
         
+        # Batting and pitching share each game's boxscore
+        self.boxscores = {}
+        
         try:
             # Get games for the date to know which teams played
             games = self._get_games_for_date(target_date)
@@ -228,6 +234,12 @@ class ComprehensiveStatsCollector:
         
         return games
     
+    def _get_boxscore(self, game_id: int) -> Optional[Dict]:
+        """Get a game's boxscore, fetched once per collection run"""
+        if game_id not in self.boxscores:
+            self.boxscores[game_id] = self.pybaseball_integration._get_game_boxscore(game_id)
+        return self.boxscores[game_id]
+    
     def _collect_batting_stats(self, target_date: str, games: List[Dict]) -> pd.DataFrame:
         """Collect batting stats for all players who played on the given date"""
         all_batting_stats = []
@@ -236,7 +248,7 @@ class ComprehensiveStatsCollector:
             game_id = game['game_id']
             
             # Get box score for the game
-            boxscore_data = self.pybaseball_integration._get_game_boxscore(game_id)
+            boxscore_data = self._get_boxscore(game_id)
             
             if not boxscore_data:
                 continue
@@ -297,7 +309,7 @@ class ComprehensiveStatsCollector:
             game_id = game['game_id']
             
             # Get box score for the game
-            boxscore_data = self.pybaseball_integration._get_game_boxscore(game_id)
+            boxscore_data = self._get_boxscore(game_id)
             
             if not boxscore_data:
                 continue
@@ -50,13 +50,14 @@ logger = logging.getLogger(__name__)
 class PlayerStatsDataQualityChecker:
     """Comprehensive data quality validation for player statistics"""
     
-    def __init__(self, environment='test', use_d1=False):
+    def __init__(self, environment='test', use_d1=False, db_path=None):
         """
         Initialize data quality checker.
         
         Args:
             environment: 'test' or 'production' for local databases
             use_d1: If True, check Cloudflare D1
+            db_path: Optional SQLite database override (e.g. the local D1 mirror)
         """
         self.environment = environment
         self.use_d1 = use_d1
@@ -68,7 +69,7 @@ class PlayerStatsDataQualityChecker:
             self.conn = None
         else:
             config = get_config_for_environment(environment)
-            self.conn = sqlite3.connect(config['database_path'])
+            self.conn = sqlite3.connect(db_path or config['database_path'])
         
         # Validation thresholds
         self.thresholds = {
@@ -99,7 +100,8 @@ class PlayerStatsDataQualityChecker:
     def execute_query(self, query: str, params: tuple = ()) -> List:
         """Execute query on appropriate database"""
         if self.use_d1:
-            return self.d1_conn.execute(query, params).fetchall()
+            result = self.d1_conn.execute(query, list(params))
+            return [tuple(row.values()) for row in result.get('results', [])]
         else:
             cursor = self.conn.cursor()
             cursor.execute(query, params)
@@ -560,6 +562,8 @@ def main():
                        help='Database environment (default: test)')
     parser.add_argument('--use-d1', action='store_true',
                        help='Check Cloudflare D1 database')
+    parser.add_argument('--mirror', action='store_true',
+                       help='Check the local D1 mirror (production tables, no D1 reads)')
     
     # Date range options
     parser.add_argument('--start', help='Start date (YYYY-MM-DD)')
@@ -573,9 +577,16 @@ def main():
     args = parser.parse_args()
     
     # Initialize checker
+    db_path = None
+    if args.mirror:
+        from data_pipeline.config.database_config import get_mirror_database_path
+        db_path = get_mirror_database_path()
+        args.environment = 'production'
+    
     checker = PlayerStatsDataQualityChecker(
         environment=args.environment,
-        use_d1=args.use_d1
+        use_d1=args.use_d1,
+        db_path=db_path
     )
     
     # Generate report
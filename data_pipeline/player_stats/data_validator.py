@@ -15,7 +15,6 @@ Key Features:
 """
 
 import sys
-import sqlite3
 import logging
 from pathlib import Path
 from datetime import datetime, date, timedelta
@@ -24,12 +23,16 @@ from dataclasses import dataclass
 from enum import Enum
 import statistics
 
+import numpy as np
+
 # Add parent directories to path
 parent_dir = Path(__file__).parent
 root_dir = parent_dir.parent
 sys.path.insert(0, str(root_dir))
 
 from player_stats.config import get_config_for_environment
+from data_pipeline.config.connection_provider import get_read_connection
+from player_stats.stats_cube import StatsCube, current_cube
 
 # Set up logging
 logging.basicConfig(
@@ -97,16 +100,17 @@ class PlayerStatsValidator:
     high-quality data integrity across all player statistics.
     """
     
-    def __init__(self, environment: str = "production"):
+    def __init__(self, environment: str = "production", db_path=None):
         """
         Initialize the validator.
         
         Args:
             environment: 'production' or 'test'
+            db_path: Optional database override (e.g. the local D1 mirror)
         """
         self.environment = environment
         self.config = get_config_for_environment(environment)
-        self.db_path = self.config['database_path']
+        self.db_path = db_path or self.config['database_path']
         self.stats_table = self.config['gkl_player_stats_table']
         self.validation_config = self.config['data_validation']
         
@@ -131,7 +135,7 @@ class PlayerStatsValidator:
         issues = []
         
         # Get all records for the date
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -183,7 +187,7 @@ class PlayerStatsValidator:
             return report
             
         finally:
-            conn.close()
+            cursor.close()
     
     def validate_date_range(self, start_date: date, end_date: date,
                            enable_anomaly_detection: bool = True) -> ValidationReport:
@@ -623,11 +627,26 @@ class PlayerStatsValidator:
         
         return issues
     
+    def _current_cube(self, season: int) -> Optional[StatsCube]:
+        """
+        The season's stats cube, if it can stand in for the stats table.
+        
+        The cube is built from the environment's default database, so it is
+        only used when validating that database and when it holds every date
+        the table has for the season.
+        """
+        return current_cube(season, self.environment, self.db_path, self.stats_table)
+    
     def _detect_range_anomalies(self, start_date: date, end_date: date) -> List[ValidationIssue]:
         """Detect anomalies across a date range."""
+        if start_date.year == end_date.year:
+            cube = self._current_cube(start_date.year)
+            if cube is not None:
+                return self._detect_range_anomalies_cube(cube, start_date, end_date)
+        
         issues = []
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -659,7 +678,7 @@ class PlayerStatsValidator:
                         issues.append(ValidationIssue(
                             severity=ValidationSeverity.WARNING,
                             category="data_consistency",
-                            description=f"Batting average inconsistency over date range",
+                            description="Batting average inconsistency over date range",
                             player_id=player_id,
                             player_name=player_name,
                             context={
@@ -670,7 +689,42 @@ class PlayerStatsValidator:
                         ))
             
         finally:
-            conn.close()
+            cursor.close()
+        
+        return issues
+    
+    def _detect_range_anomalies_cube(self, cube: StatsCube, start_date: date,
+                                     end_date: date) -> List[ValidationIssue]:
+        """Vectorized _detect_range_anomalies over the memory-mapped stats cube."""
+        block = cube.window(start_date, end_date,
+                            ['has_batting_data', 'batting_hits', 'batting_at_bats', 'batting_avg'])
+        has_batting, hits, at_bats, batting_avg = (block[..., i] for i in range(4))
+        keep = (has_batting == 1) & ~np.isnan(hits) & (at_bats > 0)
+        
+        games = keep.sum(axis=1)
+        total_hits = np.where(keep, hits, 0).sum(axis=1, dtype=np.float64)
+        total_at_bats = np.where(keep, at_bats, 0).sum(axis=1, dtype=np.float64)
+        avg_keep = keep & ~np.isnan(batting_avg)
+        avg_counts = avg_keep.sum(axis=1)
+        avg_sums = np.where(avg_keep, batting_avg, 0).sum(axis=1, dtype=np.float64)
+        
+        issues = []
+        for i in np.flatnonzero((games > 3) & (total_at_bats > 0) & (avg_counts > 0)):
+            calculated_avg = total_hits[i] / total_at_bats[i]
+            avg_batting_avg = avg_sums[i] / avg_counts[i]
+            if avg_batting_avg and abs(calculated_avg - avg_batting_avg) > 0.1:
+                issues.append(ValidationIssue(
+                    severity=ValidationSeverity.WARNING,
+                    category="data_consistency",
+                    description="Batting average inconsistency over date range",
+                    player_id=cube.player_ids[i],
+                    player_name=cube.player_names[i],
+                    context={
+                        "calculated_avg": float(calculated_avg),
+                        "reported_avg": float(avg_batting_avg),
+                        "date_range": f"{start_date} to {end_date}"
+                    }
+                ))
         
         return issues
     
@@ -708,7 +762,7 @@ class PlayerStatsValidator:
     
     def _generate_range_summary(self, start_date: date, end_date: date, issues: List[ValidationIssue]) -> Dict[str, Any]:
         """Generate summary statistics for date range validation."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -756,7 +810,7 @@ class PlayerStatsValidator:
             return summary
             
         finally:
-            conn.close()
+            cursor.close()
 
 
 def main():
@@ -29,6 +29,7 @@ parent_dir = Path(__file__).parent
 root_dir = parent_dir.parent
 sys.path.insert(0, str(root_dir))
 
+from data_pipeline.config.connection_provider import get_read_connection
 from data_pipeline.player_stats.config import get_config_for_environment
 
 # Set up logging
@@ -266,7 +267,7 @@ class PlayerStatsJobManager:
         Returns:
             JobSummary if found, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -305,7 +306,7 @@ class PlayerStatsJobManager:
             )
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_recent_jobs(self, limit: int = 20, job_type: str = None) -> List[JobSummary]:
         """
@@ -318,7 +319,7 @@ class PlayerStatsJobManager:
         Returns:
             List of JobSummary objects
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -369,7 +370,7 @@ class PlayerStatsJobManager:
             return jobs
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_jobs_by_date_range(self, start_date: date, end_date: date) -> List[JobSummary]:
         """
@@ -382,7 +383,7 @@ class PlayerStatsJobManager:
         Returns:
             List of JobSummary objects
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -432,7 +433,7 @@ class PlayerStatsJobManager:
             return jobs
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_collection_metrics(self, days_back: int = 30) -> CollectionMetrics:
         """
@@ -446,7 +447,7 @@ class PlayerStatsJobManager:
         """
         cutoff_date = datetime.now() - timedelta(days=days_back)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -505,7 +506,7 @@ class PlayerStatsJobManager:
             return metrics
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_daily_collection_status(self, target_date: date) -> Dict[str, Any]:
         """
@@ -517,7 +518,7 @@ class PlayerStatsJobManager:
         Returns:
             Dictionary with collection status information
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -573,7 +574,7 @@ class PlayerStatsJobManager:
             return status
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_failed_jobs_analysis(self, days_back: int = 7) -> Dict[str, Any]:
         """
@@ -587,7 +588,7 @@ class PlayerStatsJobManager:
         """
         cutoff_date = datetime.now() - timedelta(days=days_back)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -657,7 +658,7 @@ class PlayerStatsJobManager:
             return analysis
             
         finally:
-            conn.close()
+            cursor.close()
     
     def cleanup_old_jobs(self, days_to_keep: int = 90) -> Dict[str, int]:
         """
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Player Mapping Change Log
+
+Writers of player_mapping (YahooIDMatcher.update_player_mappings,
+YahooPlayerSearch.backfill_missing_yahoo_ids, build_player_mappings_d1) record
+the mlb_ids whose Yahoo ID they changed in player_mapping_changes. Yahoo ID
+backpropagation then touches only the daily_gkl_player_stats rows of those
+players, through an UPDATE ... FROM join on an mlb id index, in batches of
+ids, instead of re-deriving yahoo_player_id for the whole stats history.
+
+A run with no pending changes reads one indexed row and writes nothing.
+
+Usage:
+    python -m data_pipeline.player_stats.mapping_changes --environment production
+    python -m data_pipeline.player_stats.mapping_changes --mirror-d1
+    python -m data_pipeline.player_stats.mapping_changes --use-d1
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.sql_dump_writer import sql_literal
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TABLE = 'player_mapping_changes'
+MAPPING_TABLE = 'player_mapping'
+STATS_TABLE = 'daily_gkl_player_stats'
+
+# mlb ids per local UPDATE
+PROPAGATE_BATCH = 500
+# mlb ids per D1 statement (CASE arms are inlined literals, not bound params)
+D1_PROPAGATE_BATCH = 100
+
+
+def stats_mlb_column(environment: str, use_d1: bool = False) -> str:
+    """Name of the MLB id column in daily_gkl_player_stats."""
+    if use_d1 or environment == 'production':
+        return 'mlb_player_id'
+    return 'mlb_id'
+
+
+class MappingChangeLog:
+    """Records player_mapping changes and backpropagates them to daily stats."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 stats_column: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection holding player_mapping
+            environment: 'production' or 'test'
+            stats_column: Override the stats table's MLB id column
+        """
+        self.connection = connection
+        self.environment = environment
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        self.stats_column = stats_column or stats_mlb_column(environment, use_d1=not self.is_sqlite)
+        self._ensured = False
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            return self.connection.execute(sql, list(params)).rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        if self.is_sqlite:
+            self.connection.commit()
+
+    def ensure_tables(self):
+        """Create the change log and the stats MLB id index if missing."""
+        if self._ensured:
+            return
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mlb_id INTEGER NOT NULL,
+                source TEXT,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                propagated_at TIMESTAMP
+            )
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{CHANGE_TABLE}_pending
+            ON {CHANGE_TABLE}(propagated_at, change_id)
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_gkl_stats_{self.stats_column}
+            ON {STATS_TABLE}({self.stats_column})
+        """)
+        self._commit()
+        self._ensured = True
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, mlb_ids: Iterable[Any], source: str) -> int:
+        """
+        Log mlb_ids whose player_mapping Yahoo ID changed.
+
+        Args:
+            mlb_ids: MLB ids written by the caller
+            source: Name of the writer, for auditing
+
+        Returns:
+            Number of ids logged
+        """
+        ids = sorted({int(m) for m in mlb_ids if m is not None})
+        if not ids:
+            return 0
+        self.ensure_tables()
+        if self.is_sqlite:
+            self.connection.executemany(
+                f"INSERT INTO {CHANGE_TABLE} (mlb_id, source) VALUES (?, ?)",
+                [(mlb_id, source) for mlb_id in ids])
+        else:
+            statements = [
+                (f"INSERT INTO {CHANGE_TABLE} (mlb_id, source) VALUES "
+                 + ', '.join(f"({mlb_id}, {sql_literal(source)})" for mlb_id in ids[i:i + D1_PROPAGATE_BATCH]), [])
+                for i in range(0, len(ids), D1_PROPAGATE_BATCH)
+            ]
+            failures = [r for r in self.connection.execute_batch(statements) if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} change log batches failed: {failures[0].get('error')}")
+        self._commit()
+        logger.debug(f"Recorded {len(ids)} player mapping changes from {source}")
+        return len(ids)
+
+    def pending(self) -> Dict[int, int]:
+        """mlb_id -> highest pending change_id."""
+        self.ensure_tables()
+        rows = self._query(f"""
+            SELECT mlb_id, MAX(change_id) AS change_id
+            FROM {CHANGE_TABLE}
+            WHERE propagated_at IS NULL
+            GROUP BY mlb_id
+        """)
+        return {int(row['mlb_id']): int(row['change_id']) for row in rows}
+
+    # ------------------------------------------------------------------
+    # Backpropagation
+    # ------------------------------------------------------------------
+
+    def _propagate_batch(self, mlb_ids: Sequence[int]) -> int:
+        id_list = ', '.join(str(m) for m in mlb_ids)
+        return self._execute(f"""
+            UPDATE {STATS_TABLE}
+            SET yahoo_player_id = pm.yahoo_player_id
+            FROM {MAPPING_TABLE} pm
+            WHERE pm.mlb_id = {STATS_TABLE}.{self.stats_column}
+            AND {STATS_TABLE}.{self.stats_column} IN ({id_list})
+            AND pm.yahoo_player_id IS NOT NULL
+            AND ({STATS_TABLE}.yahoo_player_id IS NULL
+                 OR {STATS_TABLE}.yahoo_player_id != pm.yahoo_player_id)
+        """)
+
+    def mappings(self, mlb_ids: Sequence[int]) -> Dict[int, Any]:
+        """mlb_id -> current yahoo_player_id for the given ids."""
+        result = {}
+        for i in range(0, len(mlb_ids), PROPAGATE_BATCH):
+            batch = list(mlb_ids[i:i + PROPAGATE_BATCH])
+            rows = self._query(f"""
+                SELECT mlb_id, yahoo_player_id FROM {MAPPING_TABLE}
+                WHERE mlb_id IN ({', '.join(str(m) for m in batch)})
+                AND yahoo_player_id IS NOT NULL
+            """)
+            result.update({int(row['mlb_id']): row['yahoo_player_id'] for row in rows})
+        return result
+
+    def propagate(self, mirror=None) -> int:
+        """
+        Copy pending Yahoo ID changes into daily stats, then mark them done.
+
+        Args:
+            mirror: Optional D1Connection that receives the same changes as one
+                    batch of targeted UPDATEs (for a local change log)
+
+        Returns:
+            Number of stats rows updated on this connection
+        """
+        pending = self.pending()
+        if not pending:
+            logger.debug("No pending player mapping changes")
+            return 0
+
+        mlb_ids = sorted(pending)
+        updated = 0
+        for i in range(0, len(mlb_ids), PROPAGATE_BATCH):
+            updated += self._propagate_batch(mlb_ids[i:i + PROPAGATE_BATCH])
+        self._commit()
+
+        if mirror is not None:
+            mirror_d1(mirror, self.mappings(mlb_ids))
+
+        self._execute(f"""
+            UPDATE {CHANGE_TABLE} SET propagated_at = CURRENT_TIMESTAMP
+            WHERE propagated_at IS NULL AND change_id <= ?
+        """, [max(pending.values())])
+        self._commit()
+
+        logger.info(f"Backpropagated {len(mlb_ids)} changed mappings to {updated} stats rows")
+        return updated
+
+
+def mirror_d1(d1_conn, mappings: Dict[int, Any], stats_column: str = 'mlb_player_id') -> int:
+    """
+    Apply mlb_id -> yahoo_player_id changes to D1 daily stats as one batch.
+
+    Returns:
+        Number of D1 stats rows changed
+    """
+    if not mappings:
+        return 0
+    items = sorted(mappings.items())
+    statements = []
+    for i in range(0, len(items), D1_PROPAGATE_BATCH):
+        chunk = items[i:i + D1_PROPAGATE_BATCH]
+        arms = ' '.join(f"WHEN {mlb_id} THEN {sql_literal(str(yahoo_id))}" for mlb_id, yahoo_id in chunk)
+        id_list = ', '.join(str(mlb_id) for mlb_id, _ in chunk)
+        statements.append((f"""
+            UPDATE {STATS_TABLE}
+            SET yahoo_player_id = CASE {stats_column} {arms} END
+            WHERE {stats_column} IN ({id_list})
+            AND yahoo_player_id IS NOT CASE {stats_column} {arms} END
+        """, []))
+    results = d1_conn.execute_batch(statements)
+    failures = [r for r in results if not r.get('success', True)]
+    if failures:
+        raise RuntimeError(f"{len(failures)} D1 Yahoo ID batches failed: {failures[0].get('error')}")
+    changed = sum(r.get('changes', 0) for r in results)
+    logger.info(f"Mirrored {len(items)} changed mappings to {changed} D1 stats rows")
+    return changed
+
+
+def record_mapping_changes(connection, mlb_ids: Iterable[Any], source: str,
+                           environment: str = 'production') -> int:
+    """Post-write hook for player_mapping writers; logs instead of raising."""
+    try:
+        return MappingChangeLog(connection, environment).record(mlb_ids, source)
+    except Exception as e:
+        logger.error(f"Failed to record player mapping changes: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backpropagate changed player mappings to daily stats')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Propagate the change log kept in D1')
+    parser.add_argument('--mirror-d1', action='store_true',
+                        help='Also push local changes to D1 daily stats')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.use_d1 or args.mirror_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        d1_conn = D1Connection()
+    if args.use_d1:
+        connection = d1_conn
+    else:
+        from data_pipeline.player_stats.config import get_config_for_environment
+        connection = sqlite3.connect(get_config_for_environment(args.environment)['database_path'])
+
+    log = MappingChangeLog(connection, args.environment)
+    updated = log.propagate(mirror=d1_conn if args.mirror_d1 and not args.use_d1 else None)
+    print(f"Updated {updated} stats rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -28,6 +28,7 @@ parent_dir = Path(__file__).parent
 root_dir = parent_dir.parent
 sys.path.insert(0, str(root_dir))
 
+from data_pipeline.config.connection_provider import get_read_connection
 from data_pipeline.player_stats.config import get_config_for_environment
 from data_pipeline.player_stats.pybaseball_integration import PyBaseballIntegration
 
@@ -176,7 +177,7 @@ class PlayerIdMapper:
         Returns:
             PlayerMapping if found, None otherwise
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -216,7 +217,7 @@ class PlayerIdMapper:
             return None
             
         finally:
-            conn.close()
+            cursor.close()
     
     def save_mapping(self, mapping: PlayerMapping) -> bool:
         """
@@ -512,7 +513,7 @@ class PlayerIdMapper:
         Returns:
             Dictionary with mapping statistics
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = get_read_connection(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -566,7 +567,7 @@ class PlayerIdMapper:
             return stats
             
         finally:
-            conn.close()
+            cursor.close()
 
 
 def main():
@@ -29,6 +29,8 @@ root_dir = parent_dir.parent
 sys.path.insert(0, str(root_dir))
 
 from player_stats.config import get_config_for_environment
+from data_pipeline.config.connection_provider import get_read_connection
+from player_stats.stats_cube import StatsCube, current_cube
 
 # Set up logging
 logging.basicConfig(
@@ -139,16 +141,17 @@ class PlayerStatsRepository:
     data with support for filtering by date, player, team, and other criteria.
     """
     
-    def __init__(self, environment: str = "production"):
+    def __init__(self, environment: str = "production", db_path=None):
         """
         Initialize the repository.
         
         Args:
             environment: 'production' or 'test'
+            db_path: Optional database override (e.g. the local D1 mirror)
         """
         self.environment = environment
         self.config = get_config_for_environment(environment)
-        self.db_path = self.config['database_path']
+        self.db_path = db_path or self.config['database_path']
         self.stats_table = self.config['gkl_player_stats_table']
         self.mapping_table = self.config['player_mapping_table']
         
@@ -156,6 +159,82 @@ class PlayerStatsRepository:
         logger.info(f"Database: {self.db_path}")
         logger.info(f"Stats table: {self.stats_table}")
     
+    # Column list shared by every PlayerStatsRecord query, in constructor order
+    RECORD_COLUMNS = """
+        yahoo_player_id, player_name, team_code, date, games_played,
+        has_batting_data, has_pitching_data,
+        batting_at_bats, batting_runs, batting_hits, batting_doubles,
+        batting_triples, batting_home_runs, batting_rbis, batting_stolen_bases,
+        batting_walks, batting_strikeouts, batting_avg, batting_obp,
+        batting_slg, batting_ops,
+        pitching_games_started, pitching_wins, pitching_losses,
+        pitching_saves, pitching_holds, pitching_innings_pitched,
+        pitching_hits_allowed, pitching_runs_allowed, pitching_earned_runs,
+        pitching_walks_allowed, pitching_strikeouts, pitching_home_runs_allowed,
+        pitching_era, pitching_whip, pitching_quality_starts,
+        confidence_score, validation_status
+    """
+    
+    # Maximum bound parameters per IN (...) chunk
+    IN_CHUNK_SIZE = 500
+    
+    @staticmethod
+    def _row_to_record(row: Tuple) -> PlayerStatsRecord:
+        """Build a PlayerStatsRecord from a RECORD_COLUMNS row."""
+        return PlayerStatsRecord(
+            yahoo_player_id=row[0],
+            player_name=row[1],
+            team_code=row[2],
+            date=date.fromisoformat(row[3]),
+            games_played=row[4],
+            has_batting_data=bool(row[5]),
+            has_pitching_data=bool(row[6]),
+            batting_at_bats=row[7],
+            batting_runs=row[8],
+            batting_hits=row[9],
+            batting_doubles=row[10],
+            batting_triples=row[11],
+            batting_home_runs=row[12],
+            batting_rbis=row[13],
+            batting_stolen_bases=row[14],
+            batting_walks=row[15],
+            batting_strikeouts=row[16],
+            batting_avg=row[17],
+            batting_obp=row[18],
+            batting_slg=row[19],
+            batting_ops=row[20],
+            pitching_games_started=row[21],
+            pitching_wins=row[22],
+            pitching_losses=row[23],
+            pitching_saves=row[24],
+            pitching_holds=row[25],
+            pitching_innings_pitched=row[26],
+            pitching_hits_allowed=row[27],
+            pitching_runs_allowed=row[28],
+            pitching_earned_runs=row[29],
+            pitching_walks_allowed=row[30],
+            pitching_strikeouts=row[31],
+            pitching_home_runs_allowed=row[32],
+            pitching_era=row[33],
+            pitching_whip=row[34],
+            pitching_quality_starts=row[35],
+            confidence_score=row[36],
+            validation_status=row[37]
+        )
+    
+    def _read_connection(self) -> sqlite3.Connection:
+        """
+        Read-only connection reused across calls on the current thread.
+        
+        Returns:
+            sqlite3.Connection opened with mode=ro
+        """
+        return get_read_connection(self.db_path)
+    
+    def _chunks(self, player_ids: List[str]) -> List[List[str]]:
+        ids = list(dict.fromkeys(str(pid) for pid in player_ids if pid))
+        return [ids[i:i + self.IN_CHUNK_SIZE] for i in range(0, len(ids), self.IN_CHUNK_SIZE)]
+    
     def get_player_stats(self, yahoo_player_id: str, start_date: date, 
                         end_date: date = None) -> List[PlayerStatsRecord]:
         """
@@ -169,78 +248,43 @@ class PlayerStatsRepository:
         Returns:
             List of PlayerStatsRecord objects
         """
+        return self.get_stats_for_players([yahoo_player_id], start_date, end_date).get(
+            str(yahoo_player_id), [])
+    
+    def get_stats_for_players(self, player_ids: List[str], start_date: date,
+                              end_date: date = None) -> Dict[str, List[PlayerStatsRecord]]:
+        """
+        Get daily statistics for many players over a date range.
+        
+        One query per chunk of IN_CHUNK_SIZE ids on a shared read-only
+        connection, instead of one connection and query per player.
+        
+        Args:
+            player_ids: Yahoo Fantasy player IDs
+            start_date: Start date for query
+            end_date: End date for query (defaults to start_date)
+            
+        Returns:
+            Dictionary of yahoo_player_id -> date-ordered PlayerStatsRecord list
+            (players without rows are omitted)
+        """
         if end_date is None:
             end_date = start_date
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(f"""
-                SELECT yahoo_player_id, player_name, team_code, date, games_played,
-                       has_batting_data, has_pitching_data,
-                       batting_at_bats, batting_runs, batting_hits, batting_doubles,
-                       batting_triples, batting_home_runs, batting_rbis, batting_stolen_bases,
-                       batting_walks, batting_strikeouts, batting_avg, batting_obp,
-                       batting_slg, batting_ops,
-                       pitching_games_started, pitching_wins, pitching_losses,
-                       pitching_saves, pitching_holds, pitching_innings_pitched,
-                       pitching_hits_allowed, pitching_runs_allowed, pitching_earned_runs,
-                       pitching_walks_allowed, pitching_strikeouts, pitching_home_runs_allowed,
-                       pitching_era, pitching_whip, pitching_quality_starts,
-                       confidence_score, validation_status
+        conn = self._read_connection()
+        results: Dict[str, List[PlayerStatsRecord]] = {}
+        for chunk in self._chunks(player_ids):
+            rows = conn.execute(f"""
+                SELECT {self.RECORD_COLUMNS}
                 FROM {self.stats_table}
-                WHERE yahoo_player_id = ? AND date BETWEEN ? AND ?
-                ORDER BY date ASC
-            """, (yahoo_player_id, start_date.isoformat(), end_date.isoformat()))
-            
-            records = []
-            for row in cursor.fetchall():
-                records.append(PlayerStatsRecord(
-                    yahoo_player_id=row[0],
-                    player_name=row[1],
-                    team_code=row[2],
-                    date=date.fromisoformat(row[3]),
-                    games_played=row[4],
-                    has_batting_data=bool(row[5]),
-                    has_pitching_data=bool(row[6]),
-                    batting_at_bats=row[7],
-                    batting_runs=row[8],
-                    batting_hits=row[9],
-                    batting_doubles=row[10],
-                    batting_triples=row[11],
-                    batting_home_runs=row[12],
-                    batting_rbis=row[13],
-                    batting_stolen_bases=row[14],
-                    batting_walks=row[15],
-                    batting_strikeouts=row[16],
-                    batting_avg=row[17],
-                    batting_obp=row[18],
-                    batting_slg=row[19],
-                    batting_ops=row[20],
-                    pitching_games_started=row[21],
-                    pitching_wins=row[22],
-                    pitching_losses=row[23],
-                    pitching_saves=row[24],
-                    pitching_holds=row[25],
-                    pitching_innings_pitched=row[26],
-                    pitching_hits_allowed=row[27],
-                    pitching_runs_allowed=row[28],
-                    pitching_earned_runs=row[29],
-                    pitching_walks_allowed=row[30],
-                    pitching_strikeouts=row[31],
-                    pitching_home_runs_allowed=row[32],
-                    pitching_era=row[33],
-                    pitching_whip=row[34],
-                    pitching_quality_starts=row[35],
-                    confidence_score=row[36],
-                    validation_status=row[37]
-                ))
-            
-            return records
-            
-        finally:
-            conn.close()
+                WHERE yahoo_player_id IN ({', '.join(['?'] * len(chunk))})
+                AND date BETWEEN ? AND ?
+                ORDER BY yahoo_player_id, date ASC
+            """, chunk + [start_date.isoformat(), end_date.isoformat()]).fetchall()
+            for row in rows:
+                results.setdefault(str(row[0]), []).append(self._row_to_record(row))
+        
+        return results
     
     def get_stats_for_date(self, target_date: date, 
                           player_ids: List[str] = None) -> List[PlayerStatsRecord]:
@@ -254,7 +298,7 @@ class PlayerStatsRepository:
         Returns:
             List of PlayerStatsRecord objects
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         try:
@@ -332,7 +376,7 @@ class PlayerStatsRepository:
             return records
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_player_aggregation(self, yahoo_player_id: str, start_date: date, 
                              end_date: date) -> Optional[PlayerStatsAggregation]:
@@ -347,13 +391,37 @@ class PlayerStatsRepository:
         Returns:
             PlayerStatsAggregation object or None if no data
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.get_player_aggregations([yahoo_player_id], start_date, end_date).get(
+            str(yahoo_player_id))
+    
+    def get_player_aggregations(self, player_ids: List[str], start_date: date,
+                                end_date: date) -> Dict[str, PlayerStatsAggregation]:
+        """
+        Get aggregated statistics for many players over a date range.
         
-        try:
-            cursor.execute(f"""
+        Runs one grouped query per chunk of IN_CHUNK_SIZE ids. Rate stats are
+        derived from the summed components (H/AB, (H+BB+HBP)/(AB+BB+HBP+SF),
+        TB/AB, 9*ER/IP, (BB+H)/IP) rather than averaging daily rates, so days
+        with few at-bats or innings are not over-weighted. Name and team code
+        come from the player's latest row in the range.
+        
+        Args:
+            player_ids: Yahoo Fantasy player IDs
+            start_date: Start date for aggregation
+            end_date: End date for aggregation
+            
+        Returns:
+            Dictionary of yahoo_player_id -> PlayerStatsAggregation
+            (players without rows are omitted)
+        """
+        conn = self._read_connection()
+        aggregations: Dict[str, PlayerStatsAggregation] = {}
+        
+        for chunk in self._chunks(player_ids):
+            rows = conn.execute(f"""
                 SELECT 
-                    player_name, team_code,
+                    yahoo_player_id,
+                    MAX(date) as last_date, player_name, team_code,
                     COUNT(*) as total_games,
                     COALESCE(SUM(batting_at_bats), 0) as total_at_bats,
                     COALESCE(SUM(batting_runs), 0) as total_runs,
@@ -365,10 +433,8 @@ class PlayerStatsRepository:
                     COALESCE(SUM(batting_stolen_bases), 0) as total_stolen_bases,
                     COALESCE(SUM(batting_walks), 0) as total_walks,
                     COALESCE(SUM(batting_strikeouts), 0) as total_strikeouts,
-                    AVG(batting_avg) as avg_batting_avg,
-                    AVG(batting_obp) as avg_obp,
-                    AVG(batting_slg) as avg_slg,
-                    AVG(batting_ops) as avg_ops,
+                    COALESCE(SUM(batting_hit_by_pitch), 0) as total_hit_by_pitch,
+                    COALESCE(SUM(batting_sacrifice_flies), 0) as total_sacrifice_flies,
                     COALESCE(SUM(pitching_games_started), 0) as total_games_started,
                     COALESCE(SUM(pitching_wins), 0) as total_wins,
                     COALESCE(SUM(pitching_losses), 0) as total_losses,
@@ -381,58 +447,64 @@ class PlayerStatsRepository:
                     COALESCE(SUM(pitching_walks_allowed), 0) as total_walks_allowed,
                     COALESCE(SUM(pitching_strikeouts), 0) as total_strikeouts_pitched,
                     COALESCE(SUM(pitching_home_runs_allowed), 0) as total_home_runs_allowed,
-                    AVG(pitching_era) as avg_era,
-                    AVG(pitching_whip) as avg_whip,
                     COALESCE(SUM(pitching_quality_starts), 0) as total_quality_starts
                 FROM {self.stats_table}
-                WHERE yahoo_player_id = ? AND date BETWEEN ? AND ?
-                GROUP BY yahoo_player_id, player_name, team_code
-            """, (yahoo_player_id, start_date.isoformat(), end_date.isoformat()))
-            
-            row = cursor.fetchone()
-            if not row:
-                return None
-            
-            return PlayerStatsAggregation(
-                yahoo_player_id=yahoo_player_id,
-                player_name=row[0],
-                team_code=row[1],
-                start_date=start_date,
-                end_date=end_date,
-                total_games=row[2],
-                total_at_bats=row[3],
-                total_runs=row[4],
-                total_hits=row[5],
-                total_doubles=row[6],
-                total_triples=row[7],
-                total_home_runs=row[8],
-                total_rbis=row[9],
-                total_stolen_bases=row[10],
-                total_walks=row[11],
-                total_strikeouts=row[12],
-                avg_batting_avg=row[13],
-                avg_obp=row[14],
-                avg_slg=row[15],
-                avg_ops=row[16],
-                total_games_started=row[17],
-                total_wins=row[18],
-                total_losses=row[19],
-                total_saves=row[20],
-                total_holds=row[21],
-                total_innings_pitched=row[22],
-                total_hits_allowed=row[23],
-                total_runs_allowed=row[24],
-                total_earned_runs=row[25],
-                total_walks_allowed=row[26],
-                total_strikeouts_pitched=row[27],
-                total_home_runs_allowed=row[28],
-                avg_era=row[29],
-                avg_whip=row[30],
-                total_quality_starts=row[31]
-            )
+                WHERE yahoo_player_id IN ({', '.join(['?'] * len(chunk))})
+                AND date BETWEEN ? AND ?
+                GROUP BY yahoo_player_id
+            """, chunk + [start_date.isoformat(), end_date.isoformat()]).fetchall()
             
-        finally:
-            conn.close()
+            for row in rows:
+                (player_id, _, player_name, team_code, games,
+                 ab, runs, hits, doubles, triples, hr, rbis, sb, bb, so, hbp, sf,
+                 gs, wins, losses, saves, holds, ip, h_allowed, r_allowed, er,
+                 bb_allowed, k_pitched, hr_allowed, qs) = row
+                
+                total_bases = hits + doubles + 2 * triples + 3 * hr
+                obp_denominator = ab + bb + hbp + sf
+                avg = hits / ab if ab else None
+                obp = (hits + bb + hbp) / obp_denominator if obp_denominator else None
+                slg = total_bases / ab if ab else None
+                
+                aggregations[str(player_id)] = PlayerStatsAggregation(
+                    yahoo_player_id=str(player_id),
+                    player_name=player_name,
+                    team_code=team_code,
+                    start_date=start_date,
+                    end_date=end_date,
+                    total_games=games,
+                    total_at_bats=ab,
+                    total_runs=runs,
+                    total_hits=hits,
+                    total_doubles=doubles,
+                    total_triples=triples,
+                    total_home_runs=hr,
+                    total_rbis=rbis,
+                    total_stolen_bases=sb,
+                    total_walks=bb,
+                    total_strikeouts=so,
+                    avg_batting_avg=avg,
+                    avg_obp=obp,
+                    avg_slg=slg,
+                    avg_ops=obp + slg if obp is not None and slg is not None else None,
+                    total_games_started=gs,
+                    total_wins=wins,
+                    total_losses=losses,
+                    total_saves=saves,
+                    total_holds=holds,
+                    total_innings_pitched=ip,
+                    total_hits_allowed=h_allowed,
+                    total_runs_allowed=r_allowed,
+                    total_earned_runs=er,
+                    total_walks_allowed=bb_allowed,
+                    total_strikeouts_pitched=k_pitched,
+                    total_home_runs_allowed=hr_allowed,
+                    avg_era=9 * er / ip if ip else None,
+                    avg_whip=(bb_allowed + h_allowed) / ip if ip else None,
+                    total_quality_starts=qs
+                )
+        
+        return aggregations
     
     def get_team_stats_for_date(self, team_code: str, target_date: date) -> List[PlayerStatsRecord]:
         """
@@ -445,7 +517,7 @@ class PlayerStatsRepository:
         Returns:
             List of PlayerStatsRecord objects for the team
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         try:
@@ -513,7 +585,7 @@ class PlayerStatsRepository:
             return records
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_available_dates(self, start_date: date = None, 
                            end_date: date = None) -> List[date]:
@@ -527,7 +599,7 @@ class PlayerStatsRepository:
         Returns:
             List of dates with data available
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         try:
@@ -552,7 +624,7 @@ class PlayerStatsRepository:
             return [date.fromisoformat(row[0]) for row in cursor.fetchall()]
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_data_coverage_summary(self, start_date: date, end_date: date) -> Dict[str, Any]:
         """
@@ -565,7 +637,7 @@ class PlayerStatsRepository:
         Returns:
             Dictionary with coverage statistics
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         try:
@@ -640,7 +712,7 @@ class PlayerStatsRepository:
             return summary
             
         finally:
-            conn.close()
+            cursor.close()
     
     def search_players_by_name(self, name_query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -653,7 +725,7 @@ class PlayerStatsRepository:
         Returns:
             List of player records with recent stats
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         try:
@@ -693,7 +765,7 @@ class PlayerStatsRepository:
             return players
             
         finally:
-            conn.close()
+            cursor.close()
     
     def get_top_performers(self, stat_category: str, start_date: date, 
                           end_date: date, limit: int = 10, 
@@ -711,7 +783,7 @@ class PlayerStatsRepository:
         Returns:
             List of top performers with their stats
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._read_connection()
         cursor = conn.cursor()
         
         # Map stat categories to SQL columns
@@ -776,7 +848,153 @@ class PlayerStatsRepository:
             return performers
             
         finally:
-            conn.close()
+            cursor.close()
+
+    # ------------------------------------------------------------------
+    # Vectorized analytics over the memory-mapped stats cube
+    # ------------------------------------------------------------------
+    
+    # top-performer category -> (cube stat, aggregation)
+    CUBE_TOP_STATS = {
+        'batting': {
+            'home_runs': ('batting_home_runs', 'sum'),
+            'rbis': ('batting_rbis', 'sum'),
+            'runs': ('batting_runs', 'sum'),
+            'hits': ('batting_hits', 'sum'),
+            'stolen_bases': ('batting_stolen_bases', 'sum'),
+            'avg': ('batting_avg', 'mean'),
+            'ops': ('batting_ops', 'mean'),
+        },
+        'pitching': {
+            'wins': ('pitching_wins', 'sum'),
+            'saves': ('pitching_saves', 'sum'),
+            'strikeouts': ('pitching_strikeouts', 'sum'),
+            'innings': ('pitching_innings_pitched', 'sum'),
+            'era': ('pitching_era', 'mean'),
+            'whip': ('pitching_whip', 'mean'),
+            'quality_starts': ('pitching_quality_starts', 'sum'),
+        },
+    }
+    
+    def get_stats_cube(self, season: int) -> Optional[StatsCube]:
+        """
+        Open the memory-mapped stats cube for a season.
+        
+        Args:
+            season: Season year
+            
+        Returns:
+            StatsCube, or None if the season has not been built, the
+            repository reads another database (e.g. the D1 mirror) or the
+            cube is behind the stats table
+        """
+        return current_cube(season, self.environment, self.db_path, self.stats_table)
+    
+    def _cube_ranges(self, start_date: date, end_date: date) -> List[Tuple[StatsCube, date, date]]:
+        ranges = []
+        for season in range(start_date.year, end_date.year + 1):
+            cube = self.get_stats_cube(season)
+            if cube is not None:
+                ranges.append((cube, max(start_date, date(season, 1, 1)), min(end_date, date(season, 12, 31))))
+        return ranges
+    
+    def get_range_totals(self, start_date: date, end_date: date,
+                         stats: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Sum stats over a date range for every player at once.
+        
+        Args:
+            start_date: Start date
+            end_date: End date
+            stats: Cube stats to sum (default: all)
+            
+        Returns:
+            DataFrame indexed by yahoo_player_id with player_name, team_code,
+            games and one column per stat
+        """
+        frames = [cube.totals_frame(lo, hi, stats) for cube, lo, hi in self._cube_ranges(start_date, end_date)]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        combined = pd.concat(frames)
+        labels = combined[['player_name', 'team_code']].groupby(level=0).last()
+        totals = combined.drop(columns=['player_name', 'team_code']).groupby(level=0).sum()
+        return labels.join(totals)
+    
+    def get_top_performers_from_cube(self, stat_category: str, start_date: date,
+                                     end_date: date, limit: int = 10,
+                                     player_type: str = "batting",
+                                     min_games: int = 3) -> List[Dict[str, Any]]:
+        """
+        Vectorized get_top_performers over the stats cube.
+        
+        Same categories and output as get_top_performers, ranked over one row
+        per player (latest name and team) instead of per team stint.
+        """
+        categories = self.CUBE_TOP_STATS.get(player_type, {})
+        if stat_category not in categories:
+            raise ValueError(f"Invalid stat category: {stat_category} for type: {player_type}")
+        stat, agg = categories[stat_category]
+        mask = 'has_batting_data' if player_type == 'batting' else 'has_pitching_data'
+        
+        frames = []
+        for cube, lo, hi in self._cube_ranges(start_date, end_date):
+            frames.append(pd.DataFrame({
+                'player_name': cube.player_names,
+                'team_code': cube.team_codes,
+                'games': cube.range_sums(lo, hi, [mask], mask)[:, 0],
+                'total': cube.range_sums(lo, hi, [stat], mask)[:, 0],
+                'count': cube.range_counts(lo, hi, [stat], mask)[:, 0],
+            }, index=pd.Index(cube.player_ids, name='yahoo_player_id')))
+        if not frames:
+            return []
+        combined = pd.concat(frames)
+        if len(frames) > 1:
+            labels = combined[['player_name', 'team_code']].groupby(level=0).last()
+            combined = labels.join(combined[['games', 'total', 'count']].groupby(level=0).sum())
+        
+        combined = combined[combined['games'] >= min_games]
+        if agg == 'mean':
+            combined = combined[combined['count'] > 0]
+            values = combined['total'] / combined['count']
+        else:
+            values = combined['total']
+        top = values.nlargest(limit)
+        
+        return [{
+            'yahoo_player_id': player_id,
+            'player_name': combined.at[player_id, 'player_name'],
+            'team_code': combined.at[player_id, 'team_code'],
+            'games': int(combined.at[player_id, 'games']),
+            'stat_category': stat_category,
+            'stat_value': float(value),
+            'player_type': player_type
+        } for player_id, value in top.items()]
+    
+    def get_rolling_totals(self, stat: str, window: int, season: int,
+                           start_date: date = None, end_date: date = None) -> pd.DataFrame:
+        """
+        Trailing-window sums of a stat for every player and day of a season.
+        
+        Args:
+            stat: Cube stat
+            window: Window length in days
+            season: Season year
+            start_date: Optional first day
+            end_date: Optional last day
+            
+        Returns:
+            DataFrame (players x dates); empty if the cube is not built
+        """
+        cube = self.get_stats_cube(season)
+        if cube is None:
+            return pd.DataFrame()
+        rolled = cube.rolling_sums([stat], window, start_date, end_date)[..., 0]
+        day_range = cube.day_slice(start_date, end_date)
+        return pd.DataFrame(rolled, index=pd.Index(cube.player_ids, name='yahoo_player_id'),
+                            columns=cube.dates()[day_range])
 
 
 def main():
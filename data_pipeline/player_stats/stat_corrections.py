@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+Stat Correction Detector
+
+Finds MLB stat corrections inside RefreshStrategy.STAT_CORRECTION_WINDOW
+without re-collecting every boxscore of every day in the window:
+
+    1. MLB's /game/changes feed lists the games updated since the feed
+       watermark (falls back to every final game in the window if the feed is
+       unavailable)
+    2. Only those games' boxscores are fetched and hashed per game
+       (BOXSCORE_HASHER); games whose hash matches the stored
+       one are skipped
+    3. Changed games (plus doubleheader partners, since daily rows are per
+       player per day) are re-collected, diffed against the stored rows of
+       the teams involved by (mlb id, date) with numpy, and the differences
+       bulk-inserted into stat_corrections
+    4. Corrected players' rows are rewritten, players missing from the stored
+       rows are added and players no longer in the boxscore are deleted
+
+Game hashes live in stat_game_hashes; ComprehensiveStatsCollector runs record a
+baseline for each freshly collected date through record_baseline(). The feed
+watermark lives in stat_correction_state and only detect() moves it, after a
+run that covered the whole correction window, so feed entries are never
+dropped by a narrower run.
+
+Usage:
+    python -m data_pipeline.player_stats.stat_corrections --environment production
+    python -m data_pipeline.player_stats.stat_corrections --start 2025-08-01 --end 2025-08-07
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.sql_dump_writer import sql_literal
+from data_pipeline.player_stats.mapping_changes import stats_mlb_column
+from data_pipeline.common.content_hash import BatchHasher
+from scripts.change_tracking import RefreshStrategy
+
+logger = logging.getLogger(__name__)
+
+GAME_HASH_TABLE = 'stat_game_hashes'
+STATE_TABLE = 'stat_correction_state'
+CORRECTIONS_TABLE = 'stat_corrections'
+
+# stat_correction_state key of the /game/changes updatedSince watermark
+FEED_WATERMARK = 'change_feed_since'
+
+# mlb ids per IN (...) list; D1 caps bound parameters per statement
+LOCAL_ID_BATCH = 500
+D1_ID_BATCH = 90
+# correction rows per D1 INSERT (inlined literals)
+D1_INSERT_BATCH = 100
+
+# Counting stats compared for corrections (present in both stats schemas;
+# rate stats are derived from these)
+COMPARED_STATS = [
+    'batting_plate_appearances', 'batting_at_bats', 'batting_runs', 'batting_hits',
+    'batting_doubles', 'batting_triples', 'batting_home_runs', 'batting_rbis',
+    'batting_stolen_bases', 'batting_caught_stealing', 'batting_walks',
+    'batting_intentional_walks', 'batting_strikeouts', 'batting_hit_by_pitch',
+    'batting_sacrifice_hits', 'batting_sacrifice_flies',
+    'pitching_games_started', 'pitching_complete_games', 'pitching_shutouts',
+    'pitching_wins', 'pitching_losses', 'pitching_saves', 'pitching_blown_saves',
+    'pitching_holds', 'pitching_innings_pitched', 'pitching_hits_allowed',
+    'pitching_runs_allowed', 'pitching_earned_runs', 'pitching_home_runs_allowed',
+    'pitching_walks_allowed', 'pitching_intentional_walks_allowed', 'pitching_strikeouts',
+    'pitching_hit_batters', 'pitching_wild_pitches', 'pitching_balks',
+]
+
+
+BOXSCORE_HASHER = BatchHasher(('game_pk', 'date', 'player', 'category', 'stat', 'value'))
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def boxscore_hash(game_pk: int, game_date: str, boxscore: Dict[str, Any]) -> str:
+    """
+    Content hash of a game's per-player batting and pitching lines.
+
+    Games stored with a legacy (pre-BatchHasher) hash read as changed once;
+    the row diff then finds no corrections and the new hash is stored.
+    """
+    rows = [
+        (game_pk, game_date, key, category, stat, value)
+        for side in ('away', 'home')
+        for key, player in boxscore.get('teams', {}).get(side, {}).get('players', {}).items()
+        for category in ('batting', 'pitching')
+        for stat, value in (player.get('stats', {}).get(category) or {}).items()
+    ]
+    return BOXSCORE_HASHER.digest_rows(rows)
+
+
+def diff_stat_rows(old_rows: pd.DataFrame, new_rows: pd.DataFrame,
+                   stats: List[str] = COMPARED_STATS) -> pd.DataFrame:
+    """
+    Stat-level differences between stored and re-collected rows of one date.
+
+    Args:
+        old_rows: Stored rows with an mlb_id column and the stat columns
+        new_rows: Re-collected rows with the same columns plus player_name
+
+    Returns:
+        One row per changed (player, stat) with player_id, player_name,
+        stat_category, stat_name, old_value, new_value, difference
+    """
+    columns = ['player_id', 'player_name', 'stat_category', 'stat_name',
+               'old_value', 'new_value', 'difference']
+    if old_rows.empty or new_rows.empty:
+        return pd.DataFrame(columns=columns)
+
+    old = old_rows.drop_duplicates('mlb_id', keep='last').set_index('mlb_id')
+    new = new_rows.drop_duplicates('mlb_id', keep='last').set_index('mlb_id')
+    players = old.index.intersection(new.index)
+    stats = [s for s in stats if s in old.columns and s in new.columns]
+
+    old_values = old.loc[players, stats].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=float)
+    new_values = new.loc[players, stats].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=float)
+    rows, cols = np.nonzero(~np.isclose(old_values, new_values, atol=1e-6))
+
+    stat_columns = np.array(stats, dtype=object)[cols]
+    categories = np.where([s.startswith('batting_') for s in stat_columns], 'batting', 'pitching')
+    return pd.DataFrame({
+        'player_id': players.to_numpy()[rows].astype(int),
+        'player_name': new.loc[players, 'player_name'].to_numpy()[rows],
+        'stat_category': categories,
+        'stat_name': [s.split('_', 1)[1] for s in stat_columns],
+        'old_value': old_values[rows, cols],
+        'new_value': new_values[rows, cols],
+        'difference': new_values[rows, cols] - old_values[rows, cols],
+    }, columns=columns)
+
+
+class StatCorrectionDetector:
+    """Refetches only changed MLB games and records stat corrections."""
+
+    def __init__(self, collector, window_days: int = RefreshStrategy.STAT_CORRECTION_WINDOW):
+        """
+        Args:
+            collector: ComprehensiveStatsCollector (supplies the connection,
+                       MLB API access and row building)
+            window_days: Days back to check for corrections
+        """
+        self.collector = collector
+        self.window_days = window_days
+        self.use_d1 = collector.use_d1
+        self.stats_column = stats_mlb_column(collector.environment, collector.use_d1)
+        self._ensured = False
+
+    def _rows(self, query: str, params: tuple = ()) -> List[tuple]:
+        result = self.collector._execute_query(query, params)
+        if self.use_d1:
+            # D1 rows are dicts keyed by column
+            return [tuple(row.values()) for row in result.get('results', [])]
+        return result.fetchall()
+
+    # ------------------------------------------------------------------
+    # Game hashes
+    # ------------------------------------------------------------------
+
+    def ensure_table(self):
+        """Create the per-game hash, watermark and corrections tables if missing."""
+        if self._ensured:
+            return
+        self.collector._execute_query(f"""
+            CREATE TABLE IF NOT EXISTS {GAME_HASH_TABLE} (
+                game_pk INTEGER PRIMARY KEY,
+                date TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_checked TEXT NOT NULL,
+                last_modified TEXT
+            )
+        """)
+        self.collector._execute_query(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        # Also created by the change tracking schema, which may not be applied
+        self.collector._execute_query(f"""
+            CREATE TABLE IF NOT EXISTS {CORRECTIONS_TABLE} (
+                correction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                player_id INTEGER NOT NULL,
+                player_name TEXT,
+                date TEXT NOT NULL,
+                stat_category TEXT,
+                stat_name TEXT,
+                old_value TEXT,
+                new_value TEXT,
+                difference REAL,
+                correction_source TEXT,
+                correction_detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                job_id TEXT
+            )
+        """)
+        self.collector._execute_query(
+            f"CREATE INDEX IF NOT EXISTS idx_stat_corrections_player ON {CORRECTIONS_TABLE}(player_id)")
+        self.collector._execute_query(
+            f"CREATE INDEX IF NOT EXISTS idx_stat_corrections_date ON {CORRECTIONS_TABLE}(date)")
+        self.collector._commit()
+        self._ensured = True
+
+    def stored_hashes(self, game_pks: Iterable[int]) -> Dict[int, str]:
+        """game_pk -> stored content hash."""
+        pks = sorted(set(game_pks))
+        if not pks:
+            return {}
+        self.ensure_table()
+        rows = self._rows(
+            f"SELECT game_pk, content_hash FROM {GAME_HASH_TABLE} "
+            f"WHERE game_pk IN ({','.join('?' * len(pks))})", tuple(pks))
+        return {int(row[0]): row[1] for row in rows}
+
+    def store_hashes(self, hashes: Dict[int, str], game_date: str, checked_at: str):
+        """Upsert game hashes; last_modified moves only when the hash changes."""
+        if not hashes:
+            return
+        self.ensure_table()
+        for game_pk, content_hash in hashes.items():
+            self.collector._execute_query(f"""
+                INSERT INTO {GAME_HASH_TABLE} (game_pk, date, content_hash, last_checked, last_modified)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(game_pk) DO UPDATE SET
+                    last_checked = excluded.last_checked,
+                    last_modified = CASE WHEN content_hash != excluded.content_hash
+                                         THEN excluded.last_checked ELSE last_modified END,
+                    content_hash = excluded.content_hash
+            """, (game_pk, game_date, content_hash, checked_at, checked_at))
+        self.collector._commit()
+
+    def feed_watermark(self) -> Optional[str]:
+        """UTC timestamp the next /game/changes query starts from."""
+        self.ensure_table()
+        rows = self._rows(f"SELECT value FROM {STATE_TABLE} WHERE name = ?", (FEED_WATERMARK,))
+        return rows[0][0] if rows else None
+
+    def advance_feed_watermark(self, since: str):
+        """Move the feed watermark (only after a full-window check)."""
+        self.ensure_table()
+        self.collector._execute_query(f"""
+            INSERT INTO {STATE_TABLE} (name, value, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        """, (FEED_WATERMARK, since, _utc_now()))
+        self.collector._commit()
+
+    def record_baseline(self, game_date: str) -> int:
+        """Hash the boxscores the collector just fetched for a date."""
+        checked_at = _utc_now()
+        hashes = {game_pk: boxscore_hash(game_pk, game_date, boxscore)
+                  for game_pk, boxscore in self.collector.boxscores.items() if boxscore}
+        self.store_hashes(hashes, game_date, checked_at)
+        return len(hashes)
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+
+    def changed_games(self, since: str, start_date: str, end_date: str) -> Optional[Dict[str, Set[int]]]:
+        """
+        Games in the window updated since a UTC timestamp, by official date.
+
+        Returns:
+            {date: {game_pk, ...}}, or None if the change feed is unavailable
+        """
+        data = self.collector.pybaseball_integration._mlb_api_request(
+            "/game/changes", params={"sportId": 1, "updatedSince": since})
+        if data is None:
+            return None
+
+        changed: Dict[str, Set[int]] = {}
+        for date_data in data.get('dates', []):
+            for game in date_data.get('games', []):
+                game_date = game.get('officialDate') or date_data.get('date')
+                if game_date and start_date <= game_date <= end_date:
+                    changed.setdefault(game_date, set()).add(int(game['gamePk']))
+        return changed
+
+    @staticmethod
+    def with_doubleheaders(games: List[Dict], game_pks: Set[int]) -> List[Dict]:
+        """Games sharing a team with the given ones (daily rows span both games)."""
+        selected = {g['game_id'] for g in games if g['game_id'] in game_pks}
+        while True:
+            teams = {t for g in games if g['game_id'] in selected for t in (g['home_team'], g['away_team'])}
+            expanded = {g['game_id'] for g in games if g['home_team'] in teams or g['away_team'] in teams}
+            if expanded == selected:
+                return [g for g in games if g['game_id'] in selected]
+            selected = expanded
+
+    def has_rows(self, game_date: str) -> bool:
+        """Whether a date has been collected at all."""
+        return bool(self._rows(
+            f"SELECT 1 FROM {self.collector.stats_table} WHERE date = ? LIMIT 1", (game_date,)))
+
+    def load_rows(self, game_date: str, teams: List[str]) -> pd.DataFrame:
+        """Stored stat rows of every player of the given teams on a date."""
+        rows = self._rows(f"""
+            SELECT {self.stats_column}, player_name, {', '.join(COMPARED_STATS)}
+            FROM {self.collector.stats_table}
+            WHERE date = ? AND team_code IN ({','.join('?' * len(teams))})
+              AND {self.stats_column} IS NOT NULL
+        """, (game_date, *teams))
+        frame = pd.DataFrame(rows, columns=['mlb_id', 'player_name'] + COMPARED_STATS)
+        frame['mlb_id'] = frame['mlb_id'].astype(int)
+        return frame
+
+    def delete_rows(self, game_date: str, mlb_ids: List[int]) -> int:
+        """Delete the stored rows of players on a date."""
+        batch = D1_ID_BATCH if self.use_d1 else LOCAL_ID_BATCH
+        for i in range(0, len(mlb_ids), batch):
+            chunk = mlb_ids[i:i + batch]
+            self.collector._execute_query(f"""
+                DELETE FROM {self.collector.stats_table}
+                WHERE date = ? AND {self.stats_column} IN ({','.join('?' * len(chunk))})
+            """, (game_date, *chunk))
+        self.collector._commit()
+        return len(mlb_ids)
+
+    def insert_corrections(self, corrections: pd.DataFrame, game_date: str, job_id: str) -> int:
+        """Bulk-insert stat_corrections rows."""
+        if corrections.empty:
+            return 0
+        self.ensure_table()
+        records = [
+            (int(r.player_id), r.player_name, game_date, r.stat_category, r.stat_name,
+             f'{r.old_value:g}', f'{r.new_value:g}', float(r.difference), 'mlb_official', job_id)
+            for r in corrections.itertuples(index=False)
+        ]
+        columns = ('player_id, player_name, date, stat_category, stat_name, '
+                   'old_value, new_value, difference, correction_source, job_id')
+        if self.use_d1:
+            statements = [
+                (f"INSERT INTO {CORRECTIONS_TABLE} ({columns}) VALUES "
+                 + ', '.join('(' + ', '.join(sql_literal(v) for v in record) + ')'
+                             for record in records[i:i + D1_INSERT_BATCH]), [])
+                for i in range(0, len(records), D1_INSERT_BATCH)
+            ]
+            failures = [r for r in self.collector.d1_conn.execute_batch(statements) if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} D1 stat correction batches failed: {failures[0].get('error')}")
+        else:
+            self.collector.conn.executemany(
+                f"INSERT INTO {CORRECTIONS_TABLE} ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self.collector.conn.commit()
+        return len(records)
+
+    def check_date(self, game_date: str, game_pks: Optional[Set[int]], job_id: str,
+                   checked_at: str) -> Dict[str, int]:
+        """
+        Re-check one date's changed games and record corrections.
+
+        Args:
+            game_date: Date (YYYY-MM-DD)
+            game_pks: Games reported as changed, or None to check every final game
+            job_id: Job recorded on corrections and rewritten rows
+            checked_at: UTC timestamp stored on checked games
+        """
+        stats = {'games_checked': 0, 'games_changed': 0, 'corrections': 0, 'rows_rewritten': 0,
+                 'players_added': 0, 'players_removed': 0}
+        if not self.has_rows(game_date):
+            # Never collected: update_stats collects it in full, not the correction check
+            return stats
+        all_games = self.collector._get_games_for_date(game_date)
+        games = all_games if game_pks is None else [g for g in all_games if g['game_id'] in game_pks]
+        if not games:
+            return stats
+
+        self.collector.boxscores = {}
+        hashes = {}
+        for game in games:
+            boxscore = self.collector._get_boxscore(game['game_id'])
+            if boxscore:
+                hashes[game['game_id']] = boxscore_hash(game['game_id'], game_date, boxscore)
+        stored = self.stored_hashes(hashes)
+        changed = {pk for pk, h in hashes.items() if stored.get(pk) != h}
+        stats['games_checked'] = len(hashes)
+        stats['games_changed'] = len(changed)
+
+        if changed:
+            recollect = self.with_doubleheaders(all_games, changed)
+            batting = self.collector._collect_batting_stats(game_date, recollect)
+            pitching = self.collector._collect_pitching_stats(game_date, recollect)
+            new_rows = self.collector._merge_and_enrich_stats(batting, pitching, game_date)
+            new_rows = self.collector._calculate_rate_stats(new_rows)
+
+            teams = sorted({t for g in recollect for t in (g['home_team'], g['away_team'])})
+            old_rows = self.load_rows(game_date, teams)
+            new_ids = {int(m) for m in new_rows['mlb_id']} if not new_rows.empty else set()
+            old_ids = set(old_rows['mlb_id'])
+
+            corrections = diff_stat_rows(old_rows, new_rows)
+            stats['corrections'] = self.insert_corrections(corrections, game_date, job_id)
+            if stats['corrections']:
+                logger.info(f"{game_date}: {stats['corrections']} stat corrections for "
+                            f"{corrections['player_id'].nunique()} players in {len(changed)} changed games")
+
+            # Players new to the stored rows (late boxscore additions, games missed on collection)
+            added = new_ids - old_ids
+            rewrite = set(corrections['player_id'].astype(int)) | added
+            if rewrite:
+                rows = new_rows[new_rows['mlb_id'].astype(int).isin(rewrite)]
+                stats['rows_rewritten'] = self.collector._save_stats(rows, job_id, game_date)
+            if added:
+                stats['players_added'] = len(added)
+                names = new_rows[new_rows['mlb_id'].astype(int).isin(added)]['player_name']
+                logger.info(f"{game_date}: added {len(added)} players missing from stored rows: "
+                            f"{', '.join(sorted(map(str, names)))}")
+
+            # Players no longer in any re-collected boxscore; only trusted when every
+            # game of those teams was actually fetched
+            removed = old_ids - new_ids
+            if removed and all(self.collector._get_boxscore(g['game_id']) for g in recollect):
+                names = old_rows[old_rows['mlb_id'].isin(removed)]['player_name']
+                stats['players_removed'] = self.delete_rows(game_date, sorted(removed))
+                logger.info(f"{game_date}: removed {len(removed)} players no longer in the boxscores: "
+                            f"{', '.join(sorted(map(str, names)))}")
+            elif removed:
+                logger.warning(f"{game_date}: {len(removed)} stored players missing from re-collected "
+                               f"games, but not every boxscore was fetched; keeping them")
+
+        self.store_hashes(hashes, game_date, checked_at)
+        return stats
+
+    def detect(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, int]:
+        """
+        Check the correction window for changed games.
+
+        The feed watermark only advances when [start_date, end_date] covers the
+        whole correction window; a narrower run would otherwise skip feed
+        entries for the dates it left out.
+
+        Args:
+            start_date: First date to check (default: window_days ago)
+            end_date: Last date to check (default: today)
+
+        Returns:
+            Stats dict (dates_checked, games_checked, games_changed, corrections,
+            rows_rewritten, players_added, players_removed) plus dates_rewritten,
+            the dates whose stored rows changed
+        """
+        window_start = (date.today() - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        window_end = date.today().strftime('%Y-%m-%d')
+        start_date = start_date or window_start
+        end_date = end_date or window_end
+        covers_window = start_date <= window_start and end_date >= window_end
+
+        # Taken before the feed query, so changes made during the run are seen next time
+        checked_at = _utc_now()
+        since = self.feed_watermark() or (datetime.now(timezone.utc) - timedelta(days=self.window_days)
+                                          ).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        changed = self.changed_games(since, start_date, end_date)
+        if changed is None:
+            logger.warning("MLB game change feed unavailable, hashing every final game in the window")
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            days = (datetime.strptime(end_date, '%Y-%m-%d').date() - start).days + 1
+            dates_to_check: Dict[str, Optional[Set[int]]] = {
+                (start + timedelta(days=i)).strftime('%Y-%m-%d'): None for i in range(days)}
+        else:
+            dates_to_check = dict(changed)
+
+        job_id = self.collector.job_manager.start_job(
+            job_type='stats_corrections',
+            date_range_start=start_date,
+            date_range_end=end_date,
+            metadata={'since': since, 'change_feed': changed is not None}
+        )
+        totals = {'dates_checked': 0, 'games_checked': 0, 'games_changed': 0,
+                  'corrections': 0, 'rows_rewritten': 0, 'players_added': 0, 'players_removed': 0}
+        dates_rewritten = []
+        try:
+            for game_date in sorted(dates_to_check):
+                date_stats = self.check_date(game_date, dates_to_check[game_date], job_id, checked_at)
+                totals['dates_checked'] += 1
+                for key, value in date_stats.items():
+                    totals[key] += value
+                if date_stats['rows_rewritten'] or date_stats['players_removed']:
+                    dates_rewritten.append(game_date)
+        except Exception as e:
+            self.collector.job_manager.update_job(job_id, 'failed', error_msg=str(e))
+            raise
+
+        if covers_window:
+            self.advance_feed_watermark(checked_at)
+        else:
+            logger.info(f"Checked {start_date} to {end_date} only; change feed watermark left at {since}")
+
+        self.collector.job_manager.update_job(
+            job_id, 'completed',
+            records_processed=totals['games_checked'],
+            records_inserted=totals['corrections'],
+            metadata=totals
+        )
+        logger.info(f"Stat corrections {start_date} to {end_date}: {totals['games_changed']} of "
+                    f"{totals['games_checked']} checked games changed, {totals['corrections']} corrections, "
+                    f"{totals['players_added']} players added, {totals['players_removed']} removed")
+        totals['dates_rewritten'] = dates_rewritten
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect MLB stat corrections in changed games')
+    parser.add_argument('--start', help='First date to check (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last date to check (YYYY-MM-DD)')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Check Cloudflare D1 stats')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from data_pipeline.player_stats.comprehensive_collector import ComprehensiveStatsCollector
+
+    collector = ComprehensiveStatsCollector(environment=args.environment, use_d1=args.use_d1)
+    totals = StatCorrectionDetector(collector).detect(args.start, args.end)
+    print(f"Dates checked: {totals['dates_checked']}")
+    print(f"Games checked: {totals['games_checked']} ({totals['games_changed']} changed)")
+    print(f"Corrections recorded: {totals['corrections']}")
+    print(f"Rows rewritten: {totals['rows_rewritten']}")
+    print(f"Players added/removed: {totals['players_added']}/{totals['players_removed']}")
+
+
+if __name__ == '__main__':
+    main()
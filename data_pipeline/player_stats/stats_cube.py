@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+"""
+Player Stats Cube
+
+Columnar, memory-mapped copy of daily_gkl_player_stats for in-process
+analytics. Each season is stored as a float32 array of shape
+
+    (players, dates, stats)
+
+in database/stats_cube/<environment>/<season>.npy, opened with
+np.load(mmap_mode='r') so only the pages a query touches are read. A sidecar
+<season>.json holds the player index (yahoo_player_id, name, team code), the
+first date of the date axis and the stat axis.
+
+Missing rows and NULL values are NaN; the 'row_present' stat is 1 for every
+stored row, so COUNT(*) becomes a sum over it. Range sums, top-N and rolling
+windows run for all players at once with numpy instead of one SQL scan per
+player.
+
+Maintenance:
+    StatsCubeBuilder.refresh_dates() - incremental, called by update_stats.py
+                                       after each local stats job; rewrites
+                                       only the touched date columns
+    StatsCubeBuilder.rebuild()       - full rebuild of a season
+
+Usage:
+    python -m data_pipeline.player_stats.stats_cube --rebuild --season 2025
+    python -m data_pipeline.player_stats.stats_cube --top batting_home_runs --season 2025
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.config.database_config import get_database_path, get_stats_cube_dir
+from data_pipeline.metadata.league_keys import SEASON_DATES
+
+logger = logging.getLogger(__name__)
+
+STATS_TABLE = 'daily_gkl_player_stats'
+
+# Stat axis. row_present marks stored rows; everything else mirrors a stats column.
+CUBE_STATS: List[str] = [
+    'row_present', 'games_played', 'has_batting_data', 'has_pitching_data',
+    'batting_at_bats', 'batting_runs', 'batting_hits', 'batting_doubles',
+    'batting_triples', 'batting_home_runs', 'batting_rbis', 'batting_stolen_bases',
+    'batting_walks', 'batting_strikeouts', 'batting_hit_by_pitch', 'batting_sacrifice_flies',
+    'batting_avg', 'batting_obp', 'batting_slg', 'batting_ops',
+    'pitching_games_started', 'pitching_wins', 'pitching_losses', 'pitching_saves',
+    'pitching_holds', 'pitching_innings_pitched', 'pitching_hits_allowed',
+    'pitching_runs_allowed', 'pitching_earned_runs', 'pitching_walks_allowed',
+    'pitching_strikeouts', 'pitching_home_runs_allowed', 'pitching_era',
+    'pitching_whip', 'pitching_quality_starts',
+]
+
+# Extra player rows allocated when the player axis grows
+PLAYER_HEADROOM = 128
+
+
+def _as_date(value: Union[str, date, datetime]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def _season_bounds(season: int) -> Tuple[date, date]:
+    start, end = SEASON_DATES.get(season, (f"{season}-03-01", f"{season}-10-31"))
+    return _as_date(start), _as_date(end)
+
+
+class StatsCube:
+    """Read-only view of one season's memory-mapped stats cube."""
+
+    def __init__(self, season: int, environment: Optional[str] = None,
+                 cube_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            season: Season year
+            environment: 'production' or 'test' (selects the cube directory)
+            cube_dir: Override cube directory
+
+        Raises:
+            FileNotFoundError: If the season has not been built
+        """
+        self.season = season
+        self.cube_dir = Path(cube_dir) if cube_dir else get_stats_cube_dir(environment)
+        meta_path = self.cube_dir / f"{season}.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No stats cube for {season} in {self.cube_dir}")
+
+        self.meta = json.loads(meta_path.read_text())
+        self.data = np.load(self.cube_dir / self.meta['file'], mmap_mode='r')
+        self.player_ids: List[str] = self.meta['players']
+        self.player_names: List[str] = self.meta['player_names']
+        self.team_codes: List[str] = self.meta['team_codes']
+        self.n_players = len(self.player_ids)
+        self.first_date = _as_date(self.meta['start_date'])
+        self.n_dates = self.meta['n_dates']
+        self.stat_index = {stat: i for i, stat in enumerate(self.meta['stats'])}
+        self.player_index = {pid: i for i, pid in enumerate(self.player_ids)}
+
+    @property
+    def last_date(self) -> date:
+        return self.first_date + timedelta(days=self.n_dates - 1)
+
+    @property
+    def max_date(self) -> Optional[date]:
+        """Latest date holding stat rows when the cube was written (None if unknown)."""
+        return _as_date(self.meta['max_date']) if self.meta.get('max_date') else None
+
+    def dates(self) -> List[date]:
+        return [self.first_date + timedelta(days=i) for i in range(self.n_dates)]
+
+    def day_slice(self, start=None, end=None) -> slice:
+        lo = 0 if start is None else max(0, (_as_date(start) - self.first_date).days)
+        hi = self.n_dates if end is None else min(self.n_dates, (_as_date(end) - self.first_date).days + 1)
+        return slice(lo, max(lo, hi))
+
+    def _stat_ids(self, stats: Optional[Sequence[str]]) -> List[int]:
+        stats = stats or self.meta['stats']
+        missing = [s for s in stats if s not in self.stat_index]
+        if missing:
+            raise ValueError(f"Stats not in cube: {missing}")
+        return [self.stat_index[s] for s in stats]
+
+    def window(self, start=None, end=None, stats: Optional[Sequence[str]] = None) -> np.ndarray:
+        """(players, days, stats) view for a date range."""
+        block = self.data[:self.n_players, self.day_slice(start, end)]
+        return block[..., self._stat_ids(stats)] if stats else block
+
+    def range_sums(self, start=None, end=None, stats: Optional[Sequence[str]] = None,
+                   mask_stat: Optional[str] = None) -> np.ndarray:
+        """
+        Per-player sums over a date range.
+
+        Args:
+            start: First date (inclusive, default season start)
+            end: Last date (inclusive, default last cube date)
+            stats: Stats to sum (default all)
+            mask_stat: Only count days where this stat is 1 (e.g. 'has_batting_data')
+
+        Returns:
+            (players, stats) float64 array; NaN cells count as zero
+        """
+        block = self.window(start, end, stats).astype(np.float64)
+        if mask_stat:
+            keep = self.window(start, end, [mask_stat])[..., 0] == 1
+            block = np.where(keep[..., None], block, np.nan)
+        return np.nansum(block, axis=1)
+
+    def range_counts(self, start=None, end=None, stats: Optional[Sequence[str]] = None,
+                     mask_stat: Optional[str] = None) -> np.ndarray:
+        """Per-player count of non-NULL values over a date range."""
+        present = ~np.isnan(self.window(start, end, stats))
+        if mask_stat:
+            present &= (self.window(start, end, [mask_stat]) == 1)
+        return present.sum(axis=1)
+
+    def range_means(self, start=None, end=None, stats: Optional[Sequence[str]] = None,
+                    mask_stat: Optional[str] = None) -> np.ndarray:
+        """Per-player means of non-NULL values (SQL AVG); NaN where there are none."""
+        sums = self.range_sums(start, end, stats, mask_stat)
+        counts = self.range_counts(start, end, stats, mask_stat)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+    def totals_frame(self, start=None, end=None, stats: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Range sums as a DataFrame indexed by yahoo_player_id, players with rows only."""
+        stats = list(stats or self.meta['stats'])
+        sums = self.range_sums(start, end, stats)
+        games = self.range_sums(start, end, ['row_present'])[:, 0]
+        frame = pd.DataFrame(sums, columns=stats, index=pd.Index(self.player_ids, name='yahoo_player_id'))
+        frame.insert(0, 'games', games.astype(int))
+        frame.insert(0, 'team_code', self.team_codes)
+        frame.insert(0, 'player_name', self.player_names)
+        return frame[frame['games'] > 0]
+
+    def top_n(self, stat: str, start=None, end=None, n: int = 10, agg: str = 'sum',
+              min_games: int = 0, mask_stat: Optional[str] = None,
+              ascending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Top players by a stat's sum or mean over a range.
+
+        Args:
+            stat: Stat to rank by
+            start: First date
+            end: Last date
+            n: Number of players to return
+            agg: 'sum' or 'mean'
+            min_games: Minimum qualifying days (rows, or mask_stat days)
+            mask_stat: Only count days where this stat is 1
+            ascending: Rank lowest first (ERA, WHIP)
+        """
+        if agg == 'sum':
+            values = self.range_sums(start, end, [stat], mask_stat)[:, 0]
+        elif agg == 'mean':
+            values = self.range_means(start, end, [stat], mask_stat)[:, 0]
+        else:
+            raise ValueError(f"Unknown aggregation: {agg}")
+        games = self.range_sums(start, end, [mask_stat or 'row_present'], mask_stat)[:, 0]
+
+        eligible = np.flatnonzero((games >= max(min_games, 1)) & ~np.isnan(values))
+        if not len(eligible):
+            return []
+        order = values[eligible] if ascending else -values[eligible]
+        k = min(n, len(eligible))
+        best = eligible[np.argpartition(order, k - 1)[:k]]
+        best = best[np.argsort(values[best] if ascending else -values[best], kind='stable')]
+        return [{
+            'yahoo_player_id': self.player_ids[i],
+            'player_name': self.player_names[i],
+            'team_code': self.team_codes[i],
+            'games': int(games[i]),
+            'stat_category': stat,
+            'stat_value': float(values[i]),
+        } for i in best]
+
+    def rolling_sums(self, stats: Sequence[str], window: int, start=None, end=None) -> np.ndarray:
+        """
+        Trailing window sums for every player and day.
+
+        Returns:
+            (players, days, stats) array; day d holds the sum over [d - window + 1, d]
+            (shorter at the start of the range)
+        """
+        block = np.nan_to_num(self.window(start, end, stats).astype(np.float64))
+        csum = np.cumsum(block, axis=1)
+        out = csum.copy()
+        if window < csum.shape[1]:
+            out[:, window:] -= csum[:, :-window]
+        return out
+
+
+class StatsCubeBuilder:
+    """Builds and incrementally refreshes stats cubes from SQLite."""
+
+    def __init__(self, connection: Optional[sqlite3.Connection] = None, environment: str = 'production',
+                 stats_table: Optional[str] = None, cube_dir: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            connection: SQLite connection (default: the environment database)
+            environment: 'production' or 'test'
+            stats_table: Override stats table name
+            cube_dir: Override cube directory
+        """
+        self.connection = connection or sqlite3.connect(str(get_database_path(environment)))
+        self.environment = environment
+        self.stats_table = stats_table or STATS_TABLE
+        self.cube_dir = Path(cube_dir) if cube_dir else get_stats_cube_dir(environment)
+
+    def _load_rows(self, start: date, end: date, dates: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        columns = [c for c in CUBE_STATS if c != 'row_present']
+        where, params = "date BETWEEN ? AND ?", [start.isoformat(), end.isoformat()]
+        if dates:
+            where = f"date IN ({', '.join(['?'] * len(dates))})"
+            params = list(dates)
+        frame = pd.read_sql_query(f"""
+            SELECT date, yahoo_player_id, player_name, team_code, {', '.join(columns)}
+            FROM {self.stats_table}
+            WHERE {where} AND yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
+            ORDER BY date
+        """, self.connection, params=params)
+        frame['yahoo_player_id'] = frame['yahoo_player_id'].astype(str)
+        frame['row_present'] = 1.0
+        return frame
+
+    def _write_meta(self, season: int, meta: Dict[str, Any]):
+        path = self.cube_dir / f"{season}.json"
+        tmp = path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path)
+
+    def _allocate(self, season: int, capacity: int, n_dates: int) -> Tuple[str, np.memmap]:
+        """Create a fresh NaN-filled cube file; returns (file name, writable memmap)."""
+        name = f"{season}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.npy"
+        data = np.lib.format.open_memmap(self.cube_dir / name, mode='w+', dtype=np.float32,
+                                         shape=(capacity, n_dates, len(CUBE_STATS)))
+        data[:] = np.nan
+        return name, data
+
+    def _fill(self, data: np.ndarray, meta: Dict[str, Any], frame: pd.DataFrame):
+        """Write stat rows into the cube, registering new players."""
+        if not frame.empty:
+            latest_date = str(frame['date'].max())[:10]
+            meta['max_date'] = max(meta.get('max_date') or latest_date, latest_date)
+        index = {pid: i for i, pid in enumerate(meta['players'])}
+        latest = frame.drop_duplicates('yahoo_player_id', keep='last')
+        for row in latest.itertuples(index=False):
+            if row.yahoo_player_id not in index:
+                index[row.yahoo_player_id] = len(meta['players'])
+                meta['players'].append(row.yahoo_player_id)
+                meta['player_names'].append(row.player_name)
+                meta['team_codes'].append(row.team_code)
+            i = index[row.yahoo_player_id]
+            meta['player_names'][i] = row.player_name
+            meta['team_codes'][i] = row.team_code
+
+        first = _as_date(meta['start_date'])
+        players = frame['yahoo_player_id'].map(index).to_numpy()
+        days = (pd.to_datetime(frame['date']).dt.date.map(lambda d: (d - first).days)).to_numpy()
+        values = frame[CUBE_STATS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+        data[players, days] = values
+
+    def rebuild(self, season: int) -> Dict[str, Any]:
+        """Rebuild one season's cube from the stats table."""
+        self.cube_dir.mkdir(parents=True, exist_ok=True)
+        start, end = _season_bounds(season)
+        frame = self._load_rows(date(season, 1, 1), date(season, 12, 31))
+        if not frame.empty:
+            frame_dates = pd.to_datetime(frame['date']).dt.date
+            start, end = min(start, frame_dates.min()), max(end, frame_dates.max())
+
+        n_players = frame['yahoo_player_id'].nunique()
+        n_dates = (end - start).days + 1
+        meta = {'season': season, 'start_date': start.isoformat(), 'n_dates': n_dates,
+                'stats': CUBE_STATS, 'players': [], 'player_names': [], 'team_codes': [],
+                'capacity': n_players + PLAYER_HEADROOM}
+        old_file = self._current_file(season)
+        meta['file'], data = self._allocate(season, meta['capacity'], n_dates)
+        self._fill(data, meta, frame)
+        data.flush()
+        del data
+        self._write_meta(season, meta)
+        self._remove(old_file)
+
+        logger.info(f"Built stats cube for {season}: {len(meta['players'])} players x {n_dates} days")
+        return meta
+
+    def _current_file(self, season: int) -> Optional[str]:
+        meta_path = self.cube_dir / f"{season}.json"
+        if meta_path.exists():
+            return json.loads(meta_path.read_text()).get('file')
+        return None
+
+    def _remove(self, file_name: Optional[str]):
+        if file_name and (self.cube_dir / file_name).exists():
+            (self.cube_dir / file_name).unlink()
+
+    def refresh_dates(self, dates: Iterable[Union[str, date]]) -> int:
+        """
+        Rewrite the cube columns for the given dates, growing axes as needed.
+
+        Returns:
+            Number of stat rows written
+        """
+        by_season: Dict[int, List[date]] = {}
+        for d in dates:
+            d = _as_date(d)
+            by_season.setdefault(d.year, []).append(d)
+
+        written = 0
+        for season, season_dates in sorted(by_season.items()):
+            meta_path = self.cube_dir / f"{season}.json"
+            if not meta_path.exists():
+                written += len(self.rebuild(season)['players'])
+                continue
+            meta = json.loads(meta_path.read_text())
+            if meta['stats'] != CUBE_STATS:
+                self.rebuild(season)
+                continue
+
+            frame = self._load_rows(min(season_dates), max(season_dates),
+                                    sorted({d.isoformat() for d in season_dates}))
+            first = _as_date(meta['start_date'])
+            last = first + timedelta(days=meta['n_dates'] - 1)
+            new_players = set(frame['yahoo_player_id']) - set(meta['players'])
+            if (min(season_dates) < first or max(season_dates) > last
+                    or len(meta['players']) + len(new_players) > meta['capacity']):
+                # Axis growth: a rebuild reallocates with fresh headroom
+                self.rebuild(season)
+                written += len(frame)
+                continue
+
+            data = np.load(self.cube_dir / meta['file'], mmap_mode='r+')
+            for d in season_dates:
+                data[:, (d - first).days] = np.nan
+            self._fill(data, meta, frame)
+            data.flush()
+            del data
+            self._write_meta(season, meta)
+            written += len(frame)
+
+        logger.info(f"Refreshed stats cube with {written} rows")
+        return written
+
+
+def current_cube(season: int, environment: Optional[str] = None,
+                 db_path: Optional[Union[str, Path]] = None,
+                 stats_table: str = STATS_TABLE) -> Optional[StatsCube]:
+    """
+    The season's cube, if it can stand in for the stats table.
+
+    Cubes are built from the environment's default database, so None is
+    returned for any other database (e.g. the D1 mirror), for a season
+    without a cube, and for a cube that is missing dates the table has.
+
+    Args:
+        season: Season year
+        environment: 'production' or 'test'
+        db_path: Database the caller reads (default: the environment's)
+        stats_table: Stats table the cube mirrors
+    """
+    from data_pipeline.config.connection_provider import get_read_connection
+
+    default_path = get_database_path(environment)
+    if db_path is not None and Path(db_path).resolve() != Path(default_path).resolve():
+        return None
+    try:
+        cube = StatsCube(season, environment)
+    except FileNotFoundError:
+        return None
+
+    cursor = get_read_connection(default_path).cursor()
+    try:
+        cursor.execute(f"SELECT MAX(date) FROM {stats_table} WHERE date BETWEEN ? AND ?",
+                       (f"{season}-01-01", f"{season}-12-31"))
+        table_max = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+    if table_max and (cube.max_date is None or cube.max_date.isoformat() < str(table_max)[:10]):
+        logger.info(f"Stats cube for {season} is stale (cube through {cube.max_date}, "
+                    f"table through {table_max}); using SQL")
+        return None
+    return cube
+
+
+def refresh_cube_for_dates(connection: sqlite3.Connection, dates: Iterable[Union[str, date]],
+                           environment: str = 'production') -> int:
+    """Post-write hook for the local stats updater; logs instead of raising."""
+    try:
+        return StatsCubeBuilder(connection, environment).refresh_dates(dates)
+    except Exception as e:
+        logger.error(f"Failed to refresh stats cube: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the memory-mapped stats cube')
+    parser.add_argument('--season', type=int, required=True, help='Season year')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the season cube')
+    parser.add_argument('--top', help='Show the top players by this stat')
+    parser.add_argument('--start', help='Range start (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Range end (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.rebuild:
+        meta = StatsCubeBuilder(environment=args.environment).rebuild(args.season)
+        print(f"Built {args.season}: {len(meta['players'])} players x {meta['n_dates']} days")
+    if args.top:
+        cube = StatsCube(args.season, args.environment)
+        for rank, row in enumerate(cube.top_n(args.top, args.start, args.end, args.limit), 1):
+            print(f"{rank:>3}. {row['player_name']:<25} {row['team_code'] or '':<4} {row['stat_value']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,9 @@ Usage:
     # Also refresh Yahoo IDs
     python update_stats.py --refresh-yahoo
     
+    # Re-collect every date in the range, not only dates without stats
+    python update_stats.py --full
+    
     # Quiet mode for automation
     python update_stats.py --quiet
 """
@@ -39,8 +42,14 @@ load_dotenv()
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from data_pipeline.player_stats.comprehensive_collector import ComprehensiveStatsCollector
+from data_pipeline.player_stats.mapping_changes import MappingChangeLog
+from data_pipeline.player_stats.stat_corrections import StatCorrectionDetector
 from data_pipeline.player_stats.yahoo_id_matcher import YahooIDMatcher
 from data_pipeline.player_stats.yahoo_player_search import YahooPlayerSearch
+from data_pipeline.player_spotlight.summaries import refresh_spotlight_for_dates
+from data_pipeline.player_stats.stats_cube import refresh_cube_for_dates
+from data_pipeline.team_ledger.ledger import refresh_ledger_for_dates
+from data_pipeline.valuation.gkl_war import refresh_war_for_season
 
 # Set up logging
 logging.basicConfig(
@@ -68,6 +77,7 @@ class PlayerStatsUpdater:
         self.collector = ComprehensiveStatsCollector(environment=environment, use_d1=use_d1)
         self.yahoo_matcher = YahooIDMatcher(environment=environment)
         self.yahoo_search = YahooPlayerSearch(environment=environment)
+        self.corrections = StatCorrectionDetector(self.collector)
         
         # D1 connection if needed
         if use_d1:
@@ -133,14 +143,31 @@ class PlayerStatsUpdater:
             start = end - timedelta(days=(days - 1) if days else 6)
             return start, end
     
-    def update_stats(self, start_date: date, end_date: date, refresh_yahoo: bool = False):
+    def _collected_dates(self, start_date: date, end_date: date) -> set:
+        """Dates in the range that already have stats rows"""
+        result = self.collector._execute_query(
+            f"SELECT DISTINCT date FROM {self.collector.stats_table} WHERE date BETWEEN ? AND ?",
+            (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        )
+        if self.use_d1:
+            return {row['date'] for row in result.get('results', [])}
+        return {row[0] for row in result.fetchall()}
+    
+    def update_stats(self, start_date: date, end_date: date, refresh_yahoo: bool = False,
+                     full: bool = False):
         """
         Update stats for date range.
         
+        Dates without stats are collected in full. Dates already collected are
+        left to the stat correction check, which covers the whole correction
+        window and refetches just the games MLB reports as changed (see
+        stat_corrections.py).
+        
         Args:
             start_date: Start date
             end_date: End date
             refresh_yahoo: Whether to refresh Yahoo IDs
+            full: Re-collect every date in the range
         """
         if not start_date or not end_date:
             return
@@ -155,12 +182,16 @@ class PlayerStatsUpdater:
                 logger.info("Initializing player mappings...")
                 self.collector.initialize_player_mappings()
         
-        # Collect stats for each date
+        # Collect stats for each date not collected yet
+        collected = set() if full else self._collected_dates(start_date, end_date)
         total_records = 0
         current = start_date
         
         while current <= end_date:
             date_str = current.strftime('%Y-%m-%d')
+            if date_str in collected:
+                current += timedelta(days=1)
+                continue
             logger.info(f"Collecting stats for {date_str}")
             
             try:
@@ -168,6 +199,9 @@ class PlayerStatsUpdater:
                 total_records += records
                 logger.info(f"  Collected {records} player records")
                 # Note: When use_d1 is True, the collector writes directly to D1
+                
+                # Baseline game hashes for later correction checks
+                self.corrections.record_baseline(date_str)
                     
             except Exception as e:
                 logger.error(f"  Error collecting stats for {date_str}: {e}")
@@ -176,13 +210,64 @@ class PlayerStatsUpdater:
         
         logger.info(f"Total records collected: {total_records}")
         
+        # Check the whole correction window for changed games, not only this run's dates
+        try:
+            corrected_dates = self.corrections.detect()['dates_rewritten']
+        except Exception as e:
+            logger.error(f"Stat correction check failed: {e}")
+            corrected_dates = []
+        
+        # Derived tables below must also cover dates rewritten by corrections
+        if corrected_dates:
+            start_date = min(start_date, datetime.strptime(min(corrected_dates), '%Y-%m-%d').date())
+            end_date = max(end_date, datetime.strptime(max(corrected_dates), '%Y-%m-%d').date())
+        
         # Refresh Yahoo IDs if requested
         if refresh_yahoo:
             self.refresh_yahoo_ids()
         
-        # Update Yahoo IDs in daily stats (skip for D1)
+        # Backpropagate changed Yahoo IDs into daily stats (and D1)
+        self._update_daily_stats_yahoo_ids()
+        
+        # Recompute team stat ledger rows for the touched dates
+        self.refresh_ledger(start_date, end_date)
+        
+        # Recompute spotlight summaries for players with stats in the range
+        connection = self.d1_conn if self.use_d1 else self.collector.conn
+        refresh_spotlight_for_dates(connection, [start_date.strftime('%Y-%m-%d'),
+                                                 end_date.strftime('%Y-%m-%d')], self.environment)
+        
+        # Rewrite the touched dates of the memory-mapped stats cube (local database)
+        if not self.use_d1:
+            cube_dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+            refresh_cube_for_dates(self.collector.conn, cube_dates, self.environment)
+        
+        # Recompute GKL WAR for the touched seasons only (local database)
         if not self.use_d1:
-            self._update_daily_stats_yahoo_ids()
+            for season in sorted({start_date.year, end_date.year}):
+                refresh_war_for_season(self.collector.conn, season, self.environment)
+    
+    def refresh_ledger(self, start_date: date, end_date: date) -> int:
+        """
+        Refresh team stat ledger rows for a date range.
+        
+        Args:
+            start_date: Start date
+            end_date: End date
+            
+        Returns:
+            Number of ledger rows written
+        """
+        dates = []
+        current = start_date
+        while current <= end_date:
+            dates.append(current.strftime('%Y-%m-%d'))
+            current += timedelta(days=1)
+        
+        connection = self.d1_conn if self.use_d1 else self.collector.conn
+        written = refresh_ledger_for_dates(connection, dates, self.environment)
+        logger.info(f"Refreshed {written} team ledger rows")
+        return written
     
     def refresh_yahoo_ids(self):
         """Refresh Yahoo IDs for unmapped players"""
@@ -241,38 +326,27 @@ class PlayerStatsUpdater:
         except Exception as e:
             logger.error(f"Error refreshing Yahoo IDs: {e}")
     
-    def _update_daily_stats_yahoo_ids(self):
-        """Update Yahoo IDs in daily_gkl_player_stats from player_mapping"""
+    def _update_daily_stats_yahoo_ids(self) -> int:
+        """
+        Copy changed player_mapping Yahoo IDs into daily_gkl_player_stats.
+        
+        Only mlb_ids recorded in the mapping change log are touched, and the
+        same changes are mirrored to D1 when writing there.
+        
+        Returns:
+            Number of local stats rows updated
+        """
         try:
-            # Use correct column name based on environment
-            mlb_id_column = 'mlb_player_id' if self.environment == 'production' else 'mlb_id'
-            
-            query = f"""
-                UPDATE daily_gkl_player_stats
-                SET yahoo_player_id = (
-                    SELECT pm.yahoo_player_id 
-                    FROM player_mapping pm 
-                    WHERE pm.mlb_id = daily_gkl_player_stats.{mlb_id_column}
-                )
-                WHERE yahoo_player_id IS NULL
-                OR yahoo_player_id != (
-                    SELECT pm.yahoo_player_id 
-                    FROM player_mapping pm 
-                    WHERE pm.mlb_id = daily_gkl_player_stats.{mlb_id_column}
-                )
-            """
-            
-            cursor = self.collector.conn.cursor()
-            cursor.execute(query)
-            updated = cursor.rowcount
-            self.collector.conn.commit()
+            change_log = MappingChangeLog(self.yahoo_matcher.conn, self.environment)
+            updated = change_log.propagate(mirror=self.d1_conn)
             
             if updated > 0:
                 logger.info(f"Updated {updated} Yahoo IDs in daily stats")
+            return updated
                 
         except Exception as e:
             logger.error(f"Error updating Yahoo IDs: {e}")
-    
+            return 0
     
     def show_summary(self):
         """Show summary statistics"""
@@ -351,6 +425,8 @@ def main():
     # Processing options
     parser.add_argument('--refresh-yahoo', action='store_true',
                        help='Refresh Yahoo IDs for unmapped players')
+    parser.add_argument('--full', action='store_true',
+                       help='Re-collect already collected dates too (the stat correction check still runs)')
     parser.add_argument('--quiet', action='store_true',
                        help='Minimal output for automation')
     
@@ -381,7 +457,7 @@ def main():
         return
     
     # Run update
-    updater.update_stats(start_date, end_date, refresh_yahoo=args.refresh_yahoo)
+    updater.update_stats(start_date, end_date, refresh_yahoo=args.refresh_yahoo, full=args.full)
     
     # Show summary unless quiet
     if not args.quiet:
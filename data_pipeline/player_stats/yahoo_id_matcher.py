@@ -18,6 +18,7 @@ import re
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from data_pipeline.player_stats.config import get_config_for_environment
+from data_pipeline.player_stats.mapping_changes import record_mapping_changes
 
 # Set up logging
 logging.basicConfig(
@@ -161,7 +162,8 @@ class YahooIDMatcher:
         
         return yahoo_players
     
-    def normalize_name(self, name: str) -> str:
+    @staticmethod
+    def normalize_name(name: str) -> str:
         """Normalize player name for matching"""
         # Remove common suffixes
         name = re.sub(r'\s+(Jr\.|Sr\.|III|II|IV)$', '', name, flags=re.IGNORECASE)
@@ -306,21 +308,23 @@ class YahooIDMatcher:
         """
         logger.info(f"Updating player mappings with {len(matches)} Yahoo IDs...")
         
-        updated = 0
+        cursor = self.conn.cursor()
+        changed_mlb_ids = []
         
         for yahoo_id, mlb_id in matches.items():
-            result = self._execute_query("""
+            # Skip rows that already carry this Yahoo ID so they are not logged as changes
+            cursor.execute("""
                 UPDATE player_mapping
                 SET yahoo_player_id = ?
                 WHERE mlb_id = ?
-            """, (yahoo_id, mlb_id))
+                AND (yahoo_player_id IS NULL OR yahoo_player_id != ?)
+            """, (yahoo_id, mlb_id, yahoo_id))
             
-            if not self.use_d1:  # SQLite has rowcount
-                updated += 1 if result.rowcount > 0 else 0
-            else:  # D1 doesn't support rowcount, assume success
-                updated += 1
+            if cursor.rowcount > 0:
+                changed_mlb_ids.append(mlb_id)
         
-        self._commit()
+        self.conn.commit()
+        updated = record_mapping_changes(self.conn, changed_mlb_ids, 'yahoo_id_matcher', self.environment)
         logger.info(f"Updated {updated} player mappings with Yahoo IDs")
         
         return updated
@@ -4,23 +4,36 @@ Yahoo Player Search Module
 
 Searches Yahoo Fantasy API for player IDs to backfill missing mappings.
 Uses the Yahoo API to find all available players and match them to MLB IDs.
+
+Missing mappings are resolved in three stages:
+1. Harvest candidate Yahoo player IDs already stored from league collections
+   (daily_lineups rosters, transactions) that player_mapping does not know yet
+2. Fetch their details in 25-key players;player_keys= batches, one request at
+   a time under the shared Yahoo rate limiter, and match them to MLB players
+   by name
+3. Fall back to per-player name search only for the residue
+
+With use_d1, the league-data reads can come from the local D1 mirror
+(use_mirror / --mirror) instead of D1; mapping updates still go to D1.
 """
 
 import sys
 import sqlite3
 import logging
 import json
-import time
 import requests
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
 # Add parent directories to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from auth.token_manager import YahooTokenManager
+from data_pipeline.common.rate_limiter import get_shared_limiter
+from data_pipeline.config.database_config import get_table_name
 from data_pipeline.player_stats.config import get_config_for_environment
+from data_pipeline.player_stats.mapping_changes import record_mapping_changes
 from data_pipeline.player_stats.yahoo_id_matcher import YahooIDMatcher
 
 # Set up logging
@@ -30,23 +43,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Yahoo returns at most 25 players per collection request. Requests are made
+# one at a time: they all wait on the shared 1 req/s Yahoo budget, so
+# issuing them from a thread pool would not finish any sooner
+PLAYER_KEY_BATCH = 25
+# Name searches per backfill run
+MAX_NAME_SEARCHES = 50
+
 
 class YahooPlayerSearch:
     """Search Yahoo Fantasy API for player IDs"""
     
     BASE_URL = "https://fantasysports.yahooapis.com/fantasy/v2"
     
-    def __init__(self, environment='test', use_d1=False):
+    def __init__(self, environment='test', use_d1=False, use_mirror=False):
         self.environment = environment
         self.use_d1 = use_d1
         self.config = get_config_for_environment(environment)
         
         # Database connection
+        self.mirror_conn = None
         if use_d1:
             from data_pipeline.common.d1_connection import D1Connection
             self.d1_conn = D1Connection()
             self.conn = None
             logger.info("Using Cloudflare D1 database")
+            if use_mirror:
+                self.mirror_conn = self._open_mirror()
         else:
             self.conn = sqlite3.connect(self.config['database_path'])
             self.d1_conn = None
@@ -58,23 +81,41 @@ class YahooPlayerSearch:
         # Yahoo league key for 2025
         self.league_key = "458.l.6966"
         
-        # Rate limiting
+        # Rate limiting (shared with every other Yahoo caller in the process)
+        self.rate_limiter = get_shared_limiter('yahoo')
         self.requests_made = 0
-        self.last_request_time = None
-        self.max_requests_per_second = 1
         
         logger.info(f"Initialized YahooPlayerSearch for {environment}")
     
+    def _open_mirror(self):
+        """Sync the league tables into the local D1 mirror and open it for reads"""
+        from data_pipeline.common.d1_mirror import D1Mirror, MirrorConnection
+        
+        mirror = D1Mirror(self.d1_conn)
+        try:
+            mirror.sync(['daily_lineups', 'transactions', 'player_mapping'])
+        finally:
+            mirror.close()
+        logger.info(f"Reading league data from mirror {mirror.mirror_path}")
+        return MirrorConnection(mirror.mirror_path)
+    
     def _execute_query(self, query: str, params: tuple = ()) -> List[tuple]:
         """Execute query on appropriate database"""
         if self.use_d1:
             result = self.d1_conn.execute(query, params)
-            return result.fetchall()
+            return [tuple(row.values()) for row in result.get('results', [])]
         else:
             cursor = self.conn.cursor()
             cursor.execute(query, params)
             return cursor.fetchall()
     
+    def _read_query(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Run a read on the mirror when one is open, otherwise like _execute_query"""
+        if self.mirror_conn:
+            result = self.mirror_conn.execute(query, params)
+            return [tuple(row.values()) for row in result['results']]
+        return self._execute_query(query, params)
+    
     def _commit(self):
         """Commit transaction"""
         if not self.use_d1:  # D1 auto-commits
@@ -82,12 +123,6 @@ class YahooPlayerSearch:
     
     def _make_request(self, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """Make authenticated request to Yahoo API"""
-        # Rate limiting
-        if self.last_request_time:
-            elapsed = time.time() - self.last_request_time
-            if elapsed < (1.0 / self.max_requests_per_second):
-                time.sleep((1.0 / self.max_requests_per_second) - elapsed)
-        
         # Get current access token
         access_token = self.token_manager.get_access_token()
         if not access_token:
@@ -101,12 +136,12 @@ class YahooPlayerSearch:
         
         url = f"{self.BASE_URL}/{endpoint}"
         
+        self.rate_limiter.wait()
         try:
             response = requests.get(url, headers=headers, params=params or {})
             response.raise_for_status()
             
             self.requests_made += 1
-            self.last_request_time = time.time()
             
             return response.json()
             
@@ -212,6 +247,9 @@ class YahooPlayerSearch:
         """
         Fetch all MLB players from Yahoo Fantasy.
         
+        A position stops at its first short page, so no request is spent on
+        an empty page past the end.
+        
         Args:
             max_players: Maximum number of players to fetch
             
@@ -220,7 +258,7 @@ class YahooPlayerSearch:
         """
         logger.info(f"Fetching all MLB players from Yahoo (expecting ~1,828, max: {max_players})...")
         
-        all_players = []
+        players_by_id = {}
         positions = ['C', '1B', '2B', '3B', 'SS', 'OF', 'Util', 'SP', 'RP', 'P']
         
         for position in positions:
@@ -228,79 +266,227 @@ class YahooPlayerSearch:
             start = 0
             
             while start < max_players:
-                players = self.get_all_available_players(position=position, start=start, count=25)
-                
-                if not players:
-                    break
-                
-                # Deduplicate by Yahoo ID
+                players = self.get_all_available_players(position=position, start=start, count=PLAYER_KEY_BATCH)
                 for player in players:
-                    if not any(p['yahoo_player_id'] == player['yahoo_player_id'] for p in all_players):
-                        all_players.append(player)
+                    players_by_id.setdefault(player['yahoo_player_id'], player)
                 
-                logger.debug(f"  Fetched {len(players)} {position} players (total: {len(all_players)})")
-                start += 25
+                logger.debug(f"  Fetched {len(players)} {position} players (total: {len(players_by_id)})")
                 
-                # Rate limiting
-                time.sleep(0.5)
+                if len(players) < PLAYER_KEY_BATCH:
+                    break
+                start += PLAYER_KEY_BATCH
+        
+        logger.info(f"Fetched {len(players_by_id)} unique MLB players from Yahoo")
+        return list(players_by_id.values())
+    
+    def _parse_player(self, player: List) -> Optional[Dict]:
+        """Flatten one Yahoo player entry (a list of single-key dicts) into a record"""
+        info = {}
+        for item in player[0] if player and isinstance(player[0], list) else player:
+            if isinstance(item, dict):
+                info.update(item)
+        
+        if 'player_id' not in info:
+            return None
+        
+        return {
+            'yahoo_player_id': int(info['player_id']),
+            'player_key': info.get('player_key'),
+            'name': info.get('name', {}).get('full'),
+            'team': info.get('editorial_team_abbr'),
+            'positions': [p['position'] for p in info.get('eligible_positions', [])
+                          if isinstance(p, dict) and 'position' in p]
+        }
+    
+    def _fetch_player_batch(self, player_keys: List[str]) -> List[Dict]:
+        """Fetch details for up to 25 player keys in one request"""
+        endpoint = f"players;player_keys={','.join(player_keys)}"
+        response = self._make_request(endpoint, {'format': 'json'})
+        
+        if not response:
+            return []
+        
+        try:
+            players_data = response.get('fantasy_content', {}).get('players', {})
+            players = []
+            for key, value in players_data.items():
+                if key != 'count' and isinstance(value, dict) and 'player' in value:
+                    parsed = self._parse_player(value['player'])
+                    if parsed:
+                        players.append(parsed)
+            return players
         
-        logger.info(f"Fetched {len(all_players)} unique MLB players from Yahoo")
-        return all_players
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.error(f"Error parsing Yahoo player batch response: {e}")
+            return []
     
-    def backfill_missing_yahoo_ids(self) -> Dict[str, int]:
+    def fetch_player_details(self, yahoo_ids: Iterable[int]) -> Dict[int, Dict]:
         """
-        Search Yahoo API for all MLB players missing Yahoo IDs.
+        Fetch player details for any number of Yahoo player IDs.
         
+        Args:
+            yahoo_ids: Yahoo player IDs
+            
         Returns:
-            Statistics about the backfill process
+            Dictionary of Yahoo ID to player record
+        """
+        game_key = self.league_key.split('.l.')[0]
+        keys = [f"{game_key}.p.{yahoo_id}" for yahoo_id in sorted({int(y) for y in yahoo_ids})]
+        batches = [keys[i:i + PLAYER_KEY_BATCH] for i in range(0, len(keys), PLAYER_KEY_BATCH)]
+        
+        details = {}
+        for batch in batches:
+            for player in self._fetch_player_batch(batch):
+                details[player['yahoo_player_id']] = player
+        
+        logger.info(f"Fetched details for {len(details)} of {len(keys)} players in {len(batches)} requests")
+        return details
+    
+    def harvest_league_player_ids(self) -> Dict[int, Dict]:
+        """
+        Collect Yahoo players seen in stored league data but absent from player_mapping.
+        
+        Returns:
+            Dictionary of Yahoo ID to {'name', 'team'} from the latest league record
+        """
+        if self.use_d1 and not self.mirror_conn:
+            # Scanning the league tables over HTTPS costs D1 read quota; use --mirror
+            return {}
+        
+        candidates = {}
+        for base_table in ('daily_lineups', 'transactions'):
+            table = base_table if self.use_d1 else get_table_name(base_table, self.environment)
+            try:
+                rows = self._read_query(f"""
+                    SELECT yahoo_player_id, player_name, player_team
+                    FROM {table}
+                    WHERE yahoo_player_id IS NOT NULL AND yahoo_player_id != ''
+                    GROUP BY yahoo_player_id
+                """)
+            except sqlite3.OperationalError as e:
+                logger.debug(f"Skipping {table}: {e}")
+                continue
+            
+            for yahoo_id, name, team in rows:
+                try:
+                    candidates.setdefault(int(yahoo_id), {'name': name, 'team': team})
+                except (TypeError, ValueError):
+                    continue
+        
+        mapped = {
+            int(row[0]) for row in self._read_query(
+                "SELECT DISTINCT yahoo_player_id FROM player_mapping WHERE yahoo_player_id IS NOT NULL"
+            )
+            if str(row[0]).isdigit()
+        }
+        candidates = {yahoo_id: info for yahoo_id, info in candidates.items() if yahoo_id not in mapped}
+        
+        logger.info(f"Harvested {len(candidates)} unmapped Yahoo players from league data")
+        return candidates
+    
+    def match_candidates(self, missing_players: List[Tuple], candidates: Dict[int, Dict]) -> Dict[int, int]:
         """
-        cursor = self.conn.cursor()
+        Match unmapped MLB players to Yahoo candidates by normalized name.
         
+        Args:
+            missing_players: (mlb_id, player_name, team_code) rows
+            candidates: Yahoo ID to player record
+            
+        Returns:
+            Dictionary of MLB ID to Yahoo ID; ambiguous names are left out
+        """
+        by_name = {}
+        for yahoo_id, info in candidates.items():
+            if info.get('name'):
+                by_name.setdefault(YahooIDMatcher.normalize_name(info['name']), []).append((yahoo_id, info))
+        
+        matches = {}
+        used = set()
+        for mlb_id, player_name, team in missing_players:
+            options = [(y, i) for y, i in by_name.get(YahooIDMatcher.normalize_name(player_name or ''), [])
+                       if y not in used]
+            if len(options) > 1 and team:
+                options = [(y, i) for y, i in options if (i.get('team') or '').upper() == team.upper()]
+            if len(options) == 1:
+                matches[mlb_id] = options[0][0]
+                used.add(options[0][0])
+        
+        return matches
+    
+    def backfill_missing_yahoo_ids(self, max_searches: int = MAX_NAME_SEARCHES) -> Dict[str, int]:
+        """
+        Resolve Yahoo IDs for all MLB players missing them.
+        
+        League-data candidates are resolved in batches first; name search is
+        only used for players still unmatched afterwards.
+        
+        Args:
+            max_searches: Maximum name searches for the residue
+        
+        Returns:
+            Statistics about the backfill process
+        """
         # Get players missing Yahoo IDs
-        cursor.execute("""
+        missing_players = self._read_query("""
             SELECT mlb_id, player_name, team_code
             FROM player_mapping
             WHERE yahoo_player_id IS NULL
             AND active = 1
             ORDER BY player_name
         """)
-        
-        missing_players = cursor.fetchall()
         logger.info(f"Found {len(missing_players)} active players missing Yahoo IDs")
         
-        # Search for each player
-        found = 0
+        if not missing_players:
+            return {'searched': 0, 'found': 0, 'not_found': 0, 'remaining': 0}
+        
+        # Stages 1-2: harvested league candidates resolved in 25-key batches
+        candidates = self.harvest_league_player_ids()
+        details = self.fetch_player_details(candidates) if candidates else {}
+        for yahoo_id, info in candidates.items():
+            details.setdefault(yahoo_id, {'yahoo_player_id': yahoo_id, **info})
+        resolved = self.match_candidates(missing_players, details)
+        league_resolved = len(resolved)
+        
+        # Stage 3: name search for the residue
+        residue = [p for p in missing_players if p[0] not in resolved][:max_searches]
         not_found = []
         
-        for mlb_id, player_name, team in missing_players[:50]:  # Limit to 50 for testing
-            logger.debug(f"Searching for {player_name}...")
-            
+        for mlb_id, player_name, _ in residue:
             yahoo_player = self.search_player_by_name(player_name)
-            
             if yahoo_player:
-                # Update player mapping
-                self._execute_query("""
-                    UPDATE player_mapping
-                    SET yahoo_player_id = ?
-                    WHERE mlb_id = ?
-                """, (yahoo_player['yahoo_player_id'], mlb_id))
-                
-                found += 1
-                logger.info(f"Found: {player_name} -> Yahoo ID {yahoo_player['yahoo_player_id']}")
+                resolved[mlb_id] = yahoo_player['yahoo_player_id']
+                logger.debug(f"Found: {player_name} -> Yahoo ID {yahoo_player['yahoo_player_id']}")
             else:
                 not_found.append(player_name)
                 logger.debug(f"Not found: {player_name}")
-            
-            # Rate limiting
-            time.sleep(0.5)
+        
+        # Update player mappings
+        update_sql = """
+            UPDATE player_mapping
+            SET yahoo_player_id = ?
+            WHERE mlb_id = ?
+            AND yahoo_player_id IS NULL
+        """
+        updates = [(yahoo_id, mlb_id) for mlb_id, yahoo_id in resolved.items()]
+        if self.use_d1:
+            for params in updates:
+                self._execute_query(update_sql, params)
+        else:
+            self.conn.executemany(update_sql, updates)
         
         self._commit()
+        record_mapping_changes(self.d1_conn if self.use_d1 else self.conn, resolved.keys(),
+                               'yahoo_player_search', self.environment)
+        
+        found = len(resolved)
         
         # Show results
         logger.info(f"\nBackfill Results:")
-        logger.info(f"  Searched: {min(50, len(missing_players))} players")
+        logger.info(f"  Resolved from league data: {league_resolved} players")
+        logger.info(f"  Searched: {len(residue)} players")
         logger.info(f"  Found: {found} players")
         logger.info(f"  Not found: {len(not_found)} players")
+        logger.info(f"  API requests: {self.requests_made}")
         
         if not_found:
             logger.info("\nPlayers not found in Yahoo:")
@@ -308,10 +494,10 @@ class YahooPlayerSearch:
                 logger.info(f"  - {name}")
         
         return {
-            'searched': min(50, len(missing_players)),
+            'searched': len(residue),
             'found': found,
             'not_found': len(not_found),
-            'remaining': max(0, len(missing_players) - 50)
+            'remaining': max(0, len(missing_players) - found - len(not_found))
         }
     
     def bulk_import_yahoo_players(self) -> int:
@@ -391,7 +577,7 @@ class YahooPlayerSearch:
         print("="*80)
         
         # Overall stats
-        stats_result = self._execute_query("""
+        stats_result = self._read_query("""
             SELECT 
                 COUNT(*) as total,
                 COUNT(yahoo_player_id) as with_yahoo,
@@ -409,7 +595,7 @@ class YahooPlayerSearch:
         print(f"  Missing Yahoo ID: {stats[2]}")
         
         # Sample missing players
-        missing = self._execute_query("""
+        missing = self._read_query("""
             SELECT player_name, team_code
             FROM player_mapping
             WHERE yahoo_player_id IS NULL
@@ -435,10 +621,14 @@ def main():
                        default='stats', help='Action to perform')
     parser.add_argument('--name', help='Player name to search for')
     parser.add_argument('--environment', default='test', choices=['test', 'production'])
+    parser.add_argument('--use-d1', action='store_true', help='Use Cloudflare D1 instead of SQLite')
+    parser.add_argument('--mirror', action='store_true',
+                       help='With --use-d1, sync the local D1 mirror and read league data from it')
     
     args = parser.parse_args()
     
-    searcher = YahooPlayerSearch(environment=args.environment)
+    searcher = YahooPlayerSearch(environment=args.environment, use_d1=args.use_d1,
+                                 use_mirror=args.mirror)
     
     if args.action == 'search':
         if not args.name:
@@ -0,0 +1,13 @@
+"""
+Standings Module
+
+Roto standings for the season or any custom date window, computed from the
+team stat ledger with prefix sums.
+"""
+
+from .roto_engine import RotoStandingsEngine, roto_points
+
+__all__ = [
+    "RotoStandingsEngine",
+    "roto_points"
+]
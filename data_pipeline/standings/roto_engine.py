@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+"""
+Prefix-Sum Roto Standings Engine
+
+Answers roto standings for the full season or any custom [start, end] window
+(ROADMAP US-003 / US-004) without rescanning lineups and stats per request.
+
+The team stat ledger (data_pipeline/team_ledger) is loaded once into a NumPy
+cube of team x day x component, and a cumulative sum along the day axis is
+kept with a leading zero day. Window totals are then a single difference
+
+    totals = cum[:, end + 1] - cum[:, start]
+
+which is O(teams x components) regardless of window length. Categories are
+derived from the summed components (rate stats are divided only after
+summing) and ranked into roto points.
+
+Ties follow Yahoo's roto scoring: tied teams split the points of the places
+they occupy (two teams tied for first in a 12-team league both get 11.5).
+Rate categories are compared at their displayed precision, and a team with
+no denominator (e.g. 0 IP for ERA) ranks last in that category. K/BB is the
+exception: strikeouts with no walks rank first (ties split as usual), only
+0/0 ranks last.
+
+Usage:
+    engine = RotoStandingsEngine.from_connection(conn, season=2025)
+    table = engine.standings('2025-07-10', '2025-08-05')
+    weekly = engine.sweep(engine.weekly_windows())
+
+CLI:
+    python -m data_pipeline.standings.roto_engine --season 2025
+    python -m data_pipeline.standings.roto_engine --season 2025 --start 2025-07-10 --end 2025-08-05
+    python -m data_pipeline.standings.roto_engine --season 2025 --weekly --json standings.json
+    python -m data_pipeline.standings.roto_engine --season 2025 --weekly --export-d1
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.scoring_categories import CATEGORIES, CATEGORY_ORDER, COMPONENTS
+from data_pipeline.config.database_config import get_database_path, get_table_name
+
+logger = logging.getLogger(__name__)
+
+STANDINGS_TABLE = 'roto_standings'
+TOTAL_CATEGORY = 'TOTAL'
+
+
+def _as_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def roto_points(values: np.ndarray, higher_is_better: bool = True) -> np.ndarray:
+    """
+    Convert category values into roto points, splitting points across ties.
+
+    Args:
+        values: Array of shape (..., teams); NaN means no qualifying value
+        higher_is_better: False for categories won by the lowest value
+
+    Returns:
+        Array of the same shape with points from 1 (worst) to teams (best)
+    """
+    scores = np.where(np.isnan(values), -np.inf, values if higher_is_better else -values)
+    below = (scores[..., None, :] < scores[..., :, None]).sum(axis=-1)
+    tied = (scores[..., None, :] == scores[..., :, None]).sum(axis=-1)
+    return below + (tied + 1) / 2.0
+
+
+class RotoStandingsEngine:
+    """Roto standings for arbitrary date windows via prefix sums."""
+
+    def __init__(self, season: int, team_keys: Sequence[str], team_names: Dict[str, str],
+                 first_day: date, daily: np.ndarray):
+        """
+        Args:
+            season: Season year
+            team_keys: Team keys in cube order
+            team_names: team_key -> display name
+            first_day: Date of day index 0
+            daily: Array of shape (teams, days, components) in COMPONENTS order
+        """
+        self.season = season
+        self.team_keys = list(team_keys)
+        self.team_names = team_names
+        self.first_day = first_day
+        self.num_days = daily.shape[1]
+        self.components = list(COMPONENTS)
+        self._component_index = {name: i for i, name in enumerate(self.components)}
+
+        # cum[:, d] = totals for days [0, d)
+        self.cum = np.zeros((daily.shape[0], self.num_days + 1, daily.shape[2]))
+        np.cumsum(daily, axis=1, out=self.cum[:, 1:])
+
+    @classmethod
+    def from_connection(cls, connection, season: int, environment: str = 'production',
+                        ledger_table: Optional[str] = None,
+                        lineup_table: Optional[str] = None) -> 'RotoStandingsEngine':
+        """
+        Load a season's ledger into the engine.
+
+        Args:
+            connection: sqlite3.Connection or D1Connection holding the ledger
+            season: Season year
+            environment: 'production' or 'test' (SQLite table suffixes)
+            ledger_table: Override ledger table name
+            lineup_table: Override lineup table name (used for team names)
+        """
+        is_sqlite = isinstance(connection, sqlite3.Connection)
+        if is_sqlite:
+            ledger_table = ledger_table or get_table_name('team_stat_ledger', environment)
+            lineup_table = lineup_table or get_table_name('daily_lineups', environment)
+        else:
+            ledger_table = ledger_table or 'team_stat_ledger'
+            lineup_table = lineup_table or 'daily_lineups'
+
+        def query(sql, params):
+            if is_sqlite:
+                cursor = connection.execute(sql, params)
+                columns = [d[0] for d in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return connection.execute(sql, params).get('results', [])
+
+        components = list(COMPONENTS)
+        rows = query(
+            f"SELECT date, team_key, {', '.join(components)} FROM {ledger_table} "
+            f"WHERE season = ? ORDER BY date", [season]
+        )
+        if not rows:
+            raise ValueError(f"No ledger rows for season {season}; rebuild the team stat ledger first")
+
+        names = query(
+            f"SELECT team_key, MAX(team_name) AS team_name FROM {lineup_table} "
+            f"WHERE season = ? GROUP BY team_key", [season]
+        )
+        team_names = {row['team_key']: row['team_name'] for row in names}
+
+        return cls.from_rows(season, rows, team_names)
+
+    @classmethod
+    def from_rows(cls, season: int, rows: Sequence[Dict[str, Any]],
+                  team_names: Optional[Dict[str, str]] = None) -> 'RotoStandingsEngine':
+        """Build the cube from ledger row dictionaries."""
+        components = list(COMPONENTS)
+        team_keys = sorted({row['team_key'] for row in rows})
+        team_index = {key: i for i, key in enumerate(team_keys)}
+        days = [_as_date(row['date']) for row in rows]
+        first_day = min(days)
+        num_days = (max(days) - first_day).days + 1
+
+        daily = np.zeros((len(team_keys), num_days, len(components)))
+        t_idx = np.fromiter((team_index[row['team_key']] for row in rows), dtype=np.int64, count=len(rows))
+        d_idx = np.fromiter(((d - first_day).days for d in days), dtype=np.int64, count=len(rows))
+        values = np.array([[row.get(c) or 0 for c in components] for row in rows], dtype=float)
+        np.add.at(daily, (t_idx, d_idx), values)
+
+        return cls(season, team_keys, team_names or {}, first_day, daily)
+
+    # ------------------------------------------------------------------
+    # Windows
+    # ------------------------------------------------------------------
+
+    @property
+    def last_day(self) -> date:
+        return self.first_day + timedelta(days=self.num_days - 1)
+
+    def _day_bounds(self, start, end) -> Tuple[int, int]:
+        """Clip a date window to the loaded days; returns [lo, hi) day indexes."""
+        lo = 0 if start is None else (_as_date(start) - self.first_day).days
+        hi = self.num_days if end is None else (_as_date(end) - self.first_day).days + 1
+        lo = min(max(lo, 0), self.num_days)
+        hi = min(max(hi, lo), self.num_days)
+        return lo, hi
+
+    def weekly_windows(self, week_start: int = 0) -> List[Tuple[date, date]]:
+        """
+        Calendar weeks covering the loaded season.
+
+        Args:
+            week_start: Weekday that starts a week (0 = Monday, Yahoo's default)
+        """
+        windows = []
+        start = self.first_day
+        while start <= self.last_day:
+            end = start + timedelta(days=(week_start - start.weekday() - 1) % 7)
+            windows.append((start, min(end, self.last_day)))
+            start = end + timedelta(days=1)
+        return windows
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _category_values(self, totals: np.ndarray) -> np.ndarray:
+        """Convert component totals (..., teams, components) to (..., teams, categories)."""
+        out = np.empty(totals.shape[:-1] + (len(CATEGORY_ORDER),))
+        for k, category in enumerate(CATEGORY_ORDER):
+            spec = CATEGORIES[category]
+            numerator = sum(totals[..., self._component_index[c]] for c in spec['numerator'])
+            if spec.get('denominator'):
+                denominator = sum(totals[..., self._component_index[c]] for c in spec['denominator'])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    value = np.where(denominator > 0,
+                                     numerator * spec.get('scale', 1) / np.where(denominator > 0, denominator, 1),
+                                     np.nan)
+                value = np.round(value, spec.get('precision', 3))
+                if spec.get('zero_denominator_best'):
+                    # Above every finite rate; roto_points ranks NaN (0/0) last
+                    value = np.where((denominator <= 0) & (numerator > 0), np.inf, value)
+                out[..., k] = value
+            else:
+                out[..., k] = numerator
+        return out
+
+    def _score(self, totals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Category values and roto points for component totals (..., teams, components)."""
+        values = self._category_values(totals)
+        points = np.empty_like(values)
+        for k, category in enumerate(CATEGORY_ORDER):
+            points[..., k] = roto_points(values[..., k], CATEGORIES[category].get('higher_is_better', True))
+        return values, points
+
+    def window_totals(self, start=None, end=None) -> np.ndarray:
+        """Component totals for [start, end] as an array of shape (teams, components)."""
+        lo, hi = self._day_bounds(start, end)
+        return self.cum[:, hi] - self.cum[:, lo]
+
+    def standings(self, start=None, end=None) -> List[Dict[str, Any]]:
+        """
+        Roto standings for an inclusive date window (default: whole season).
+
+        Returns:
+            Teams sorted by total points, each with rank, total_points and a
+            per-category dictionary of value and points
+        """
+        values, points = self._score(self.window_totals(start, end))
+        return self._format(values, points, start, end)
+
+    def sweep(self, windows: Sequence[Tuple[Any, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score many windows at once with one vectorized pass.
+
+        Args:
+            windows: (start, end) pairs
+
+        Returns:
+            One {'start', 'end', 'standings'} entry per window
+        """
+        if not windows:
+            return []
+        bounds = np.array([self._day_bounds(start, end) for start, end in windows])
+        # (windows, teams, components)
+        totals = (self.cum[:, bounds[:, 1]] - self.cum[:, bounds[:, 0]]).transpose(1, 0, 2)
+        values, points = self._score(totals)
+        return [
+            {
+                'start': str(_as_date(start)) if start else str(self.first_day),
+                'end': str(_as_date(end)) if end else str(self.last_day),
+                'standings': self._format(values[w], points[w], start, end),
+            }
+            for w, (start, end) in enumerate(windows)
+        ]
+
+    def _format(self, values: np.ndarray, points: np.ndarray, start, end) -> List[Dict[str, Any]]:
+        totals = points.sum(axis=1)
+        # Tied teams share the better place
+        ranks = 1 + (totals[None, :] > totals[:, None]).sum(axis=1)
+        table = []
+        for t, team_key in enumerate(self.team_keys):
+            table.append({
+                'team_key': team_key,
+                'team_name': self.team_names.get(team_key, team_key),
+                'rank': int(ranks[t]),
+                'total_points': float(totals[t]),
+                'categories': {
+                    category: {
+                        'value': float(values[t, k]) if np.isfinite(values[t, k]) else None,
+                        'points': float(points[t, k]),
+                    }
+                    for k, category in enumerate(CATEGORY_ORDER)
+                },
+            })
+        table.sort(key=lambda row: (-row['total_points'], row['team_key']))
+        return table
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def to_rows(self, windows: Sequence[Dict[str, Any]]) -> List[Tuple]:
+        """Flatten sweep() output into roto_standings rows (one per team and category)."""
+        rows = []
+        for window in windows:
+            for team in window['standings']:
+                base = (self.season, window['start'], window['end'], team['team_key'], team['team_name'])
+                rows.append(base + (TOTAL_CATEGORY, team['total_points'], team['total_points'], team['rank']))
+                for category, cell in team['categories'].items():
+                    rows.append(base + (category, cell['value'], cell['points'], None))
+        return rows
+
+    def export_json(self, windows: Sequence[Dict[str, Any]], path) -> Path:
+        """Write sweep() output as JSON for the web UI."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'season': self.season,
+            'categories': CATEGORY_ORDER,
+            'generated_at': datetime.now().isoformat(),
+            'windows': list(windows),
+        }
+        path.write_text(json.dumps(payload, indent=2))
+        logger.info(f"Wrote {len(windows)} standings windows to {path}")
+        return path
+
+    def export_table(self, connection, windows: Sequence[Dict[str, Any]],
+                     table: str = STANDINGS_TABLE) -> int:
+        """
+        Replace stored standings for the given windows in SQLite or D1.
+
+        Returns:
+            Number of rows written
+        """
+        columns = ('season', 'start_date', 'end_date', 'team_key', 'team_name',
+                   'category', 'value', 'points', 'rank')
+        create_sql = f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                season INTEGER NOT NULL,
+                start_date DATE NOT NULL,
+                end_date DATE NOT NULL,
+                team_key TEXT NOT NULL,
+                team_name TEXT,
+                category TEXT NOT NULL,
+                value REAL,
+                points REAL,
+                rank REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (season, start_date, end_date, team_key, category)
+            )
+        """
+        rows = self.to_rows(windows)
+        insert_sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES "
+
+        if isinstance(connection, sqlite3.Connection):
+            connection.execute(create_sql)
+            connection.executemany(insert_sql + f"({', '.join(['?'] * len(columns))})", rows)
+            connection.commit()
+        else:
+            from data_pipeline.common.sql_dump_writer import encode_row
+            connection.execute(create_sql)
+            statements = [
+                (insert_sql + ',\n'.join(encode_row(row) for row in rows[i:i + 100]), [])
+                for i in range(0, len(rows), 100)
+            ]
+            failures = [r for r in connection.execute_batch(statements) if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} standings batches failed: {failures[0].get('error')}")
+
+        logger.info(f"Exported {len(rows)} standings rows to {table}")
+        return len(rows)
+
+
+def print_standings(table: List[Dict[str, Any]], start=None, end=None):
+    """Print a standings table."""
+    print("=" * 60)
+    print(f"ROTO STANDINGS {start or 'season start'} to {end or 'season end'}")
+    print("=" * 60)
+    header = f"{'Rank':<6}{'Team':<28}{'Pts':>7}"
+    print(header)
+    print("-" * len(header))
+    for team in table:
+        print(f"{team['rank']:<6}{team['team_name'][:27]:<28}{team['total_points']:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roto standings for any date window')
+    parser.add_argument('--season', type=int, required=True, help='Season year')
+    parser.add_argument('--start', help='Window start (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Window end (YYYY-MM-DD)')
+    parser.add_argument('--weekly', action='store_true', help='Score every calendar week')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    parser.add_argument('--export-d1', action='store_true', help='Write results to the D1 roto_standings table')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Read the ledger from D1')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    d1 = None
+    if args.use_d1 or args.export_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        d1 = D1Connection()
+    connection = d1 if args.use_d1 else sqlite3.connect(str(get_database_path(args.environment)))
+
+    engine = RotoStandingsEngine.from_connection(connection, args.season, args.environment)
+
+    if args.weekly:
+        windows = engine.sweep(engine.weekly_windows())
+        for window in windows:
+            leader = window['standings'][0]
+            print(f"{window['start']} to {window['end']}: {leader['team_name']} ({leader['total_points']:.1f})")
+    else:
+        windows = engine.sweep([(args.start, args.end)])
+        print_standings(windows[0]['standings'], windows[0]['start'], windows[0]['end'])
+
+    if args.json:
+        engine.export_json(windows, args.json)
+    if args.export_d1:
+        engine.export_table(d1, windows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Standings Module Test Suite
+
+Run all tests:
+    python -m unittest discover data_pipeline/standings/tests
+"""
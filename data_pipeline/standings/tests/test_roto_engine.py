@@ -0,0 +1,89 @@
+"""Tests for the prefix-sum roto standings engine."""
+
+import unittest
+
+import numpy as np
+
+from data_pipeline.standings.roto_engine import RotoStandingsEngine, roto_points
+
+
+def ledger_row(team_key, date, **components):
+    return {'team_key': team_key, 'date': date, **components}
+
+
+def category(table, team_key, name):
+    return next(team for team in table if team['team_key'] == team_key)['categories'][name]
+
+
+class RotoPointsTest(unittest.TestCase):
+
+    def test_ties_split_points(self):
+        points = roto_points(np.array([5.0, 7.0, 7.0, 1.0]))
+        np.testing.assert_array_equal(points, [2.0, 3.5, 3.5, 1.0])
+
+    def test_lower_is_better_and_missing_values_rank_last(self):
+        points = roto_points(np.array([3.50, np.nan, 2.75, 3.50]), higher_is_better=False)
+        np.testing.assert_array_equal(points, [2.5, 1.0, 4.0, 2.5])
+
+
+class RotoStandingsEngineTest(unittest.TestCase):
+
+    def test_rate_stats_divide_window_totals(self):
+        engine = RotoStandingsEngine.from_rows(2025, [
+            ledger_row('t.1', '2025-04-01', batting_hits=1, batting_at_bats=4),
+            ledger_row('t.1', '2025-04-02', batting_hits=3, batting_at_bats=4),
+            ledger_row('t.2', '2025-04-01', batting_hits=2, batting_at_bats=4),
+            ledger_row('t.2', '2025-04-02', batting_hits=2, batting_at_bats=4),
+        ])
+        season = engine.standings()
+        # Both .500 over the season, so AVG is tied
+        self.assertEqual(category(season, 't.1', 'AVG'), {'value': 0.5, 'points': 1.5})
+        self.assertEqual(category(season, 't.2', 'AVG'), {'value': 0.5, 'points': 1.5})
+
+        day_two = engine.standings('2025-04-02', '2025-04-02')
+        self.assertEqual(category(day_two, 't.1', 'AVG'), {'value': 0.75, 'points': 2.0})
+        self.assertEqual(category(day_two, 't.2', 'AVG'), {'value': 0.5, 'points': 1.0})
+
+    def test_era_without_innings_ranks_last(self):
+        engine = RotoStandingsEngine.from_rows(2025, [
+            ledger_row('t.1', '2025-04-01', pitching_earned_runs=3, pitching_innings_pitched=9),
+            ledger_row('t.2', '2025-04-01', pitching_earned_runs=6, pitching_innings_pitched=9),
+            ledger_row('t.3', '2025-04-01', batting_hits=1),
+        ])
+        table = engine.standings()
+        self.assertEqual(category(table, 't.1', 'ERA')['points'], 3.0)
+        self.assertEqual(category(table, 't.2', 'ERA')['points'], 2.0)
+        self.assertEqual(category(table, 't.3', 'ERA'), {'value': None, 'points': 1.0})
+
+    def test_strikeouts_without_walks_rank_best_in_k_bb(self):
+        engine = RotoStandingsEngine.from_rows(2025, [
+            ledger_row('t.1', '2025-04-01', pitching_strikeouts=12, pitching_walks_allowed=2),
+            ledger_row('t.2', '2025-04-01', pitching_strikeouts=5, pitching_walks_allowed=0),
+            ledger_row('t.3', '2025-04-01', pitching_strikeouts=0, pitching_walks_allowed=0),
+            ledger_row('t.4', '2025-04-01', pitching_strikeouts=3, pitching_walks_allowed=3),
+        ])
+        table = engine.standings()
+        self.assertEqual(category(table, 't.2', 'K/BB'), {'value': None, 'points': 4.0})
+        self.assertEqual(category(table, 't.1', 'K/BB'), {'value': 6.0, 'points': 3.0})
+        self.assertEqual(category(table, 't.4', 'K/BB'), {'value': 1.0, 'points': 2.0})
+        self.assertEqual(category(table, 't.3', 'K/BB'), {'value': None, 'points': 1.0})
+
+    def test_sweep_matches_single_windows_and_ranks_ties(self):
+        engine = RotoStandingsEngine.from_rows(2025, [
+            ledger_row('t.1', '2025-04-07', batting_runs=2),
+            ledger_row('t.2', '2025-04-07', batting_runs=2),
+            ledger_row('t.1', '2025-04-14', batting_runs=5),
+        ])
+        windows = engine.weekly_windows()
+        self.assertEqual([(str(s), str(e)) for s, e in windows],
+                         [('2025-04-07', '2025-04-13'), ('2025-04-14', '2025-04-14')])
+
+        swept = engine.sweep(windows)
+        for window, (start, end) in zip(swept, windows):
+            self.assertEqual(window['standings'], engine.standings(start, end))
+        # Identical first week: both teams share first place
+        self.assertEqual([team['rank'] for team in swept[0]['standings']], [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,13 @@
+"""
+Team Stat Ledger Module
+
+Materialized team x date totals of scoring-category components, maintained
+from daily_lineups and daily_gkl_player_stats.
+"""
+
+from .ledger import TeamStatLedger, refresh_ledger_for_dates
+
+__all__ = [
+    "TeamStatLedger",
+    "refresh_ledger_for_dates"
+]
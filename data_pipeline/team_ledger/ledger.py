@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""
+Team-Day Stat Ledger
+
+Materializes team x date totals for every scoring-category component from
+daily_lineups (active slots only) joined to daily_gkl_player_stats. Standings,
+matchup and valuation queries read a few thousand ledger rows instead of
+re-joining hundreds of thousands of raw lineup and stat rows.
+
+Rate categories are stored as components (H and AB, ER and IP, BB + H and IP,
+...) so any date range can be summed first and divided afterwards.
+
+Two maintenance paths:
+    refresh_dates()  - incremental; one set-based DELETE + INSERT ... SELECT per
+                       batch of dates, executed inside the database (SQLite or D1).
+                       Called by update_lineups.py and update_stats.py.
+    rebuild_season() - full rebuild of a season, vectorized with pandas over a
+                       local SQLite source (the production database or the D1
+                       mirror) and bulk-written to the target.
+
+Usage:
+    python -m data_pipeline.team_ledger.ledger --rebuild --season 2025
+    python -m data_pipeline.team_ledger.ledger --dates 2025-08-01 2025-08-02 --use-d1
+    python -m data_pipeline.team_ledger.ledger --rebuild --season 2025 --use-d1 --source-mirror
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.scoring_categories import (
+    COMPONENTS,
+    INACTIVE_SLOTS,
+    PITCHING_SLOTS,
+    component_sql,
+    stats_columns,
+)
+from data_pipeline.config.database_config import get_database_path, get_table_name
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = 'team_stat_ledger'
+STATS_TABLE = 'daily_gkl_player_stats'
+LINEUP_TABLE = 'daily_lineups'
+
+# Dates per incremental statement (keeps D1 statements small)
+REFRESH_DATE_BATCH = 31
+# Rows per multi-row INSERT when writing a rebuild to D1
+D1_INSERT_ROWS = 100
+
+
+def _quoted(values: Sequence[str]) -> str:
+    return ', '.join(f"'{value}'" for value in values)
+
+
+class TeamStatLedger:
+    """Maintains the team x date component ledger."""
+
+    def __init__(self, connection, environment: str = 'production',
+                 lineup_table: Optional[str] = None, stats_table: Optional[str] = None,
+                 ledger_table: Optional[str] = None):
+        """
+        Args:
+            connection: D1Connection or sqlite3.Connection holding lineups and stats
+            environment: 'production' or 'test' (selects table suffixes for SQLite)
+            lineup_table: Override lineup table name
+            stats_table: Override stats table name
+            ledger_table: Override ledger table name
+        """
+        self.connection = connection
+        self.is_sqlite = isinstance(connection, sqlite3.Connection)
+        self.environment = environment
+
+        if self.is_sqlite:
+            self.lineup_table = lineup_table or get_table_name(LINEUP_TABLE, environment)
+            self.ledger_table = ledger_table or get_table_name(LEDGER_TABLE, environment)
+        else:
+            self.lineup_table = lineup_table or LINEUP_TABLE
+            self.ledger_table = ledger_table or LEDGER_TABLE
+        self.stats_table = stats_table or STATS_TABLE
+
+        self.components = list(COMPONENTS)
+
+    # ------------------------------------------------------------------
+    # Connection helpers
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self.connection.execute(sql, list(params)).get('results', [])
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        if self.is_sqlite:
+            cursor = self.connection.execute(sql, list(params))
+            return cursor.rowcount
+        return self.connection.execute(sql, list(params)).get('changes', 0)
+
+    def _commit(self):
+        if self.is_sqlite:
+            self.connection.commit()
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def ensure_table(self):
+        """Create the ledger table if it does not exist."""
+        component_columns = ',\n                '.join(
+            f"{name} {'REAL' if name == 'pitching_innings_pitched' else 'INTEGER'} DEFAULT 0"
+            for name in self.components
+        )
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.ledger_table} (
+                season INTEGER NOT NULL,
+                date DATE NOT NULL,
+                team_key TEXT NOT NULL,
+                active_players INTEGER DEFAULT 0,
+                {component_columns},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (date, team_key)
+            )
+        """)
+        self._execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.ledger_table}_season_team
+            ON {self.ledger_table}(season, team_key, date)
+        """)
+        self._commit()
+
+    # ------------------------------------------------------------------
+    # Incremental refresh
+    # ------------------------------------------------------------------
+
+    def _aggregate_sql(self, where: str) -> str:
+        batting_slot = (f"l.selected_position NOT IN ({_quoted(PITCHING_SLOTS)})")
+        pitching_slot = (f"l.selected_position IN ({_quoted(PITCHING_SLOTS)})")
+
+        sums = []
+        for name in self.components:
+            side, _ = COMPONENTS[name]
+            slot = batting_slot if side == 'batting' else pitching_slot
+            sums.append(f"SUM(CASE WHEN {slot} THEN {component_sql(name)} ELSE 0 END) AS {name}")
+
+        return f"""
+            SELECT l.season, l.date, l.team_key,
+                   COUNT(DISTINCT l.yahoo_player_id) AS active_players,
+                   {', '.join(sums)}
+            FROM {self.lineup_table} l
+            LEFT JOIN {self.stats_table} s
+                ON s.date = l.date AND s.yahoo_player_id = l.yahoo_player_id
+            WHERE l.selected_position IS NOT NULL
+              AND l.selected_position NOT IN ({_quoted(INACTIVE_SLOTS)})
+              AND {where}
+            GROUP BY l.season, l.date, l.team_key
+        """
+
+    def refresh_dates(self, dates: Iterable[str]) -> int:
+        """
+        Recompute ledger rows for the given dates inside the database.
+
+        Args:
+            dates: Dates (YYYY-MM-DD) whose lineups or stats changed
+
+        Returns:
+            Number of ledger rows written
+        """
+        dates = sorted({str(d)[:10] for d in dates})
+        if not dates:
+            return 0
+
+        self.ensure_table()
+        columns = ['season', 'date', 'team_key', 'active_players'] + self.components
+        written = 0
+
+        for i in range(0, len(dates), REFRESH_DATE_BATCH):
+            batch = dates[i:i + REFRESH_DATE_BATCH]
+            placeholders = ', '.join(['?'] * len(batch))
+            self._execute(f"DELETE FROM {self.ledger_table} WHERE date IN ({placeholders})", batch)
+            written += self._execute(
+                f"INSERT INTO {self.ledger_table} ({', '.join(columns)}) "
+                f"{self._aggregate_sql(f'l.date IN ({placeholders})')}",
+                batch
+            )
+            self._commit()
+
+        logger.info(f"Refreshed {written} ledger rows for {len(dates)} dates")
+        return written
+
+    # ------------------------------------------------------------------
+    # Full rebuild
+    # ------------------------------------------------------------------
+
+    def build_frame(self, source: sqlite3.Connection, season: int):
+        """
+        Compute a season's ledger rows as a DataFrame, vectorized.
+
+        Args:
+            source: SQLite connection holding lineups and stats (local DB or D1 mirror)
+            season: Season year
+
+        Returns:
+            DataFrame with one row per team and date
+        """
+        import numpy as np
+        import pandas as pd
+
+        lineups = pd.read_sql_query(
+            f"SELECT season, date, team_key, yahoo_player_id, selected_position "
+            f"FROM {self.lineup_table} "
+            f"WHERE season = ? AND selected_position IS NOT NULL "
+            f"AND selected_position NOT IN ({_quoted(INACTIVE_SLOTS)})",
+            source, params=[season]
+        )
+        columns = ['date', 'yahoo_player_id'] + stats_columns()
+        stats = pd.read_sql_query(
+            f"SELECT {', '.join(columns)} FROM {self.stats_table} "
+            f"WHERE date BETWEEN ? AND ?",
+            source, params=[lineups['date'].min(), lineups['date'].max()]
+        ) if not lineups.empty else pd.DataFrame(columns=columns)
+
+        merged = lineups.merge(stats, on=['date', 'yahoo_player_id'], how='left')
+        pitching_mask = merged['selected_position'].isin(PITCHING_SLOTS).to_numpy()
+        masks = {'batting': ~pitching_mask, 'pitching': pitching_mask}
+
+        for name in self.components:
+            side, terms = COMPONENTS[name]
+            total = np.zeros(len(merged))
+            for column, weight in terms:
+                total += weight * pd.to_numeric(merged[column], errors='coerce').fillna(0).to_numpy()
+            merged[name] = np.where(masks[side], total, 0)
+
+        grouped = merged.groupby(['season', 'date', 'team_key'], sort=True)
+        frame = grouped[self.components].sum()
+        frame.insert(0, 'active_players', grouped['yahoo_player_id'].nunique())
+        frame = frame.reset_index()
+
+        integer_columns = [c for c in self.components if c != 'pitching_innings_pitched']
+        frame[integer_columns] = frame[integer_columns].round().astype('int64')
+        return frame
+
+    def rebuild_season(self, season: int, source: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Replace all ledger rows for a season.
+
+        Args:
+            season: Season year
+            source: SQLite connection to read lineups and stats from. Defaults to
+                the ledger connection when it is SQLite. With a D1 target and no
+                source, the rebuild runs set-based on the server instead.
+
+        Returns:
+            Number of ledger rows written
+        """
+        self.ensure_table()
+
+        if source is None and not self.is_sqlite:
+            dates = [row['date'] for row in self._query(
+                f"SELECT DISTINCT date FROM {self.lineup_table} WHERE season = ? ORDER BY date",
+                [season]
+            )]
+            self._execute(f"DELETE FROM {self.ledger_table} WHERE season = ?", [season])
+            return self.refresh_dates(dates)
+
+        frame = self.build_frame(source or self.connection, season)
+        columns = list(frame.columns)
+        rows = frame.itertuples(index=False, name=None)
+
+        self._execute(f"DELETE FROM {self.ledger_table} WHERE season = ?", [season])
+        if self.is_sqlite:
+            self.connection.executemany(
+                f"INSERT INTO {self.ledger_table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * len(columns))})",
+                [tuple(value.item() if hasattr(value, 'item') else value for value in row) for row in rows]
+            )
+            self._commit()
+        else:
+            from data_pipeline.common.sql_dump_writer import encode_row
+            rows = list(rows)
+            statements = []
+            for i in range(0, len(rows), D1_INSERT_ROWS):
+                values = ',\n'.join(encode_row(row) for row in rows[i:i + D1_INSERT_ROWS])
+                statements.append((f"INSERT INTO {self.ledger_table} ({', '.join(columns)}) VALUES\n{values}", []))
+            failures = [r for r in self.connection.execute_batch(statements) if not r.get('success', True)]
+            if failures:
+                raise RuntimeError(f"{len(failures)} ledger insert batches failed: {failures[0].get('error')}")
+
+        logger.info(f"Rebuilt {len(frame)} ledger rows for season {season}")
+        return len(frame)
+
+
+def refresh_ledger_for_dates(connection, dates: Iterable[str], environment: str = 'production',
+                             **table_overrides) -> int:
+    """
+    Refresh ledger rows for changed dates, logging instead of raising.
+
+    Used as a post-write hook by the lineup and stats updaters so a ledger
+    problem never fails an ingestion job.
+    """
+    try:
+        return TeamStatLedger(connection, environment, **table_overrides).refresh_dates(dates)
+    except Exception as e:
+        logger.error(f"Failed to refresh team stat ledger: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the team-day stat ledger')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild a whole season')
+    parser.add_argument('--season', type=int, help='Season to rebuild')
+    parser.add_argument('--dates', nargs='+', help='Refresh specific dates (YYYY-MM-DD)')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--use-d1', action='store_true', help='Maintain the ledger in D1')
+    parser.add_argument('--source-mirror', action='store_true',
+                        help='Read lineups and stats from the local D1 mirror for --rebuild')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.rebuild and not args.dates:
+        parser.error('Specify --rebuild --season YEAR or --dates')
+    if args.rebuild and not args.season:
+        parser.error('--rebuild requires --season')
+
+    if args.use_d1:
+        from data_pipeline.common.d1_connection import D1Connection
+        connection = D1Connection()
+    else:
+        connection = sqlite3.connect(str(get_database_path(args.environment)))
+
+    source = None
+    if args.source_mirror:
+        from data_pipeline.config.database_config import get_mirror_database_path
+        source = sqlite3.connect(str(get_mirror_database_path()))
+
+    ledger = TeamStatLedger(connection, args.environment)
+    if args.rebuild:
+        count = ledger.rebuild_season(args.season, source=source)
+        print(f"Rebuilt {count} ledger rows for {args.season}")
+    else:
+        count = ledger.refresh_dates(args.dates)
+        print(f"Refreshed {count} ledger rows for {len(args.dates)} dates")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+Team Ledger Module Test Suite
+
+Run all tests:
+    python -m unittest discover data_pipeline/team_ledger/tests
+"""
@@ -0,0 +1,93 @@
+"""Tests for the team-day stat ledger."""
+
+import sqlite3
+import unittest
+
+from data_pipeline.common.scoring_categories import stats_columns
+from data_pipeline.team_ledger.ledger import TeamStatLedger
+
+TEAM = '458.l.6966.t.1'
+OTHER_TEAM = '458.l.6966.t.2'
+
+
+class TeamStatLedgerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("""
+            CREATE TABLE lineups (
+                season INTEGER, date TEXT, team_key TEXT, yahoo_player_id TEXT, selected_position TEXT
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE TABLE stats (
+                date TEXT, yahoo_player_id TEXT, {', '.join(f'{c} REAL' for c in stats_columns())}
+            )
+        """)
+        self.ledger = TeamStatLedger(self.conn, 'production', lineup_table='lineups',
+                                     stats_table='stats', ledger_table='ledger')
+
+        self.add_lineup('2025-06-01', TEAM, '1', 'C')
+        self.add_lineup('2025-06-01', TEAM, '2', 'SP')
+        self.add_lineup('2025-06-01', TEAM, '3', 'BN')
+        self.add_lineup('2025-06-01', TEAM, '4', 'IL15')
+        self.add_lineup('2025-06-01', OTHER_TEAM, '5', 'OF')
+        self.add_lineup('2025-06-02', TEAM, '1', 'C')
+        self.add_stats('2025-06-01', '1', batting_hits=2, batting_at_bats=4, batting_home_runs=1)
+        # Pitching stats of a player in a batting slot do not count, and vice versa
+        self.add_stats('2025-06-01', '2', pitching_strikeouts=7, pitching_innings_pitched=6, batting_hits=1)
+        self.add_stats('2025-06-01', '3', batting_hits=3, batting_at_bats=3)
+        self.add_stats('2025-06-01', '4', batting_hits=1, batting_at_bats=1)
+        self.add_stats('2025-06-01', '5', batting_hits=1, batting_at_bats=5)
+        self.add_stats('2025-06-02', '1', batting_hits=1, batting_at_bats=3)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def add_lineup(self, date, team_key, player_id, position):
+        self.conn.execute("INSERT INTO lineups VALUES (2025, ?, ?, ?, ?)", (date, team_key, player_id, position))
+
+    def add_stats(self, date, player_id, **values):
+        columns = ['date', 'yahoo_player_id'] + list(values)
+        self.conn.execute(f"INSERT INTO stats ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                          [date, player_id] + list(values.values()))
+
+    def ledger_rows(self):
+        return self.conn.execute("""
+            SELECT date, team_key, active_players, batting_hits, batting_at_bats, batting_home_runs,
+                   batting_total_bases, pitching_strikeouts, pitching_innings_pitched
+            FROM ledger ORDER BY date, team_key
+        """).fetchall()
+
+    def test_refresh_dates_sums_active_slots_by_side(self):
+        self.assertEqual(self.ledger.refresh_dates(['2025-06-01', '2025-06-02']), 3)
+        self.assertEqual(self.ledger_rows(), [
+            ('2025-06-01', TEAM, 2, 2, 4, 1, 5, 7, 6.0),
+            ('2025-06-01', OTHER_TEAM, 1, 1, 5, 0, 1, 0, 0.0),
+            ('2025-06-02', TEAM, 1, 1, 3, 0, 1, 0, 0.0),
+        ])
+
+    def test_refresh_rerun_replaces_rows(self):
+        self.ledger.refresh_dates(['2025-06-01', '2025-06-02'])
+        self.conn.execute("UPDATE stats SET batting_hits = 3 WHERE date = '2025-06-02'")
+        self.conn.execute("UPDATE lineups SET selected_position = 'BN' WHERE yahoo_player_id = '5'")
+
+        self.ledger.refresh_dates(['2025-06-01', '2025-06-02'])
+        self.assertEqual(self.ledger_rows(), [
+            ('2025-06-01', TEAM, 2, 2, 4, 1, 5, 7, 6.0),
+            ('2025-06-02', TEAM, 1, 3, 3, 0, 3, 0, 0.0),
+        ])
+
+    def test_rebuild_season_matches_refresh(self):
+        self.ledger.refresh_dates(['2025-06-01', '2025-06-02'])
+        refreshed = self.ledger_rows()
+
+        self.assertEqual(self.ledger.rebuild_season(2025), 3)
+        self.assertEqual(self.ledger_rows(), refreshed)
+        # A second rebuild replaces the season instead of adding to it
+        self.ledger.rebuild_season(2025)
+        self.assertEqual(self.ledger_rows(), refreshed)
+
+
+if __name__ == '__main__':
+    unittest.main()
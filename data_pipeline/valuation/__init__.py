@@ -0,0 +1,15 @@
+"""
+Valuation Module
+
+Player and draft value analytics built on the league's scoring categories.
+"""
+
+from .draft_value import DraftValueEngine, team_summary
+from .gkl_war import GKLWarEngine, refresh_war_for_season
+
+__all__ = [
+    "DraftValueEngine",
+    "team_summary",
+    "GKLWarEngine",
+    "refresh_war_for_season"
+]
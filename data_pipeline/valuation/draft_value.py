@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+"""
+Draft Value Attribution (ROADMAP US-001)
+
+Answers which manager got the most value from their draft by crediting each
+drafted player's production to the drafting team only while that team
+rostered him, for every season in one batch.
+
+Pipeline:
+    1. Ownership intervals - daily_lineups rows are collapsed into
+       (season, player, team, start, end) runs with a gaps-and-islands pass.
+       Runs separated by missing lineup days are merged unless the
+       transactions table shows the player leaving that team in between.
+    2. Draft tenure - each draft pick is joined to the drafting team's first
+       ownership interval that season (the tenure that began at the draft).
+    3. Range aggregation - per-player cumulative stat sums are built once; the
+       production inside an interval is cum(end) - cum(start - 1), looked up
+       with merge_asof, so no day-by-day scan is needed.
+    4. Value - attributed totals are scored with the GKL WAR category z-scores
+       (valuation.gkl_war.score_side) against all drafted players that season.
+
+Keepers are taken from draft_results.keeper_status (see
+DraftResultsCollector.update_keeper_status); team summaries report value with
+and without keepers.
+
+Usage:
+    python -m data_pipeline.valuation.draft_value                 # All seasons
+    python -m data_pipeline.valuation.draft_value --season 2024 2025
+    python -m data_pipeline.valuation.draft_value --exclude-keepers
+    python -m data_pipeline.valuation.draft_value --mirror       # Read the D1 mirror
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.scoring_categories import COMPONENTS, component_sql
+from data_pipeline.config.database_config import get_database_path, get_table_name
+from data_pipeline.metadata.league_keys import LEAGUE_KEYS
+from data_pipeline.valuation.gkl_war import STATS_TABLE, score_side
+
+logger = logging.getLogger(__name__)
+
+DRAFT_VALUE_TABLE = 'draft_value'
+
+# Transaction movements that take a player off a team
+DEPARTURE_MOVEMENTS = ('drop', 'trade')
+
+
+class DraftValueEngine:
+    """Attributes drafted players' production to their drafting teams."""
+
+    def __init__(self, conn: sqlite3.Connection, environment: str = 'production',
+                 stats_table: Optional[str] = None, lineup_table: Optional[str] = None,
+                 transactions_table: Optional[str] = None, draft_table: Optional[str] = None,
+                 output_table: Optional[str] = None, source: Optional[sqlite3.Connection] = None):
+        """
+        Args:
+            conn: SQLite analytics database the output table is written to (and
+                  read from, unless source is given)
+            environment: 'production' or 'test' (table suffixes)
+            stats_table: Override stats table name
+            lineup_table: Override lineup table name
+            transactions_table: Override transactions table name
+            draft_table: Override draft results table name
+            output_table: Override output table name
+            source: SQLite connection to read lineups, stats, transactions and
+                    draft results from instead, e.g. the D1 mirror (unsuffixed
+                    D1 table names)
+        """
+        self.conn = conn
+        self.source = source or conn
+        self.environment = environment
+        # The D1 mirror holds production tables under their D1 names
+        table_name = (lambda name: name) if source is not None else (lambda name: get_table_name(name, environment))
+        self.stats_table = stats_table or STATS_TABLE
+        self.lineup_table = lineup_table or table_name('daily_lineups')
+        self.transactions_table = transactions_table or table_name('transactions')
+        self.draft_table = draft_table or table_name('draft_results')
+        self.output_table = output_table or get_table_name(DRAFT_VALUE_TABLE, environment)
+
+    def _season_filter(self, column: str, seasons: Optional[Sequence[int]]):
+        if not seasons:
+            return '1 = 1', []
+        return f"{column} IN ({', '.join(['?'] * len(seasons))})", list(seasons)
+
+    def _date_filter(self, seasons: Optional[Sequence[int]]):
+        # Date ranges rather than substr(date, 1, 4) so the date index is used
+        if not seasons:
+            return '1 = 1', []
+        ranges = ' OR '.join(['date BETWEEN ? AND ?'] * len(seasons))
+        return f"({ranges})", [bound for season in seasons
+                               for bound in (f'{season}-01-01', f'{season}-12-31')]
+
+    # ------------------------------------------------------------------
+    # Ownership intervals
+    # ------------------------------------------------------------------
+
+    def _load_departures(self, seasons: Optional[Sequence[int]]) -> pd.DataFrame:
+        season_by_league = pd.Series({key: season for season, key in LEAGUE_KEYS.items()})
+        movements = ', '.join(f"'{m}'" for m in DEPARTURE_MOVEMENTS)
+        try:
+            departures = pd.read_sql_query(f"""
+                SELECT league_key, yahoo_player_id, source_team_key AS team_key, date
+                FROM {self.transactions_table}
+                WHERE movement_type IN ({movements})
+                  AND source_team_key IS NOT NULL AND source_team_key != ''
+            """, self.source)
+        except Exception as e:
+            logger.warning(f"No transactions available, intervals use lineups only: {e}")
+            return pd.DataFrame(columns=['season', 'yahoo_player_id', 'team_key', 'date'])
+
+        departures['season'] = departures['league_key'].map(season_by_league)
+        departures = departures.dropna(subset=['season'])
+        departures['season'] = departures['season'].astype(int)
+        if seasons:
+            departures = departures[departures['season'].isin(seasons)]
+        departures['date'] = pd.to_datetime(departures['date'])
+        return departures[['season', 'yahoo_player_id', 'team_key', 'date']]
+
+    def ownership_intervals(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Contiguous rostered periods per (season, player, team).
+
+        Returns:
+            DataFrame with season, yahoo_player_id, team_key, team_name,
+            start_date, end_date and interval_number (0 = first tenure)
+        """
+        where, params = self._season_filter('season', seasons)
+        days = pd.read_sql_query(f"""
+            SELECT DISTINCT season, yahoo_player_id, team_key, team_name, date
+            FROM {self.lineup_table}
+            WHERE {where}
+        """, self.source, params=params)
+        if days.empty:
+            return pd.DataFrame(columns=['season', 'yahoo_player_id', 'team_key', 'team_name',
+                                         'start_date', 'end_date', 'interval_number'])
+
+        days['date'] = pd.to_datetime(days['date'])
+        days = days.sort_values(['season', 'yahoo_player_id', 'team_key', 'date'])
+        keys = ['season', 'yahoo_player_id', 'team_key']
+
+        # Gaps and islands: a new run starts when the key changes or a day is skipped
+        same_key = (days[keys] == days[keys].shift()).all(axis=1)
+        gap = days['date'].diff().dt.days.ne(1)
+        days['run'] = (~same_key | gap).cumsum()
+        runs = days.groupby('run').agg(
+            season=('season', 'first'), yahoo_player_id=('yahoo_player_id', 'first'),
+            team_key=('team_key', 'first'), team_name=('team_name', 'last'),
+            start_date=('date', 'min'), end_date=('date', 'max')
+        ).reset_index(drop=True)
+
+        # Bridge runs split only by missing lineup days (no departure in between)
+        runs['prev_end'] = runs.groupby(keys)['end_date'].shift()
+        candidates = runs[runs['prev_end'].notna()].reset_index()
+        departures = self._load_departures(seasons)
+        if not candidates.empty and not departures.empty:
+            hits = candidates.merge(departures, on=keys)
+            hits = hits[(hits['date'] > hits['prev_end']) & (hits['date'] <= hits['start_date'])]
+            departed = set(hits['index'])
+        else:
+            departed = set()
+        new_tenure = runs['prev_end'].isna() | runs.index.isin(departed)
+
+        runs['tenure'] = new_tenure.cumsum()
+        intervals = runs.groupby('tenure').agg(
+            season=('season', 'first'), yahoo_player_id=('yahoo_player_id', 'first'),
+            team_key=('team_key', 'first'), team_name=('team_name', 'last'),
+            start_date=('start_date', 'min'), end_date=('end_date', 'max')
+        ).reset_index(drop=True)
+        intervals['interval_number'] = intervals.groupby(keys).cumcount()
+        return intervals
+
+    # ------------------------------------------------------------------
+    # Range aggregation
+    # ------------------------------------------------------------------
+
+    def _cumulative_stats(self, seasons: Optional[Sequence[int]]) -> pd.DataFrame:
+        """Per-player running totals of every component, one row per stat day."""
+        where, params = self._date_filter(seasons)
+        components = list(COMPONENTS)
+        daily = pd.read_sql_query(f"""
+            SELECT yahoo_player_id, date,
+                   {', '.join(f'SUM({component_sql(name)}) AS {name}' for name in components)}
+            FROM {self.stats_table} s
+            WHERE yahoo_player_id IS NOT NULL AND {where}
+            GROUP BY yahoo_player_id, date
+        """, self.source, params=params)
+        daily['date'] = pd.to_datetime(daily['date'])
+        daily = daily.sort_values(['yahoo_player_id', 'date'])
+        daily[components] = daily.groupby('yahoo_player_id')[components].cumsum()
+        return daily
+
+    def _sum_over_intervals(self, intervals: pd.DataFrame, cumulative: pd.DataFrame) -> pd.DataFrame:
+        """Component totals inside each interval via cum(end) - cum(start - 1)."""
+        components = list(COMPONENTS)
+        result = intervals.copy()
+        result[components] = 0.0
+        if result.empty or cumulative.empty:
+            return result
+
+        cumulative = cumulative.sort_values('date')
+        lookup = cumulative[['yahoo_player_id', 'date'] + components]
+
+        def cum_at(dates: pd.Series) -> np.ndarray:
+            probe = pd.DataFrame({'yahoo_player_id': result['yahoo_player_id'].to_numpy(),
+                                  'date': dates.to_numpy(), 'row': np.arange(len(result))})
+            probe = probe.sort_values('date')
+            matched = pd.merge_asof(probe, lookup, on='date', by='yahoo_player_id', direction='backward')
+            return matched.sort_values('row')[components].fillna(0).to_numpy()
+
+        totals = cum_at(result['end_date']) - cum_at(result['start_date'] - pd.Timedelta(days=1))
+        result[components] = totals
+        return result
+
+    # ------------------------------------------------------------------
+    # Draft attribution
+    # ------------------------------------------------------------------
+
+    def compute(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Value each draft pick by the drafting team's first tenure with the player.
+
+        Returns:
+            One row per pick with tenure dates, attributed totals and value
+        """
+        where, params = self._season_filter('season', seasons)
+        picks = pd.read_sql_query(f"""
+            SELECT league_key, season, team_key, team_name, player_id AS yahoo_player_id,
+                   player_name, draft_round, draft_pick, draft_cost, draft_type,
+                   COALESCE(keeper_status, 0) AS keeper_status
+            FROM {self.draft_table}
+            WHERE {where}
+        """, self.source, params=params)
+        if picks.empty:
+            return picks
+
+        intervals = self.ownership_intervals(seasons)
+        first_tenure = intervals[intervals['interval_number'] == 0].drop(columns=['team_name'])
+        attributed = picks.merge(first_tenure, on=['season', 'yahoo_player_id', 'team_key'], how='left')
+
+        rostered = attributed[attributed['start_date'].notna()]
+        totals = self._sum_over_intervals(rostered, self._cumulative_stats(seasons))
+
+        components = list(COMPONENTS)
+        attributed = attributed.merge(
+            totals[['season', 'yahoo_player_id', 'team_key'] + components],
+            on=['season', 'yahoo_player_id', 'team_key'], how='left'
+        )
+        attributed[components] = attributed[components].fillna(0)
+        attributed['days_rostered'] = ((attributed['end_date'] - attributed['start_date']).dt.days + 1).fillna(0)
+
+        # Score both sides against every drafted player that season
+        attributed['value'] = 0.0
+        for side, playing_time in (('batting', 'batting_at_bats'), ('pitching', 'pitching_innings_pitched')):
+            mask = attributed[playing_time] > 0
+            if not mask.any():
+                continue
+            side_frame = attributed[mask].assign(qualified=True)
+            pool_sizes = side_frame.groupby('season').size()
+            pool_sizes = {(season, side): int(count) for season, count in pool_sizes.items()}
+            scored = score_side(side_frame, side, pool_sizes)
+            attributed.loc[mask, 'value'] += scored['value']
+
+        attributed['start_date'] = attributed['start_date'].dt.strftime('%Y-%m-%d')
+        attributed['end_date'] = attributed['end_date'].dt.strftime('%Y-%m-%d')
+        columns = ['season', 'league_key', 'team_key', 'team_name', 'yahoo_player_id', 'player_name',
+                   'draft_round', 'draft_pick', 'draft_cost', 'draft_type', 'keeper_status',
+                   'start_date', 'end_date', 'days_rostered', 'value'] + components
+        return attributed[columns].sort_values(['season', 'draft_pick']).reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def ensure_table(self):
+        """Create the draft value table and its lookup indexes."""
+        # Earlier runs created the table with DataFrame.to_sql, without a key
+        existing = self.conn.execute(f"PRAGMA table_info({self.output_table})").fetchall()
+        if existing and not any(column[5] for column in existing):
+            logger.info(f"Recreating {self.output_table} with its primary key")
+            self.conn.execute(f"DROP TABLE {self.output_table}")
+
+        component_columns = ',\n                '.join(f"{name} REAL" for name in COMPONENTS)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.output_table} (
+                season INTEGER NOT NULL,
+                league_key TEXT,
+                team_key TEXT NOT NULL,
+                team_name TEXT,
+                yahoo_player_id TEXT NOT NULL,
+                player_name TEXT,
+                draft_round INTEGER,
+                draft_pick INTEGER,
+                draft_cost REAL,
+                draft_type TEXT,
+                keeper_status INTEGER DEFAULT 0,
+                start_date TEXT,
+                end_date TEXT,
+                days_rostered INTEGER,
+                value REAL,
+                {component_columns},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (season, team_key, yahoo_player_id)
+            )
+        """)
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.output_table}_player "
+                          f"ON {self.output_table}(yahoo_player_id, season)")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.output_table}_pick "
+                          f"ON {self.output_table}(season, draft_pick)")
+
+    def refresh(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Recompute and store pick-level draft value for the given seasons."""
+        result = self.compute(seasons)
+        self.ensure_table()
+
+        if seasons:
+            placeholders = ', '.join(['?'] * len(seasons))
+            self.conn.execute(f"DELETE FROM {self.output_table} WHERE season IN ({placeholders})", list(seasons))
+        else:
+            self.conn.execute(f"DELETE FROM {self.output_table}")
+
+        if not result.empty:
+            columns = list(result.columns)
+            rows = result.astype(object).where(result.notna(), None).itertuples(index=False, name=None)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.output_table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * len(columns))})",
+                list(rows)
+            )
+        self.conn.commit()
+        logger.info(f"Stored draft value for {len(result)} picks")
+        return result
+
+
+def team_summary(picks: pd.DataFrame, include_keepers: bool = True) -> pd.DataFrame:
+    """
+    Total draft value per season and team.
+
+    Args:
+        picks: Output of DraftValueEngine.compute()
+        include_keepers: Count keeper picks in the totals
+
+    Returns:
+        DataFrame ranked by draft value within each season
+    """
+    if not include_keepers:
+        picks = picks[picks['keeper_status'] == 0]
+    summary = picks.groupby(['season', 'team_key'], as_index=False).agg(
+        team_name=('team_name', 'last'),
+        picks=('yahoo_player_id', 'count'),
+        keepers=('keeper_status', 'sum'),
+        rostered_days=('days_rostered', 'sum'),
+        draft_value=('value', 'sum'),
+    )
+    summary['rank'] = summary.groupby('season')['draft_value'].rank(ascending=False, method='min').astype(int)
+    return summary.sort_values(['season', 'rank']).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Attribute drafted player value to drafting teams')
+    parser.add_argument('--season', type=int, nargs='+', help='Seasons (default: all)')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--mirror', action='store_true',
+                        help='Read league data from the local D1 mirror (draft value is still written to the analytics DB)')
+    parser.add_argument('--exclude-keepers', action='store_true', help='Leave keeper picks out of team totals')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    source = None
+    if args.mirror:
+        from data_pipeline.config.database_config import get_mirror_database_path
+        source = sqlite3.connect(str(get_mirror_database_path()))
+
+    conn = sqlite3.connect(str(get_database_path(args.environment)))
+    picks = DraftValueEngine(conn, args.environment, source=source).refresh(args.season)
+    summary = team_summary(picks, include_keepers=not args.exclude_keepers)
+
+    for season, rows in summary.groupby('season'):
+        print(f"\n{season} DRAFT VALUE")
+        print("-" * 50)
+        for row in rows.itertuples():
+            print(f"  {row.rank:>2}. {str(row.team_name)[:28]:<28} {row.draft_value:>8.2f}  "
+                  f"({row.picks} picks, {row.keepers} keepers)")
+    conn.close()
+    if source is not None:
+        source.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+#!/usr/bin/env python
+"""
+GKL WAR - Player Value Above Replacement (ROADMAP US-002)
+
+Scores every player-season in the league's 18 roto categories and expresses
+it as wins above a positional replacement level, for all seasons in one pass.
+
+Method (z-score value over replacement):
+    1. Sum each player's season stat components from daily_gkl_player_stats
+       with one GROUP BY (batting and pitching are valued separately).
+    2. Per season and side, turn each category into a contribution: the raw
+       total for counting stats, and for rate stats the marginal effect on a
+       pool-average team (numerator - pool_rate * denominator, sign-flipped
+       for ERA/WHIP). Contributions are z-scored against the draftable pool
+       (teams x active slots, re-selected once from the first-pass values).
+    3. Each player is assigned the scarcest position they were eligible for in
+       daily_lineups. Replacement level is the value of the best player at that
+       position beyond the league's starters (teams x slots, with flex slots
+       shared out proportionally).
+    4. gkl_war = value - replacement value, in category z units.
+
+League size and slot counts are read from daily_lineups per season, so
+historical roster formats are respected. All steps are grouped pandas/NumPy
+operations over every season at once.
+
+Usage:
+    python -m data_pipeline.valuation.gkl_war                 # All seasons
+    python -m data_pipeline.valuation.gkl_war --season 2025   # Incremental
+    python -m data_pipeline.valuation.gkl_war --season 2025 --top 25
+    python -m data_pipeline.valuation.gkl_war --mirror       # Read the D1 mirror
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from data_pipeline.common.scoring_categories import (
+    CATEGORIES,
+    CATEGORY_ORDER,
+    COMPONENTS,
+    INACTIVE_SLOTS,
+    component_sql,
+)
+from data_pipeline.config.database_config import get_database_path, get_table_name
+
+logger = logging.getLogger(__name__)
+
+WAR_TABLE = 'gkl_war'
+STATS_TABLE = 'daily_gkl_player_stats'
+
+# Scarcest first; a player is valued at the first position they are eligible for
+BATTING_POSITIONS = ['C', 'SS', '2B', '3B', 'OF', '1B']
+PITCHING_POSITIONS = ['SP', 'RP']
+POSITION_ALIASES = {'LF': 'OF', 'CF': 'OF', 'RF': 'OF'}
+FLEX_SLOTS = {'batting': ['UTIL', 'Util', 'MI', 'CI'], 'pitching': ['P']}
+
+# Used for seasons without lineup data
+DEFAULT_TEAMS = 12
+DEFAULT_SLOTS = {'C': 1, '1B': 1, '2B': 1, '3B': 1, 'SS': 1, 'OF': 3, 'UTIL': 1,
+                 'SP': 2, 'RP': 2, 'P': 4}
+
+# Minimum playing time for a player-season to enter the initial pool
+MIN_AT_BATS = 1
+MIN_INNINGS = 1.0
+
+
+def category_column(category: str) -> str:
+    """Column name for a category's z-score (e.g. 'K/BB' -> 'z_k_bb')."""
+    return 'z_' + re.sub(r'[^0-9a-z]+', '_', category.lower()).strip('_')
+
+
+def _side_categories(side: str) -> List[str]:
+    return [c for c in CATEGORY_ORDER if CATEGORIES[c]['side'] == side]
+
+
+def score_side(frame: pd.DataFrame, side: str, pool_sizes: Dict) -> pd.DataFrame:
+    """
+    Category z-scores and total value for one side, all seasons at once.
+
+    Args:
+        frame: Rows with season, qualified and component total columns
+        side: 'batting' or 'pitching'
+        pool_sizes: (season, side) -> number of players in the valuation pool
+
+    Returns:
+        Copy of frame with one z column per category and a 'value' column
+    """
+    categories = _side_categories(side)
+    frame = frame.copy()
+    in_pool = frame['qualified'].to_numpy()
+
+    for _ in range(2):
+        pool = frame[in_pool]
+        for category in categories:
+            spec = CATEGORIES[category]
+            numerator = frame[spec['numerator']].sum(axis=1) * spec.get('scale', 1)
+            if spec.get('denominator'):
+                denominator = frame[spec['denominator']].sum(axis=1)
+                pool_num = numerator[in_pool].groupby(pool['season']).sum()
+                pool_den = denominator[in_pool].groupby(pool['season']).sum()
+                rate = (pool_num / pool_den.replace(0, np.nan)).fillna(0)
+                contribution = numerator - frame['season'].map(rate) * denominator
+            else:
+                contribution = numerator
+            if not spec.get('higher_is_better', True):
+                contribution = -contribution
+
+            grouped = contribution[in_pool].groupby(pool['season'])
+            mean = frame['season'].map(grouped.mean())
+            std = frame['season'].map(grouped.std(ddof=0)).replace(0, np.nan)
+            frame[category_column(category)] = ((contribution - mean) / std).fillna(0)
+
+        frame['value'] = frame[[category_column(c) for c in categories]].sum(axis=1)
+
+        # Second pass: pool is the top teams x slots players per season
+        rank = frame.groupby('season')['value'].rank(ascending=False, method='first')
+        limit = frame['season'].map(lambda s: pool_sizes.get((s, side), 0))
+        in_pool = ((rank <= limit) & frame['qualified']).to_numpy()
+
+    return frame
+
+
+class GKLWarEngine:
+    """Batch GKL WAR computation over player-seasons."""
+
+    def __init__(self, conn: sqlite3.Connection, environment: str = 'production',
+                 stats_table: Optional[str] = None, lineup_table: Optional[str] = None,
+                 war_table: Optional[str] = None, source: Optional[sqlite3.Connection] = None):
+        """
+        Args:
+            conn: SQLite analytics database the WAR table is written to (and
+                  read from, unless source is given)
+            environment: 'production' or 'test' (table suffixes)
+            stats_table: Override stats table name
+            lineup_table: Override lineup table name
+            war_table: Override output table name
+            source: SQLite connection to read stats and lineups from instead,
+                    e.g. the D1 mirror (unsuffixed D1 table names)
+        """
+        self.conn = conn
+        self.source = source or conn
+        self.environment = environment
+        self.stats_table = stats_table or STATS_TABLE
+        self.lineup_table = lineup_table or (
+            'daily_lineups' if source is not None else get_table_name('daily_lineups', environment))
+        self.war_table = war_table or get_table_name(WAR_TABLE, environment)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _season_filter(self, column: str, seasons: Optional[Sequence[int]]):
+        if not seasons:
+            return '1 = 1', []
+        return f"{column} IN ({', '.join(['?'] * len(seasons))})", list(seasons)
+
+    def _date_filter(self, seasons: Optional[Sequence[int]]):
+        # Date ranges rather than substr(date, 1, 4) so the date index is used
+        if not seasons:
+            return '1 = 1', []
+        ranges = ' OR '.join(['date BETWEEN ? AND ?'] * len(seasons))
+        return f"({ranges})", [bound for season in seasons
+                               for bound in (f'{season}-01-01', f'{season}-12-31')]
+
+    def load_player_seasons(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Season totals of every component per player, one row per side played."""
+        where, params = self._date_filter(seasons)
+        sums = ', '.join(f"SUM({component_sql(name)}) AS {name}" for name in COMPONENTS)
+        totals = pd.read_sql_query(f"""
+            SELECT CAST(substr(date, 1, 4) AS INTEGER) AS season,
+                   yahoo_player_id,
+                   MAX(player_name) AS player_name,
+                   MAX(position_codes) AS position_codes,
+                   COUNT(*) AS games,
+                   {sums}
+            FROM {self.stats_table} s
+            WHERE yahoo_player_id IS NOT NULL AND yahoo_player_id != '' AND {where}
+            GROUP BY season, yahoo_player_id
+        """, self.source, params=params)
+
+        frames = []
+        for side, playing_time, minimum in (('batting', 'batting_at_bats', MIN_AT_BATS),
+                                            ('pitching', 'pitching_innings_pitched', MIN_INNINGS)):
+            played = totals[totals[playing_time] > 0].copy()
+            played['side'] = side
+            played['qualified'] = played[playing_time] >= minimum
+            frames.append(played)
+        return pd.concat(frames, ignore_index=True)
+
+    def load_eligibility(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Distinct eligible position strings per player-season from daily_lineups."""
+        where, params = self._season_filter('season', seasons)
+        try:
+            return pd.read_sql_query(f"""
+                SELECT DISTINCT season, yahoo_player_id, eligible_positions
+                FROM {self.lineup_table}
+                WHERE eligible_positions IS NOT NULL AND {where}
+            """, self.source, params=params)
+        except Exception as e:
+            logger.warning(f"No lineup eligibility available: {e}")
+            return pd.DataFrame(columns=['season', 'yahoo_player_id', 'eligible_positions'])
+
+    def load_roster_format(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Teams and average slots per position for each season, from daily_lineups."""
+        where, params = self._season_filter('season', seasons)
+        inactive = ', '.join(f"'{slot}'" for slot in INACTIVE_SLOTS)
+        try:
+            slots = pd.read_sql_query(f"""
+                SELECT season, selected_position AS position, COUNT(*) AS rows_used
+                FROM {self.lineup_table}
+                WHERE selected_position IS NOT NULL AND selected_position NOT IN ({inactive}) AND {where}
+                GROUP BY season, selected_position
+            """, self.source, params=params)
+            sizes = pd.read_sql_query(f"""
+                SELECT season, COUNT(DISTINCT team_key) AS teams,
+                       COUNT(DISTINCT date || team_key) AS team_days
+                FROM {self.lineup_table}
+                WHERE {where}
+                GROUP BY season
+            """, self.source, params=params)
+        except Exception as e:
+            logger.warning(f"No lineup roster format available: {e}")
+            return pd.DataFrame(columns=['season', 'teams', 'position', 'slots'])
+
+        slots = slots.merge(sizes, on='season')
+        slots['position'] = slots['position'].replace(POSITION_ALIASES).replace({'Util': 'UTIL'})
+        slots = slots.groupby(['season', 'teams', 'team_days', 'position'], as_index=False)['rows_used'].sum()
+        slots['slots'] = (slots['rows_used'] / slots['team_days']).round()
+        return slots[slots['slots'] > 0][['season', 'teams', 'position', 'slots']]
+
+    # ------------------------------------------------------------------
+    # Valuation
+    # ------------------------------------------------------------------
+
+    def _roster_tables(self, seasons: Sequence[int], fmt: pd.DataFrame):
+        """Per season: teams, pool size per side and starters per position."""
+        teams, pool, starters = {}, {}, {}
+        for season in seasons:
+            season_fmt = fmt[fmt['season'] == season]
+            if season_fmt.empty:
+                n_teams, slot_map = DEFAULT_TEAMS, DEFAULT_SLOTS
+            else:
+                n_teams = int(season_fmt['teams'].iloc[0])
+                slot_map = dict(zip(season_fmt['position'], season_fmt['slots']))
+            teams[season] = n_teams
+
+            for side, positions in (('batting', BATTING_POSITIONS), ('pitching', PITCHING_POSITIONS)):
+                dedicated = {p: slot_map.get(p, 0) for p in positions}
+                flex = sum(slot_map.get(p, 0) for p in FLEX_SLOTS[side])
+                total_dedicated = sum(dedicated.values()) or 1
+                pool[(season, side)] = int(n_teams * (total_dedicated + flex))
+                for position, count in dedicated.items():
+                    share = count + flex * count / total_dedicated
+                    starters[(season, position)] = int(round(n_teams * share))
+        return teams, pool, starters
+
+    def _assign_positions(self, frame: pd.DataFrame, eligibility: pd.DataFrame) -> pd.Series:
+        """Scarcest eligible position per player-season and side."""
+        eligible = eligibility.assign(position=eligibility['eligible_positions'].str.split(','))
+        eligible = eligible.explode('position')
+        eligible['position'] = eligible['position'].str.strip().replace(POSITION_ALIASES)
+        eligible = eligible.drop_duplicates(['season', 'yahoo_player_id', 'position'])
+
+        result = pd.Series('UTIL', index=frame.index)
+        result[frame['side'] == 'pitching'] = 'RP'
+
+        for side, positions in (('batting', BATTING_POSITIONS), ('pitching', PITCHING_POSITIONS)):
+            order = {p: i for i, p in enumerate(positions)}
+            side_eligible = eligible[eligible['position'].isin(order)].copy()
+            side_eligible['order'] = side_eligible['position'].map(order)
+            best = (side_eligible.sort_values('order')
+                    .drop_duplicates(['season', 'yahoo_player_id'])
+                    .set_index(['season', 'yahoo_player_id'])['position'])
+
+            mask = frame['side'] == side
+            keys = pd.MultiIndex.from_frame(frame.loc[mask, ['season', 'yahoo_player_id']])
+            from_lineups = pd.Series(best.reindex(keys).to_numpy(), index=frame.index[mask])
+
+            # Fall back to the stats table's position codes for unrostered players
+            codes = frame.loc[mask, 'position_codes'].fillna('').str.replace(' ', '')
+            from_stats = pd.Series(np.nan, index=codes.index, dtype=object)
+            for position in reversed(positions):
+                hit = codes.str.split(',').apply(
+                    lambda items, p=position: p in [POSITION_ALIASES.get(i, i) for i in items])
+                from_stats[hit] = position
+
+            result[mask] = from_lineups.fillna(from_stats).fillna(result[mask])
+        return result
+
+    def compute(self, seasons: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Compute GKL WAR for the given seasons (default: every season with stats).
+
+        Returns:
+            DataFrame with one row per season, player and side
+        """
+        players = self.load_player_seasons(seasons)
+        if players.empty:
+            return players
+
+        season_list = sorted(players['season'].unique().tolist())
+        teams, pool_sizes, starters = self._roster_tables(season_list, self.load_roster_format(seasons))
+
+        scored = pd.concat(
+            [score_side(players[players['side'] == side], side, pool_sizes)
+             for side in ('batting', 'pitching')],
+            ignore_index=True
+        )
+        scored['position'] = self._assign_positions(scored, self.load_eligibility(seasons))
+
+        # Replacement: best player at the position beyond the league's starters
+        scored = scored.sort_values(['season', 'side', 'position', 'value'],
+                                    ascending=[True, True, True, False])
+        scored['position_rank'] = scored.groupby(['season', 'side', 'position']).cumcount()
+
+        starter_count = pd.Series(
+            [starters.get((s, p)) if (s, p) in starters else pool_sizes.get((s, side), 0)
+             for s, side, p in zip(scored['season'], scored['side'], scored['position'])],
+            index=scored.index
+        )
+        at_replacement = scored[scored['position_rank'] == starter_count]
+        replacement = at_replacement.set_index(['season', 'side', 'position'])['value']
+        floor = scored.groupby(['season', 'side', 'position'])['value'].min()
+        keys = pd.MultiIndex.from_frame(scored[['season', 'side', 'position']])
+        scored['replacement_value'] = replacement.reindex(keys).fillna(floor.reindex(keys)).to_numpy()
+        scored['gkl_war'] = scored['value'] - scored['replacement_value']
+
+        z_columns = [category_column(c) for c in CATEGORY_ORDER]
+        for column in z_columns:
+            if column not in scored:
+                scored[column] = np.nan
+        columns = ['season', 'yahoo_player_id', 'player_name', 'side', 'position', 'games',
+                   'value', 'replacement_value', 'gkl_war'] + z_columns
+        return scored[columns].sort_values(['season', 'gkl_war'], ascending=[True, False]).reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def ensure_table(self):
+        z_columns = ',\n                '.join(f"{category_column(c)} REAL" for c in CATEGORY_ORDER)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.war_table} (
+                season INTEGER NOT NULL,
+                yahoo_player_id TEXT NOT NULL,
+                player_name TEXT,
+                side TEXT NOT NULL,
+                position TEXT,
+                games INTEGER,
+                value REAL,
+                replacement_value REAL,
+                gkl_war REAL,
+                {z_columns},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (season, yahoo_player_id, side)
+            )
+        """)
+
+    def refresh(self, seasons: Optional[Sequence[int]] = None) -> int:
+        """
+        Recompute and replace stored WAR for the given seasons (default: all).
+
+        Returns:
+            Number of rows written
+        """
+        result = self.compute(seasons)
+        self.ensure_table()
+
+        if seasons:
+            placeholders = ', '.join(['?'] * len(seasons))
+            self.conn.execute(f"DELETE FROM {self.war_table} WHERE season IN ({placeholders})", list(seasons))
+        else:
+            self.conn.execute(f"DELETE FROM {self.war_table}")
+
+        if not result.empty:
+            columns = list(result.columns)
+            rows = result.astype(object).where(result.notna(), None).itertuples(index=False, name=None)
+            self.conn.executemany(
+                f"INSERT INTO {self.war_table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * len(columns))})",
+                list(rows)
+            )
+        self.conn.commit()
+
+        logger.info(f"Stored GKL WAR for {len(result)} player-seasons")
+        return len(result)
+
+
+def refresh_war_for_season(conn: sqlite3.Connection, season: int, environment: str = 'production') -> int:
+    """
+    Recompute one season's GKL WAR, logging instead of raising.
+
+    Used after daily stats updates so only the current season is recomputed.
+    """
+    try:
+        return GKLWarEngine(conn, environment).refresh([season])
+    except Exception as e:
+        logger.error(f"Failed to refresh GKL WAR for {season}: {e}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute GKL WAR for all players')
+    parser.add_argument('--season', type=int, nargs='+', help='Seasons to recompute (default: all)')
+    parser.add_argument('--environment', default='production', choices=['production', 'test'])
+    parser.add_argument('--mirror', action='store_true',
+                        help='Read stats and lineups from the local D1 mirror (WAR is still written to the analytics DB)')
+    parser.add_argument('--top', type=int, default=0, help='Print the top N players per season')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    source = None
+    if args.mirror:
+        from data_pipeline.config.database_config import get_mirror_database_path
+        source = sqlite3.connect(str(get_mirror_database_path()))
+
+    conn = sqlite3.connect(str(get_database_path(args.environment)))
+    engine = GKLWarEngine(conn, args.environment, source=source)
+    count = engine.refresh(args.season)
+    print(f"Stored GKL WAR for {count} player-seasons")
+
+    if args.top:
+        for season in args.season or [r[0] for r in conn.execute(
+                f"SELECT DISTINCT season FROM {engine.war_table} ORDER BY season")]:
+            print(f"\n{season}")
+            for name, side, position, war in conn.execute(
+                    f"SELECT player_name, side, position, gkl_war FROM {engine.war_table} "
+                    f"WHERE season = ? ORDER BY gkl_war DESC LIMIT ?", (season, args.top)):
+                print(f"  {name:<28}{side:<10}{position:<6}{war:>7.2f}")
+    conn.close()
+    if source is not None:
+        source.close()
+
+
+if __name__ == '__main__':
+    main()
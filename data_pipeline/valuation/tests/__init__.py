@@ -0,0 +1,6 @@
+"""
+Valuation Module Test Suite
+
+Run all tests:
+    python -m unittest discover data_pipeline/valuation/tests
+"""
@@ -0,0 +1,102 @@
+"""Tests for the GKL WAR engine."""
+
+import sqlite3
+import unittest
+
+from data_pipeline.common.scoring_categories import stats_columns
+from data_pipeline.valuation.gkl_war import GKLWarEngine
+
+CATCHERS = {'c1': 30, 'c2': 20, 'c3': 10, 'c4': 5}
+STARTERS = {'p1': 60, 'p2': 45, 'p3': 30}
+
+
+class GKLWarEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(f"""
+            CREATE TABLE stats (
+                date TEXT, yahoo_player_id TEXT, player_name TEXT, position_codes TEXT,
+                {', '.join(f'{c} REAL' for c in stats_columns())}
+            )
+        """)
+        self.conn.execute("CREATE INDEX idx_stats_date ON stats(date)")
+        self.conn.execute("""
+            CREATE TABLE lineups (
+                season INTEGER, date TEXT, team_key TEXT, yahoo_player_id TEXT,
+                selected_position TEXT, eligible_positions TEXT
+            )
+        """)
+        # Two teams starting one C and one SP: two starters per position
+        for season in (2024, 2025):
+            for team, catcher, pitcher in (('t.1', 'c1', 'p1'), ('t.2', 'c2', 'p2')):
+                self.add_lineup(season, team, catcher, 'C', 'C,1B')
+                self.add_lineup(season, team, pitcher, 'SP', 'SP')
+            for player_id, hits in CATCHERS.items():
+                self.add_batter(season, player_id, hits)
+            for player_id, strikeouts in STARTERS.items():
+                self.add_pitcher(season, player_id, strikeouts)
+        self.engine = GKLWarEngine(self.conn, 'production', stats_table='stats',
+                                   lineup_table='lineups', war_table='war')
+
+    def tearDown(self):
+        self.conn.close()
+
+    def add_lineup(self, season, team_key, player_id, position, eligible):
+        self.conn.execute("INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?)",
+                          (season, f'{season}-06-01', team_key, player_id, position, eligible))
+
+    def add_stats(self, season, player_id, position_codes, **values):
+        columns = ['date', 'yahoo_player_id', 'player_name', 'position_codes'] + list(values)
+        self.conn.execute(
+            f"INSERT INTO stats ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [f'{season}-06-01', player_id, player_id.upper(), position_codes] + list(values.values()))
+
+    def add_batter(self, season, player_id, hits):
+        self.add_stats(season, player_id, 'C', batting_at_bats=100, batting_hits=hits,
+                       batting_runs=hits // 2, batting_rbis=hits // 2, batting_home_runs=hits // 10)
+
+    def add_pitcher(self, season, player_id, strikeouts):
+        self.add_stats(season, player_id, 'SP', pitching_innings_pitched=40, pitching_strikeouts=strikeouts,
+                       pitching_walks_allowed=10, pitching_hits_allowed=30, pitching_earned_runs=15,
+                       games_played=7)
+
+    def stored(self, season):
+        return self.conn.execute(
+            "SELECT yahoo_player_id, side, position, value, replacement_value, gkl_war "
+            "FROM war WHERE season = ? ORDER BY side, yahoo_player_id", (season,)).fetchall()
+
+    def test_replacement_level_is_first_player_beyond_starters(self):
+        war = self.engine.compute([2025])
+        catchers = war[war['position'] == 'C'].set_index('yahoo_player_id')
+        pitchers = war[war['position'] == 'SP'].set_index('yahoo_player_id')
+
+        self.assertEqual(sorted(catchers.index), sorted(CATCHERS))
+        # Two teams x one C slot: the third-best catcher sets replacement level
+        self.assertEqual(catchers['gkl_war'].idxmax(), 'c1')
+        self.assertTrue((catchers['replacement_value'] == catchers.at['c3', 'value']).all())
+        self.assertAlmostEqual(catchers.at['c3', 'gkl_war'], 0.0)
+        self.assertGreater(catchers.at['c2', 'gkl_war'], 0)
+        self.assertLess(catchers.at['c4', 'gkl_war'], 0)
+        self.assertAlmostEqual(pitchers.at['p3', 'gkl_war'], 0.0)
+        self.assertGreater(pitchers.at['p1', 'gkl_war'], pitchers.at['p2', 'gkl_war'])
+
+    def test_season_refresh_leaves_other_seasons_alone(self):
+        self.assertEqual(self.engine.refresh(), 14)
+        before_2024 = self.stored(2024)
+
+        self.conn.execute("UPDATE stats SET batting_hits = 40 WHERE yahoo_player_id = 'c4' AND date LIKE '2025%'")
+        self.assertEqual(self.engine.refresh([2025]), 7)
+
+        self.assertEqual(self.stored(2024), before_2024)
+        after_2025 = {row[0]: row for row in self.stored(2025)}
+        self.assertGreater(after_2025['c4'][5], 0)
+        # A season refreshed alone scores the same as in a full run
+        full = self.engine.compute()
+        expected = full[full['season'] == 2025].set_index('yahoo_player_id')['gkl_war']
+        for player_id, war in expected.items():
+            self.assertAlmostEqual(after_2025[player_id][5], war)
+
+
+if __name__ == '__main__':
+    unittest.main()
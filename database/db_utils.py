@@ -140,6 +140,10 @@ def retry_on_lock(max_attempts: int = 5,
     """
     Decorator to retry database operations on lock errors with exponential backoff.
     
+    Pipeline jobs writing to the same database from one process should queue
+    through data_pipeline.common.sqlite_writer instead, which serializes writes
+    on a single connection rather than retrying.
+    
     Args:
         max_attempts: Maximum number of retry attempts
         initial_delay: Initial delay in seconds
@@ -268,7 +268,7 @@ class RefreshStrategy:
     """Determines when data should be refreshed based on age and type."""
     
     # Refresh windows in days
-    FORCE_REFRESH_DAYS = 3  # Always refresh recent data
+    FORCE_REFRESH_DAYS = 3  # Always refresh recent stats/transactions
     STAT_CORRECTION_WINDOW = 7  # Check for stat corrections
     ARCHIVE_THRESHOLD = 30  # Data older than this is rarely changed
     
@@ -277,16 +277,22 @@ class RefreshStrategy:
         data_date: str,
         data_type: str = 'lineup',
         last_fetched: Optional[datetime] = None,
-        force: bool = False
+        force: bool = False,
+        roster_changed: bool = False
     ) -> Tuple[bool, str]:
         """
         Determine if data should be refreshed.
         
+        Lineups are not force-refreshed by age: past team-days only change
+        through transactions, so they are refetched when roster_changed is set
+        (see data_pipeline/daily_lineups/refresh_planner.py) or never fetched.
+        
         Args:
             data_date: Date of the data (YYYY-MM-DD)
             data_type: Type of data ('lineup', 'stats', 'transaction')
             last_fetched: When data was last fetched
             force: Force refresh regardless of age
+            roster_changed: A transaction touched the team after last_fetched (lineups)
         
         Returns:
             Tuple of (should_refresh, reason)
@@ -303,6 +309,16 @@ class RefreshStrategy:
         if last_fetched is None:
             return True, "new_data"
         
+        if data_type == 'lineup':
+            if days_old <= 0:
+                return True, "today"
+            if roster_changed:
+                return True, "transaction"
+            # Fetched before the day was over
+            if last_fetched.date() <= data_datetime.date():
+                return True, "unsettled"
+            return False, "up_to_date"
+        
         # Force refresh window for recent data
         if days_old <= RefreshStrategy.FORCE_REFRESH_DAYS:
             return True, "recent_data"
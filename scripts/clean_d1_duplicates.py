@@ -1,92 +1,138 @@
 #!/usr/bin/env python3
-"""Clean D1 player stats - remove .0 duplicates and bad data."""
+"""Clean D1 duplicates - natural-key duplicates, .0 Yahoo IDs and bad data.
 
-import os
+All work happens on the server: duplicates are found with GROUP BY/HAVING
+queries and removed with batched window-function DELETEs (see
+data_pipeline/common/d1_deduplicator.py), so no table is pulled locally.
+
+Usage:
+    python scripts/clean_d1_duplicates.py --dry-run
+    python scripts/clean_d1_duplicates.py --tables daily_lineups --since 2025-08-01
+    python scripts/clean_d1_duplicates.py --yes --add-unique-index
+"""
+
+import argparse
 import sys
 from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent / 'data_pipeline'))
+sys.path.append(str(Path(__file__).parent.parent))
 
-from common.d1_connection import D1Connection
+from data_pipeline.common.d1_connection import D1Connection
+from data_pipeline.common.d1_deduplicator import (
+    DEDUP_TARGETS,
+    DEFAULT_DELETE_BATCH_SIZE,
+    D1Deduplicator,
+    print_report,
+)
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def clean_d1_duplicates():
-    """Remove duplicate player records with .0 suffix and bad position codes."""
-    
+# Known bad rows in daily_gkl_player_stats, removed before natural-key dedup
+BAD_STATS_FILTERS = {
+    ".0 suffix Yahoo IDs": "yahoo_player_id LIKE '%.0'",
+    "generic 'POS' position": "position_codes = 'POS'",
+}
+
+
+def count_rows(d1, where):
+    """Count daily_gkl_player_stats rows matching a filter."""
+    result = d1.execute(f"SELECT COUNT(*) as count FROM daily_gkl_player_stats WHERE {where}")
+    rows = result.get('results', [])
+    return rows[0].get('count', 0) if rows else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Remove duplicate and bad rows from D1')
+    parser.add_argument('--dry-run', action='store_true', help='Report only, do not delete')
+    parser.add_argument('--tables', nargs='+', choices=sorted(DEDUP_TARGETS),
+                        help='Tables to deduplicate (default: all)')
+    parser.add_argument('--since', help='Only consider rows on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Only consider rows on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_DELETE_BATCH_SIZE,
+                        help='Maximum rows deleted per statement')
+    parser.add_argument('--add-unique-index', action='store_true',
+                        help='Create natural-key unique indexes after cleanup')
+    parser.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    return parser.parse_args(argv)
+
+
+def clean_d1_duplicates(argv=None):
+    """Remove natural-key duplicates, .0 Yahoo IDs and bad position codes."""
+    args = parse_args(argv)
+
     # Initialize D1 connection
     d1 = D1Connection()
-    
+    dedup = D1Deduplicator(d1, batch_size=args.batch_size)
+    tables = args.tables or list(DEDUP_TARGETS)
+
     try:
         # Step 1: Count problematic records
         logger.info("Analyzing D1 data quality issues...")
-        
-        # Records with .0
-        result = d1.execute_query(
-            "SELECT COUNT(*) as count FROM daily_gkl_player_stats WHERE yahoo_player_id LIKE '%.0'"
-        )
-        decimal_count = result[0].get('count', 0) if result and result[0] else 0
-        logger.info(f"Records with .0 suffix: {decimal_count:,}")
-        
-        # Records with bad positions
-        result = d1.execute_query(
-            "SELECT COUNT(*) as count FROM daily_gkl_player_stats WHERE position_codes = 'POS'"
-        )
-        bad_pos_count = result[0].get('count', 0) if result and result[0] else 0
-        logger.info(f"Records with generic 'POS': {bad_pos_count:,}")
-        
-        if decimal_count == 0 and bad_pos_count == 0:
+
+        bad_counts = {}
+        if 'daily_gkl_player_stats' in tables:
+            for label, where in BAD_STATS_FILTERS.items():
+                bad_counts[label] = count_rows(d1, where)
+                logger.info(f"Records with {label}: {bad_counts[label]:,}")
+
+        report = dedup.report(tables, since=args.since, until=args.until)
+        print_report(report)
+
+        surplus = sum(info['surplus_rows'] for info in report.values())
+        if surplus == 0 and not any(bad_counts.values()):
             logger.info("No data quality issues found!")
+            if args.add_unique_index and not args.dry_run:
+                for table in tables:
+                    dedup.ensure_unique_index(table)
             return
-        
-        # User confirmation
-        print("\n" + "="*60)
-        print("This will remove the following from D1:")
-        print(f"- {decimal_count:,} records with .0 Yahoo IDs")
-        print(f"- {bad_pos_count:,} records with generic 'POS' position")
-        print("="*60)
-        response = input("\nProceed with cleanup? (yes/no): ")
-        
-        if response.lower() != 'yes':
-            logger.info("Cleanup cancelled by user")
+
+        if args.dry_run:
+            logger.info("Dry run - no rows deleted")
             return
-        
-        # Step 2: Remove records with .0 suffix
-        if decimal_count > 0:
-            logger.info("Removing records with .0 suffix...")
-            d1.execute_query(
-                "DELETE FROM daily_gkl_player_stats WHERE yahoo_player_id LIKE '%.0'"
-            )
-            logger.info(f"Removed {decimal_count:,} records with .0 suffix")
-        
-        # Step 3: Remove records with bad position codes
-        if bad_pos_count > 0:
-            logger.info("Removing records with generic 'POS'...")
-            d1.execute_query(
-                "DELETE FROM daily_gkl_player_stats WHERE position_codes = 'POS'"
-            )
-            logger.info(f"Removed {bad_pos_count:,} records with 'POS'")
-        
+
+        # User confirmation
+        if not args.yes:
+            print("\n" + "="*60)
+            print("This will remove the following from D1:")
+            for label, count in bad_counts.items():
+                print(f"- {count:,} records with {label}")
+            for table, info in report.items():
+                print(f"- {info['surplus_rows']:,} duplicate rows from {table}")
+            print("="*60)
+            response = input("\nProceed with cleanup? (yes/no): ")
+
+            if response.lower() != 'yes':
+                logger.info("Cleanup cancelled by user")
+                return
+
+        # Step 2: Remove known bad records
+        for label, where in BAD_STATS_FILTERS.items():
+            if bad_counts.get(label):
+                logger.info(f"Removing records with {label}...")
+                result = d1.execute(f"DELETE FROM daily_gkl_player_stats WHERE {where}")
+                logger.info(f"Removed {result.get('changes', 0):,} records with {label}")
+
+        # Step 3: Remove natural-key duplicates, keeping the newest row
+        deleted = dedup.deduplicate_all(tables, since=args.since, until=args.until)
+        for table, count in deleted.items():
+            logger.info(f"Removed {count:,} duplicate rows from {table}")
+
+        if args.add_unique_index:
+            for table in tables:
+                dedup.ensure_unique_index(table)
+
         # Step 4: Verify cleanup
         logger.info("\nVerifying cleanup...")
-        
-        result = d1.execute_query(
-            "SELECT COUNT(*) as total, COUNT(DISTINCT yahoo_player_id) as players FROM daily_gkl_player_stats"
-        )
-        if result and result[0]:
-            logger.info(f"Remaining records: {result[0].get('total', 0):,}")
-            logger.info(f"Unique players: {result[0].get('players', 0):,}")
-        
+        remaining = dedup.report(tables, since=args.since, until=args.until)
+        for table, info in remaining.items():
+            logger.info(f"{table}: {info['surplus_rows']:,} duplicate rows remaining")
+
         print("\n✅ Cleanup complete!")
-        print("\nNote: This only removed duplicates and bad data.")
-        print("You still need to run GitHub Actions to:")
-        print("1. Fill in missing dates")
-        print("2. Update position codes with correct eligible positions")
-        
+
     except Exception as e:
         logger.error(f"Error cleaning D1: {e}")
         raise
 
 if __name__ == "__main__":
-    clean_d1_duplicates()
\ No newline at end of file
+    clean_d1_duplicates()
@@ -11,6 +11,15 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data_pipeline.common.sql_dump_writer import SqlDumpWriter
+
+def _discard_dump(writer):
+    """Remove an empty dump and its manifest so it is not deployed."""
+    writer.path.unlink(missing_ok=True)
+    writer.manifest_path.unlink(missing_ok=True)
+
 def export_recent_data():
     """Export recent data changes to SQL files for CloudFlare import."""
     
@@ -78,233 +87,145 @@ def export_recent_data():
         print(f"📋 Found {len(job_ids)} job IDs to ensure exist in D1")
         
         # Generate SQL to ensure job_log entries exist (create minimal entries if needed)
-        sql_lines = []
-        sql_lines.append("-- Ensure job_log entries exist for foreign key constraints")
-        sql_lines.append(f"-- Generated: {datetime.now().isoformat()}")
-        sql_lines.append("")
-        
-        for job_id in job_ids:
-            # Create a minimal job_log entry if it doesn't exist
-            escaped_job_id = job_id.replace("'", "''")
-            sql_lines.append(f"""
-INSERT OR IGNORE INTO job_log 
-(job_id, job_type, environment, status)
-VALUES ('{escaped_job_id}', 'data_sync', 'production', 'completed');""")
-        
-        # Write job_log file
         job_file = export_dir / 'job_logs.sql'
-        with open(job_file, 'w') as f:
-            f.write('\n'.join(sql_lines))
+        with SqlDumpWriter(job_file) as writer:
+            writer.write_comment("Ensure job_log entries exist for foreign key constraints")
+            writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+            writer.write_blank()
+            writer.write_rows(
+                'job_log',
+                ['job_id', 'job_type', 'environment', 'status'],
+                ((job_id, 'data_sync', 'production', 'completed') for job_id in sorted(job_ids)),
+                mode='insert_or_ignore'
+            )
         
         print(f"✅ Exported job logs to: {job_file}")
     
     # Export recent transactions
-    cursor.execute("""
-        SELECT transaction_id, league_key, transaction_date as date,
-               transaction_type, player_id, player_name,
-               team_name as player_team,
-               CASE 
-                   WHEN transaction_type = 'add' THEN 'add'
-                   WHEN transaction_type = 'drop' THEN 'drop'
-                   ELSE transaction_type
-               END as movement_type,
-               NULL as player_position,
-               to_team_key as destination_team_key,
-               team_name as destination_team_name,
-               from_team_key as source_team_key,
-               NULL as source_team_name,
-               job_id
-        FROM transactions
-        WHERE created_at >= ?
-        ORDER BY transaction_date, transaction_id
-    """, (last_job_time,))
-    
-    transactions = cursor.fetchall()
-    
-    if transactions:
-        print(f"📋 Found {len(transactions)} recent transactions")
-        
-        # Generate SQL for transactions
-        sql_lines = []
-        sql_lines.append("-- Recent transactions export")
-        sql_lines.append(f"-- Generated: {datetime.now().isoformat()}")
-        sql_lines.append("")
-        
-        for txn in transactions:
-            # Fix f-string syntax - can't use backslash in f-string
-            escaped_values = []
-            for v in txn:
-                if v:
-                    escaped_val = str(v).replace("'", "''")
-                    escaped_values.append(f"'{escaped_val}'")
-                else:
-                    escaped_values.append('NULL')
-            values = ', '.join(escaped_values)
-            sql_lines.append(f"""
-INSERT OR REPLACE INTO transactions 
-(transaction_id, league_key, date, transaction_type, player_id, player_name,
- player_team, movement_type, player_position, destination_team_key, 
- destination_team_name, source_team_key, source_team_name, job_id)
-VALUES ({values});""")
-        
-        # Write transactions file
-        txn_file = export_dir / 'recent_transactions.sql'
-        with open(txn_file, 'w') as f:
-            f.write('\n'.join(sql_lines))
-        
+    txn_file = export_dir / 'recent_transactions.sql'
+    with SqlDumpWriter(txn_file) as writer:
+        writer.write_comment("Recent transactions export")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_blank()
+        txn_count = writer.write_query(conn, 'transactions', """
+            SELECT transaction_id, league_key, transaction_date as date,
+                   transaction_type, player_id, player_name,
+                   team_name as player_team,
+                   CASE 
+                       WHEN transaction_type = 'add' THEN 'add'
+                       WHEN transaction_type = 'drop' THEN 'drop'
+                       ELSE transaction_type
+                   END as movement_type,
+                   NULL as player_position,
+                   to_team_key as destination_team_key,
+                   team_name as destination_team_name,
+                   from_team_key as source_team_key,
+                   NULL as source_team_name,
+                   job_id
+            FROM transactions
+            WHERE created_at >= ?
+            ORDER BY transaction_date, transaction_id
+        """, (last_job_time,), mode='insert_or_replace')
+    
+    if txn_count:
+        print(f"📋 Found {txn_count} recent transactions")
         print(f"✅ Exported transactions to: {txn_file}")
+    else:
+        _discard_dump(writer)
     
     # Export recent lineup changes (last 3 days)
-    cursor.execute("""
-        SELECT job_id, season, date, team_key, team_name, 
-               player_id, player_name, selected_position
-        FROM daily_lineups
-        WHERE date >= date('now', '-3 days')
-        ORDER BY date, team_key, player_id
-    """)
-    
-    lineups = cursor.fetchall()
-    
-    if lineups:
-        print(f"📋 Found {len(lineups)} recent lineup entries")
-        
-        # Generate SQL for lineups
-        sql_lines = []
-        sql_lines.append("-- Recent lineups export")
-        sql_lines.append(f"-- Generated: {datetime.now().isoformat()}")
-        sql_lines.append("")
-        sql_lines.append("-- Clear recent lineup data")
-        sql_lines.append("DELETE FROM daily_lineups WHERE date >= date('now', '-3 days');")
-        sql_lines.append("")
-        
-        for lineup in lineups:
-            # Fix f-string syntax - can't use backslash in f-string
-            escaped_values = []
-            for v in lineup:
-                if v:
-                    escaped_val = str(v).replace("'", "''")
-                    escaped_values.append(f"'{escaped_val}'")
-                else:
-                    escaped_values.append('NULL')
-            values = ', '.join(escaped_values)
-            sql_lines.append(f"""
-INSERT INTO daily_lineups 
-(job_id, season, date, team_key, team_name, player_id, player_name, selected_position)
-VALUES ({values});""")
-        
-        # Write lineups file
-        lineup_file = export_dir / 'recent_lineups.sql'
-        with open(lineup_file, 'w') as f:
-            f.write('\n'.join(sql_lines))
-        
+    lineup_file = export_dir / 'recent_lineups.sql'
+    with SqlDumpWriter(lineup_file) as writer:
+        writer.write_comment("Recent lineups export")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_blank()
+        writer.write_comment("Clear recent lineup data")
+        writer.write_statement("DELETE FROM daily_lineups WHERE date >= date('now', '-3 days')",
+                               table='daily_lineups')
+        writer.write_blank()
+        lineup_count = writer.write_query(conn, 'daily_lineups', """
+            SELECT job_id, season, date, team_key, team_name, 
+                   player_id, player_name, selected_position
+            FROM daily_lineups
+            WHERE date >= date('now', '-3 days')
+            ORDER BY date, team_key, player_id
+        """, mode='insert')
+    
+    if lineup_count:
+        print(f"📋 Found {lineup_count} recent lineup entries")
         print(f"✅ Exported lineups to: {lineup_file}")
+    else:
+        _discard_dump(writer)
     
     # Export recent stats (last 7 days)
     # Select all the columns that exist in the source table and map to D1 schema
-    cursor.execute("""
-        SELECT job_id, date, mlb_player_id, yahoo_player_id, 
-               player_name, team_code, position_codes, 
-               COALESCE(games_played, 1) as games_played,
-               batting_plate_appearances,
-               batting_at_bats,
-               batting_runs, batting_hits, 
-               batting_singles,
-               batting_doubles,
-               batting_triples,
-               batting_home_runs, batting_rbis, batting_stolen_bases,
-               batting_caught_stealing,
-               batting_walks,
-               batting_intentional_walks,
-               batting_strikeouts,
-               batting_hit_by_pitch,
-               batting_sacrifice_hits,
-               batting_sacrifice_flies,
-               batting_ground_into_double_play,
-               batting_total_bases,
-               pitching_games_started,
-               pitching_complete_games,
-               pitching_shutouts,
-               pitching_wins,
-               pitching_losses,
-               pitching_saves,
-               pitching_blown_saves,
-               pitching_holds,
-               pitching_innings_pitched,
-               pitching_batters_faced,
-               pitching_hits_allowed,
-               pitching_runs_allowed,
-               pitching_earned_runs,
-               pitching_home_runs_allowed,
-               pitching_walks_allowed,
-               pitching_intentional_walks_allowed,
-               pitching_strikeouts,
-               pitching_hit_batters,
-               pitching_wild_pitches,
-               pitching_balks,
-               pitching_quality_starts,
-               COALESCE(data_source, 'export') as data_source,
-               COALESCE(confidence_score, 1.0) as confidence_score,
-               has_batting_data,
-               COALESCE(has_pitching_data, 0) as has_pitching_data,
-               COALESCE(validation_status, 'valid') as validation_status,
-               validation_notes
-        FROM daily_gkl_player_stats
-        WHERE date >= date('now', '-7 days')
-          AND has_batting_data = 1
-        ORDER BY date, yahoo_player_id
-    """)
-    
-    stats = cursor.fetchall()
-    
-    if stats:
-        print(f"📋 Found {len(stats)} recent stats entries")
-        
-        # Generate SQL for stats
-        sql_lines = []
-        sql_lines.append("-- Recent stats export")
-        sql_lines.append(f"-- Generated: {datetime.now().isoformat()}")
-        sql_lines.append("")
-        sql_lines.append("-- Clear recent stats data")
-        sql_lines.append("DELETE FROM daily_gkl_player_stats WHERE date >= date('now', '-7 days');")
-        sql_lines.append("")
-        
-        for stat in stats:
-            # Properly escape and format values
-            escaped_values = []
-            for v in stat:
-                if v is not None:
-                    if isinstance(v, str):
-                        escaped_val = str(v).replace("'", "''")
-                        escaped_values.append(f"'{escaped_val}'")
-                    else:
-                        escaped_values.append(str(v))
-                else:
-                    escaped_values.append('NULL')
-            values = ', '.join(escaped_values)
-            
-            sql_lines.append(f"""
-INSERT OR REPLACE INTO daily_gkl_player_stats 
-(job_id, date, mlb_player_id, yahoo_player_id, player_name, team_code, position_codes,
- games_played, batting_plate_appearances, batting_at_bats, batting_runs, batting_hits,
- batting_singles, batting_doubles, batting_triples, batting_home_runs, batting_rbis,
- batting_stolen_bases, batting_caught_stealing, batting_walks, batting_intentional_walks,
- batting_strikeouts, batting_hit_by_pitch, batting_sacrifice_hits, batting_sacrifice_flies,
- batting_ground_into_double_play, batting_total_bases, pitching_games_started,
- pitching_complete_games, pitching_shutouts, pitching_wins, pitching_losses,
- pitching_saves, pitching_blown_saves, pitching_holds, pitching_innings_pitched,
- pitching_batters_faced, pitching_hits_allowed, pitching_runs_allowed, pitching_earned_runs,
- pitching_home_runs_allowed, pitching_walks_allowed, pitching_intentional_walks_allowed,
- pitching_strikeouts, pitching_hit_batters, pitching_wild_pitches, pitching_balks,
- pitching_quality_starts, data_source, confidence_score, has_batting_data,
- has_pitching_data, validation_status, validation_notes)
-VALUES ({values});""")
-        
-        # Write stats file
-        stats_file = export_dir / 'recent_stats.sql'
-        with open(stats_file, 'w') as f:
-            f.write('\n'.join(sql_lines))
-        
+    stats_file = export_dir / 'recent_stats.sql'
+    with SqlDumpWriter(stats_file) as writer:
+        writer.write_comment("Recent stats export")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_blank()
+        writer.write_comment("Clear recent stats data")
+        writer.write_statement("DELETE FROM daily_gkl_player_stats WHERE date >= date('now', '-7 days')",
+                               table='daily_gkl_player_stats')
+        writer.write_blank()
+        stats_count = writer.write_query(conn, 'daily_gkl_player_stats', """
+            SELECT job_id, date, mlb_player_id, yahoo_player_id, 
+                   player_name, team_code, position_codes, 
+                   COALESCE(games_played, 1) as games_played,
+                   batting_plate_appearances,
+                   batting_at_bats,
+                   batting_runs, batting_hits, 
+                   batting_singles,
+                   batting_doubles,
+                   batting_triples,
+                   batting_home_runs, batting_rbis, batting_stolen_bases,
+                   batting_caught_stealing,
+                   batting_walks,
+                   batting_intentional_walks,
+                   batting_strikeouts,
+                   batting_hit_by_pitch,
+                   batting_sacrifice_hits,
+                   batting_sacrifice_flies,
+                   batting_ground_into_double_play,
+                   batting_total_bases,
+                   pitching_games_started,
+                   pitching_complete_games,
+                   pitching_shutouts,
+                   pitching_wins,
+                   pitching_losses,
+                   pitching_saves,
+                   pitching_blown_saves,
+                   pitching_holds,
+                   pitching_innings_pitched,
+                   pitching_batters_faced,
+                   pitching_hits_allowed,
+                   pitching_runs_allowed,
+                   pitching_earned_runs,
+                   pitching_home_runs_allowed,
+                   pitching_walks_allowed,
+                   pitching_intentional_walks_allowed,
+                   pitching_strikeouts,
+                   pitching_hit_batters,
+                   pitching_wild_pitches,
+                   pitching_balks,
+                   pitching_quality_starts,
+                   COALESCE(data_source, 'export') as data_source,
+                   COALESCE(confidence_score, 1.0) as confidence_score,
+                   has_batting_data,
+                   COALESCE(has_pitching_data, 0) as has_pitching_data,
+                   COALESCE(validation_status, 'valid') as validation_status,
+                   validation_notes
+            FROM daily_gkl_player_stats
+            WHERE date >= date('now', '-7 days')
+              AND has_batting_data = 1
+            ORDER BY date, yahoo_player_id
+        """, mode='insert_or_replace')
+    
+    if stats_count:
+        print(f"📋 Found {stats_count} recent stats entries")
         print(f"✅ Exported stats to: {stats_file}")
+    else:
+        _discard_dump(writer)
     
     conn.close()
     return True
@@ -375,8 +296,9 @@ def deploy_to_cloudflare():
             
             if result.returncode == 0:
                 print(f"✅ {sql_file.name} executed successfully")
-                # Remove the file after successful execution
+                # Remove the file (and its dump manifest) after successful execution
                 sql_file.unlink()
+                sql_file.with_name(sql_file.name + '.manifest.json').unlink(missing_ok=True)
             else:
                 print(f"❌ {sql_file.name} failed: {result.stderr}")
                 return False
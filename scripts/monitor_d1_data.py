@@ -8,6 +8,7 @@ checking for completeness, consistency, and recent updates.
 Usage:
     python monitor_d1_data.py
     python monitor_d1_data.py --detailed
+    python monitor_d1_data.py --mirror    # Sync and read the local D1 mirror
 """
 
 import sys
@@ -25,9 +26,23 @@ sys.path.append(str(Path(__file__).parent.parent))
 from data_pipeline.common.d1_connection import D1Connection
 
 
-def check_data_quality():
+def get_connection(use_mirror=False):
+    """Return a D1 connection, or a reader over the synced local mirror."""
+    if not use_mirror:
+        return D1Connection()
+
+    from data_pipeline.common.d1_mirror import D1Mirror, MirrorConnection
+    mirror = D1Mirror(D1Connection())
+    try:
+        mirror.sync()
+    finally:
+        mirror.close()
+    return MirrorConnection(mirror.mirror_path)
+
+
+def check_data_quality(d1=None):
     """Check overall data quality in D1."""
-    d1 = D1Connection()
+    d1 = d1 or D1Connection()
     
     print("="*60)
     print("D1 DATA QUALITY REPORT")
@@ -160,9 +175,9 @@ def check_data_quality():
                 print(f"WARNING: {table}: {days_behind} days behind (last: {latest})")
 
 
-def check_detailed_stats():
+def check_detailed_stats(d1=None):
     """Show detailed statistics."""
-    d1 = D1Connection()
+    d1 = d1 or D1Connection()
     
     print("\n## DETAILED PLAYER STATS ANALYSIS")
     print("-"*40)
@@ -201,14 +216,17 @@ def main():
     
     parser.add_argument('--detailed', action='store_true',
                        help='Show detailed statistics')
+    parser.add_argument('--mirror', action='store_true',
+                       help='Sync the local D1 mirror and report from it')
     
     args = parser.parse_args()
     
     try:
-        check_data_quality()
+        d1 = get_connection(args.mirror)
+        check_data_quality(d1)
         
         if args.detailed:
-            check_detailed_stats()
+            check_detailed_stats(d1)
             
         print("\n" + "="*60)
         print("END OF REPORT")
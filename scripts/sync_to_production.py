@@ -11,6 +11,10 @@ import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data_pipeline.common.sql_dump_writer import SqlDumpWriter
+
 # Fix Windows console encoding for emojis
 if sys.platform == 'win32':
     import io
@@ -23,47 +27,31 @@ def export_recent_transactions(conn, export_dir, days_back=2):
     # Get transactions from the last N days
     cutoff_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
     
-    cursor.execute("""
-        SELECT * FROM transactions 
-        WHERE date >= ? 
-        ORDER BY date DESC, created_at DESC
-    """, (cutoff_date,))
-    
-    transactions = cursor.fetchall()
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE date >= ?", (cutoff_date,))
+    count = cursor.fetchone()[0]
     
-    if not transactions:
+    if not count:
         print(f"No transactions found since {cutoff_date}")
         return None
     
-    # Get column names
-    cursor.execute("PRAGMA table_info(transactions)")
-    columns = [col[1] for col in cursor.fetchall()]
-    
     # Generate SQL file
     sql_file = export_dir / f'transactions_{datetime.now().strftime("%Y%m%d_%H%M%S")}.sql'
     
-    with open(sql_file, 'w', encoding='utf-8') as f:
-        f.write(f"-- Recent transactions export\n")
-        f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-        f.write(f"-- Transactions since: {cutoff_date}\n")
-        f.write(f"-- Count: {len(transactions)}\n\n")
+    with SqlDumpWriter(sql_file) as writer:
+        writer.write_comment("Recent transactions export")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_comment(f"Transactions since: {cutoff_date}")
+        writer.write_comment(f"Count: {count}")
+        writer.write_blank()
         
         # Use REPLACE to handle duplicates
-        for row in transactions:
-            values = []
-            for val in row:
-                if val is None:
-                    values.append('NULL')
-                elif isinstance(val, str):
-                    # Escape single quotes and handle special characters
-                    escaped = val.replace("'", "''")
-                    values.append(f"'{escaped}'")
-                else:
-                    values.append(str(val))
-            
-            f.write(f"REPLACE INTO transactions ({', '.join(columns)}) VALUES ({', '.join(values)});\n")
+        count = writer.write_query(conn, 'transactions', """
+            SELECT * FROM transactions 
+            WHERE date >= ? 
+            ORDER BY date DESC, created_at DESC
+        """, (cutoff_date,), mode='replace')
     
-    print(f"✅ Exported {len(transactions)} transactions to {sql_file}")
+    print(f"✅ Exported {count} transactions to {sql_file}")
     return sql_file
 
 def export_job_logs(conn, export_dir, job_ids):
@@ -71,47 +59,28 @@ def export_job_logs(conn, export_dir, job_ids):
     if not job_ids:
         return None
     
-    cursor = conn.cursor()
-    
     # Create placeholders for SQL query
     placeholders = ','.join(['?' for _ in job_ids])
     
-    cursor.execute(f"""
-        SELECT * FROM job_log 
-        WHERE job_id IN ({placeholders})
-    """, list(job_ids))
-    
-    job_logs = cursor.fetchall()
-    
-    if not job_logs:
-        return None
-    
-    # Get column names
-    cursor.execute("PRAGMA table_info(job_log)")
-    columns = [col[1] for col in cursor.fetchall()]
-    
     # Generate SQL file
     sql_file = export_dir / f'job_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.sql'
     
-    with open(sql_file, 'w', encoding='utf-8') as f:
-        f.write(f"-- Job log export for foreign key dependencies\n")
-        f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-        f.write(f"-- Count: {len(job_logs)}\n\n")
+    with SqlDumpWriter(sql_file) as writer:
+        writer.write_comment("Job log export for foreign key dependencies")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_blank()
         
-        for row in job_logs:
-            values = []
-            for val in row:
-                if val is None:
-                    values.append('NULL')
-                elif isinstance(val, str):
-                    escaped = val.replace("'", "''")
-                    values.append(f"'{escaped}'")
-                else:
-                    values.append(str(val))
-            
-            f.write(f"INSERT OR IGNORE INTO job_log ({', '.join(columns)}) VALUES ({', '.join(values)});\n")
+        count = writer.write_query(conn, 'job_log', f"""
+            SELECT * FROM job_log 
+            WHERE job_id IN ({placeholders})
+        """, list(job_ids), mode='insert_or_ignore')
+    
+    if not count:
+        sql_file.unlink()
+        writer.manifest_path.unlink(missing_ok=True)
+        return None
     
-    print(f"✅ Exported {len(job_logs)} job_log entries to {sql_file}")
+    print(f"✅ Exported {count} job_log entries to {sql_file}")
     return sql_file
 
 def export_recent_lineups(conn, export_dir, days_back=7):
@@ -126,60 +95,37 @@ def export_recent_lineups(conn, export_dir, days_back=7):
     
     cutoff_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
     
-    cursor.execute("""
-        SELECT * FROM daily_lineups 
-        WHERE date >= ? 
-        ORDER BY date DESC
-    """, (cutoff_date,))
+    cursor.execute("SELECT COUNT(*) FROM daily_lineups WHERE date >= ?", (cutoff_date,))
+    count = cursor.fetchone()[0]
     
-    lineups = cursor.fetchall()
-    
-    if not lineups:
+    if not count:
         print(f"No lineups found since {cutoff_date}")
         return None, set()
     
-    # Get column names and find job_id column index
-    cursor.execute("PRAGMA table_info(daily_lineups)")
-    columns_info = cursor.fetchall()
-    columns = [col[1] for col in columns_info]
-    
-    # Find job_id column index
-    job_id_index = None
-    for i, col in enumerate(columns):
-        if col == 'job_id':
-            job_id_index = i
-            break
-    
-    # Collect unique job_ids
-    job_ids = set()
-    if job_id_index is not None:
-        for row in lineups:
-            if row[job_id_index]:
-                job_ids.add(row[job_id_index])
+    # Collect unique job_ids without materializing the lineup rows
+    cursor.execute("""
+        SELECT DISTINCT job_id FROM daily_lineups 
+        WHERE date >= ? AND job_id IS NOT NULL
+    """, (cutoff_date,))
+    job_ids = {row[0] for row in cursor.fetchall()}
     
     # Generate SQL file
     sql_file = export_dir / f'lineups_{datetime.now().strftime("%Y%m%d_%H%M%S")}.sql'
     
-    with open(sql_file, 'w', encoding='utf-8') as f:
-        f.write(f"-- Recent lineups export\n")
-        f.write(f"-- Generated: {datetime.now().isoformat()}\n")
-        f.write(f"-- Lineups since: {cutoff_date}\n")
-        f.write(f"-- Count: {len(lineups)}\n\n")
+    with SqlDumpWriter(sql_file) as writer:
+        writer.write_comment("Recent lineups export")
+        writer.write_comment(f"Generated: {datetime.now().isoformat()}")
+        writer.write_comment(f"Lineups since: {cutoff_date}")
+        writer.write_comment(f"Count: {count}")
+        writer.write_blank()
         
-        for row in lineups:
-            values = []
-            for val in row:
-                if val is None:
-                    values.append('NULL')
-                elif isinstance(val, str):
-                    escaped = val.replace("'", "''")
-                    values.append(f"'{escaped}'")
-                else:
-                    values.append(str(val))
-            
-            f.write(f"REPLACE INTO daily_lineups ({', '.join(columns)}) VALUES ({', '.join(values)});\n")
+        count = writer.write_query(conn, 'daily_lineups', """
+            SELECT * FROM daily_lineups 
+            WHERE date >= ? 
+            ORDER BY date DESC
+        """, (cutoff_date,), mode='replace')
     
-    print(f"✅ Exported {len(lineups)} lineups to {sql_file}")
+    print(f"✅ Exported {count} lineups to {sql_file}")
     return sql_file, job_ids
 
 def main():
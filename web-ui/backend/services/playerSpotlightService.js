@@ -3,10 +3,45 @@ const { getTableName, getEnvironment } = require('../config/database');
 const { getSeasonDays, getSeasonDateRange, daysBetween } = require('../config/seasonDates');
 const playerStatsService = require('./playerStatsService');
 
+// Lineup slots that are not starts (same sets as data_pipeline/common/scoring_categories.py)
+const BENCH_SLOTS = ['BN'];
+const INJURED_SLOTS = ['IL', 'IL10', 'IL15', 'IL60', 'IL+'];
+const MINOR_LEAGUE_SLOTS = ['NA'];
+
+const MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+                     'July', 'August', 'September', 'October', 'November', 'December'];
+
 class PlayerSpotlightService {
   constructor() {
     this.environment = getEnvironment();
     this.tableName = getTableName('daily_lineups', this.environment);
+    this.summaryTable = getTableName('player_spotlight_summary', this.environment);
+  }
+
+  // Get the precomputed spotlight summary for a player-season
+  // (built by data_pipeline/player_spotlight/summaries.py), or null if there is none
+  async getSpotlightSummary(playerId, season) {
+    let summary;
+    try {
+      summary = await database.get(`
+        SELECT teams_json, positions_json, monthly_json
+        FROM ${this.summaryTable}
+        WHERE yahoo_player_id = ? AND season = ?
+      `, [String(playerId), parseInt(season)]);
+    } catch (error) {
+      // Table not created on this database yet
+      console.warn('Spotlight summary unavailable:', error.message);
+      return null;
+    }
+    if (!summary) {
+      return null;
+    }
+
+    return {
+      teams: JSON.parse(summary.teams_json || '[]'),
+      positions: JSON.parse(summary.positions_json || '[]'),
+      monthly: JSON.parse(summary.monthly_json || '[]')
+    };
   }
 
   // Get comprehensive player spotlight data for a specific season
@@ -15,17 +50,20 @@ class PlayerSpotlightService {
       // Get basic player information
       const playerInfo = await this.getPlayerBasicInfo(playerId);
       
+      // Team history, usage and monthly rows come from the summary when there is one
+      const summary = await this.getSpotlightSummary(playerId, season);
+      
       // Get team history for the season
-      const teamHistory = await this.getTeamHistory(playerId, season);
+      const teamHistory = await this.getTeamHistory(playerId, season, summary);
       
       // Add team history to player info
       playerInfo.team_history = teamHistory;
       
       // Get season usage statistics (filtered by current team)
-      const usageStats = await this.getSeasonUsageStats(playerId, season, playerInfo.current_fantasy_team);
+      const usageStats = await this.getSeasonUsageStats(playerId, season, playerInfo.current_fantasy_team, summary);
       
       // Get monthly breakdown data
-      const monthlyData = await this.getMonthlyBreakdown(playerId, season);
+      const monthlyData = await this.getMonthlyBreakdown(playerId, season, summary);
       
       // Get available seasons for this player
       const availableSeasons = await this.getAvailableSeasons(playerId);
@@ -95,7 +133,21 @@ class PlayerSpotlightService {
   }
 
   // Get team history for a player in a season
-  async getTeamHistory(playerId, season) {
+  async getTeamHistory(playerId, season, summary) {
+    if (summary === undefined) {
+      summary = await this.getSpotlightSummary(playerId, season);
+    }
+    if (summary) {
+      const totalDays = summary.teams.reduce((sum, team) => sum + team.days, 0);
+      return summary.teams.map(team => ({
+        team_name: team.team_name,
+        days: team.days,
+        percentage: totalDays > 0 ? team.days * 100.0 / totalDays : 0,
+        from_date: team.from_date,
+        to_date: team.to_date
+      }));
+    }
+
     const teams = await database.all(`
       SELECT 
         team_name,
@@ -125,53 +177,19 @@ class PlayerSpotlightService {
   }
 
   // Get season usage statistics with percentages
-  async getSeasonUsageStats(playerId, season, currentTeam = null) {
+  async getSeasonUsageStats(playerId, season, currentTeam = null, summary) {
     // If no current team provided, get it from player info
     if (!currentTeam) {
       const playerInfo = await this.getPlayerBasicInfo(playerId);
       currentTeam = playerInfo.current_fantasy_team;
     }
+    if (summary === undefined) {
+      summary = await this.getSpotlightSummary(playerId, season);
+    }
 
-    // Get stats for current team only
-    const stats = await database.all(`
-      SELECT 
-        selected_position,
-        COUNT(*) as days,
-        COUNT(*) * 100.0 / (
-          SELECT COUNT(*) 
-          FROM ${this.tableName} 
-          WHERE yahoo_player_id = ? 
-          AND strftime('%Y', date) = ?
-          AND team_name = ?
-        ) as percentage
-      FROM ${this.tableName}
-      WHERE yahoo_player_id = ? 
-      AND strftime('%Y', date) = ?
-      AND team_name = ?
-      GROUP BY selected_position
-      ORDER BY days DESC
-    `, [playerId, season.toString(), currentTeam, playerId, season.toString(), currentTeam]);
-
-    // Get total days on current team
-    const currentTeamResult = await database.get(`
-      SELECT COUNT(*) as total_days
-      FROM ${this.tableName}
-      WHERE yahoo_player_id = ? 
-      AND strftime('%Y', date) = ?
-      AND team_name = ?
-    `, [playerId, season.toString(), currentTeam]);
-
-    // Get days on other teams
-    const otherTeamResult = await database.get(`
-      SELECT COUNT(*) as other_days
-      FROM ${this.tableName}
-      WHERE yahoo_player_id = ? 
-      AND strftime('%Y', date) = ?
-      AND team_name != ?
-    `, [playerId, season.toString(), currentTeam]);
-
-    const currentTeamDays = currentTeamResult?.total_days || 0;
-    const otherTeamDays = otherTeamResult?.other_days || 0;
+    const { stats, currentTeamDays, otherTeamDays, otherTeams } = summary
+      ? this.usageFromSummary(summary, currentTeam)
+      : await this.queryUsage(playerId, season, currentTeam);
     const totalRosteredDays = currentTeamDays + otherTeamDays;
     
     // Get total season days to calculate "Not Owned" accurately
@@ -188,26 +206,11 @@ class PlayerSpotlightService {
       not_rostered: { days: notOwnedDays, percentage: (notOwnedDays / totalSeasonDays) * 100, positions: [] }
     };
 
-    // Get team breakdown for other rosters
-    if (otherTeamDays > 0) {
-      const otherTeams = await database.all(`
-        SELECT 
-          team_name,
-          COUNT(*) as days
-        FROM ${this.tableName}
-        WHERE yahoo_player_id = ?
-        AND strftime('%Y', date) = ?
-        AND team_name != ?
-        GROUP BY team_name
-        ORDER BY days DESC
-      `, [playerId, season.toString(), currentTeam]);
-
-      usageBreakdown.other_roster.teams = otherTeams.map(team => ({
-        name: team.team_name,
-        days: team.days,
-        percentage: (team.days / totalSeasonDays) * 100
-      }));
-    }
+    usageBreakdown.other_roster.teams = otherTeams.map(team => ({
+      name: team.team_name,
+      days: team.days,
+      percentage: (team.days / totalSeasonDays) * 100
+    }));
 
     stats.forEach(stat => {
       const position = stat.selected_position;
@@ -215,16 +218,16 @@ class PlayerSpotlightService {
       // Recalculate percentage based on total season days
       const percentage = (days / totalSeasonDays) * 100;
 
-      if (['BN'].includes(position)) {
+      if (BENCH_SLOTS.includes(position)) {
         usageBreakdown.benched.days += days;
         usageBreakdown.benched.percentage = (usageBreakdown.benched.days / totalSeasonDays) * 100;
         usageBreakdown.benched.positions.push(position);
-      } else if (['IL', 'IL10', 'IL15', 'IL60'].includes(position)) {
+      } else if (INJURED_SLOTS.includes(position)) {
         // Only actual IL positions, not NA
         usageBreakdown.injured_list.days += days;
         usageBreakdown.injured_list.percentage = (usageBreakdown.injured_list.days / totalSeasonDays) * 100;
         usageBreakdown.injured_list.positions.push(position);
-      } else if (position === 'NA') {
+      } else if (MINOR_LEAGUE_SLOTS.includes(position)) {
         // NA is Minor Leagues, not injured
         usageBreakdown.minor_leagues.days += days;
         usageBreakdown.minor_leagues.percentage = (usageBreakdown.minor_leagues.days / totalSeasonDays) * 100;
@@ -259,8 +262,115 @@ class PlayerSpotlightService {
     };
   }
 
-  // Get monthly breakdown data
-  async getMonthlyBreakdown(playerId, season) {
+  // Position days on the current team and days on other teams, from the summary
+  usageFromSummary(summary, currentTeam) {
+    const positions = summary.positions.filter(row => row.team_name === currentTeam);
+    const currentTeamDays = positions.reduce((sum, row) => sum + row.days, 0);
+    const otherTeams = summary.teams
+      .filter(team => team.team_name !== currentTeam)
+      .map(team => ({ team_name: team.team_name, days: team.days }))
+      .sort((a, b) => b.days - a.days);
+
+    return {
+      stats: positions.map(row => ({
+        selected_position: row.selected_position,
+        days: row.days,
+        percentage: currentTeamDays > 0 ? row.days * 100.0 / currentTeamDays : 0
+      })),
+      currentTeamDays,
+      otherTeamDays: otherTeams.reduce((sum, team) => sum + team.days, 0),
+      otherTeams
+    };
+  }
+
+  // Same figures aggregated from daily_lineups
+  async queryUsage(playerId, season, currentTeam) {
+    // Get stats for current team only
+    const stats = await database.all(`
+      SELECT 
+        selected_position,
+        COUNT(*) as days,
+        COUNT(*) * 100.0 / (
+          SELECT COUNT(*) 
+          FROM ${this.tableName} 
+          WHERE yahoo_player_id = ? 
+          AND strftime('%Y', date) = ?
+          AND team_name = ?
+        ) as percentage
+      FROM ${this.tableName}
+      WHERE yahoo_player_id = ? 
+      AND strftime('%Y', date) = ?
+      AND team_name = ?
+      GROUP BY selected_position
+      ORDER BY days DESC
+    `, [playerId, season.toString(), currentTeam, playerId, season.toString(), currentTeam]);
+
+    // Get total days on current team
+    const currentTeamResult = await database.get(`
+      SELECT COUNT(*) as total_days
+      FROM ${this.tableName}
+      WHERE yahoo_player_id = ? 
+      AND strftime('%Y', date) = ?
+      AND team_name = ?
+    `, [playerId, season.toString(), currentTeam]);
+
+    // Get days on other teams
+    const otherTeamResult = await database.get(`
+      SELECT COUNT(*) as other_days
+      FROM ${this.tableName}
+      WHERE yahoo_player_id = ? 
+      AND strftime('%Y', date) = ?
+      AND team_name != ?
+    `, [playerId, season.toString(), currentTeam]);
+
+    const currentTeamDays = currentTeamResult?.total_days || 0;
+    const otherTeamDays = otherTeamResult?.other_days || 0;
+
+    // Get team breakdown for other rosters
+    let otherTeams = [];
+    if (otherTeamDays > 0) {
+      otherTeams = await database.all(`
+        SELECT 
+          team_name,
+          COUNT(*) as days
+        FROM ${this.tableName}
+        WHERE yahoo_player_id = ?
+        AND strftime('%Y', date) = ?
+        AND team_name != ?
+        GROUP BY team_name
+        ORDER BY days DESC
+      `, [playerId, season.toString(), currentTeam]);
+    }
+
+    return { stats, currentTeamDays, otherTeamDays, otherTeams };
+  }
+
+  // Monthly (month, team, position) rows and month list, from the summary
+  monthlyFromSummary(summary) {
+    const monthlyStats = summary.monthly
+      .map(row => ({
+        month_year: row.month,
+        month_name: MONTH_NAMES[parseInt(row.month.split('-')[1]) - 1],
+        earliest_date: row.first_date,
+        latest_date: row.last_date,
+        period_start: row.first_date,
+        period_end: row.last_date,
+        selected_position: row.selected_position,
+        team_name: row.team_name,
+        position_days: row.days
+      }))
+      .sort((a, b) => a.month_year.localeCompare(b.month_year) ||
+        a.period_start.localeCompare(b.period_start) ||
+        (a.team_name || '').localeCompare(b.team_name || '') ||
+        (a.selected_position || '').localeCompare(b.selected_position || ''));
+    const monthTotals = [...new Set(monthlyStats.map(stat => stat.month_year))]
+      .map(monthYear => ({ month_year: monthYear }));
+
+    return { monthlyStats, monthTotals };
+  }
+
+  // Same rows aggregated from daily_lineups
+  async queryMonthly(playerId, season) {
     const monthlyStats = await database.all(`
       SELECT 
         strftime('%Y-%m', date) as month_year,
@@ -303,6 +413,18 @@ class PlayerSpotlightService {
       GROUP BY month_year
     `, [playerId, season.toString()]);
 
+    return { monthlyStats, monthTotals };
+  }
+
+  // Get monthly breakdown data
+  async getMonthlyBreakdown(playerId, season, summary) {
+    if (summary === undefined) {
+      summary = await this.getSpotlightSummary(playerId, season);
+    }
+    const { monthlyStats, monthTotals } = summary
+      ? this.monthlyFromSummary(summary)
+      : await this.queryMonthly(playerId, season);
+
     // Helper function to get actual calendar days in a month
     const getCalendarDaysInMonth = (year, month) => {
       const monthNum = parseInt(month);
@@ -439,13 +561,13 @@ class PlayerSpotlightService {
 
       // Categorize into summary buckets
       const position = stat.selected_position;
-      if (['BN'].includes(position)) {
+      if (BENCH_SLOTS.includes(position)) {
         monthlyData[monthKey].summary.benched += stat.position_days;
         monthlyData[monthKey].teams[stat.team_name].summary.benched += stat.position_days;
-      } else if (['IL', 'IL10', 'IL15', 'IL60'].includes(position)) {
+      } else if (INJURED_SLOTS.includes(position)) {
         monthlyData[monthKey].summary.injured_list += stat.position_days;
         monthlyData[monthKey].teams[stat.team_name].summary.injured_list += stat.position_days;
-      } else if (position === 'NA') {
+      } else if (MINOR_LEAGUE_SLOTS.includes(position)) {
         monthlyData[monthKey].summary.minor_leagues += stat.position_days;
         monthlyData[monthKey].teams[stat.team_name].summary.minor_leagues += stat.position_days;
       } else if (position === 'Not Owned' || position === 'FA') {
@@ -498,11 +620,8 @@ class PlayerSpotlightService {
           const effectiveEnd = monthEnd > new Date(actualEndDate) ? 
             new Date(actualEndDate) : monthEnd;
           
-          const monthNames = ['January', 'February', 'March', 'April', 'May', 'June',
-                             'July', 'August', 'September', 'October', 'November', 'December'];
-          
           monthlyData[monthKey] = {
-            month: monthNames[month - 1], // month is 1-based, array is 0-based
+            month: MONTH_NAMES[month - 1], // month is 1-based, array is 0-based
             year: year,
             month_year: monthKey,
             earliest_date: effectiveStart.toISOString().split('T')[0],
@@ -5,6 +5,8 @@ class TransactionService {
   constructor() {
     this.environment = getEnvironment();
     this.tableName = getTableName('transactions', this.environment);
+    this.rollupTableName = getTableName('transaction_rollups', this.environment);
+    this.rollupOverviewTableName = getTableName('transaction_rollup_overview', this.environment);
   }
   
   // Get all transactions with pagination and filtering
@@ -151,6 +153,67 @@ class TransactionService {
 
   // Get transaction statistics
   async getStatistics() {
+    // Rollups are maintained by data_pipeline/league_transactions/rollups.py
+    try {
+      const rollupStats = await this.getRollupStatistics();
+      if (rollupStats) {
+        return rollupStats;
+      }
+    } catch (error) {
+      console.warn('Transaction rollups unavailable, scanning transactions:', error.message);
+    }
+    return this.computeStatistics();
+  }
+
+  // Read the statistics payload from precomputed rollup rows
+  async getRollupStatistics() {
+    const overview = await database.get(`
+      SELECT max_transaction_id, earliest_date, latest_date
+      FROM ${this.rollupOverviewTableName}
+      WHERE id = 1
+    `);
+    if (!overview) {
+      return null;
+    }
+
+    const rows = await database.all(`
+      SELECT dimension, key, label, count
+      FROM ${this.rollupTableName}
+      ORDER BY count DESC, key
+    `);
+    const byDimension = {};
+    rows.forEach(row => {
+      (byDimension[row.dimension] = byDimension[row.dimension] || []).push(row);
+    });
+    const dimension = (name, limit) => (byDimension[name] || []).slice(0, limit);
+
+    const mostDropped = dimension('player_drop', 1)[0];
+    const recentActivity = (byDimension.date || [])
+      .map(row => ({ date: row.key, transaction_count: row.count }))
+      .sort((a, b) => b.date.localeCompare(a.date))
+      .slice(0, 30);
+
+    return {
+      overview: {
+        total_transactions: overview.max_transaction_id,
+        unique_players: dimension('active_player').length,
+        unique_teams: dimension('active_destination').length + dimension('active_source').length,
+        earliest_date: overview.earliest_date,
+        latest_date: overview.latest_date
+      },
+      typeBreakdown: dimension('transaction_type').map(row => ({ transaction_type: row.key, count: row.count })),
+      movementBreakdown: dimension('movement_type').map(row => ({ movement_type: row.key, count: row.count })),
+      topTeams: dimension('destination_team', 10).map(row => ({ team_name: row.key, acquisitions: row.count })),
+      topPlayers: dimension('player', 10).map(row => ({ player_name: row.key, transaction_count: row.count })),
+      mostAddedPlayers: dimension('player_add', 10).map(row => ({ player_name: row.key, add_count: row.count })),
+      mostDroppedPlayer: mostDropped ? { player_name: mostDropped.key, drop_count: mostDropped.count } : undefined,
+      recentActivity,
+      managerStats: dimension('manager').map(row => ({ team_name: row.label, transaction_count: row.count }))
+    };
+  }
+
+  // Compute the statistics payload by scanning the transactions table
+  async computeStatistics() {
     const stats = await database.all(`
       SELECT 
         MAX(CAST(transaction_id as INTEGER)) as total_transactions,